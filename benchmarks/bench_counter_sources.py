@@ -0,0 +1,45 @@
+"""Samples per second and CPU per sample of each network counter source.
+
+Run from the repository root:
+
+    python benchmarks/bench_counter_sources.py [seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speedview.controllers.counter_sources import COUNTER_SOURCES
+
+
+def run(source, seconds):
+    """Return (samples per second, CPU us per sample)"""
+    samples = 0
+    cpu_start = time.process_time()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        source.read()
+        samples += 1
+    cpu = time.process_time() - cpu_start
+    return samples / seconds, cpu * 1e6 / samples
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    print(f"{'source':<10}{'samples/s':>12}{'CPU us/sample':>16}")
+    for name, source_class in COUNTER_SOURCES.items():
+        try:
+            source = source_class()
+        except (OSError, AttributeError) as e:
+            print(f"{name:<10}{'unavailable':>12}  {e}")
+            continue
+        try:
+            rate, cpu_us = run(source, seconds)
+        finally:
+            source.close()
+        print(f"{name:<10}{rate:>12.0f}{cpu_us:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
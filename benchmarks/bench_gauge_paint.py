@@ -0,0 +1,86 @@
+"""CPU per frame of the main gauge: full QSvgWidget reloads vs SvgGaugeWidget.
+
+The reload cases are the paths the windows took before SvgGaugeWidget:
+NetworkSpeedMeter wrote every frame to a temp file and loaded it, and
+MainWindow loaded the rendered bytes.
+
+Frames are driven by a QTimer at each rate so the numbers include the event
+loop, the same way the windows are updated. Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_gauge_paint.py [seconds]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtSvg import QSvgWidget
+from PyQt5.QtCore import QTimer
+
+from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE
+from speedview.ui.svg_gauge import SvgGaugeWidget
+from speedview.utils.svg_utils import MAIN_SVG_LAYERS, render_main_svg, speed_slot_values
+
+
+def reload_frame(widget, speed):
+    widget.load(render_main_svg(speed, 100, status="Connected", connection_type="WiFi",
+                                signal_strength=3).encode('utf-8'))
+    widget.repaint()
+
+
+def file_reload_frame(widget, speed, path=os.path.join(tempfile.gettempdir(), "bench_gauge_paint.svg")):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_main_svg(speed, 100, status="Connected", connection_type="WiFi", signal_strength=3))
+    widget.load(path)
+    widget.repaint()
+
+
+def gauge_frame(widget, speed):
+    widget.set_values(speed_slot_values(speed, 100))
+    widget.repaint()
+
+
+def run(app, widget, frame, rate_hz, seconds):
+    """Return (CPU ms per frame, frames drawn)"""
+    frames = [0]
+
+    def tick():
+        frame(widget, frames[0] % 100)
+        frames[0] += 1
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    cpu_start = time.process_time()
+    timer.start(int(1000 / rate_hz))
+    app.exec_()
+    timer.stop()
+    cpu = time.process_time() - cpu_start
+    return cpu * 1000 / max(frames[0], 1), frames[0]
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    app = QApplication.instance() or QApplication(sys.argv)
+    cases = [
+        ("QSvgWidget file", QSvgWidget, file_reload_frame),
+        ("QSvgWidget.load", QSvgWidget, reload_frame),
+        ("SvgGaugeWidget", lambda: SvgGaugeWidget(MAIN_SVG_TEMPLATE, MAIN_SVG_LAYERS), gauge_frame),
+    ]
+    print(f"{'case':<20}{'rate':>8}{'frames':>8}{'CPU ms/frame':>15}{'CPU %':>8}")
+    for name, factory, frame in cases:
+        for rate_hz in (2, 30):
+            widget = factory()
+            widget.resize(500, 500)
+            widget.show()
+            ms_per_frame, frames = run(app, widget, frame, rate_hz, seconds)
+            widget.close()
+            # Share of one core spent drawing at this frame rate
+            print(f"{name:<20}{rate_hz:>6}Hz{frames:>8}{ms_per_frame:>15.3f}{ms_per_frame * rate_hz / 10:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Startup time and peak RSS of the headless daemon.
+
+Each run starts a fresh interpreter, measures the time to import the daemon
+and to publish its first rate, then reports the peak resident set size
+(VmHWM, Linux only). Run from the repository root:
+
+    python benchmarks/bench_headless.py [runs]
+"""
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys, time, json, asyncio
+start = time.perf_counter()
+from speedview.daemon import HeadlessDaemon
+from speedview.models.settings import Settings
+imported = time.perf_counter()
+
+settings = Settings()
+settings.update_interval = 0.05
+daemon = HeadlessDaemon(settings)
+first = []
+def on_update(update):
+    if update.rate is not None and not first:
+        first.append(time.perf_counter())
+        daemon.stop()
+daemon.engine.subscribe(on_update)
+asyncio.run(daemon.run(5))
+
+try:
+    with open('/proc/self/status') as f:
+        rss_kb = int(f.read().split('VmHWM:')[1].split()[0])
+except OSError:
+    rss_kb = None
+print(json.dumps({"import_ms": (imported - start) * 1000,
+                  "first_update_ms": (first[0] - start) * 1000 if first else None,
+                  "rss_mb": rss_kb / 1024 if rss_kb else None,
+                  "qt_loaded": "PyQt5" in sys.modules}))
+"""
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'run':>4}{'import ms':>12}{'first update ms':>18}{'peak RSS MB':>14}{'Qt':>5}")
+    for run in range(runs):
+        output = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        rss = f"{result['rss_mb']:.1f}" if result["rss_mb"] else "n/a"
+        first = f"{result['first_update_ms']:.1f}" if result["first_update_ms"] else "n/a"
+        print(f"{run + 1:>4}{result['import_ms']:>12.1f}{first:>18}{rss:>14}"
+              f"{'yes' if result['qt_loaded'] else 'no':>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Frame time of the history chart while panning a year of recorded history.
+
+A temporary HistoryStore is filled with a year of five-minute records, then
+the chart is zoomed out to the whole year and panned a few pixels per frame,
+the way a mouse drag does. Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_history_chart.py [frames]
+"""
+import os
+import sys
+import math
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+from speedview.models.history import HistoryStore, SECOND_NS, DAY_NS
+from speedview.ui.history_chart import HistoryChart
+
+RECORD_NS = 300 * SECOND_NS
+
+
+def fill(store, end_ns, days):
+    """Diurnal traffic with a burst every few hours; returns the record count"""
+    records = 0
+    for timestamp_ns in range(end_ns - days * DAY_NS, end_ns, RECORD_NS):
+        hour = timestamp_ns / (3600 * SECOND_NS)
+        rx_bps = int(20e6 * (1.2 + math.sin(hour / 24 * 2 * math.pi)))
+        if int(hour) % 7 == 0:
+            rx_bps *= 5
+        store.append(timestamp_ns, RECORD_NS, "eth0", rx_bps, rx_bps // 8)
+        records += 1
+    store.flush()
+    return records
+
+
+def run(chart, frames, pixels):
+    """Return (mean, worst) ms per frame while panning ``pixels`` per frame.
+
+    Tiles that scroll into view load in the background and show up in a
+    later frame, so a frame never waits for the store.
+    """
+    times = []
+    for _ in range(frames):
+        chart.pan(-pixels)
+        start = time.perf_counter()
+        chart.grab()
+        times.append(time.perf_counter() - start)
+    return sum(times) * 1000 / frames, max(times) * 1000
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    app = QApplication.instance() or QApplication(sys.argv)
+    directory = tempfile.mkdtemp()
+    try:
+        store = HistoryStore(directory, retention_days=0)
+        now_ns = time.time_ns()
+        start = time.perf_counter()
+        records = fill(store, now_ns, 365)
+        print(f"filled {records} records in {time.perf_counter() - start:.1f} s")
+
+        chart = HistoryChart(store)
+        chart.resize(800, 300)
+        chart.show()
+        for label, days in (("1 year", 365), ("30 days", 30), ("1 day", 1)):
+            chart.invalidate()
+            chart.show_range(now_ns - days * DAY_NS, now_ns)
+            start = time.perf_counter()
+            chart.grab()
+            first_ms = (time.perf_counter() - start) * 1000
+            # Tiles load on a background thread; cold is until they are all drawn
+            while chart.loading:
+                app.processEvents()
+                time.sleep(0.001)
+            chart.grab()
+            cold_ms = (time.perf_counter() - start) * 1000
+            mean_ms, worst_ms = run(chart, frames, 3)
+            print(f"{label:<8} first paint {first_ms:6.2f} ms  cold {cold_ms:7.2f} ms  panning mean {mean_ms:6.3f} ms "
+                  f"worst {worst_ms:6.2f} ms  ({1000 / mean_ms:.0f} fps)")
+        chart.close()
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""CPU per interface per tick of InterfaceRateMonitor with many interfaces.
+
+Run from the repository root:
+
+    python benchmarks/bench_interface_monitor.py [ticks]
+
+The per-interface cost should stay about the same from 50 to 500
+interfaces (container veths).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speedview.controllers.engine import Sample
+from speedview.controllers.interface_monitor import InterfaceRateMonitor
+
+SECOND_NS = 1_000_000_000
+
+
+def run(count, ticks):
+    """Return CPU us per interface per tick"""
+    interfaces = tuple(f"veth{i}" for i in range(count))
+    samples = [Sample(tick * SECOND_NS, interfaces, (tick * 1000,) * count, (tick * 100,) * count)
+               for tick in range(1, ticks + 1)]
+    monitor = InterfaceRateMonitor(link_speeds=dict)
+    cpu_start = time.process_time()
+    for sample in samples:
+        monitor.update(sample)
+    return (time.process_time() - cpu_start) * 1e6 / (count * ticks)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    run(50, 100)  # Warm up
+    print(f"{'interfaces':>10}{'CPU us/interface':>18}")
+    for count in (1, 10, 50, 100, 500, 1000):
+        print(f"{count:>10}{run(count, ticks):>18.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compare the compiled SVG renderer against the legacy regex path.
+
+Run from the repository root:
+
+    python benchmarks/bench_svg_render.py [frames]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE, FLOATING_SVG_TEMPLATE
+from speedview.utils import svg_utils
+
+
+def regex_main_frame(speed):
+    svg = svg_utils._regex_update_svg_speed(MAIN_SVG_TEMPLATE, speed, 100)
+    svg = svg_utils._regex_update_svg_connection_status(svg, "Connected", "WiFi")
+    return svg_utils._regex_update_svg_signal_strength(svg, 3)
+
+
+def compiled_main_frame(speed):
+    return svg_utils.render_main_svg(speed, 100, status="Connected",
+                                     connection_type="WiFi", signal_strength=3)
+
+
+def regex_floating_frame(speed):
+    return svg_utils._regex_update_floating_svg(FLOATING_SVG_TEMPLATE, speed, 60, "WiFi", "5GHz")
+
+
+def compiled_floating_frame(speed):
+    return svg_utils.render_floating_svg(speed, 60, "WiFi", "5GHz")
+
+
+def measure(render, frames):
+    """Return (frames per second, peak bytes allocated while rendering one frame)"""
+    start = time.perf_counter()
+    for i in range(frames):
+        render(i % 100)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    render(50)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return frames / elapsed, peak
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cases = [
+        ("main/regex", regex_main_frame),
+        ("main/compiled", compiled_main_frame),
+        ("floating/regex", regex_floating_frame),
+        ("floating/compiled", compiled_floating_frame),
+    ]
+    print(f"{'case':<20}{'frames/s':>12}{'peak bytes/frame':>20}")
+    for name, render in cases:
+        fps, peak = measure(render, frames)
+        print(f"{name:<20}{fps:>12.0f}{peak:>20}")
+
+
+if __name__ == '__main__':
+    main()
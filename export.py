@@ -0,0 +1,80 @@
+"""Export recorded history or speed test results for other tools.
+
+    python export.py history traffic.csv --days 30 --interface eth0
+    python export.py results tests.parquet --start 2024-01-01 --end 2024-02-01
+    python export.py history - --format jsonl --days 1 | jq .
+
+Rows are streamed from the stores, so memory use does not depend on the range.
+"""
+import sys
+import time
+import argparse
+from datetime import datetime
+
+from speedview.config.config import HISTORY_DIR, RESULTS_DB
+from speedview.models.history import HistoryStore, SECOND_NS, DAY_NS
+from speedview.models.results import ResultsStore
+from speedview.utils.export import (BINARY_FORMATS, EXPORT_FORMATS, HISTORY_FIELDS, RESULT_FIELDS,
+                                    export_rows, format_for_path, history_rows, result_rows)
+
+
+def parse_time(value):
+    """ISO 8601 date or date-time, in local time unless it carries an offset, as ns"""
+    try:
+        return int(datetime.fromisoformat(value).timestamp() * SECOND_NS)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO date or date-time: {value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Export SpeedView history or speed test results")
+    parser.add_argument("dataset", choices=("history", "results"))
+    parser.add_argument("output", help="output file, or - for standard output")
+    parser.add_argument("--format", choices=EXPORT_FORMATS,
+                        help="output format (default: from the output file extension)")
+    parser.add_argument("--start", type=parse_time, help="first time to include (ISO 8601)")
+    parser.add_argument("--end", type=parse_time, help="time to stop before (ISO 8601, default: now)")
+    parser.add_argument("--days", type=float, help="export the last DAYS days instead of --start")
+    parser.add_argument("--interface", help="only this network interface")
+    parser.add_argument("--history-dir", default=HISTORY_DIR)
+    parser.add_argument("--results-db", default=RESULTS_DB)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    export_format = args.format or format_for_path(args.output)
+    if export_format is None:
+        print("Cannot tell the format from the output name; pass --format", file=sys.stderr)
+        return 2
+    if args.output == "-" and export_format in BINARY_FORMATS:
+        print(f"{export_format} cannot be written to standard output; give an output file", file=sys.stderr)
+        return 2
+
+    end_ns = args.end if args.end is not None else time.time_ns() + 1
+    if args.days is not None:
+        start_ns = end_ns - int(args.days * DAY_NS)
+    else:
+        start_ns = args.start if args.start is not None else 0
+
+    if args.dataset == "history":
+        # Only reading; retention and crash recovery are left to the application
+        store = HistoryStore(args.history_dir, read_only=True)
+        rows, fields = history_rows(store, start_ns, end_ns, args.interface), HISTORY_FIELDS
+    else:
+        store = ResultsStore(args.results_db)
+        rows, fields = result_rows(store, start_ns, end_ns, args.interface), RESULT_FIELDS
+    try:
+        count = export_rows(rows, fields, args.output, export_format)
+    except (OSError, RuntimeError) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    if args.output != "-":
+        print(f"Exported {count} rows to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
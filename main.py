@@ -1,29 +1,92 @@
 import logging
-from PyQt5.QtWidgets import QApplication
-from speedview.app import NetworkSpeedMeter
-from speedview.ui.update_dialog import UpdateDialog
+import threading
 import sys
 
-def check_updates_on_startup():
+# Delay before the startup update check, so it never competes with the first frame
+STARTUP_UPDATE_CHECK_DELAY_MS = 3000
+
+def check_updates_on_startup(window):
+    """Check for updates on a worker thread; a dialog opens only when one is available"""
+    from PyQt5.QtWidgets import QApplication
+    from speedview.ui.update_dialog import UpdateCheckThread, UpdateDialog
     from speedview.update.updater import UpdateChecker
-    updater = UpdateChecker()
-    if updater.check_for_updates():
-        dialog = UpdateDialog()
-        dialog.exec_()
+    # Rate limited: within UPDATE_CHECK_INTERVAL of the last check the cached release is used
+    thread = UpdateCheckThread(UpdateChecker(window.settings), parent=window)
+
+    def on_checked(update_available):
+        if update_available:
+            UpdateDialog(window, updater=thread.updater).exec_()
+
+    thread.checked.connect(on_checked)
+    QApplication.instance().aboutToQuit.connect(thread.wait)
+    thread.start()
+
+def run_gui(instance=None, command="show"):
+    """Start the desktop application; PyQt5 is only imported here"""
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from speedview.app import NetworkSpeedMeter
+    from speedview.utils.svg_utils import sweep_orphaned_svg_files
+
+    app = QApplication(sys.argv)
+    # Clean up SVG temp files leaked by older versions without delaying startup
+    threading.Thread(target=sweep_orphaned_svg_files, daemon=True).start()
+    window = NetworkSpeedMeter()
+    logging.info('Main window created and shown')
+    window.show()
+    # The update check needs the network; first paint does not wait for it
+    QTimer.singleShot(STARTUP_UPDATE_CHECK_DELAY_MS, lambda: check_updates_on_startup(window))
+    if command != "show":
+        window.handle_instance_command(command)
+    if instance is not None:
+        # Commands from later launches arrive on the listener thread; the signal queues them to the GUI
+        instance.set_handler(window.instance_command.emit)
+        app.aboutToQuit.connect(instance.release)
+    return app.exec_()
+
+def forward_or_lock(argv):
+    """Hand the command to a running instance, or become the running instance.
+
+    Returns (instance, command), or (None, command) when the command was forwarded.
+    """
+    from speedview.utils.single_instance import SingleInstance, command_from_argv
+    command = command_from_argv(argv)
+    instance = SingleInstance()
+    if not instance.acquire():
+        if instance.forward(command):
+            return None, command
+        print("SpeedView is already running but did not answer", file=sys.stderr)
+        sys.exit(1)
+    try:
+        instance.listen()
+    except OSError as e:
+        logging.warning('Later launches cannot reach this instance: %s', e)
+    return instance, command
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['watch']:
+        # Reads the running instance's rate stream; no Qt and no sampling
+        from speedview.watch import main as watch_main
+        sys.exit(watch_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['bench']:
+        # A speed test on the command line, against loopback by default; no Qt
+        from speedview.bench import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
+    if '--headless' in sys.argv[1:]:
+        # Servers without a display: no Qt at all
+        from speedview.daemon import main as headless_main
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != '--headless']))
+
+    # Before any heavy import: a second launch only forwards its command and exits
+    instance, command = forward_or_lock(sys.argv[1:])
+    if instance is None:
+        sys.exit(0)
+
     import traceback
     logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
     try:
         logging.info('Starting SpeedView application')
-        app = QApplication(sys.argv)
-        # Check for updates on startup
-        logging.info('Checking for updates on startup')
-        check_updates_on_startup()
-        window = NetworkSpeedMeter()
-        logging.info('Main window created and shown')
-        window.show()
-        sys.exit(app.exec_())
+        sys.exit(run_gui(instance, command))
     except Exception as e:
         logging.error('Exception during application startup: %s', e)
         traceback.print_exc()
@@ -1,43 +1,27 @@
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QMessageBox,
                               QDialog, QFormLayout, QLabel, QComboBox, QCheckBox,
                               QSystemTrayIcon, QMenu, QAction, QSlider, QPushButton,QLineEdit,QDialogButtonBox)
-from PyQt5.QtSvg import QSvgWidget
-from PyQt5.QtCore import QTimer, QThread, pyqtSignal, Qt, QSize
+from PyQt5.QtCore import QTimer, pyqtSignal, Qt, QSize
 from PyQt5.QtGui import QIcon, QPixmap
 from speedview.models.settings import Settings
 from speedview.controllers.network_controller import NetworkController
 from speedview.controllers.speed_controller import SpeedController
-from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE, FLOATING_SVG_TEMPLATE
-from speedview.utils.svg_utils import update_svg_connection_status, update_svg_speed, save_svg_to_file
+from speedview.controllers.sampler import SamplerService
+from speedview.controllers.stream import StreamServer
+from speedview.models.history import HistoryStore
+from speedview.models.results import ResultsStore
+from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE
+from speedview.utils.svg_utils import MAIN_SVG_LAYERS, connection_slot_values, speed_slot_values
+from speedview.ui.svg_gauge import SvgGaugeWidget
 from speedview.ui.floating_window import FloatingWindow
-from speedview.ui.settings_dialog import SettingsDialog
 
-import psutil
-import socket
-import platform
-import subprocess
-import re  
-import speedtest
 import sys
 import os
-
-
-
-class SpeedTestThread(QThread):
-    finished = pyqtSignal(float, float)  # download_speed, upload_speed
-
-    def run(self):
-        try:
-            st = speedtest.Speedtest()
-            st.get_best_server()
-            download_speed = st.download() / 1_000_000  # Convert to Mbps
-            upload_speed = st.upload() / 1_000_000      # Convert to Mbps
-            self.finished.emit(download_speed, upload_speed)
-        except Exception as e:
-            print(f"Speed test failed: {e}")
-            self.finished.emit(0, 0)
+import logging
 
 class NetworkSpeedMeter(QWidget):
+    instance_command = pyqtSignal(str)  # Forwarded by a second launch; see handle_instance_command
+
     def __init__(self):
         super().__init__()
         
@@ -52,14 +36,32 @@ class NetworkSpeedMeter(QWidget):
         self.selected_interface = self.settings.selected_interface
         self.is_floating = self.settings.is_floating
         
-        # Controllers
-        self.network_controller = NetworkController()
-        self.speed_controller = SpeedController(self.settings)
+        # Controllers; the sampler is the only thing that polls network counters
+        self.results = ResultsStore()
+        self.network_controller = NetworkController(results=self.results, settings=self.settings)
+        self.sampler = SamplerService(self.update_interval, sample_hz=self.settings.sample_hz,
+                                      render_hz=self.settings.render_hz)
+        self.history = HistoryStore(retention_days=self.settings.history_retention_days)
+        self.speed_controller = SpeedController(self.settings, sampler=self.sampler, history=self.history,
+                                                results=self.results)
+        QApplication.instance().aboutToQuit.connect(self.history.close)
+        QApplication.instance().aboutToQuit.connect(self.results.close)
+        self.metrics = None
+        self.update_metrics_exporter()
+        QApplication.instance().aboutToQuit.connect(self.stop_metrics_exporter)
+        self.stream = None
+        self.update_stream_server()
+        QApplication.instance().aboutToQuit.connect(self.stop_stream_server)
+        self.instance_command.connect(self.handle_instance_command)
         
         # Connect signals
         self.network_controller.connection_updated.connect(self.update_connection_status)
         self.network_controller.speed_test_complete.connect(self.on_speed_test_complete)
+        self.network_controller.speed_test_failed.connect(self.on_speed_test_failed)
+        self.network_controller.speed_test_progress.connect(self.on_speed_test_progress)
         self.speed_controller.speed_updated.connect(self.update_speed_display)
+        self._test_dialog = None
+        self.test_speed = None  # (phase, Mbps) of a running speed test; the needle follows it instead
         
         self.setup_ui()
         self.setup_shortcuts()
@@ -67,18 +69,13 @@ class NetworkSpeedMeter(QWidget):
         if self.settings.is_floating:
             self.toggle_float_mode()
         
-        # Speed update timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_speed)
-        self.timer.start(int(self.update_interval * 1000))
+        # Start sampling; the display repaints when a new sample arrives
+        self.sampler.start()
         
         # Network connection check timer (every 5 seconds)
         self.connection_timer = QTimer()
         self.connection_timer.timeout.connect(self.network_controller.check_connection_status)
         self.connection_timer.start(5000)  # Check connection every 5 seconds
-
-        self.prev_bytes_received = 0
-        self.prev_bytes_sent = 0
         
         # Start minimized if setting is enabled
         if self.start_minimized:
@@ -97,13 +94,10 @@ class NetworkSpeedMeter(QWidget):
         self.setGeometry(100, 100, 500, 500)
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
-        self.svg_widget = QSvgWidget()
+        # Network speed meter: static SVG background plus live needle and text layers
+        self.svg_widget = SvgGaugeWidget(MAIN_SVG_TEMPLATE, MAIN_SVG_LAYERS)
         self.layout.addWidget(self.svg_widget)
         self.svg_widget.mousePressEvent = self.handle_svg_click
-        
-        # Add SVG for the network speed meter
-        self.svg_code = MAIN_SVG_TEMPLATE
-        self.load_svg(self.svg_code)
 
         # Add Help menu with update check
         from PyQt5.QtWidgets import QMenuBar, QMenu, QAction
@@ -123,32 +117,29 @@ class NetworkSpeedMeter(QWidget):
         QShortcut(QKeySequence("Ctrl+S"), self, self.open_settings)
         QShortcut(QKeySequence("Ctrl+T"), self, self.test_network)
         QShortcut(QKeySequence("Ctrl+F"), self, self.toggle_float_mode)
+        QShortcut(QKeySequence("Ctrl+H"), self, self.show_history)
         QShortcut(QKeySequence("Esc"), self, self.hide_if_floating)
 
-    def load_svg(self, svg_content):
-        # Load SVG content into the widget
-        svg_path = save_svg_to_file(svg_content)
-        self.svg_widget.load(svg_path)
-
     def update_speed_display(self):
         """Update the displayed speed in the floating window."""
-        download_speed, upload_speed = self.speed_controller.get_current_speeds()
-        display_speed = upload_speed if self.settings.show_upload_speed else download_speed
-        # Update the SVG or any other UI component to reflect the new speed
-        updated_svg = update_svg_speed(self.svg_code, display_speed, self.settings.max_speed)
-        self.load_svg(updated_svg)
+        if self.test_speed is not None:
+            phase, speed = self.test_speed
+            upload = phase == "upload"
+            values = speed_slot_values(speed, self.settings.max_upload if upload else self.settings.max_speed,
+                                       show_upload=upload)
+        else:
+            download_speed, upload_speed = self.speed_controller.get_current_speeds()
+            display_speed = upload_speed if self.settings.show_upload_speed else download_speed
+            values = speed_slot_values(display_speed, self.settings.max_speed)
+        # Only the needle and speed text are repainted
+        self.svg_widget.set_values(values)
 
     def update_connection_status(self, status, signal_strength):
         """Update connection status display"""
         self.connection_status = status
         self.signal_strength = signal_strength
         connection_type = self.network_controller.get_connection_info()[0]
-        updated_svg = update_svg_connection_status(
-            self.svg_code, 
-            status=status,
-            connection_type=connection_type
-        )
-        self.load_svg(updated_svg)
+        self.svg_widget.set_values(connection_slot_values(status, connection_type))
 
     def handle_svg_click(self, event):
         """Handle clicks on SVG elements with proper coordinate mapping"""
@@ -171,6 +162,16 @@ class NetworkSpeedMeter(QWidget):
         # Float Button region (50,400 to 150,440)
         elif 50 <= svg_x <= 150 and 400 <= svg_y <= 440:
             self.toggle_float_mode()
+        # History Button region (350,400 to 450,440)
+        elif 350 <= svg_x <= 450 and 400 <= svg_y <= 440:
+            self.show_history()
+
+    def show_history(self):
+        """Show recorded network history"""
+        from speedview.ui.history_dialog import HistoryDialog
+        dialog = HistoryDialog(self.history, interface=self.settings.selected_interface, parent=self,
+                               results=self.results)
+        dialog.exec_()
 
     def apply_settings(self):
         """Apply settings changes"""
@@ -179,8 +180,12 @@ class NetworkSpeedMeter(QWidget):
         self.update_interval = self.settings.update_interval
         self.selected_interface = self.settings.selected_interface
         
-        # Update timers
-        self.timer.setInterval(int(self.update_interval * 1000))
+        # Update sampling cadence
+        self.speed_controller.set_update_interval(self.update_interval)
+        self.speed_controller.set_sampling_rates(self.settings.sample_hz, self.settings.render_hz)
+        self.speed_controller.configure_schedule()
+        self.update_metrics_exporter()
+        self.update_stream_server()
         
         # Update display mode
         if self.settings.is_floating != self.is_floating:
@@ -197,44 +202,116 @@ class NetworkSpeedMeter(QWidget):
         # Refresh UI
         self.refresh_ui()
 
+    def update_metrics_exporter(self):
+        """Start, stop or rebind the metrics endpoint to match the settings"""
+        wanted = (self.settings.metrics_address, self.settings.metrics_port) if self.settings.metrics_enabled else None
+        if self.metrics is not None and (self.metrics.address, self.metrics.requested_port) == wanted:
+            return
+        self.stop_metrics_exporter()
+        if wanted is None:
+            return
+        from speedview.controllers.metrics import MetricsExporter  # http.server is only loaded when enabled
+        self.metrics = MetricsExporter(self.speed_controller.engine, self.sampler.counters, self.results,
+                                       address=wanted[0], port=wanted[1])
+        try:
+            self.metrics.start()
+        except OSError as e:
+            logging.error(f"Could not start the metrics endpoint on port {wanted[1]}: {e}")
+            self.metrics = None
+
+    def stop_metrics_exporter(self):
+        if self.metrics is not None:
+            self.metrics.stop()
+            self.metrics = None
+
+    def update_stream_server(self):
+        """Start or stop the local rate stream to match the settings"""
+        if self.settings.stream_enabled == (self.stream is not None):
+            return
+        if self.stream is not None:
+            self.stop_stream_server()
+            return
+        self.stream = StreamServer(self.speed_controller.engine)
+        try:
+            self.stream.start()
+        except OSError as e:
+            logging.warning(f"Could not start the rate stream: {e}")
+            self.stream = None
+
+    def stop_stream_server(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+
+    def handle_instance_command(self, command):
+        """Carry out a command forwarded by a second launch (show, float or run-test)"""
+        if command == "float" and not self.settings.is_floating:
+            self.toggle_float_mode()
+        elif command == "run-test":
+            self.test_network()
+            return
+        window = self.floating_window if self.settings.is_floating else self
+        window.show()
+        window.raise_()
+        window.activateWindow()
+
     def open_settings(self):
         """Open settings dialog"""
+        from speedview.ui.settings_dialog import SettingsDialog
         dialog = SettingsDialog(parent=self, settings=self.settings)
         if dialog.exec_():
             self.apply_settings()
 
     def test_network(self):
         # Start a network speed test with visual dialog
+        if not self.network_controller.run_speed_test():
+            # Another test, possibly a scheduled one, owns the only slot; its results go elsewhere
+            QMessageBox.information(self, "Test Running", "A speed test is already running.")
+            return
         from speedview.ui.test_network_dialog import TestNetworkDialog
         self._test_dialog = TestNetworkDialog(self)
         self._test_dialog.set_status("Running speed test...")
         self._test_dialog.show()
         self._test_dialog.raise_()
         self._test_dialog.activateWindow()
-        self.network_controller.speed_test_complete.connect(self._on_test_dialog_result)
-        self.network_controller.run_speed_test()
+
+    def on_speed_test_progress(self, batch):
+        """Animate the needle and the test dialog with a batch of SpeedTestProgress items"""
+        for item in batch:
+            if item.phase in ("download", "upload") and item.value is not None:
+                self.test_speed = (item.phase, item.value)
+        if self._test_dialog is not None:
+            self._test_dialog.show_progress(batch)
+        self.update_speed_display()
 
     def _on_test_dialog_result(self, download_speed, upload_speed):
-        if not hasattr(self, '_test_dialog') or self._test_dialog is None:
+        if self._test_dialog is None:
             return
         if download_speed == 0 and upload_speed == 0:
             self._test_dialog.show_failure()
         else:
-            self.update_speed_display()
             self._test_dialog.show_results(download_speed, upload_speed)
-        self.network_controller.speed_test_complete.disconnect(self._on_test_dialog_result)
         # Dialog will be closed by user
 
+    def on_speed_test_failed(self, error):
+        self.test_speed = None
+        self.update_speed_display()
+        if self._test_dialog is not None:
+            self._test_dialog.show_failure()
+            return
+        QMessageBox.warning(self, "Test Failed", f"Network speed test failed:\n{error}")
+
     def on_speed_test_complete(self, download_speed, upload_speed):
+        self.test_speed = None
+        self.update_speed_display()
         # Backward compatibility: call dialog result handler if dialog exists
-        if hasattr(self, '_test_dialog') and self._test_dialog is not None:
+        if self._test_dialog is not None:
             self._on_test_dialog_result(download_speed, upload_speed)
             return
         # Fallback: legacy QMessageBox
         if download_speed == 0 and upload_speed == 0:
             QMessageBox.warning(self, "Test Failed", "Network speed test failed. Please check your connection and try again.")
             return
-        self.update_speed_display()
         QMessageBox.information(self, "Test Results", f"Download Speed: {download_speed:.2f} Mbps\nUpload Speed: {upload_speed:.2f} Mbps")
 
     def init_system_tray(self):
@@ -264,7 +341,6 @@ class NetworkSpeedMeter(QWidget):
 
     def refresh_ui(self):
         # Refresh UI after settings change
-        self.svg_code = FLOATING_SVG_TEMPLATE if self.is_floating else MAIN_SVG_TEMPLATE
         self.update_speed_display()
 
     def closeEvent(self, event):
@@ -276,40 +352,10 @@ class NetworkSpeedMeter(QWidget):
         else:
             event.accept()
 
-    def update_speed(self):
-        """Update network speed measurements"""
-        try:
-            stats = psutil.net_io_counters(pernic=True)
-            
-            # If interface is selected, use that specific one
-            if self.selected_interface and self.selected_interface in stats:
-                net_io = stats[self.selected_interface]
-            else:
-                # Otherwise use the default overall counters
-                net_io = psutil.net_io_counters()
-            
-            bytes_recv = net_io.bytes_recv
-            bytes_sent = net_io.bytes_sent
-            
-            if self.prev_bytes_received > 0:
-                # Calculate speeds in Mbps
-                download_speed = ((bytes_recv - self.prev_bytes_received) * 8) / (1024 * 1024 * self.update_interval)
-                upload_speed = ((bytes_sent - self.prev_bytes_sent) * 8) / (1024 * 1024 * self.update_interval)
-                
-                # Update the display
-                self.update_speed_display()
-            
-            # Store current values for next calculation
-            self.prev_bytes_received = bytes_recv
-            self.prev_bytes_sent = bytes_sent
-            
-        except Exception as e:
-            print(f"Error updating speed: {e}")
-
     def check_for_updates(self):
         """Check for software updates"""
         from speedview.ui.update_dialog import UpdateDialog
-        dialog = UpdateDialog(self)
+        dialog = UpdateDialog(self, settings=self.settings)
         dialog.exec_()
 
 if __name__ == '__main__':
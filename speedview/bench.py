@@ -0,0 +1,78 @@
+"""Run a speed test from the command line, by default against loopback.
+
+    python main.py bench [--url URL] [--backend NAME] [--streams N [N ...]]
+                         [--duration SECONDS] [--warmup SECONDS]
+
+Without ``--url`` the built-in engine is pointed at a SpeedTestServer on
+127.0.0.1. The network is then out of the picture, and the numbers show how
+fast the engine itself can go with each stream count. With ``--url``, or
+with another ``--backend``, a real test is run and printed. Nothing is
+stored and nothing here imports PyQt5.
+"""
+import sys
+import argparse
+
+from speedview.config.config import (
+    SPEED_TEST_BACKENDS, DEFAULT_SPEED_TEST_STREAMS, DEFAULT_SPEED_TEST_DURATION, DEFAULT_SPEED_TEST_WARMUP
+)
+from speedview.controllers.rate import format_rate
+from speedview.controllers.speed_test import SpeedTestError, create_speed_test_engine
+from speedview.controllers.speed_test_server import SpeedTestServer
+
+
+def format_result(result, streams=None):
+    """One line per test"""
+    fields = [result.backend if streams is None else f"{result.backend} x{streams}"]
+    if result.latency_ms is not None:
+        latency = f"latency {result.latency_ms:.2f} ms"
+        if result.jitter_ms is not None:
+            latency += f" (jitter {result.jitter_ms:.2f} ms)"
+        fields.append(latency)
+    fields.append(f"download {format_rate(result.download_mbps * 1_000_000)}")
+    fields.append(f"upload {format_rate(result.upload_mbps * 1_000_000)}")
+    return ", ".join(fields)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py bench",
+                                     description="Run a speed test; against loopback unless --url is given")
+    parser.add_argument("--url", help="LibreSpeed-compatible server (default: a loopback stand-in)")
+    parser.add_argument("--backend", choices=SPEED_TEST_BACKENDS, default="http",
+                        help="speed test engine (default: the built-in http engine)")
+    parser.add_argument("--streams", type=int, nargs="+", default=[DEFAULT_SPEED_TEST_STREAMS],
+                        help="parallel connections; several values run one test each")
+    parser.add_argument("--duration", type=float, default=DEFAULT_SPEED_TEST_DURATION,
+                        help="seconds measured per direction")
+    parser.add_argument("--warmup", type=float, default=DEFAULT_SPEED_TEST_WARMUP,
+                        help="seconds discarded at the start of each direction")
+    return parser
+
+
+def main(argv=None, out=None):
+    args = build_parser().parse_args(argv)
+    out = out or sys.stdout
+    server = None
+    url = args.url
+    if url is None and args.backend == "http":
+        server = SpeedTestServer()
+        server.start()
+        url = server.url
+    try:
+        for streams in args.streams:
+            engine = create_speed_test_engine(args.backend, url or "", streams, args.duration, args.warmup)
+            result = engine.run()
+            out.write(format_result(result, streams if args.backend == "http" else None) + "\n")
+            out.flush()
+    except SpeedTestError as e:
+        print(f"Speed test failed: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
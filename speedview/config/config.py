@@ -1,5 +1,6 @@
 # Application-wide constants
 import os
+import tempfile
 
 
 APP_NAME = "Network Speed Meter"
@@ -9,6 +10,11 @@ APP_VERSION = "1.0.0"
 DEFAULT_MAX_SPEED = 100
 DEFAULT_MAX_UPLOAD = 50  # Added default max upload speed
 DEFAULT_UPDATE_INTERVAL = 1.0
+DEFAULT_SAMPLE_HZ = 0  # 0 samples once per update interval; >0 samples on a background thread
+DEFAULT_RENDER_HZ = 2.0
+MAX_SAMPLE_HZ = 100
+MIN_RENDER_HZ = 0.5
+MAX_RENDER_HZ = 30
 DEFAULT_START_MINIMIZED = False
 DEFAULT_MINIMIZE_TO_TRAY = True
 DEFAULT_SHOW_UPLOAD_SPEED = False
@@ -16,6 +22,27 @@ DEFAULT_CLOSE_TO_TRAY = True  # Added default close to tray
 DEFAULT_ENABLE_NOTIFICATIONS = True  # Added default notifications
 DEFAULT_NOTIFICATION_THRESHOLD = 50  # Added default threshold
 DEFAULT_SPEED_UNIT = "Mbps"  # Added default speed unit
+DEFAULT_HISTORY_RETENTION_DAYS = 7  # Raw records and 1 s rollups; coarser tiers are kept longer
+DEFAULT_METRICS_ENABLED = False  # Prometheus/OpenMetrics endpoint
+DEFAULT_METRICS_ADDRESS = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9877
+DEFAULT_STREAM_ENABLED = True  # Local rate stream for `main.py watch` and other tools
+DEFAULT_STREAM_HOST = "127.0.0.1"  # Loopback TCP where there are no Unix sockets (Windows)
+DEFAULT_STREAM_PORT = 9878
+DEFAULT_INSTANCE_PORT = 9879  # Loopback TCP for commands to the running instance (Windows)
+SPEED_TEST_BACKENDS = ("auto", "speedtest.net", "fast.com", "http")  # See controllers/speed_test.py
+DEFAULT_SPEED_TEST_BACKEND = "auto"
+DEFAULT_SPEED_TEST_URL = ""  # LibreSpeed-compatible server for the built-in http engine
+DEFAULT_SPEED_TEST_STREAMS = 8  # Parallel connections of the http engine
+DEFAULT_SPEED_TEST_DURATION = 10.0  # Seconds measured per direction, after the warm-up
+DEFAULT_SPEED_TEST_WARMUP = 2.0  # Seconds of TCP slow start that are not counted
+MAX_SPEED_TEST_STREAMS = 64
+SPEED_TEST_SERVER_TTL = 24 * 60 * 60  # Seconds before the cached speedtest.net server list is refreshed
+SPEED_TEST_SERVER_CANDIDATES = 5  # Cached servers probed for latency before each test
+DEFAULT_SPEED_TEST_SCHEDULE = ""  # Scheduled speed tests: "", "@hourly", "@daily", "@every 30m" or "M H DoM Mon DoW"
+DEFAULT_SPEED_TEST_JITTER = 300.0  # Up to this many seconds are added to each scheduled time
+DEFAULT_SPEED_TEST_BUSY_MBPS = 5.0  # Scheduled tests wait while traffic exceeds this; 0 never waits
+DEFAULT_SPEED_TEST_DAILY_BUDGET_MB = 2000  # Speed test traffic allowed per day for scheduled tests; 0 for no limit
 
 # New settings for help and update
 DEFAULT_SHOW_HELP = True
@@ -24,8 +51,20 @@ DEFAULT_SHOW_ABOUT = True
 # Update URL for the update checker
 DEFAULT_UPDATE_URL = "https://api.github.com/repos/yourusername/network-speed-meter/releases/latest"
 
-# File paths
-CONFIG_FILE = os.path.join(os.getenv("APPDATA"), "NetworkSpeedMeter", "network_speed_meter.conf")
+# File paths; %APPDATA% on Windows, the XDG config directory elsewhere (headless servers)
+APPDATA = os.getenv("APPDATA") or os.getenv("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+CONFIG_FILE = os.path.join(APPDATA, "NetworkSpeedMeter", "network_speed_meter.conf")
+HISTORY_DIR = os.path.join(APPDATA, "NetworkSpeedMeter", "history")
+RESULTS_DB = os.path.join(APPDATA, "NetworkSpeedMeter", "speed_tests.db")
+INSTANCE_LOCK = os.path.join(APPDATA, "NetworkSpeedMeter", "instance.lock")
+UPDATE_CACHE_FILE = os.path.join(APPDATA, "NetworkSpeedMeter", "update_cache.json")  # Last release feed response
+UPDATE_DOWNLOAD_DIR = os.path.join(APPDATA, "NetworkSpeedMeter", "updates")  # Installers, kept partial for resuming
+SPEED_TEST_SERVER_CACHE = os.path.join(APPDATA, "NetworkSpeedMeter", "speedtest_servers.json")  # Closest servers
+# Per-user runtime directory; the temp directory is shared, so the names carry the uid
+RUNTIME_DIR = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+_SOCKET_PREFIX = f"speedview-{os.getuid()}" if hasattr(os, "getuid") else "speedview"
+STREAM_SOCKET = os.path.join(RUNTIME_DIR, f"{_SOCKET_PREFIX}.sock")
+INSTANCE_SOCKET = os.path.join(RUNTIME_DIR, f"{_SOCKET_PREFIX}-instance.sock")
 TEMP_SVG_FILE = "temp_speedometer.svg"
 
 # UI Constants
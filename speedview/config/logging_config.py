@@ -31,13 +31,3 @@ def setup_logging():
     
     # Log startup
     logging.info("Application started")
-
-# Get a logger instance
-logger = logging.getLogger(__name__)
-
-# Log messages at various levels
-logger.debug("Debugging information.")
-logger.info("Informational message.")
-logger.warning("Warning about potential issues.")
-logger.error("An error occurred.")
-logger.critical("Critical issue that needs immediate attention.")
\ No newline at end of file
@@ -1,8 +1,9 @@
 import os
-import winreg
 
-# Windows-specific paths
-APPDATA_DIR = os.path.join(os.getenv('APPDATA'), 'NetworkSpeedMeter')
+from speedview.config.config import APPDATA
+
+# Windows-specific paths; importable on other platforms, winreg is only loaded when used
+APPDATA_DIR = os.path.join(APPDATA, 'NetworkSpeedMeter')
 CONFIG_FILE = os.path.join(APPDATA_DIR, 'config.json')
 LOG_FILE = os.path.join(APPDATA_DIR, 'app.log')
 TEMP_DIR = os.path.join(APPDATA_DIR, 'temp')
@@ -28,12 +29,13 @@ TRAY_ICON_SIZE = 16
 TRAY_UPDATE_INTERVAL = 1000  # milliseconds
 
 # Installation paths
-INSTALL_DIR = os.path.join(os.getenv('PROGRAMFILES'), 'NetworkSpeedMeter')
+INSTALL_DIR = os.path.join(os.getenv('PROGRAMFILES', r'C:\Program Files'), 'NetworkSpeedMeter')
 UNINSTALL_REG_PATH = r'Software\Microsoft\Windows\CurrentVersion\Uninstall\NetworkSpeedMeter'
 
 def set_autostart(enable=True):
     """Set application to start with Windows"""
     try:
+        import winreg
         key = winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, REG_PATH)
         app_path = os.path.join(INSTALL_DIR, 'NetworkSpeedMeter.exe')
         
@@ -53,6 +55,7 @@ def set_autostart(enable=True):
 def create_uninstall_reg_key():
     """Create uninstall information in Windows registry"""
     try:
+        import winreg
         key = winreg.CreateKeyEx(winreg.HKEY_LOCAL_MACHINE, 
                                 r'Software\Microsoft\Windows\CurrentVersion\Uninstall\NetworkSpeedMeter')
         
@@ -81,21 +84,10 @@ def create_uninstall_reg_key():
 def remove_uninstall_reg_key():
     """Remove uninstall information from Windows registry"""
     try:
+        import winreg
         winreg.DeleteKey(winreg.HKEY_LOCAL_MACHINE, 
                         r'Software\Microsoft\Windows\CurrentVersion\Uninstall\NetworkSpeedMeter')
         return True
     except Exception as e:
         print(f"Error removing uninstall key: {e}")
         return False
-
-def check_single_instance():
-    """Ensure only one instance is running"""
-    import win32event, win32api, winerror
-    try:
-        mutex = win32event.CreateMutex(None, 1, "NetworkSpeedMeter_Mutex")
-        if win32api.GetLastError() == winerror.ERROR_ALREADY_EXISTS:
-            return False
-        return True
-    except Exception as e:
-        print(f"Error checking single instance: {e}")
-        return True  # Allow running if check fails
\ No newline at end of file
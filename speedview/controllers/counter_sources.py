@@ -0,0 +1,228 @@
+"""Backends that read per-interface network byte counters.
+
+Every source returns the same thing from ``read()``: parallel tuples of
+interface names, received bytes and sent bytes, ready to go into a Sample.
+On Linux the counters are read straight from the kernel; psutil remains the
+fallback everywhere else.
+"""
+import os
+import sys
+import socket
+import struct
+import logging
+import psutil
+
+PROC_NET_DEV = "/proc/net/dev"
+
+# rtnetlink constants (linux/netlink.h, linux/rtnetlink.h, linux/if_link.h)
+NETLINK_ROUTE = 0
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+RTM_NEWSTATS = 92
+RTM_GETSTATS = 94
+IFLA_STATS_LINK_64 = 1
+
+_NLMSG_HEADER = struct.Struct("=IHHII")   # len, type, flags, seq, pid
+_IF_STATS_MSG = struct.Struct("=BBHII")   # family, pad1, pad2, ifindex, filter_mask
+_RTATTR_HEADER = struct.Struct("=HH")     # len, type
+_RX_TX_BYTES = struct.Struct("=QQ")       # rx_bytes, tx_bytes of rtnl_link_stats64
+_RX_BYTES_OFFSET = 16                     # after rx_packets and tx_packets
+
+
+class CounterSource:
+    """Reads byte counters for every network interface"""
+
+    name = "base"
+
+    def read(self):
+        """Return (interfaces, bytes_recv, bytes_sent) as parallel tuples"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PsutilCounterSource(CounterSource):
+    """Portable source using ``psutil.net_io_counters(pernic=True)``"""
+
+    name = "psutil"
+
+    def read(self):
+        stats = psutil.net_io_counters(pernic=True)
+        interfaces = tuple(stats)
+        return (interfaces,
+                tuple(stats[name].bytes_recv for name in interfaces),
+                tuple(stats[name].bytes_sent for name in interfaces))
+
+
+class ProcNetDevCounterSource(CounterSource):
+    """Linux source that re-reads an open ``/proc/net/dev``.
+
+    The file stays open and is read with ``os.preadv`` into a preallocated
+    buffer, which grows only if the interface list outgrows it. Only the
+    receive and transmit byte columns are converted.
+    """
+
+    name = "procfs"
+
+    def __init__(self, path=PROC_NET_DEV, buffer_size=16384):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        # Interface names are decoded once and the tuple reused while unchanged
+        self._names = {}
+        self._interfaces = ()
+
+    def _read_file(self):
+        while True:
+            size = os.preadv(self.fd, [self.view], 0)
+            if size < len(self.buffer):
+                return bytes(self.view[:size])
+            # Buffer was filled; the file may be longer
+            self.view.release()
+            self.buffer = bytearray(len(self.buffer) * 2)
+            self.view = memoryview(self.buffer)
+
+    def read(self):
+        names = self._names
+        interfaces = []
+        bytes_recv = []
+        bytes_sent = []
+        # Skip the two header lines
+        for line in self._read_file().split(b"\n")[2:]:
+            raw_name, _, columns = line.partition(b":")
+            if not columns:
+                continue
+            name = names.get(raw_name)
+            if name is None:
+                name = names[raw_name] = raw_name.strip().decode("utf-8", "replace")
+            fields = columns.split(None, 9)
+            interfaces.append(name)
+            bytes_recv.append(int(fields[0]))
+            bytes_sent.append(int(fields[8]))
+
+        interfaces = tuple(interfaces)
+        if interfaces != self._interfaces:
+            self._interfaces = interfaces
+        return self._interfaces, tuple(bytes_recv), tuple(bytes_sent)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class NetlinkCounterSource(CounterSource):
+    """Linux source dumping ``RTM_GETSTATS`` 64-bit link stats over rtnetlink"""
+
+    name = "netlink"
+
+    def __init__(self, buffer_size=65536):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.bind((0, 0))
+        self.buffer = bytearray(buffer_size)
+        self.seq = 0
+        self._names = {}
+
+    def _request(self):
+        self.seq += 1
+        body = _IF_STATS_MSG.pack(socket.AF_UNSPEC, 0, 0, 0, 1 << (IFLA_STATS_LINK_64 - 1))
+        header = _NLMSG_HEADER.pack(_NLMSG_HEADER.size + len(body), RTM_GETSTATS,
+                                    NLM_F_REQUEST | NLM_F_DUMP, self.seq, 0)
+        self.sock.send(header + body)
+
+    def _interface_name(self, index):
+        name = self._names.get(index)
+        if name is None:
+            try:
+                name = self._names[index] = socket.if_indextoname(index)
+            except OSError:
+                return None  # Interface disappeared since the dump
+        return name
+
+    def read(self):
+        self._request()
+        interfaces = []
+        bytes_recv = []
+        bytes_sent = []
+        buffer = self.buffer
+        while True:
+            size = self.sock.recv_into(buffer)
+            offset = 0
+            while offset + _NLMSG_HEADER.size <= size:
+                length, msg_type, _, seq, _ = _NLMSG_HEADER.unpack_from(buffer, offset)
+                if length < _NLMSG_HEADER.size:
+                    break
+                if seq != self.seq:
+                    pass  # Reply to an older request
+                elif msg_type == NLMSG_DONE:
+                    return tuple(interfaces), tuple(bytes_recv), tuple(bytes_sent)
+                elif msg_type == NLMSG_ERROR:
+                    error = struct.unpack_from("=i", buffer, offset + _NLMSG_HEADER.size)[0]
+                    raise OSError(-error, f"RTM_GETSTATS failed: {os.strerror(-error)}")
+                elif msg_type == RTM_NEWSTATS:
+                    self._parse_stats(buffer, offset, length, interfaces, bytes_recv, bytes_sent)
+                offset += (length + 3) & ~3
+
+    def _parse_stats(self, buffer, offset, length, interfaces, bytes_recv, bytes_sent):
+        body = offset + _NLMSG_HEADER.size
+        index = _IF_STATS_MSG.unpack_from(buffer, body)[3]
+        attr = body + _IF_STATS_MSG.size
+        end = offset + length
+        while attr + _RTATTR_HEADER.size <= end:
+            attr_length, attr_type = _RTATTR_HEADER.unpack_from(buffer, attr)
+            if attr_length < _RTATTR_HEADER.size:
+                return
+            if attr_type == IFLA_STATS_LINK_64:
+                name = self._interface_name(index)
+                if name is not None:
+                    recv, sent = _RX_TX_BYTES.unpack_from(buffer, attr + _RTATTR_HEADER.size + _RX_BYTES_OFFSET)
+                    interfaces.append(name)
+                    bytes_recv.append(recv)
+                    bytes_sent.append(sent)
+                return
+            attr += (attr_length + 3) & ~3
+
+    def close(self):
+        self.sock.close()
+
+
+COUNTER_SOURCES = {
+    PsutilCounterSource.name: PsutilCounterSource,
+    ProcNetDevCounterSource.name: ProcNetDevCounterSource,
+    NetlinkCounterSource.name: NetlinkCounterSource,
+}
+
+
+def link_speeds():
+    """``{interface: link speed in bits per second}`` for the interfaces that report one"""
+    try:
+        stats = psutil.net_if_stats()
+    except OSError as e:
+        logging.debug(f"Could not read link speeds: {e}")
+        return {}
+    return {name: stat.speed * 1_000_000 for name, stat in stats.items() if stat.speed > 0}
+
+
+def create_counter_source(backend="auto"):
+    """Create the requested counter source, falling back to psutil.
+
+    ``auto`` prefers ``/proc/net/dev`` on Linux. A backend that cannot be
+    opened (not Linux, no permission) is logged and replaced by psutil.
+    """
+    if backend == "auto":
+        backend = "procfs" if sys.platform.startswith("linux") else "psutil"
+    source_class = COUNTER_SOURCES.get(backend)
+    if source_class is None:
+        logging.warning(f"Unknown counter source '{backend}', using psutil")
+        return PsutilCounterSource()
+    try:
+        source = source_class()
+        source.read()
+        return source
+    except (OSError, AttributeError, ValueError, IndexError) as e:
+        logging.warning(f"Counter source '{backend}' unavailable ({e}), using psutil")
+        return PsutilCounterSource()
@@ -0,0 +1,182 @@
+"""Measurement core shared by the Qt application and the headless daemon.
+
+Nothing here imports PyQt5. CounterSampler reads the network counters, on
+demand or at a fixed rate on a background thread. SpeedEngine turns the
+samples into rates, window statistics and history records, and hands every
+result to its subscribers. The Qt side (SamplerService, SpeedController)
+drives these from QTimers and re-emits the results as signals. The headless
+daemon drives them from an asyncio loop.
+"""
+import time
+import logging
+import threading
+from collections import namedtuple
+
+from speedview.controllers.counter_sources import create_counter_source
+from speedview.controllers.interface_monitor import InterfaceRateMonitor
+from speedview.controllers.rate import RateEngine, convert_rate, window_stats
+from speedview.utils.histogram import Histogram
+from speedview.utils.ring_buffer import RingBuffer
+
+# Samples held between render windows; 10 s at the highest sample rate
+RING_CAPACITY = 1024
+# Upper bounds (seconds) of the counter read latency histogram
+READ_LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.1)
+
+
+class Sample(namedtuple("Sample", ["timestamp_ns", "interfaces", "bytes_recv", "bytes_sent"])):
+    """Immutable counter reading for every interface, taken at one instant.
+
+    ``timestamp_ns`` comes from ``time.monotonic_ns()``. ``interfaces``,
+    ``bytes_recv`` and ``bytes_sent`` are parallel tuples.
+    """
+    __slots__ = ()
+
+    def counters(self, interface=None):
+        """(bytes_recv, bytes_sent) of one interface, or summed over all interfaces"""
+        if interface and interface in self.interfaces:
+            index = self.interfaces.index(interface)
+            return self.bytes_recv[index], self.bytes_sent[index]
+        return sum(self.bytes_recv), sum(self.bytes_sent)
+
+
+class CounterSampler:
+    """Reads Samples from a CounterSource, once or continuously on a background thread"""
+
+    def __init__(self, source=None, ring_capacity=RING_CAPACITY):
+        self.source = source or create_counter_source()
+        self.ring = RingBuffer(ring_capacity)
+        self.read_latency = Histogram(READ_LATENCY_BUCKETS)  # Seconds per source read
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self):
+        """True while the background thread is sampling"""
+        return self._thread is not None
+
+    def read_sample(self):
+        """Read the counters once; returns None if the source failed"""
+        try:
+            timestamp_ns = time.monotonic_ns()
+            interfaces, bytes_recv, bytes_sent = self.source.read()
+        except Exception as e:
+            logging.exception(f"Error reading network counters: {e}")
+            return None
+        self.read_latency.observe((time.monotonic_ns() - timestamp_ns) / 1e9)
+        return Sample(timestamp_ns, interfaces, bytes_recv, bytes_sent)
+
+    def start_thread(self, sample_hz):
+        """Sample ``sample_hz`` times a second into the ring buffer until ``stop_thread``"""
+        self.stop_thread()
+        self.ring.drain()  # Discard samples left from an earlier run
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, args=(sample_hz,),
+                                        name="SamplerThread", daemon=True)
+        self._thread.start()
+
+    def stop_thread(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def drain(self):
+        """Samples the background thread buffered since the last drain, oldest first"""
+        return self.ring.drain()
+
+    def _sample_loop(self, sample_hz):
+        next_ns = time.monotonic_ns()
+        while not self._stop_event.is_set():
+            sample = self.read_sample()
+            if sample is not None:
+                self.ring.push(sample)
+            next_ns += int(1e9 / sample_hz)
+            delay_ns = next_ns - time.monotonic_ns()
+            if delay_ns < 0:
+                # Fell behind (suspend, slow read); resume the cadence from now
+                next_ns = time.monotonic_ns()
+                continue
+            self._stop_event.wait(delay_ns / 1e9)
+
+    def close(self):
+        self.stop_thread()
+        self.source.close()
+
+
+class EngineUpdate(namedtuple("EngineUpdate", ["interface_rates", "rate", "rx_stats", "tx_stats",
+                                               "download_mbps", "upload_mbps"])):
+    """Result of one window of samples.
+
+    ``interface_rates`` is the InterfaceRate table of the newest sample, or
+    None before there is a baseline. The remaining fields describe the
+    selected interface and are None when the window produced no rate.
+    """
+    __slots__ = ()
+
+
+class SpeedEngine:
+    """Turns windows of Samples into rates, window statistics and history records"""
+
+    def __init__(self, interface=None, history=None):
+        self.interface = interface  # Selected interface; None sums all interfaces
+        self.history = history  # Optional HistoryStore receiving every interface's rates
+        self.rate_engine = RateEngine()
+        self.rate_interface = interface
+        self.interface_monitor = InterfaceRateMonitor()
+        self.latest = None  # Newest EngineUpdate with a rate
+        self.latest_sample = None
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Call ``callback(update)`` with every EngineUpdate"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def process(self, samples):
+        """Compute the rates of one window of samples and publish them.
+
+        The speeds are the time-weighted mean over the window; peak and p95
+        are in the window statistics. Returns the EngineUpdate, or None if
+        there was nothing to publish.
+        """
+        # Rates for every NIC come from the newest sample
+        self.latest_sample = samples[-1]
+        table = self.interface_monitor.update(samples[-1])
+        if table is not None and self.history is not None:
+            self.history.append_rates(time.time_ns(), self.interface_monitor.interval_ns, table)
+
+        # Counters of another interface are not comparable with the baseline
+        if self.interface != self.rate_interface:
+            self.rate_interface = self.interface
+            self.rate_engine.reset()
+        self.rate_engine.link_bps = self.interface_monitor.link_bps(self.rate_interface)
+
+        # Use the selected interface if present, otherwise all interfaces
+        rates = []
+        for sample in samples:
+            bytes_recv, bytes_sent = sample.counters(self.rate_interface)
+            rate = self.rate_engine.update(sample.timestamp_ns, bytes_recv, bytes_sent)
+            if rate is not None:
+                rates.append(rate)
+
+        if rates:
+            intervals = [rate.interval_ns for rate in rates]
+            rx_stats = window_stats([rate.rx_bps for rate in rates], intervals)
+            tx_stats = window_stats([rate.tx_bps for rate in rates], intervals)
+            update = EngineUpdate(table, rates[-1], rx_stats, tx_stats,
+                                  convert_rate(rx_stats.mean_bps, "Mbps"), convert_rate(tx_stats.mean_bps, "Mbps"))
+            self.latest = update
+        elif table is not None:
+            update = EngineUpdate(table, None, None, None, None, None)
+        else:
+            return None
+
+        for callback in list(self._subscribers):
+            try:
+                callback(update)
+            except Exception as e:
+                logging.exception(f"Error in engine subscriber: {e}")
+        return update
@@ -0,0 +1,124 @@
+"""Per-interface rates for every NIC from one counter sample.
+
+State is kept in parallel arrays indexed by a slot per interface rather than a
+dict of namedtuples, so a tick costs one pass over flat arrays however many
+interfaces (bonds, VPN tunnels, container veths) the host has. Link speeds,
+which bound how far a counter may wrap, are only looked up again when new
+interfaces appear.
+"""
+from array import array
+from collections import namedtuple
+
+from speedview.controllers.counter_sources import link_speeds
+from speedview.controllers.rate import DEFAULT_MAX_RATE_BPS, counter_delta, wrap_limit
+
+InterfaceRate = namedtuple("InterfaceRate", ["interface", "rx_bps", "tx_bps"])
+
+
+class InterfaceRateMonitor:
+    """Computes rx/tx rates for all interfaces of a Sample at once"""
+
+    def __init__(self, max_rate_bps=DEFAULT_MAX_RATE_BPS, link_speeds=link_speeds):
+        self.max_rate_bps = max_rate_bps
+        self.link_speeds = link_speeds  # link_speeds() -> {interface: bits per second}
+        self.timestamp_ns = None
+        self.interval_ns = 0
+        self._names = []
+        self._slots = {}
+        self._prev_recv = array('Q')
+        self._prev_sent = array('Q')
+        self._rx_bps = array('d')
+        self._tx_bps = array('d')
+        self._link_bps = array('d')  # 0 when the link speed is unknown
+        self._has_baseline = bytearray()
+        # Slot order of the last sample's interfaces, reused while the set is unchanged
+        self._interfaces = None
+        self._order = []
+
+    def _slot_order(self, interfaces):
+        if interfaces == self._interfaces:
+            return self._order
+        slots = self._slots
+        order = []
+        speeds = None
+        for name in interfaces:
+            slot = slots.get(name)
+            if slot is None:
+                if speeds is None:
+                    speeds = self.link_speeds()
+                slot = len(self._names)
+                slots[name] = slot
+                self._names.append(name)
+                self._prev_recv.append(0)
+                self._prev_sent.append(0)
+                self._rx_bps.append(0.0)
+                self._tx_bps.append(0.0)
+                self._link_bps.append(speeds.get(name, 0))
+                self._has_baseline.append(0)
+            order.append(slot)
+        if len(self._names) > 2 * len(interfaces) + 16:
+            # Many interfaces came and went (container veths); drop the stale slots
+            self._compact(interfaces)
+            return self._slot_order(interfaces)
+        self._interfaces = interfaces
+        self._order = order
+        return order
+
+    def _compact(self, interfaces):
+        live = [(self._slots[name], name) for name in interfaces]
+        self._names = [name for _, name in live]
+        self._slots = {name: i for i, name in enumerate(self._names)}
+        self._prev_recv = array('Q', (self._prev_recv[slot] for slot, _ in live))
+        self._prev_sent = array('Q', (self._prev_sent[slot] for slot, _ in live))
+        self._rx_bps = array('d', (self._rx_bps[slot] for slot, _ in live))
+        self._tx_bps = array('d', (self._tx_bps[slot] for slot, _ in live))
+        self._link_bps = array('d', (self._link_bps[slot] for slot, _ in live))
+        self._has_baseline = bytearray(self._has_baseline[slot] for slot, _ in live)
+        self._interfaces = None
+
+    def update(self, sample):
+        """Add a Sample and return the per-interface rate table.
+
+        Returns None for the first sample or when the clock did not advance.
+        An interface that is new or whose counters were reset reports 0 until
+        its next sample.
+        """
+        order = self._slot_order(sample.interfaces)
+        previous_ns = self.timestamp_ns
+        self.timestamp_ns = sample.timestamp_ns
+        interval_ns = sample.timestamp_ns - previous_ns if previous_ns is not None else 0
+        self.interval_ns = interval_ns
+
+        prev_recv, prev_sent = self._prev_recv, self._prev_sent
+        rx_bps, tx_bps = self._rx_bps, self._tx_bps
+        link_bps, has_baseline = self._link_bps, self._has_baseline
+        if interval_ns > 0:
+            max_delta = self.max_rate_bps * interval_ns // 8_000_000_000 + 1
+            scale = 8e9 / interval_ns
+        for slot, recv, sent in zip(order, sample.bytes_recv, sample.bytes_sent):
+            if interval_ns > 0 and has_baseline[slot]:
+                max_wrap = wrap_limit(link_bps[slot], interval_ns)
+                recv_delta = counter_delta(prev_recv[slot], recv, max_delta, max_wrap)
+                sent_delta = counter_delta(prev_sent[slot], sent, max_delta, max_wrap)
+                if recv_delta is None or sent_delta is None:
+                    rx_bps[slot] = tx_bps[slot] = 0.0
+                else:
+                    rx_bps[slot] = recv_delta * scale
+                    tx_bps[slot] = sent_delta * scale
+            prev_recv[slot] = recv
+            prev_sent[slot] = sent
+            has_baseline[slot] = 1
+
+        if interval_ns <= 0:
+            return None
+        return self.table()
+
+    def link_bps(self, interface):
+        """Link speed of an interface seen in a sample, in bits per second; 0 when unknown"""
+        slot = self._slots.get(interface)
+        return self._link_bps[slot] if slot is not None else 0
+
+    def table(self):
+        """Current rates of the interfaces in the last sample"""
+        names, rx_bps, tx_bps = self._names, self._rx_bps, self._tx_bps
+        return [InterfaceRate(names[slot], rx_bps[slot], tx_bps[slot]) for slot in self._order]
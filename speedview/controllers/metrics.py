@@ -0,0 +1,210 @@
+"""Prometheus/OpenMetrics endpoint for live rates and speed test results.
+
+MetricsExporter serves ``GET /metrics`` from a ThreadingHTTPServer on a
+background thread. Scrapes only read what the sampler already measured. The
+engine and results subscribers just keep a reference to the newest update,
+so they cost the UI nothing. The exposition is rendered once per sample tick,
+on the first scrape after it, and reused by every scrape until the next
+tick. A scrape never reads the counters and never waits on the UI thread.
+"""
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRICS_PATH = "/metrics"
+
+
+def escape_label(value):
+    """Escape a label value for the text exposition"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _metric(lines, name, kind, help_text, unit=None):
+    lines.append(f"# TYPE {name} {kind}")
+    if unit:
+        lines.append(f"# UNIT {name} {unit}")
+    lines.append(f"# HELP {name} {help_text}")
+
+
+def render_metrics(sample=None, update=None, result=None, speed_tests=0, read_latency=None):
+    """OpenMetrics text for the newest Sample, EngineUpdate and SpeedTestResult.
+
+    Any of the inputs may be None; their metric families are then left out
+    (or, for counters, reported without samples).
+    """
+    lines = []
+
+    # Byte counters straight from the newest sample
+    for name, direction in (("speedview_interface_receive_bytes", "received"),
+                            ("speedview_interface_transmit_bytes", "transmitted")):
+        _metric(lines, name, "counter", f"Bytes {direction} by the interface", "bytes")
+        if sample is not None:
+            values = sample.bytes_recv if direction == "received" else sample.bytes_sent
+            for interface, value in zip(sample.interfaces, values):
+                lines.append(f'{name}_total{{interface="{escape_label(interface)}"}} {value}')
+
+    # Rates of the last tick, per interface
+    table = update.interface_rates if update is not None else None
+    for name, field, direction in (("speedview_interface_receive_bits_per_second", "rx_bps", "Receive"),
+                                   ("speedview_interface_transmit_bits_per_second", "tx_bps", "Transmit")):
+        _metric(lines, name, "gauge", f"{direction} rate of the interface over the last sample interval")
+        for rate in table or ():
+            lines.append(f'{name}{{interface="{escape_label(rate.interface)}"}} '
+                         f'{format_value(float(getattr(rate, field)))}')
+
+    _metric(lines, "speedview_speed_tests", "counter", "Speed tests completed since start")
+    lines.append(f"speedview_speed_tests_total {speed_tests}")
+    if result is not None:
+        labels = (f'server="{escape_label(result.server or "")}",'
+                  f'interface="{escape_label(result.interface or "")}",'
+                  f'backend="{escape_label(result.backend or "")}"')
+        gauges = (
+            ("speedview_speed_test_download_bits_per_second", "Download speed of the last speed test",
+             result.download_mbps * 1e6 if result.download_mbps is not None else None),
+            ("speedview_speed_test_upload_bits_per_second", "Upload speed of the last speed test",
+             result.upload_mbps * 1e6 if result.upload_mbps is not None else None),
+            ("speedview_speed_test_latency_seconds", "Latency of the last speed test",
+             result.latency_ms / 1e3 if result.latency_ms is not None else None),
+            ("speedview_speed_test_jitter_seconds", "Jitter of the last speed test",
+             result.jitter_ms / 1e3 if result.jitter_ms is not None else None),
+            ("speedview_speed_test_timestamp_seconds", "Unix time the last speed test finished",
+             result.timestamp),
+        )
+        for name, help_text, value in gauges:
+            if value is None:
+                continue
+            _metric(lines, name, "gauge", help_text, "seconds" if name.endswith("_seconds") else None)
+            lines.append(f"{name}{{{labels}}} {format_value(float(value))}")
+
+    if read_latency is not None:
+        name = "speedview_sampler_read_duration_seconds"
+        _metric(lines, name, "histogram", "Time taken to read the network counters", "seconds")
+        cumulative, count, total = read_latency.snapshot()
+        for bound, bucket in zip(read_latency.bounds + (float("inf"),), cumulative):
+            lines.append(f'{name}_bucket{{le="{format_value(float(bound))}"}} {bucket}')
+        lines.append(f"{name}_count {count}")
+        lines.append(f"{name}_sum {format_value(float(total))}")
+
+    lines.append("# EOF")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class MetricsExporter:
+    """Serves the newest SpeedEngine, CounterSampler and ResultsStore state over HTTP"""
+
+    def __init__(self, engine, counters=None, results=None, address="127.0.0.1", port=0):
+        self.engine = engine
+        self.counters = counters
+        self.results = results
+        self.address = address
+        self.requested_port = port
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._version = 0  # Bumped by every tick or result
+        self._rendered_version = -1
+        self._body = None
+        self._update = None
+        self._result = None
+        self._speed_tests = 0
+
+    @property
+    def running(self):
+        return self._server is not None
+
+    @property
+    def port(self):
+        """Port the server is bound to; differs from the requested one when that was 0"""
+        return self._server.server_address[1] if self._server is not None else None
+
+    def start(self):
+        """Bind the port and serve on a background thread; raises OSError if the port is taken"""
+        if self._server is not None:
+            return
+        exporter = self
+
+        class Handler(MetricsRequestHandler):
+            def metrics_body(self):
+                return exporter.render()
+
+        self._server = ThreadingHTTPServer((self.address, self.requested_port), Handler)
+        self._server.daemon_threads = True
+        self.engine.subscribe(self._on_update)
+        if self.results is not None:
+            self.results.subscribe(self._on_result)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsExporter", daemon=True)
+        self._thread.start()
+        logging.info(f"Serving metrics on http://{self.address}:{self.port}{METRICS_PATH}")
+
+    def stop(self):
+        if self._server is None:
+            return
+        self.engine.unsubscribe(self._on_update)
+        if self.results is not None:
+            self.results.unsubscribe(self._on_result)
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def _on_update(self, update):
+        # Runs on the engine's thread (the UI thread in the app); render lazily instead
+        self._update = update
+        self._version += 1
+
+    def _on_result(self, result):
+        self._result = result
+        self._speed_tests += 1
+        self._version += 1
+
+    def render(self):
+        """Exposition bytes for the current tick, rendered on the first scrape after it"""
+        with self._lock:
+            version = self._version
+            if self._body is None or version != self._rendered_version:
+                self._body = render_metrics(self.engine.latest_sample, self._update, self._result,
+                                            self._speed_tests,
+                                            self.counters.read_latency if self.counters is not None else None)
+                self._rendered_version = version
+            return self._body
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Answers GET/HEAD /metrics with ``metrics_body()``"""
+
+    def metrics_body(self):
+        raise NotImplementedError
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        if self.path.split("?", 1)[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        try:
+            body = self.metrics_body()
+        except Exception as e:
+            logging.exception(f"Error rendering metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics request from {self.address_string()}: {format % args}")
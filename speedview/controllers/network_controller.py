@@ -4,7 +4,7 @@ import subprocess
 import re
 import threading
 from PyQt5.QtCore import QObject, pyqtSignal
-import speedtest
+from speedview.controllers.speed_test_runner import SpeedTestRunner
 
 class NetworkController(QObject):
     """Handles network connectivity and testing"""
@@ -12,9 +12,16 @@ class NetworkController(QObject):
     connection_updated = pyqtSignal(str, int)  # status, signal_strength
     speed_test_complete = pyqtSignal(float, float)  # download_speed, upload_speed
     speed_test_failed = pyqtSignal(str)  # error_message
+    speed_test_progress = pyqtSignal(list)  # SpeedTestProgress items, batched
     
-    def __init__(self):
+    def __init__(self, results=None, settings=None):
         super().__init__()
+        self.results = results  # Optional ResultsStore receiving speed test results
+        self.settings = settings  # Chooses the speed test engine; the default engine without it
+        self.speed_test_runner = SpeedTestRunner(settings, results, self)
+        self.speed_test_runner.progress.connect(self.speed_test_progress)
+        self.speed_test_runner.completed.connect(self._on_speed_test_completed)
+        self.speed_test_runner.failed.connect(self.speed_test_failed)
         self.connection_status = "Unknown"
         self.signal_strength = 0
         self.updating = False
@@ -112,43 +119,15 @@ class NetworkController(QObject):
             return 0
     
     def run_speed_test(self):
-        """Start a speed test in a background thread"""
-        thread = threading.Thread(target=self._speed_test_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def _speed_test_thread(self):
-        """Thread to run network speed test"""
-        try:
-            import speedtest
-            st = speedtest.Speedtest()
-            st.get_best_server()
-            download_speed = st.download() / 1_000_000  # Convert to Mbps
-            upload_speed = st.upload() / 1_000_000      # Convert to Mbps
-            self.speed_test_complete.emit(download_speed, upload_speed)
-        except Exception as e:
-            print(f"Speedtest failed: {e}\nTrying fast.com backend...")
-            # Try fast-cli as fallback
-            try:
-                import subprocess
-                import json
-                # Use 'fast --json' (fast-cli does not support --unit)
-                result = subprocess.run(
-                    ['fast', '--json'],
-                    capture_output=True, text=True, timeout=30
-                )
-                if result.returncode == 0:
-                    data = json.loads(result.stdout)
-                    download_speed = float(data.get('downloadSpeed', 0))
-                    # fast-cli does not provide upload, so set to 0
-                    upload_speed = 0.0
-                    self.speed_test_complete.emit(download_speed, upload_speed)
-                else:
-                    print(f"fast-cli failed: {result.stderr}")
-                    self.speed_test_failed.emit(f"fast-cli failed: {result.stderr}")
-            except Exception as fallback_e:
-                print(f"Both speedtest and fast-cli failed: {fallback_e}")
-                self.speed_test_failed.emit(f"Speedtest failed: {e}; fast-cli failed: {fallback_e}")
+        """Start a speed test on a worker thread; progress arrives in speed_test_progress batches.
+
+        Returns False, and emits nothing, when a test is already running,
+        including a scheduled one started by SpeedController.
+        """
+        return self.speed_test_runner.start()
+
+    def _on_speed_test_completed(self, result):
+        self.speed_test_complete.emit(result.download_mbps, result.upload_mbps)
     
     def get_connection_info(self):
         """Get the current connection type and band."""
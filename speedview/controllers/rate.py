@@ -0,0 +1,164 @@
+"""Rate computation from raw network byte counters.
+
+Rates are computed from the time that actually elapsed between two samples
+(``time.monotonic_ns()``), not the configured interval, so timer jitter, a
+busy event loop or a suspended laptop do not skew them. Counters that wrap at
+32 or 64 bits are unwrapped; a counter that goes backwards for any other
+reason (interface reset, driver reload) restarts the baseline instead of
+producing a negative or huge spike.
+
+The 400 Gbit/s sanity bound is far too loose to tell the two apart: a
+counter reset from 3e9 to 0 looks like a 32-bit wrap of about 1.3 GB. So a
+wrap is only accepted when it fits the link speed, where the OS reports one,
+or otherwise when the counter was already close to the wrap point.
+"""
+import math
+from collections import namedtuple
+
+COUNTER_32_MODULUS = 2 ** 32
+COUNTER_64_MODULUS = 2 ** 64
+
+# Fastest link we expect to see; larger deltas are treated as counter resets
+DEFAULT_MAX_RATE_BPS = 400_000_000_000  # 400 Gbit/s
+# Largest wrap accepted without a link speed: within 512 MiB of the wrap point
+UNKNOWN_LINK_MAX_WRAP = COUNTER_32_MODULUS // 8
+LINK_SPEED_SLACK = 1.25  # Headroom over the reported link speed for timing jitter
+
+# Bits per second in one unit of each display unit
+SI_UNITS = {"bps": 1, "Kbps": 1e3, "Mbps": 1e6, "Gbps": 1e9}
+IEC_UNITS = {"bps": 1, "Kibps": 2 ** 10, "Mibps": 2 ** 20, "Gibps": 2 ** 30}
+BYTE_UNITS = {"KB/s": 8e3, "MB/s": 8e6, "KiB/s": 8 * 2 ** 10, "MiB/s": 8 * 2 ** 20}
+UNITS = dict(SI_UNITS, **IEC_UNITS, **BYTE_UNITS)
+
+
+class Rate(namedtuple("Rate", ["timestamp_ns", "interval_ns", "rx_bps", "tx_bps"])):
+    """Receive and transmit rate in bits per second over one sample interval"""
+    __slots__ = ()
+
+    def rx(self, unit="Mbps"):
+        return convert_rate(self.rx_bps, unit)
+
+    def tx(self, unit="Mbps"):
+        return convert_rate(self.tx_bps, unit)
+
+
+class WindowStats(namedtuple("WindowStats", ["samples", "peak_bps", "mean_bps", "p95_bps"])):
+    """Summary of the rates seen in one render window, in bits per second"""
+    __slots__ = ()
+
+
+def window_stats(rates, weights=None):
+    """Peak, mean and 95th percentile of a window of rates.
+
+    ``weights`` (usually the sample intervals) turn the mean into a
+    time-weighted average, so it matches the bytes moved over the window.
+    Returns None for an empty window.
+    """
+    if not rates:
+        return None
+    if weights:
+        mean = sum(rate * weight for rate, weight in zip(rates, weights)) / sum(weights)
+    else:
+        mean = sum(rates) / len(rates)
+    ordered = sorted(rates)
+    # Nearest-rank percentile
+    p95 = ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)]
+    return WindowStats(len(rates), ordered[-1], mean, p95)
+
+
+def convert_rate(bps, unit="Mbps"):
+    """Convert bits per second to an SI (Mbps), IEC (Mibps) or byte (MB/s) unit"""
+    try:
+        return bps / UNITS[unit]
+    except KeyError:
+        raise ValueError(f"Unknown rate unit '{unit}'")
+
+
+def format_rate(bps, iec=False):
+    """Human readable rate, picking the largest SI or IEC unit below the value"""
+    units = IEC_UNITS if iec else SI_UNITS
+    name = "bps"
+    for candidate, scale in units.items():
+        if bps >= scale:
+            name = candidate
+    return f"{bps / units[name]:.2f} {name}"
+
+
+def wrap_limit(link_bps, interval_ns):
+    """Most bytes a counter wrap may cover in ``interval_ns``.
+
+    That is what a link of ``link_bps`` could carry, or UNKNOWN_LINK_MAX_WRAP
+    when the link speed is unknown (0).
+    """
+    if link_bps:
+        return int(link_bps * LINK_SPEED_SLACK) * interval_ns // 8_000_000_000 + 1
+    return UNKNOWN_LINK_MAX_WRAP
+
+
+def counter_delta(previous, current, max_delta, max_wrap=None):
+    """Bytes counted between two readings of a counter.
+
+    Returns None when the counter was reset (it went backwards without a
+    plausible wrap, or jumped by more than ``max_delta``). A wrap must also
+    cover no more than ``max_wrap`` bytes (see wrap_limit); by default only
+    ``max_delta`` applies.
+    """
+    if current >= previous:
+        delta = current - previous
+        return delta if delta <= max_delta else None
+
+    # The counter went backwards: try a 32-bit wrap, then a 64-bit wrap. A wrap
+    # covering half the counter range or more is indistinguishable from a reset.
+    if max_wrap is not None:
+        max_delta = min(max_delta, max_wrap)
+    for modulus in (COUNTER_32_MODULUS, COUNTER_64_MODULUS):
+        if previous < modulus and current < modulus:
+            delta = modulus - previous + current
+            if delta <= max_delta and delta < modulus // 2:
+                return delta
+    return None
+
+
+class RateEngine:
+    """Turns timestamped receive/transmit counters into rates"""
+
+    def __init__(self, max_rate_bps=DEFAULT_MAX_RATE_BPS, link_bps=0):
+        self.max_rate_bps = max_rate_bps
+        self.link_bps = link_bps  # Link speed bounding counter wraps; 0 when unknown
+        self.reset()
+
+    def reset(self):
+        """Forget the baseline; the next sample only establishes a new one"""
+        self.timestamp_ns = None
+        self.bytes_recv = None
+        self.bytes_sent = None
+
+    def update(self, timestamp_ns, bytes_recv, bytes_sent):
+        """Add a sample and return the Rate since the previous one.
+
+        Returns None for the first sample, a non-advancing clock, or a counter
+        reset; the sample then becomes the new baseline.
+        """
+        previous_ns = self.timestamp_ns
+        previous_recv = self.bytes_recv
+        previous_sent = self.bytes_sent
+        self.timestamp_ns = timestamp_ns
+        self.bytes_recv = bytes_recv
+        self.bytes_sent = bytes_sent
+
+        if previous_ns is None:
+            return None
+        interval_ns = timestamp_ns - previous_ns
+        if interval_ns <= 0:
+            return None
+
+        # Most bytes the link could have carried in this interval
+        max_delta = self.max_rate_bps * interval_ns // 8_000_000_000 + 1
+        max_wrap = wrap_limit(self.link_bps, interval_ns)
+        recv_delta = counter_delta(previous_recv, bytes_recv, max_delta, max_wrap)
+        sent_delta = counter_delta(previous_sent, bytes_sent, max_delta, max_wrap)
+        if recv_delta is None or sent_delta is None:
+            return None
+
+        seconds = interval_ns / 1e9
+        return Rate(timestamp_ns, interval_ns, recv_delta * 8 / seconds, sent_delta * 8 / seconds)
@@ -0,0 +1,96 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from speedview.config.config import DEFAULT_RENDER_HZ
+from speedview.controllers.engine import CounterSampler, Sample
+
+
+class SamplerService(QObject):
+    """Owns network counter polling for the whole process.
+
+    Counters for every interface are read once per interval from a
+    CounterSource (``/proc/net/dev`` on Linux, psutil elsewhere) and published
+    as an immutable Sample. Controllers and views subscribe to
+    ``sample_ready`` instead of running their own timers.
+
+    With ``sample_hz`` set, counters are instead read at that rate on a
+    background thread into a ring buffer. The GUI thread drains it
+    ``render_hz`` times a second and publishes the whole window on
+    ``window_ready``, so microbursts are captured without redrawing per sample.
+    """
+
+    sample_ready = pyqtSignal(object)  # Sample
+    window_ready = pyqtSignal(object)  # list of Samples since the previous window
+
+    def __init__(self, interval=1.0, parent=None, source=None, sample_hz=0,
+                 render_hz=DEFAULT_RENDER_HZ):
+        super().__init__(parent)
+        self.interval = interval
+        self.sample_hz = sample_hz
+        self.render_hz = render_hz
+        self.latest = None
+        self.counters = CounterSampler(source)
+        self.source = self.counters.source
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+
+    @property
+    def high_frequency(self):
+        return self.sample_hz > 0
+
+    def start(self):
+        """Start periodic sampling, taking the first sample immediately"""
+        if self.high_frequency:
+            self.counters.start_thread(self.sample_hz)
+            self.timer.start(int(1000 / self.render_hz))
+        else:
+            self.poll()
+            self.timer.start(int(self.interval * 1000))
+
+    def stop(self):
+        self.timer.stop()
+        self.counters.stop_thread()
+
+    def set_interval(self, interval):
+        """Change the sampling cadence (seconds)"""
+        self.interval = interval
+        if not self.high_frequency:
+            self.timer.setInterval(int(interval * 1000))
+
+    def set_rates(self, sample_hz, render_hz):
+        """Switch high-frequency sampling on (sample_hz > 0) or off and set the render rate"""
+        if (sample_hz, render_hz) == (self.sample_hz, self.render_hz):
+            return
+        running = self.timer.isActive()
+        self.stop()
+        self.sample_hz = sample_hz
+        self.render_hz = render_hz
+        if running:
+            self.start()
+
+    def read_sample(self):
+        """Read the counters once; returns None if the source failed"""
+        return self.counters.read_sample()
+
+    def poll(self):
+        """Read the counters once and publish the sample.
+
+        In high-frequency mode this publishes the samples gathered since the
+        last window instead; the GUI thread never reads the source itself.
+        """
+        if self.high_frequency:
+            return self.drain()
+        sample = self.read_sample()
+        if sample is None:
+            return None
+        self.latest = sample
+        self.sample_ready.emit(sample)
+        return sample
+
+    def drain(self):
+        """Publish the samples the background thread buffered since the last window"""
+        samples = self.counters.drain()
+        if not samples:
+            return None
+        self.latest = samples[-1]
+        self.window_ready.emit(samples)
+        return samples
@@ -0,0 +1,209 @@
+"""Scheduled speed tests.
+
+A schedule setting is one of
+
+* ``@hourly``, ``@daily`` or ``@weekly``,
+* ``@every 30m``: a fixed interval from the previous run (``s``, ``m`` or
+  ``h``; at least MIN_INTERVAL seconds),
+* five cron fields, ``minute hour day-of-month month day-of-week``, with
+  ``*``, lists, ranges and ``/step``, in local time.
+
+SpeedTestScheduler only decides; it keeps no timers. Its owner calls
+``tick`` every few seconds and passes it the live rates with ``observe``.
+Each scheduled time gets a random delay of up to ``jitter`` seconds, so
+machines started together do not all test at once. When the time comes,
+the test
+
+* is skipped when today's tests (from the results store) plus the expected
+  traffic of one more would exceed ``daily_budget_mb``,
+* waits BUSY_RETRY seconds while the link is busy, which means the median
+  rate of the last BUSY_WINDOW seconds is above ``busy_mbps``,
+* also waits while another speed test runs; ``start_test`` returns False
+  then.
+
+A test that keeps waiting is skipped once the next scheduled time comes.
+``clock`` returns epoch seconds, so tests can pass a fake one.
+"""
+import time
+import random
+import logging
+import statistics
+from collections import deque
+from datetime import datetime, timedelta, time as day_time
+
+# What tick() did with a test that was due
+RUN = "run"
+BUSY = "busy"
+OVER_BUDGET = "budget"
+RUNNING = "running"
+
+BUSY_WINDOW = 30.0  # Seconds of rate samples judged by link_busy
+BUSY_RETRY = 300.0  # Seconds a test waits for a busy link or another test
+MIN_INTERVAL = 60.0
+MAX_SCHEDULE_DAYS = 366 * 8  # Cron days searched; enough for February 29 on a given weekday
+ALIASES = {"@hourly": "0 * * * *", "@daily": "0 0 * * *", "@weekly": "0 0 * * 0"}
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600}
+# (lowest, highest) of each cron field; day of week 7 is Sunday, like 0
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def estimate_test_mb(result, seconds):
+    """Traffic of a speed test in MB, from its rates and the seconds spent per direction"""
+    return (result.download_mbps + result.upload_mbps) * seconds / 8
+
+
+def _parse_cron_field(field, low, high):
+    """Sorted values of one cron field; raises ValueError"""
+    values = set()
+    for part in field.split(","):
+        span, slash, step = part.partition("/")
+        step = int(step) if slash else 1
+        if span == "*":
+            start, end = low, high
+        elif "-" in span:
+            start, end = (int(value) for value in span.split("-", 1))
+        else:
+            start = int(span)
+            end = high if slash else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Cron field out of range: {field!r}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+class IntervalSchedule:
+    """Every ``seconds``, counted from the previous run"""
+
+    def __init__(self, seconds):
+        if seconds < MIN_INTERVAL:
+            raise ValueError(f"Speed test interval below {MIN_INTERVAL:.0f} seconds")
+        self.seconds = seconds
+
+    def next_after(self, t):
+        return t + self.seconds
+
+
+class CronSchedule:
+    """The minutes matching five cron fields, in local time"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected five cron fields: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS))
+        self.weekdays = {day % 7 for day in weekdays}
+        # As in cron, when both day fields are restricted a day matching either one runs
+        self.any_day = fields[2].startswith("*") or fields[4].startswith("*")
+        self.next_after(time.time())  # Rejects expressions that never match, like "0 0 30 2 *"
+
+    def _day_matches(self, date):
+        if date.month not in self.months:
+            return False
+        day = date.day in self.days
+        weekday = (date.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        return day and weekday if self.any_day else day or weekday
+
+    def next_after(self, t):
+        """First matching minute after ``t``"""
+        start = datetime.fromtimestamp(t).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for offset in range(MAX_SCHEDULE_DAYS):
+            date = start.date() + timedelta(days=offset)
+            if not self._day_matches(date):
+                continue
+            for hour in self.hours:
+                for minute in self.minutes:
+                    candidate = datetime.combine(date, day_time(hour, minute))
+                    if candidate >= start:
+                        return candidate.timestamp()
+        raise ValueError("Cron expression never matches")
+
+
+def parse_schedule(text):
+    """IntervalSchedule or CronSchedule for a schedule setting, None when it is empty; raises ValueError"""
+    if not isinstance(text, str):
+        raise TypeError(f"Schedule must be a string, not {type(text).__name__}")
+    text = text.strip().lower()
+    if not text or text == "off":
+        return None
+    text = ALIASES.get(text, text)
+    if text.startswith("@every"):
+        amount = text[len("@every"):].strip()
+        unit = INTERVAL_UNITS.get(amount[-1:])
+        if unit is None:
+            raise ValueError(f"Interval needs a unit (s, m or h): {text!r}")
+        return IntervalSchedule(float(amount[:-1]) * unit)
+    return CronSchedule(text)
+
+
+class SpeedTestScheduler:
+    """Decides when scheduled speed tests run"""
+
+    def __init__(self, schedule, start_test, results=None, jitter=0.0, busy_mbps=0.0, daily_budget_mb=0.0,
+                 test_seconds=10.0, clock=time.time, rng=None):
+        self.schedule = schedule  # IntervalSchedule or CronSchedule
+        self.start_test = start_test  # start_test() -> False when another test is running
+        self.results = results  # Optional ResultsStore; needed for the budget
+        self.jitter = jitter
+        self.busy_mbps = busy_mbps  # 0 never waits for the link
+        self.daily_budget_mb = daily_budget_mb  # 0 for no limit
+        self.test_seconds = test_seconds  # Per direction, for estimate_test_mb
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._rates = deque()  # (time, download + upload Mbps)
+        self.slot = None  # Scheduled time of the next test
+        self.next_run = None  # The slot plus jitter, or a retry
+        self._plan(self.clock())
+
+    def _plan(self, now):
+        self.slot = self.schedule.next_after(now)
+        self.next_run = self.slot + self.rng.uniform(0, self.jitter)
+        logging.debug(f"Next scheduled speed test at {time.ctime(self.next_run)}")
+
+    def observe(self, download_mbps, upload_mbps):
+        """Record a live rate sample"""
+        now = self.clock()
+        self._rates.append((now, download_mbps + upload_mbps))
+        while self._rates and self._rates[0][0] < now - BUSY_WINDOW:
+            self._rates.popleft()
+
+    def link_busy(self, now):
+        if not self.busy_mbps:
+            return False
+        rates = [rate for t, rate in self._rates if t >= now - BUSY_WINDOW]
+        return bool(rates) and statistics.median(rates) > self.busy_mbps
+
+    def used_today_mb(self, now):
+        """Estimated traffic of the stored tests since local midnight"""
+        midnight = datetime.combine(datetime.fromtimestamp(now).date(), day_time()).timestamp()
+        return sum(estimate_test_mb(result, self.test_seconds) for result in self.results.query(midnight, now))
+
+    def over_budget(self, now):
+        """True when one more test, as large as the last one, would exceed the daily budget"""
+        if not self.daily_budget_mb or self.results is None:
+            return False
+        latest = self.results.latest(1)
+        expected = estimate_test_mb(latest[0], self.test_seconds) if latest else 0.0
+        return self.used_today_mb(now) + expected > self.daily_budget_mb
+
+    def tick(self):
+        """Start the test when it is due; returns RUN, BUSY, OVER_BUDGET or RUNNING then, otherwise None"""
+        now = self.clock()
+        if now < self.next_run:
+            return None
+        if self.over_budget(now):
+            outcome = OVER_BUDGET
+        elif self.link_busy(now):
+            outcome = BUSY
+        elif not self.start_test():
+            outcome = RUNNING
+        else:
+            outcome = RUN
+        if outcome in (BUSY, RUNNING) and now + BUSY_RETRY < self.schedule.next_after(self.slot):
+            logging.info(f"Scheduled speed test postponed ({outcome})")
+            self.next_run = now + BUSY_RETRY
+            return outcome
+        if outcome != RUN:
+            logging.info(f"Scheduled speed test skipped ({outcome})")
+        self._plan(now)
+        return outcome
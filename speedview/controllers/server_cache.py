@@ -0,0 +1,166 @@
+"""Cache of the closest speedtest.net servers.
+
+``Speedtest.get_best_server()`` downloads the whole server list (thousands
+of entries) and then pings five servers one after another, three times
+each, before a single byte is measured. The closest servers barely change,
+so ServerCache keeps them in a JSON file next to the settings file:
+
+* a fresh cache is used as it is,
+* a stale cache is still used for this test, while the list is refreshed
+  on a background thread,
+* only a missing or unreadable cache makes the test wait for the list.
+
+Before each test the first ``candidates`` cached servers are probed in
+parallel (``latency.txt``, as speedtest-cli does) and the fastest one is
+picked, so the probing costs one round of round trips instead of fifteen.
+"""
+import os
+import json
+import time
+import logging
+import threading
+import http.client
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from speedview.config.config import (
+    SPEED_TEST_SERVER_CACHE, SPEED_TEST_SERVER_TTL, SPEED_TEST_SERVER_CANDIDATES
+)
+
+CACHED_SERVERS = 20  # Closest servers kept; more than are probed, in case some go away
+PROBE_ATTEMPTS = 3
+PROBE_TIMEOUT = 2.0  # Seconds per server; slower servers are not worth testing against
+# Fields of a speedtest-cli server entry that are kept in the cache
+SERVER_FIELDS = ("url", "lat", "lon", "name", "country", "cc", "sponsor", "id", "host", "d")
+
+# One background refresh at a time, however many engines share the cache file
+_refresh_lock = threading.Lock()
+
+
+def fetch_closest_servers(st=None, limit=CACHED_SERVERS):
+    """The ``limit`` closest speedtest.net servers, closest first"""
+    if st is None:
+        import speedtest  # Slow to import; only needed once a test runs
+        st = speedtest.Speedtest()
+    return [{field: server[field] for field in SERVER_FIELDS if field in server}
+            for server in st.get_closest_servers(limit)]
+
+
+def probe_latency(server, attempts=PROBE_ATTEMPTS, timeout=PROBE_TIMEOUT):
+    """Lowest ``latency.txt`` round trip to a server in ms, or None when it does not answer"""
+    parts = urlsplit(server["url"])
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    path = posixpath.dirname(parts.path) + "/latency.txt"
+    connection = connection_class(parts.netloc, timeout=timeout)
+    best = None
+    try:
+        connection.connect()  # Not timed, so the handshake does not count as latency
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            connection.request("GET", f"{path}?x={time.time_ns()}.{attempt}")
+            response = connection.getresponse()
+            body = response.read()
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status != 200 or not body.startswith(b"test=test"):
+                return None
+            best = elapsed if best is None else min(best, elapsed)
+    except (OSError, http.client.HTTPException) as e:
+        logging.debug(f"Speed test server {parts.netloc} did not answer: {e}")
+    finally:
+        connection.close()
+    return best
+
+
+class ServerCache:
+    """The closest speedtest.net servers, stored in a JSON file with a time to live"""
+
+    def __init__(self, path=SPEED_TEST_SERVER_CACHE, ttl=SPEED_TEST_SERVER_TTL,
+                 candidates=SPEED_TEST_SERVER_CANDIDATES, fetch=fetch_closest_servers, probe=probe_latency):
+        self.path = path
+        self.ttl = ttl
+        self.candidates = candidates
+        self.fetch = fetch  # fetch(st) -> server list; st is a Speedtest or None
+        self.probe = probe  # probe(server) -> latency in ms or None
+
+    def load(self):
+        """``(servers, fetched_at)``; no servers when the file is missing or unreadable"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            servers = cache['servers']
+            fetched_at = float(cache['fetched_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return [], 0.0
+        if not isinstance(servers, list) or not all(isinstance(s, dict) and 'url' in s for s in servers):
+            return [], 0.0
+        return servers, fetched_at
+
+    def save(self, servers, fetched_at=None):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': time.time() if fetched_at is None else fetched_at,
+                           'servers': servers}, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not save the speed test server cache: {e}")
+
+    def is_stale(self, fetched_at):
+        return not 0 <= time.time() - fetched_at < self.ttl
+
+    def refresh(self, st=None):
+        """Fetch and store the server list; returns it"""
+        servers = self.fetch(st)
+        if servers:
+            self.save(servers)
+        return servers
+
+    def refresh_in_background(self):
+        """Refresh on a daemon thread; returns it, or None when a refresh is already running"""
+        if not _refresh_lock.acquire(blocking=False):
+            return None
+
+        def refresh():
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.warning(f"Could not refresh the speed test server list: {e}")
+            finally:
+                _refresh_lock.release()
+
+        thread = threading.Thread(target=refresh, name="SpeedTestServers", daemon=True)
+        thread.start()
+        return thread
+
+    def probe_servers(self, servers):
+        """``[(latency_ms, server)]`` for the servers that answered, fastest first; probed in parallel"""
+        if not servers:
+            return []
+        with ThreadPoolExecutor(max_workers=len(servers), thread_name_prefix="ServerProbe") as pool:
+            latencies = list(pool.map(self.probe, servers))
+        answered = [(latency, index) for index, latency in enumerate(latencies) if latency is not None]
+        return [(latency, servers[index]) for latency, index in sorted(answered)]
+
+    def best_server(self, st=None):
+        """The cached candidate with the lowest latency, or None when none answers.
+
+        ``st`` is the Speedtest of the test about to run; it is used to fetch
+        the list when there is no cache yet.
+        """
+        servers, fetched_at = self.load()
+        cached = bool(servers)
+        if not cached:
+            servers = self.refresh(st)
+        elif self.is_stale(fetched_at):
+            self.refresh_in_background()
+        answered = self.probe_servers(servers[:self.candidates])
+        if not answered:
+            if cached:
+                # The cached servers may have gone away; the next test gets a new list
+                self.refresh_in_background()
+            return None
+        latency, server = answered[0]
+        logging.debug(f"Speed test server {server.get('host')} answered in {latency:.1f} ms")
+        return server
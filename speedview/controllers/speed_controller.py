@@ -1,66 +1,107 @@
 import logging
 import psutil
 from PyQt5.QtCore import QObject, QTimer, pyqtSignal
-import threading
-import speedtest
 import subprocess
+from speedview.controllers.sampler import SamplerService
+from speedview.controllers.engine import SpeedEngine
+from speedview.controllers.speed_test_runner import SpeedTestRunner, speed_test_running
+from speedview.controllers.scheduler import SpeedTestScheduler, parse_schedule
+
+SCHEDULE_TICK_MS = 15000  # How often a scheduled speed test is checked for being due
 
 class SpeedController(QObject):
-    """Controls network speed measurement and calculations"""
+    """Controls network speed measurement and calculations.
+
+    The measurement itself is done by a Qt-free SpeedEngine; this class feeds
+    it the sampler's windows and re-emits its updates as signals.
+    """
     
     speed_updated = pyqtSignal(float, float)  # Download speed, Upload speed
+    interface_rates_updated = pyqtSignal(object)  # list of InterfaceRate, one per NIC
+    window_stats_updated = pyqtSignal(object, object)  # Download and upload WindowStats
+    speed_test_progress = pyqtSignal(list)  # SpeedTestProgress items, batched
     
-    def __init__(self, settings):
+    def __init__(self, settings, sampler=None, history=None, results=None):
         super().__init__()
         self.settings = settings
+        self.history = history  # Optional HistoryStore receiving every interface's rates
+        self.results = results  # Optional ResultsStore receiving speed test results
         
-        self.prev_bytes_recv = 0
-        self.prev_bytes_sent = 0
+        self.engine = SpeedEngine(settings.selected_interface, history)
+        self.engine.subscribe(self.on_engine_update)
+        self.last_rate = None
+        self.last_rx_stats = None
+        self.last_tx_stats = None
+        self.last_interface_rates = []
         self.last_download_speed = 0
         self.last_upload_speed = 0
-        self.test_in_progress = False  # Prevent concurrent speed tests
+        # One speed test at a time; its progress is re-emitted in speed_test_progress batches
+        self.speed_test_runner = SpeedTestRunner(settings, results, self)
+        self.speed_test_runner.progress.connect(self.speed_test_progress)
+        self.speed_test_runner.completed.connect(self._on_speed_test_completed)
+        self.speed_test_runner.failed.connect(self._on_speed_test_failed)
+        # Scheduled speed tests; the scheduler decides, this timer asks it
+        self.scheduler = None
+        self.schedule_timer = QTimer(self)
+        self.schedule_timer.setInterval(SCHEDULE_TICK_MS)
+        self.schedule_timer.timeout.connect(self.check_schedule)
+        self.configure_schedule()
         
-        # Setup timer for periodic updates
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_speed)
-        self.timer.start(int(self.settings.update_interval * 2000))  # Increased interval to reduce CPU usage
+        # Counters come from the shared sampler; it owns the only polling timer
+        self.owns_sampler = sampler is None
+        self.sampler = sampler or SamplerService(self.settings.update_interval,
+                                                 sample_hz=self.settings.sample_hz,
+                                                 render_hz=self.settings.render_hz)
+        self.sampler.sample_ready.connect(self.on_sample)
+        self.sampler.window_ready.connect(self.on_window)
+        if self.owns_sampler:
+            self.sampler.start()
     
     def update_speed(self):
-        """Update network speed measurements"""
+        """Take a sample now instead of waiting for the next interval"""
+        self.sampler.poll()
+
+    def on_sample(self, sample):
+        """Update network speed measurements from a new counter sample"""
+        self.on_window((sample,))
+
+    def on_window(self, samples):
+        """Update network speed measurements from the samples of one render window"""
         try:
-            stats = psutil.net_io_counters(pernic=True)
-            
-            # If interface is selected, use that specific one
-            if self.settings.selected_interface and self.settings.selected_interface in stats:
-                net_io = stats[self.settings.selected_interface]
-            else:
-                # Otherwise use the default overall counters
-                net_io = psutil.net_io_counters()
-            
-            bytes_recv = net_io.bytes_recv
-            bytes_sent = net_io.bytes_sent
-            
-            if self.prev_bytes_recv > 0:
-                # Calculate speeds in Mbps
-                download_speed = ((bytes_recv - self.prev_bytes_recv) * 8) / (1024 * 1024 * self.settings.update_interval)
-                upload_speed = ((bytes_sent - self.prev_bytes_sent) * 8) / (1024 * 1024 * self.settings.update_interval)
-                logging.info(f"Periodic speed update: download={download_speed:.2f} Mbps, upload={upload_speed:.2f} Mbps")
-                # Emit the signal with updated speeds
-                self.speed_updated.emit(download_speed, upload_speed)
-                # Store for later use
-                self.last_download_speed = download_speed
-                self.last_upload_speed = upload_speed
-            
-            # Store the current byte counts for next calculation
-            self.prev_bytes_recv = bytes_recv
-            self.prev_bytes_sent = bytes_sent
+            self.engine.interface = self.settings.selected_interface
+            self.engine.process(samples)
         except Exception as e:
             logging.exception(f"Error updating speed: {e}")
+
+    def on_engine_update(self, update):
+        """Re-emit an EngineUpdate as signals"""
+        if update.interface_rates is not None:
+            self.last_interface_rates = update.interface_rates
+            self.interface_rates_updated.emit(update.interface_rates)
+        if update.rate is None:
+            return
+        self.last_rate = update.rate
+        self.last_rx_stats = update.rx_stats
+        self.last_tx_stats = update.tx_stats
+        self.last_download_speed = update.download_mbps
+        self.last_upload_speed = update.upload_mbps
+        if self.scheduler is not None:
+            self.scheduler.observe(update.download_mbps, update.upload_mbps)
+        logging.debug(f"Periodic speed update: download={self.last_download_speed:.2f} Mbps, "
+                      f"upload={self.last_upload_speed:.2f} Mbps")
+        self.window_stats_updated.emit(self.last_rx_stats, self.last_tx_stats)
+        self.speed_updated.emit(self.last_download_speed, self.last_upload_speed)
     
     def set_update_interval(self, interval):
         """Change the update interval"""
         self.settings.update_interval = interval
-        self.timer.setInterval(int(interval * 1000))
+        self.sampler.set_interval(interval)
+
+    def set_sampling_rates(self, sample_hz, render_hz):
+        """Change the high-frequency sample rate (0 turns it off) and the render rate"""
+        self.settings.sample_hz = sample_hz
+        self.settings.render_hz = render_hz
+        self.sampler.set_rates(sample_hz, render_hz)
     
     def get_current_speeds(self):
         """Get the most recently calculated speeds"""
@@ -78,32 +119,51 @@ class SpeedController(QObject):
         
         return interfaces
 
+    @property
+    def test_in_progress(self):
+        """True while any speed test runs, including one started elsewhere"""
+        return speed_test_running()
+
     def run_speed_test(self):
-        """Start a speed test in a background thread"""
-        if self.test_in_progress:
-            logging.info("Speed test already in progress. Skipping new test.")
-            return
-        self.test_in_progress = True
+        """Start a speed test in a background thread; False when one is already running"""
         logging.info("Starting speed test thread...")
-        thread = threading.Thread(target=self._speed_test_thread)
-        thread.daemon = True
-        thread.start()
+        return self.speed_test_runner.start()
+
+    def configure_schedule(self):
+        """(Re)create the speed test scheduler from Settings; no schedule stops it"""
+        try:
+            schedule = parse_schedule(getattr(self.settings, 'speed_test_schedule', ""))
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Ignoring speed test schedule: {e}")
+            schedule = None
+        if schedule is None:
+            self.scheduler = None
+            self.schedule_timer.stop()
+            return
+        self.scheduler = SpeedTestScheduler(
+            schedule, self.run_speed_test, self.results,
+            jitter=self.settings.speed_test_jitter,
+            busy_mbps=self.settings.speed_test_busy_mbps,
+            daily_budget_mb=self.settings.speed_test_daily_budget_mb,
+            test_seconds=self.settings.speed_test_duration + self.settings.speed_test_warmup)
+        self.schedule_timer.start()
 
-    def _speed_test_thread(self):
-        """Thread to run network speed test"""
+    def check_schedule(self):
+        """Start the scheduled speed test if it is due"""
+        if self.scheduler is None:
+            return
         try:
-            logging.info("Running network speed test...")
-            st = speedtest.Speedtest()
-            st.get_best_server()
-            download_speed = st.download() / 1_000_000  # Convert to Mbps
-            upload_speed = st.upload() / 1_000_000      # Convert to Mbps
-            logging.info(f"Speed test complete: download={download_speed:.2f} Mbps, upload={upload_speed:.2f} Mbps")
-            self.speed_updated.emit(download_speed, upload_speed)
+            self.scheduler.tick()
         except Exception as e:
-            logging.exception(f"Speed test failed: {e}")
-            self.speed_updated.emit(0, 0)
-        finally:
-            self.test_in_progress = False
+            logging.exception(f"Error running scheduled speed test: {e}")
+
+    def _on_speed_test_completed(self, result):
+        logging.info(f"Speed test complete ({result.backend}): download={result.download_mbps:.2f} Mbps, "
+                     f"upload={result.upload_mbps:.2f} Mbps")
+        self.speed_updated.emit(result.download_mbps, result.upload_mbps)
+
+    def _on_speed_test_failed(self, error):
+        self.speed_updated.emit(0, 0)
 
     def toggle_network_adapter(self, interface_name, enable=True):
         """Enable or disable a network adapter"""
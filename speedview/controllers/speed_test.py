@@ -0,0 +1,345 @@
+"""Speed test backends behind one interface.
+
+Every engine's ``run(interface, progress)`` blocks until the test is done
+and returns a SpeedTestResult, or raises SpeedTestError. Callers run it on a
+worker thread and never need to know which backend measured. ``progress``,
+when given, is called on the test's threads with SpeedTestProgress items:
+a marker when a phase starts, then intermediate values (the built-in engine
+reports every SAMPLE_INTERVAL; the others only per phase).
+
+* ``speedtest.net`` uses the speedtest-cli package, with the closest
+  servers cached by ServerCache (server_cache.py),
+* ``fast.com`` shells out to fast-cli (``fast --json``),
+* ``http`` is built in. It opens several parallel connections to a
+  LibreSpeed-compatible server (``garbage.php`` for download, ``empty.php``
+  for upload and ping) and counts the bytes moved. The first ``warmup``
+  seconds, while TCP slow start ramps up, are discarded, so one test can
+  saturate multi-gigabit links that a single stream cannot fill.
+
+``auto`` tries the built-in engine when a server URL is configured and
+falls back to speedtest.net and then fast.com.
+
+SpeedTestServer in speed_test_server.py speaks the same protocol on
+loopback, so the http engine can be tested and benchmarked offline.
+"""
+import time
+import json
+import random
+import logging
+import threading
+import statistics
+import subprocess
+import http.client
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from speedview.config.config import (
+    DEFAULT_SPEED_TEST_BACKEND, DEFAULT_SPEED_TEST_URL, DEFAULT_SPEED_TEST_STREAMS,
+    DEFAULT_SPEED_TEST_DURATION, DEFAULT_SPEED_TEST_WARMUP
+)
+from speedview.controllers.server_cache import ServerCache
+from speedview.models.results import SpeedTestResult, speedtest_result
+
+CONNECT_TIMEOUT = 10.0  # Seconds; also the longest a stalled read may block
+FAST_CLI_TIMEOUT = 90  # Seconds for a whole fast-cli run
+PING_COUNT = 10
+SAMPLE_INTERVAL = 0.1  # Seconds between throughput samples
+DOWNLOAD_CHUNK_MB = 100  # ckSize of one garbage.php request; streams repeat requests until time is up
+UPLOAD_REQUEST_BYTES = 64 * 1024 * 1024
+READ_BLOCK = 1024 * 1024
+WRITE_BLOCK = 256 * 1024
+
+
+PHASE_LATENCY = "latency"
+PHASE_DOWNLOAD = "download"
+PHASE_UPLOAD = "upload"
+
+# ``value`` is ms for latency and Mbps for download and upload; None marks the start of ``phase``.
+# ``elapsed`` is seconds since the phase started.
+SpeedTestProgress = namedtuple("SpeedTestProgress", ["phase", "elapsed", "value"])
+
+
+class SpeedTestError(Exception):
+    """A speed test could not be completed"""
+
+
+def report(progress, phase, elapsed=0.0, value=None):
+    """Pass a SpeedTestProgress to the ``progress`` callback, if there is one"""
+    if progress is not None:
+        progress(SpeedTestProgress(phase, elapsed, value))
+
+
+class SpeedTestEngine:
+    """Measures latency, download and upload"""
+
+    name = "base"
+
+    def run(self, interface=None, progress=None):
+        """Run a test; returns a SpeedTestResult labelled with ``interface``"""
+        raise NotImplementedError
+
+
+class SpeedtestCliEngine(SpeedTestEngine):
+    """speedtest.net servers through the speedtest-cli package"""
+
+    name = "speedtest.net"
+
+    def __init__(self, server_cache=None):
+        self.server_cache = server_cache or ServerCache()
+
+    def run(self, interface=None, progress=None):
+        try:
+            import speedtest  # Slow to import; only needed once a test runs
+            report(progress, PHASE_LATENCY)
+            st = speedtest.Speedtest()
+            server = self.server_cache.best_server(st)
+            # Pinging the one chosen server sets results.ping the way speedtest-cli measures it
+            st.get_best_server([server] if server is not None else None)
+            report(progress, PHASE_LATENCY, 0.0, st.results.ping)
+            for phase, measure in ((PHASE_DOWNLOAD, st.download), (PHASE_UPLOAD, st.upload)):
+                report(progress, phase)
+                start = time.monotonic()
+                bps = measure()
+                report(progress, phase, time.monotonic() - start, bps / 1_000_000)
+        except Exception as e:
+            raise SpeedTestError(f"speedtest.net: {e}") from e
+        return speedtest_result(st.results, interface)
+
+
+class FastCliEngine(SpeedTestEngine):
+    """fast.com through the fast-cli command line tool"""
+
+    name = "fast.com"
+
+    def run(self, interface=None, progress=None):
+        report(progress, PHASE_DOWNLOAD)
+        start = time.monotonic()
+        try:
+            result = subprocess.run(['fast', '--json'], capture_output=True, text=True, timeout=FAST_CLI_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise SpeedTestError(f"fast-cli: {e}") from e
+        if result.returncode != 0:
+            raise SpeedTestError(f"fast-cli failed: {result.stderr.strip()}")
+        try:
+            data = json.loads(result.stdout)
+            download = float(data.get('downloadSpeed', 0))
+        except (ValueError, TypeError) as e:
+            raise SpeedTestError(f"fast-cli output not understood: {e}") from e
+        latency = data.get('latency')
+        # fast-cli only measures upload with --upload
+        upload = float(data.get('uploadSpeed') or 0)
+        report(progress, PHASE_DOWNLOAD, time.monotonic() - start, download)
+        if upload:
+            report(progress, PHASE_UPLOAD, time.monotonic() - start, upload)
+        return SpeedTestResult(time.time(), None, float(latency) if latency else None, None,
+                               download, upload, interface, self.name)
+
+
+class HttpSpeedTestEngine(SpeedTestEngine):
+    """Built-in engine: parallel HTTP streams against a LibreSpeed-compatible server"""
+
+    name = "http"
+
+    def __init__(self, url, streams=DEFAULT_SPEED_TEST_STREAMS, duration=DEFAULT_SPEED_TEST_DURATION,
+                 warmup=DEFAULT_SPEED_TEST_WARMUP, upload=True):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Not an http(s) URL: {url!r}")
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.streams = max(1, int(streams))
+        self.duration = float(duration)
+        self.warmup = max(0.0, float(warmup))
+        self.upload = upload
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=CONNECT_TIMEOUT)
+
+    def _path(self, name, **query):
+        # A random parameter keeps caches and proxies out of the way, like LibreSpeed's own client
+        query["r"] = random.random()
+        return f"{self.base_path}/{name}?" + "&".join(f"{key}={value}" for key, value in query.items())
+
+    def measure_latency(self, count=PING_COUNT, progress=None):
+        """(median, jitter) in ms of small requests on one kept-alive connection"""
+        report(progress, PHASE_LATENCY)
+        phase_start = time.monotonic()
+        connection = self._connect()
+        times = []
+        try:
+            # The first request also pays for the TCP (and TLS) handshake and is not counted
+            for i in range(count + 1):
+                start = time.perf_counter()
+                connection.request("GET", self._path("empty.php"), headers={"Cache-Control": "no-cache"})
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    raise SpeedTestError(f"Ping failed with HTTP {response.status}")
+                if i:
+                    times.append((time.perf_counter() - start) * 1000)
+                    report(progress, PHASE_LATENCY, time.monotonic() - phase_start, times[-1])
+        except (OSError, http.client.HTTPException) as e:
+            raise SpeedTestError(f"Cannot reach {self.url}: {e}") from e
+        finally:
+            connection.close()
+        jitter = statistics.mean(abs(b - a) for a, b in zip(times, times[1:])) if len(times) > 1 else 0.0
+        return statistics.median(times), jitter
+
+    def _download_stream(self, index, counters, stop, connections):
+        connection = connections[index]
+        while not stop.is_set():
+            connection.request("GET", self._path("garbage.php", ckSize=DOWNLOAD_CHUNK_MB),
+                               headers={"Cache-Control": "no-cache", "Accept-Encoding": "identity"})
+            response = connection.getresponse()
+            if response.status != 200:
+                raise SpeedTestError(f"Download failed with HTTP {response.status}")
+            # Read until the body ends, with or without a Content-Length (chunked encoding);
+            # a body cut short raises IncompleteRead
+            while not stop.is_set():
+                # At most one recv: counters move on slow links too, and fast ones get large reads
+                read = len(response.read1(READ_BLOCK))
+                if not read:
+                    break
+                counters[index] += read
+            if not stop.is_set():
+                response.read()  # Marks the response done, so the connection takes the next request
+
+    def _upload_stream(self, index, counters, stop, connections):
+        connection = connections[index]
+        block = memoryview(random.randbytes(WRITE_BLOCK))
+        while not stop.is_set():
+            connection.putrequest("POST", self._path("empty.php"))
+            connection.putheader("Content-Type", "application/octet-stream")
+            connection.putheader("Content-Length", str(UPLOAD_REQUEST_BYTES))
+            connection.endheaders()
+            sent = 0
+            while sent < UPLOAD_REQUEST_BYTES and not stop.is_set():
+                size = min(WRITE_BLOCK, UPLOAD_REQUEST_BYTES - sent)
+                connection.send(block[:size])
+                sent += size
+                counters[index] += size
+            if sent == UPLOAD_REQUEST_BYTES:
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    raise SpeedTestError(f"Upload failed with HTTP {response.status}")
+
+    def measure_throughput(self, stream, phase=PHASE_DOWNLOAD, progress=None):
+        """Bits per second moved by ``streams`` parallel runs of ``stream`` after the warm-up.
+
+        Every stream adds to its own counter slot, so the hot loop takes no
+        lock; this thread sums the slots every SAMPLE_INTERVAL and reports
+        the rate over that interval to ``progress``.
+        """
+        report(progress, phase)
+        counters = [0] * self.streams
+        connections = [self._connect() for _ in range(self.streams)]
+        stop = threading.Event()
+        errors = []
+
+        def run_stream(index):
+            try:
+                stream(index, counters, stop, connections)
+            except Exception as e:
+                # Anything a stream raises counts as a failed stream, not a silently dead thread
+                if not stop.is_set():
+                    errors.append(e)
+
+        threads = [threading.Thread(target=run_stream, args=(i,), name=f"SpeedTestStream-{i}", daemon=True)
+                   for i in range(self.streams)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        try:
+            measure_from = start + self.warmup
+            end = measure_from + self.duration
+            base_time, base_bytes = None, 0
+            now = last_time = time.monotonic()
+            total = last_bytes = 0
+            while now < end and len(errors) < self.streams:
+                time.sleep(min(SAMPLE_INTERVAL, max(end - now, 0)))
+                now = time.monotonic()
+                total = sum(counters)
+                if base_time is None and now >= measure_from:
+                    base_time, base_bytes = now, total
+                if now > last_time:
+                    report(progress, phase, now - start, (total - last_bytes) * 8 / (now - last_time) / 1_000_000)
+                last_time, last_bytes = now, total
+        finally:
+            stop.set()
+            # Closing the sockets unblocks streams waiting in recv or send
+            for connection in connections:
+                connection.close()
+            for thread in threads:
+                thread.join(CONNECT_TIMEOUT)
+        if len(errors) == self.streams:
+            raise SpeedTestError(f"All streams failed: {errors[0]}")
+        if base_time is None or now <= base_time:
+            raise SpeedTestError("Test ended before the warm-up")
+        if errors:
+            logging.warning(f"{len(errors)} of {self.streams} speed test streams failed: {errors[0]}")
+        return (total - base_bytes) * 8 / (now - base_time)
+
+    def run(self, interface=None, progress=None):
+        latency, jitter = self.measure_latency(progress=progress)
+        download_bps = self.measure_throughput(self._download_stream, PHASE_DOWNLOAD, progress)
+        upload_bps = self.measure_throughput(self._upload_stream, PHASE_UPLOAD, progress) if self.upload else 0.0
+        return SpeedTestResult(time.time(), self.host, latency, jitter, download_bps / 1_000_000,
+                               upload_bps / 1_000_000, interface, self.name)
+
+
+class FallbackEngine(SpeedTestEngine):
+    """Tries its engines in order and returns the first result"""
+
+    name = "auto"
+
+    def __init__(self, engines):
+        self.engines = list(engines)
+
+    def run(self, interface=None, progress=None):
+        errors = []
+        for engine in self.engines:
+            try:
+                return engine.run(interface, progress)
+            except SpeedTestError as e:
+                logging.warning(f"Speed test with {engine.name} failed: {e}")
+                errors.append(str(e))
+        raise SpeedTestError("; ".join(errors) or "No speed test engine configured")
+
+
+SPEED_TEST_ENGINES = {
+    SpeedtestCliEngine.name: SpeedtestCliEngine,
+    FastCliEngine.name: FastCliEngine,
+    HttpSpeedTestEngine.name: HttpSpeedTestEngine,
+}
+
+
+def create_speed_test_engine(backend=DEFAULT_SPEED_TEST_BACKEND, url=DEFAULT_SPEED_TEST_URL,
+                             streams=DEFAULT_SPEED_TEST_STREAMS, duration=DEFAULT_SPEED_TEST_DURATION,
+                             warmup=DEFAULT_SPEED_TEST_WARMUP):
+    """Create the requested engine; unknown or unusable choices fall back to ``auto``"""
+    if backend == HttpSpeedTestEngine.name or (backend == "auto" and url):
+        try:
+            engine = HttpSpeedTestEngine(url, streams, duration, warmup)
+        except ValueError as e:
+            logging.warning(f"Built-in speed test unavailable ({e}), using speedtest.net")
+        else:
+            if backend == HttpSpeedTestEngine.name:
+                return engine
+            return FallbackEngine([engine, SpeedtestCliEngine(), FastCliEngine()])
+    elif backend in SPEED_TEST_ENGINES:
+        return SPEED_TEST_ENGINES[backend]()
+    elif backend != "auto":
+        logging.warning(f"Unknown speed test backend '{backend}', using auto")
+    return FallbackEngine([SpeedtestCliEngine(), FastCliEngine()])
+
+
+def engine_from_settings(settings):
+    """The engine chosen in Settings"""
+    return create_speed_test_engine(settings.speed_test_backend, settings.speed_test_url,
+                                    settings.speed_test_streams, settings.speed_test_duration,
+                                    settings.speed_test_warmup)
@@ -0,0 +1,114 @@
+"""Runs speed tests off the GUI thread and brings their progress back to it.
+
+The engine runs on a worker thread and calls ``put`` for every progress
+item, 10 or more times per second. Emitting a Qt signal for each would queue
+one event per item, so items go into a SimpleQueue instead. A timer on the
+GUI thread drains that queue every PROGRESS_BATCH_MS and emits one
+``progress`` signal per batch. The result or failure goes through the same
+queue, so it always arrives after the last progress batch.
+
+Tests never overlap, whichever runner starts them: ``start`` takes one
+process-wide lock without waiting, and the test releases it when its
+outcome reaches the GUI thread.
+"""
+import queue
+import logging
+import threading
+from collections import namedtuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+PROGRESS_BATCH_MS = 100
+
+# End of a test in the progress queue: a SpeedTestResult or an error message
+_Outcome = namedtuple("_Outcome", ["result", "error"])
+
+# Held from start() until the outcome is emitted; one speed test at a time in the process
+_test_lock = threading.Lock()
+
+
+def speed_test_running():
+    """True while any runner has a speed test in progress"""
+    return _test_lock.locked()
+
+
+class SpeedTestRunner(QObject):
+    """Runs the speed test engine chosen in Settings; one test at a time across all runners"""
+
+    progress = pyqtSignal(list)  # SpeedTestProgress items since the last batch
+    completed = pyqtSignal(object)  # SpeedTestResult
+    failed = pyqtSignal(str)
+
+    def __init__(self, settings=None, results=None, parent=None):
+        super().__init__(parent)
+        self.settings = settings  # Chooses the engine; the default engine without it
+        self.results = results  # Optional ResultsStore receiving results
+        self._running = False
+        self._queue = queue.SimpleQueue()
+        self._timer = QTimer(self)
+        self._timer.setInterval(PROGRESS_BATCH_MS)
+        self._timer.timeout.connect(self._drain)
+
+    @property
+    def running(self):
+        """True while this runner's test is in progress"""
+        return self._running
+
+    def start(self):
+        """Start a test on a worker thread; False when any test is already running. Call on the GUI thread."""
+        if not _test_lock.acquire(blocking=False):
+            logging.info("Speed test already in progress. Skipping new test.")
+            return False
+        self._running = True
+        self._timer.start()
+        threading.Thread(target=self._run, name="SpeedTest", daemon=True).start()
+        return True
+
+    def _engine(self):
+        from speedview.controllers.speed_test import create_speed_test_engine, engine_from_settings
+        return engine_from_settings(self.settings) if self.settings is not None else create_speed_test_engine()
+
+    def _run(self):
+        from speedview.controllers.speed_test import SpeedTestError
+        try:
+            result = self._engine().run(getattr(self.settings, 'selected_interface', None), self._queue.put)
+        except SpeedTestError as e:
+            logging.error(f"Speed test failed: {e}")
+            self._queue.put(_Outcome(None, str(e)))
+            return
+        except Exception as e:
+            logging.exception(f"Speed test failed: {e}")
+            self._queue.put(_Outcome(None, str(e)))
+            return
+        try:
+            if self.results is not None:
+                self.results.add(result)
+        except Exception as e:
+            # The test itself succeeded; its result is still shown
+            logging.exception(f"Could not store the speed test result: {e}")
+        finally:
+            # Always queued, or the lock would never be released and no test could run again
+            self._queue.put(_Outcome(result, None))
+
+    def _drain(self):
+        batch = []
+        outcome = None
+        while outcome is None:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Outcome):
+                outcome = item
+            else:
+                batch.append(item)
+        if batch:
+            self.progress.emit(batch)
+        if outcome is not None:
+            self._timer.stop()
+            self._running = False
+            _test_lock.release()
+            if outcome.error is None:
+                self.completed.emit(outcome.result)
+            else:
+                self.failed.emit(outcome.error)
@@ -0,0 +1,148 @@
+"""Loopback stand-in for a LibreSpeed server.
+
+Answers the three requests HttpSpeedTestEngine makes:
+
+* ``GET garbage.php?ckSize=N`` sends N MiB of incompressible bytes,
+* ``POST empty.php`` reads and discards the body,
+* ``GET empty.php`` answers at once, for latency.
+
+The payload is one random block sent over and over, so serving costs no
+more than a memory copy per block. With ``chunked`` the download has no
+Content-Length and uses chunked transfer encoding, as LibreSpeed's
+``garbage.php`` does behind PHP or Apache. Tests run the engine against
+it, and ``main.py bench`` measures how fast the engine itself can go.
+"""
+import os
+import logging
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BLOCK_SIZE = 1024 * 1024
+DEFAULT_CHUNK_MB = 4
+MAX_CHUNK_MB = 1024
+_PAYLOAD = memoryview(os.urandom(BLOCK_SIZE))
+
+
+class SpeedTestServer:
+    """Serves the LibreSpeed endpoints on a background thread"""
+
+    def __init__(self, address="127.0.0.1", port=0, chunked=False):
+        self.address = address
+        self.requested_port = port
+        self.chunked = chunked  # Send downloads with chunked transfer encoding
+        self._server = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._server is not None
+
+    @property
+    def port(self):
+        """Port the server is bound to; differs from the requested one when that was 0"""
+        return self._server.server_address[1] if self._server is not None else None
+
+    @property
+    def url(self):
+        """Base URL for HttpSpeedTestEngine"""
+        return f"http://{self.address}:{self.port}/"
+
+    def start(self):
+        """Bind the port and serve on a background thread; raises OSError if the port is taken"""
+        if self._server is not None:
+            return
+        self._server = ThreadingHTTPServer((self.address, self.requested_port), SpeedTestRequestHandler)
+        self._server.daemon_threads = True
+        self._server.chunked = self.chunked
+        self._thread = threading.Thread(target=self._server.serve_forever, name="SpeedTestServer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class SpeedTestRequestHandler(BaseHTTPRequestHandler):
+    """garbage.php and empty.php, kept alive between requests"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _endpoint(self):
+        parts = urlsplit(self.path)
+        return parts.path.rsplit("/", 1)[-1], parse_qs(parts.query)
+
+    def _send_empty(self):
+        self.send_response(200)
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        endpoint, query = self._endpoint()
+        if endpoint == "empty.php":
+            self._send_empty()
+            return
+        if endpoint != "garbage.php":
+            self.send_error(404)
+            return
+        try:
+            chunk_mb = min(int(query.get("ckSize", [DEFAULT_CHUNK_MB])[0]), MAX_CHUNK_MB)
+        except ValueError:
+            chunk_mb = DEFAULT_CHUNK_MB
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Cache-Control", "no-store")
+        chunked = self.server.chunked
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Content-Length", str(chunk_mb * BLOCK_SIZE))
+        self.end_headers()
+        try:
+            for _ in range(chunk_mb):
+                if chunked:
+                    self.wfile.write(b"%x\r\n" % BLOCK_SIZE)
+                self.wfile.write(_PAYLOAD)
+                if chunked:
+                    self.wfile.write(b"\r\n")
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The engine closes its streams when time is up
+            self.close_connection = True
+
+    def do_POST(self):
+        endpoint, _ = self._endpoint()
+        length = int(self.headers.get("Content-Length") or 0)
+        buffer = bytearray(BLOCK_SIZE)
+        view = memoryview(buffer)
+        try:
+            while length > 0:
+                read = self.rfile.readinto(view[:min(length, BLOCK_SIZE)])
+                if not read:
+                    self.close_connection = True
+                    return
+                length -= read
+        except (ConnectionResetError, TimeoutError):
+            self.close_connection = True
+            return
+        if endpoint != "empty.php":
+            self.send_error(404)
+            return
+        self._send_empty()
+
+    def log_message(self, format, *args):
+        logging.debug(f"Speed test request from {self.address_string()}: {format % args}")
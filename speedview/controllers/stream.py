@@ -0,0 +1,400 @@
+"""Local stream of per-interface rates for other processes.
+
+The running instance (desktop application or headless daemon) publishes every
+EngineUpdate through a StreamServer. Tools such as ``main.py watch`` can then
+show live rates without reading the network counters themselves. The
+transport is a Unix domain socket, or loopback TCP where Python has no
+AF_UNIX (Windows).
+
+Every frame is a 4-byte big-endian length followed by that many payload
+bytes. The first payload byte is the message type:
+
+    MSG_SUBSCRIBE  client -> server, UTF-8 JSON
+                   {"interfaces": ["eth0"] or null, "resolution_ms": 1000}
+    MSG_RATES      server -> client, binary
+                   timestamp_ns (q), interval_ns (q), dropped (I), count (H),
+                   then per interface: name length (B), name, rx_bps (d), tx_bps (d)
+
+A single thread serves all clients through a selector. The engine subscriber
+only queues the update and wakes that thread. Each client has a bounded
+queue of encoded frames. If a client reads too slowly, its oldest frames are
+dropped (and counted in ``dropped``) so the other clients are not held up.
+"""
+import os
+import json
+import math
+import time
+import socket
+import struct
+import logging
+import selectors
+import threading
+from collections import deque, namedtuple
+
+from speedview.config.config import STREAM_SOCKET, DEFAULT_STREAM_HOST, DEFAULT_STREAM_PORT
+from speedview.controllers.interface_monitor import InterfaceRate
+from speedview.utils.local_socket import connect, create_listener
+
+FRAME_LENGTH = struct.Struct("!I")
+RATES_HEADER = struct.Struct("!BqqIH")
+RATE_VALUES = struct.Struct("!dd")
+MSG_SUBSCRIBE = 1
+MSG_RATES = 2
+MAX_FRAME_BYTES = 1 << 20
+CLIENT_QUEUE_FRAMES = 64  # Frames buffered per client before the oldest are dropped
+PENDING_UPDATES = 256  # Updates queued for the server thread
+RECV_BYTES = 65536
+MAX_RESOLUTION_MS = 3_600_000  # Longest averaging window a client may ask for
+
+
+class RatesFrame(namedtuple("RatesFrame", ["timestamp_ns", "interval_ns", "dropped", "rates"])):
+    """Mean rates over ``interval_ns`` ending at ``timestamp_ns`` (Unix time).
+
+    ``rates`` is a list of InterfaceRate. ``dropped`` counts the frames the
+    server discarded for this client because it fell behind.
+    """
+    __slots__ = ()
+
+
+def default_address():
+    """Unix socket path, or (host, port) where AF_UNIX is unavailable"""
+    if hasattr(socket, "AF_UNIX"):
+        return STREAM_SOCKET
+    return DEFAULT_STREAM_HOST, DEFAULT_STREAM_PORT
+
+
+def encode_frame(payload):
+    return FRAME_LENGTH.pack(len(payload)) + payload
+
+
+def encode_subscribe(interfaces=None, resolution_ms=0):
+    request = {"interfaces": list(interfaces) if interfaces else None, "resolution_ms": resolution_ms}
+    return encode_frame(bytes([MSG_SUBSCRIBE]) + json.dumps(request).encode("utf-8"))
+
+
+def encode_rates(timestamp_ns, interval_ns, dropped, rates):
+    parts = [RATES_HEADER.pack(MSG_RATES, timestamp_ns, interval_ns, dropped, len(rates))]
+    for rate in rates:
+        name = rate.interface.encode("utf-8")[:255]
+        parts.append(bytes([len(name)]))
+        parts.append(name)
+        parts.append(RATE_VALUES.pack(rate.rx_bps, rate.tx_bps))
+    return encode_frame(b"".join(parts))
+
+
+def decode_rates(payload):
+    _, timestamp_ns, interval_ns, dropped, count = RATES_HEADER.unpack_from(payload)
+    offset = RATES_HEADER.size
+    rates = []
+    for _ in range(count):
+        length = payload[offset]
+        name = bytes(payload[offset + 1:offset + 1 + length]).decode("utf-8", "replace")
+        offset += 1 + length
+        rx_bps, tx_bps = RATE_VALUES.unpack_from(payload, offset)
+        offset += RATE_VALUES.size
+        rates.append(InterfaceRate(name, rx_bps, tx_bps))
+    return RatesFrame(timestamp_ns, interval_ns, dropped, rates)
+
+
+class FrameReader:
+    """Splits a byte stream into frame payloads"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Complete payloads in ``data`` plus what was buffered; raises ValueError on oversized frames"""
+        self._buffer += data
+        payloads = []
+        while len(self._buffer) >= FRAME_LENGTH.size:
+            (length,) = FRAME_LENGTH.unpack_from(self._buffer)
+            if length > MAX_FRAME_BYTES or length == 0:
+                raise ValueError(f"Invalid frame length {length}")
+            end = FRAME_LENGTH.size + length
+            if len(self._buffer) < end:
+                break
+            payloads.append(bytes(self._buffer[FRAME_LENGTH.size:end]))
+            del self._buffer[:end]
+        return payloads
+
+
+class _Client:
+    """Server-side state of one subscriber"""
+
+    def __init__(self, sock, queue_frames):
+        self.sock = sock
+        self.reader = FrameReader()
+        self.frames = deque()
+        self.queue_frames = queue_frames
+        self.pending = None  # Unsent rest of the frame being written
+        self.events = selectors.EVENT_READ
+        self.subscribed = False
+        self.interfaces = None
+        self.resolution_ns = 0
+        self.dropped = 0
+        self._bits = {}  # Interface -> [rx bits, tx bits] in the current resolution window
+        self._window_ns = 0
+
+    def subscribe(self, payload):
+        request = json.loads(payload.decode("utf-8"))
+        if not isinstance(request, dict):
+            raise ValueError("subscribe request must be a JSON object")
+        interfaces = request.get("interfaces")
+        resolution_ms = request.get("resolution_ms") or 0
+        if interfaces is not None and (not isinstance(interfaces, list)
+                                       or not all(isinstance(name, str) for name in interfaces)):
+            raise ValueError("interfaces must be a list of names")
+        if (not isinstance(resolution_ms, (int, float)) or not math.isfinite(resolution_ms)
+                or not 0 <= resolution_ms <= MAX_RESOLUTION_MS):
+            raise ValueError(f"resolution_ms must be a number from 0 to {MAX_RESOLUTION_MS}")
+        self.interfaces = frozenset(interfaces) if interfaces is not None else None
+        self.resolution_ns = int(resolution_ms * 1e6)
+        self.subscribed = True
+        self._bits = {}
+        self._window_ns = 0
+
+    def add(self, timestamp_ns, interval_ns, table):
+        """Accumulate one tick; queues a frame once the resolution window is full"""
+        if not self.subscribed or interval_ns <= 0:
+            return
+        for rate in table:
+            if self.interfaces is None or rate.interface in self.interfaces:
+                bits = self._bits.get(rate.interface)
+                if bits is None:
+                    bits = self._bits[rate.interface] = [0.0, 0.0]
+                bits[0] += rate.rx_bps * interval_ns
+                bits[1] += rate.tx_bps * interval_ns
+        self._window_ns += interval_ns
+        if self._window_ns < self.resolution_ns:
+            return
+        window_ns = self._window_ns
+        rates = [InterfaceRate(name, rx / window_ns, tx / window_ns) for name, (rx, tx) in self._bits.items()]
+        self._bits = {}
+        self._window_ns = 0
+        if len(self.frames) >= self.queue_frames:
+            self.frames.popleft()
+            self.dropped += 1
+        self.frames.append(encode_rates(timestamp_ns, window_ns, self.dropped, rates))
+
+    def flush(self):
+        """Send queued frames until the socket would block; True once everything is sent"""
+        while True:
+            if not self.pending:
+                if not self.frames:
+                    return True
+                self.pending = memoryview(self.frames.popleft())
+            try:
+                sent = self.sock.send(self.pending)
+            except BlockingIOError:
+                return False
+            self.pending = self.pending[sent:]
+
+
+class StreamServer:
+    """Publishes a SpeedEngine's per-interface rates to local subscribers"""
+
+    def __init__(self, engine, address=None, queue_frames=CLIENT_QUEUE_FRAMES):
+        self.engine = engine
+        self.address = address or default_address()
+        self.queue_frames = queue_frames
+        self._updates = deque(maxlen=PENDING_UPDATES)
+        self._clients = []
+        self._listener = None
+        self._selector = None
+        self._wake_r = self._wake_w = None
+        self._thread = None
+        self._running = False
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    @property
+    def bound_address(self):
+        """Socket path, or the (host, port) actually bound when port 0 was requested"""
+        if self._listener is None:
+            return None
+        return self.address if isinstance(self.address, str) else self._listener.getsockname()[:2]
+
+    def start(self):
+        """Listen and serve on a background thread; raises OSError if the address is taken"""
+        if self._thread is not None:
+            return
+        self._listener = create_listener(self.address)
+        self._listener.setblocking(False)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="StreamServer", daemon=True)
+        self._thread.start()
+        self.engine.subscribe(self._on_update)
+        logging.info(f"Streaming rates on {self.bound_address}")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.engine.unsubscribe(self._on_update)
+        self._running = False
+        self._wake()
+        self._thread.join()
+        self._thread = None
+        for client in list(self._clients):
+            self._close_client(client)
+        self._selector.close()
+        self._listener.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        self._listener = None
+        if isinstance(self.address, str):
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+    def _on_update(self, update):
+        # Runs on the engine's thread; the server thread does the fan-out
+        if update.interface_rates is None:
+            return
+        self._updates.append((time.time_ns(), self.engine.interface_monitor.interval_ns, update.interface_rates))
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Already awake, or stopping
+
+    def _serve(self):
+        while self._running:
+            for key, events in self._selector.select():
+                if key.fileobj is self._listener:
+                    self._accept()
+                elif key.fileobj is self._wake_r:
+                    self._drain_wake()
+                else:
+                    client = key.data
+                    try:
+                        if events & selectors.EVENT_READ:
+                            self._read(client)
+                        if events & selectors.EVENT_WRITE and client in self._clients:
+                            self._write(client)
+                    except Exception as e:
+                        self._drop_client(client, e)
+            while self._updates:
+                timestamp_ns, interval_ns, table = self._updates.popleft()
+                for client in list(self._clients):
+                    try:
+                        client.add(timestamp_ns, interval_ns, table)
+                    except Exception as e:
+                        self._drop_client(client, e)
+            for client in list(self._clients):
+                if client.frames and not client.pending:
+                    try:
+                        self._write(client)
+                    except Exception as e:
+                        self._drop_client(client, e)
+
+    def _drop_client(self, client, error):
+        # One misbehaving client must not stop the stream for the others
+        logging.exception(f"Dropping stream client after an unexpected error: {error}")
+        self._close_client(client)
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _accept(self):
+        try:
+            sock, _ = self._listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        sock.setblocking(False)
+        client = _Client(sock, self.queue_frames)
+        self._clients.append(client)
+        self._selector.register(sock, selectors.EVENT_READ, client)
+
+    def _read(self, client):
+        try:
+            data = client.sock.recv(RECV_BYTES)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close_client(client)
+            return
+        try:
+            for payload in client.reader.feed(data):
+                if payload[0] == MSG_SUBSCRIBE:
+                    client.subscribe(payload[1:])
+        except (ValueError, TypeError, OverflowError) as e:
+            # Malformed frame or request (JSON errors are ValueErrors too)
+            logging.debug(f"Dropping stream client: {e}")
+            self._close_client(client)
+
+    def _write(self, client):
+        try:
+            done = client.flush()
+        except OSError:
+            self._close_client(client)
+            return
+        events = selectors.EVENT_READ if done else selectors.EVENT_READ | selectors.EVENT_WRITE
+        if events != client.events:
+            client.events = events
+            self._selector.modify(client.sock, events, client)
+
+    def _close_client(self, client):
+        if client in self._clients:
+            self._clients.remove(client)
+            self._selector.unregister(client.sock)
+        client.sock.close()
+
+
+class StreamClient:
+    """Subscribes to the running instance's stream and yields RatesFrames"""
+
+    def __init__(self, address=None, interfaces=None, resolution_s=0, timeout=None):
+        self.address = address or default_address()
+        self.interfaces = interfaces
+        self.resolution_s = resolution_s
+        self.timeout = timeout
+        self.sock = None
+
+    def connect(self):
+        """Connect and subscribe; raises OSError when no instance is streaming"""
+        self.sock = connect(self.address, self.timeout)
+        self.sock.sendall(encode_subscribe(self.interfaces, self.resolution_s * 1000))
+
+    def frames(self):
+        """RatesFrames until the server goes away"""
+        reader = FrameReader()
+        while True:
+            data = self.sock.recv(RECV_BYTES)
+            if not data:
+                return
+            for payload in reader.feed(data):
+                if payload[0] == MSG_RATES:
+                    yield decode_rates(payload)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,172 @@
+"""Headless SpeedView for servers: sampling, rates and history without Qt.
+
+    python main.py --headless [--duration SECONDS] [--interface NAME] [--metrics-port PORT]
+
+The daemon drives CounterSampler and SpeedEngine from an asyncio loop and
+records history like the desktop application. Nothing it imports pulls in
+PyQt5.
+"""
+import sys
+import time
+import signal
+import asyncio
+import logging
+import argparse
+
+from speedview.config.config import HISTORY_DIR
+from speedview.controllers.engine import CounterSampler, SpeedEngine
+from speedview.controllers.metrics import MetricsExporter
+from speedview.controllers.stream import StreamServer
+from speedview.controllers.rate import format_rate
+from speedview.models.history import HistoryStore
+from speedview.models.settings import Settings
+
+DEFAULT_LOG_INTERVAL = 60.0  # Seconds between rate lines in the log
+
+
+class HeadlessDaemon:
+    """Samples network counters on an asyncio loop and publishes EngineUpdates"""
+
+    def __init__(self, settings, history=None, source=None, log_interval=DEFAULT_LOG_INTERVAL):
+        self.settings = settings
+        self.history = history
+        self.counters = CounterSampler(source)
+        self.engine = SpeedEngine(settings.selected_interface, history)
+        self.log_interval = log_interval
+        self.ticks = 0
+        self._last_log = time.monotonic()
+        self._stop_event = None
+
+    @property
+    def high_frequency(self):
+        return self.settings.sample_hz > 0
+
+    def stop(self):
+        """Ask ``run`` to return after the current tick"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def tick(self):
+        """Read (or drain) the counters once and feed the engine"""
+        if self.high_frequency:
+            samples = self.counters.drain()
+        else:
+            sample = self.counters.read_sample()
+            samples = [sample] if sample is not None else []
+        self.ticks += 1
+        if samples:
+            self.engine.process(samples)
+
+    def _log_update(self, update):
+        now = time.monotonic()
+        if update.rate is None or now - self._last_log < self.log_interval:
+            return
+        self._last_log = now
+        logging.info(f"download {format_rate(update.rx_stats.mean_bps)} (peak {format_rate(update.rx_stats.peak_bps)}), "
+                     f"upload {format_rate(update.tx_stats.mean_bps)} (peak {format_rate(update.tx_stats.peak_bps)})")
+
+    async def run(self, duration=None):
+        """Sample until ``stop`` is called, or for ``duration`` seconds"""
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if duration is not None:
+            loop.call_later(duration, self._stop_event.set)
+        if self.high_frequency:
+            self.counters.start_thread(self.settings.sample_hz)
+            period = 1 / self.settings.render_hz
+        else:
+            period = self.settings.update_interval
+        self.engine.subscribe(self._log_update)
+        try:
+            next_tick = loop.time()
+            while not self._stop_event.is_set():
+                self.tick()
+                next_tick += period
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    # Fell behind (suspend, slow disk); resume the cadence from now
+                    next_tick = loop.time()
+                    delay = 0
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.engine.unsubscribe(self._log_update)
+            self.counters.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run SpeedView without a GUI")
+    parser.add_argument("--interface", help="interface for the logged rates (default: from settings)")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--log-interval", type=float, default=DEFAULT_LOG_INTERVAL,
+                        help="seconds between rate lines in the log")
+    parser.add_argument("--history-dir", default=HISTORY_DIR)
+    parser.add_argument("--no-history", action="store_true", help="do not record history")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on this port (default: from settings, if enabled)")
+    parser.add_argument("--metrics-address", help="address of the metrics endpoint (default: from settings)")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="do not share the rates with local clients such as 'main.py watch'")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s', force=True)
+
+    settings = Settings()
+    settings.load()
+    if args.interface:
+        settings.selected_interface = args.interface
+    history = None if args.no_history else HistoryStore(args.history_dir,
+                                                        retention_days=settings.history_retention_days)
+    daemon = HeadlessDaemon(settings, history, log_interval=args.log_interval)
+    metrics = None
+    if args.metrics_port is not None or settings.metrics_enabled:
+        metrics = MetricsExporter(daemon.engine, daemon.counters, address=args.metrics_address or settings.metrics_address,
+                                  port=settings.metrics_port if args.metrics_port is None else args.metrics_port)
+        try:
+            metrics.start()
+        except OSError as e:
+            logging.error(f"Could not start the metrics endpoint: {e}")
+            if history is not None:
+                history.close()
+            return 1
+    stream = None
+    if settings.stream_enabled and not args.no_stream:
+        stream = StreamServer(daemon.engine)
+        try:
+            stream.start()
+        except OSError as e:
+            logging.warning(f"Could not start the rate stream: {e}")
+            stream = None
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, daemon.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows; Ctrl+C raises KeyboardInterrupt instead
+        await daemon.run(args.duration)
+
+    logging.info("Starting SpeedView in headless mode")
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if stream is not None:
+            stream.stop()
+        if metrics is not None:
+            metrics.stop()
+        if history is not None:
+            history.close()
+    logging.info("SpeedView headless mode stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,566 @@
+"""Append-only on-disk history of per-interface network rates.
+
+Raw records are fixed-width: four little-endian int64s (wall-clock timestamp
+in ns, interval in ns, rx and tx bits per second), so a segment file can be
+memory-mapped and viewed as one flat int64 array without parsing. Each
+interface gets one raw segment file per UTC day, named
+``YYYYMMDD-<id>.bin``; interface ids are kept in ``interfaces.json``. Idle
+intervals (no traffic in either direction) are not written.
+
+Alongside the raw records, rollup tiers (1 s, 1 min, 1 h, 1 day) are updated
+online as records arrive. A rollup bucket holds the sample count, the time
+covered, and min, max and total bits per direction, in segments named
+``<tier>-<period>-<id>.bin``. Queries use the coarsest tier that satisfies
+the requested resolution, so a month is a few thousand buckets rather than
+millions of records.
+
+Raw segments and the 1 s tier expire after the retention period
+(``history_retention_days``). The 1 min tier is kept for a year, and the 1 h
+and 1 d tiers are kept forever. A busy interface costs 32 bytes per raw
+record plus 72 bytes per 1 s bucket within the retention period, about 9 MB
+a day at 1 Hz. After that it costs about 100 kB a day in 1 min buckets for
+a year, and under 2 kB a day beyond.
+
+A bucket is written when it closes, so the open 1 h and 1 d buckets live in
+memory for up to a day. A flush saves them to ``open-buckets.json`` when
+they changed since the last one; a store opened after a crash writes the
+saved buckets as the first part of their buckets, which are joined with the
+rest at query time. Queries never write: records and buckets still buffered
+in memory are read from the buffers.
+"""
+import os
+import sys
+import mmap
+import json
+import time
+import heapq
+import itertools
+import bisect
+import struct
+import logging
+from array import array
+from collections import namedtuple
+from datetime import datetime, timezone, timedelta
+
+from speedview.config.config import HISTORY_DIR, DEFAULT_HISTORY_RETENTION_DAYS
+
+RECORD = struct.Struct("<qqqq")  # timestamp_ns, interval_ns, rx_bps, tx_bps
+FIELDS = 4
+# start_ns, samples, covered_ns, rx_min, rx_max, rx_bits, tx_min, tx_max, tx_bits
+BUCKET = struct.Struct("<9q")
+BUCKET_FIELDS = 9
+FLUSH_INTERVAL_NS = 30 * 1_000_000_000
+FLUSH_BYTES = 64 * 1024
+STREAM_RECORDS = 4096  # Records copied out of a segment at a time when streaming
+SECOND_NS = 1_000_000_000
+DAY_NS = 86400 * SECOND_NS
+
+HistoryRecord = namedtuple("HistoryRecord", ["timestamp_ns", "interval_ns", "rx_bps", "tx_bps"])
+
+
+class RollupTier(namedtuple("RollupTier", ["name", "seconds", "segment_format", "retention_days"])):
+    """Bucket width, segment period (strftime format) and retention.
+
+    ``retention_days`` of 0 keeps the tier forever; None follows the raw
+    records' retention.
+    """
+    __slots__ = ()
+
+    @property
+    def bucket_ns(self):
+        return self.seconds * SECOND_NS
+
+
+ROLLUP_TIERS = (
+    RollupTier("1s", 1, "%Y%m%d", None),  # No coarser than raw records, so kept no longer
+    RollupTier("1m", 60, "%Y%m%d", 365),
+    RollupTier("1h", 3600, "%Y%m", 0),
+    RollupTier("1d", 86400, "%Y", 0),
+)
+ROLLUP_TIER_NAMES = {tier.name: tier for tier in ROLLUP_TIERS}
+
+
+class Bucket(namedtuple("Bucket", ["start_ns", "seconds", "samples", "covered_ns",
+                                   "rx_min_bps", "rx_max_bps", "rx_bits",
+                                   "tx_min_bps", "tx_max_bps", "tx_bits"])):
+    """Aggregate of the records in one rollup bucket"""
+    __slots__ = ()
+
+    @property
+    def rx_mean_bps(self):
+        """Mean download rate over the time covered by records"""
+        return self.rx_bits * SECOND_NS / self.covered_ns if self.covered_ns else 0.0
+
+    @property
+    def tx_mean_bps(self):
+        return self.tx_bits * SECOND_NS / self.covered_ns if self.covered_ns else 0.0
+
+
+class HistorySummary(namedtuple("HistorySummary", ["samples", "seconds", "rx_bytes", "tx_bytes",
+                                                   "peak_rx_bps", "peak_tx_bps"])):
+    """Totals over a time range; ``seconds`` is the time covered by records"""
+    __slots__ = ()
+
+    def mean_rx_bps(self, duration_s):
+        """Average download rate over ``duration_s`` seconds, counting gaps as idle"""
+        return self.rx_bytes * 8 / duration_s if duration_s > 0 else 0.0
+
+    def mean_tx_bps(self, duration_s):
+        return self.tx_bytes * 8 / duration_s if duration_s > 0 else 0.0
+
+
+def _period(timestamp_ns, segment_format="%Y%m%d"):
+    return datetime.fromtimestamp(timestamp_ns / 1e9, timezone.utc).strftime(segment_format)
+
+
+def _day(timestamp_ns):
+    return _period(timestamp_ns)
+
+
+def pick_tier(resolution_s):
+    """Coarsest rollup tier whose buckets are no wider than ``resolution_s``"""
+    chosen = ROLLUP_TIERS[0]
+    for tier in ROLLUP_TIERS:
+        if tier.seconds <= resolution_s:
+            chosen = tier
+    return chosen
+
+
+def _join_parts(a, b):
+    """One interface's bucket written in two parts (the app restarted mid-bucket)"""
+    return Bucket(a.start_ns, a.seconds, a.samples + b.samples, a.covered_ns + b.covered_ns,
+                  min(a.rx_min_bps, b.rx_min_bps), max(a.rx_max_bps, b.rx_max_bps), a.rx_bits + b.rx_bits,
+                  min(a.tx_min_bps, b.tx_min_bps), max(a.tx_max_bps, b.tx_max_bps), a.tx_bits + b.tx_bits)
+
+
+def _add_interfaces(a, b):
+    """Buckets of two interfaces over the same time; summed min and max bound the total's"""
+    return Bucket(a.start_ns, a.seconds, a.samples + b.samples, max(a.covered_ns, b.covered_ns),
+                  a.rx_min_bps + b.rx_min_bps, a.rx_max_bps + b.rx_max_bps, a.rx_bits + b.rx_bits,
+                  a.tx_min_bps + b.tx_min_bps, a.tx_max_bps + b.tx_max_bps, a.tx_bits + b.tx_bits)
+
+
+class _TimestampColumn:
+    """Sequence view of the first field of fixed-width records, for bisect"""
+
+    def __init__(self, values, fields):
+        self.values = values
+        self.fields = fields
+
+    def __len__(self):
+        return len(self.values) // self.fields
+
+    def __getitem__(self, index):
+        return self.values[index * self.fields]
+
+
+class HistoryStore:
+    """Stores rate samples per interface and answers range queries"""
+
+    def __init__(self, directory=HISTORY_DIR, retention_days=DEFAULT_HISTORY_RETENTION_DAYS, read_only=False):
+        self.directory = directory
+        self.retention_days = retention_days
+        # For tools reading beside the application: nothing is written, recovered or expired
+        self.read_only = read_only
+        os.makedirs(directory, exist_ok=True)
+
+        self._interfaces_file = os.path.join(directory, "interfaces.json")
+        self._checkpoint_file = os.path.join(directory, "open-buckets.json")
+        self._interface_ids = self._load_interfaces()
+        self._pending = {}  # segment path -> bytearray of records not yet written
+        self._pending_bytes = 0
+        self._last_flush_ns = time.time_ns()
+        # (tier name, interface id) -> open bucket as a list of BUCKET fields
+        self._open_buckets = {}
+        self._buckets_changed = False  # Since the last checkpoint
+        if not read_only:
+            self._recover_open_buckets()
+            self.apply_retention()
+
+    def _load_interfaces(self):
+        try:
+            with open(self._interfaces_file, 'r') as f:
+                return {name: index for index, name in enumerate(json.load(f))}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.error(f"Error loading history interfaces: {e}")
+            return {}
+
+    def _recover_open_buckets(self):
+        """Write the buckets left open by a store that was not closed, as parts of their buckets"""
+        try:
+            with open(self._checkpoint_file, 'r') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Error loading open history buckets: {e}")
+            return
+        for entry in entries if isinstance(entries, list) else ():
+            try:
+                name, interface_id, fields = entry
+                tier = ROLLUP_TIER_NAMES[name]
+                data = BUCKET.pack(*fields)
+            except (KeyError, TypeError, ValueError, struct.error):
+                continue
+            self._buffer(self._segment(_period(fields[0], tier.segment_format), interface_id, tier), data)
+        self._buckets_changed = True  # The recovered buckets are written; the checkpoint must go
+        self.flush()
+
+    def _checkpoint(self):
+        """Save the open rollup buckets; a crash then loses at most one flush interval of them"""
+        entries = [[name, interface_id, bucket] for (name, interface_id), bucket in self._open_buckets.items()]
+        temp_file = self._checkpoint_file + ".tmp"
+        try:
+            with open(temp_file, 'w') as f:
+                json.dump(entries, f)
+            os.replace(temp_file, self._checkpoint_file)
+        except OSError as e:
+            logging.error(f"Error saving open history buckets: {e}")
+            return
+        self._buckets_changed = False
+
+    def _interface_id(self, interface, create=False):
+        index = self._interface_ids.get(interface)
+        if index is None and create:
+            index = self._interface_ids[interface] = len(self._interface_ids)
+            names = sorted(self._interface_ids, key=self._interface_ids.get)
+            temp_file = self._interfaces_file + ".tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(names, f)
+            os.replace(temp_file, self._interfaces_file)
+        return index
+
+    @property
+    def interfaces(self):
+        """Names of all interfaces that have history"""
+        return sorted(self._interface_ids)
+
+    def _segment(self, period, interface_id, tier=None):
+        if tier is None:
+            return os.path.join(self.directory, f"{period}-{interface_id}.bin")
+        return os.path.join(self.directory, f"{tier.name}-{period}-{interface_id}.bin")
+
+    def _buffer(self, path, data):
+        buffer = self._pending.get(path)
+        if buffer is None:
+            buffer = self._pending[path] = bytearray()
+        buffer += data
+        self._pending_bytes += len(data)
+
+    def append(self, timestamp_ns, interval_ns, interface, rx_bps, tx_bps):
+        """Buffer one record and fold it into the rollup tiers; records are written in batches"""
+        if not rx_bps and not tx_bps:
+            # Nothing is stored for idle time, but a bucket that already saw traffic counts it
+            interface_id = self._interface_id(interface)
+            if interface_id is not None:
+                self._roll_up(timestamp_ns, interval_ns, interface_id, 0, 0, idle=True)
+            return
+        interface_id = self._interface_id(interface, create=True)
+        rx_bps, tx_bps = round(rx_bps), round(tx_bps)
+        self._buffer(self._segment(_day(timestamp_ns), interface_id),
+                     RECORD.pack(timestamp_ns, interval_ns, rx_bps, tx_bps))
+        self._roll_up(timestamp_ns, interval_ns, interface_id, rx_bps, tx_bps)
+        if (self._pending_bytes >= FLUSH_BYTES
+                or timestamp_ns - self._last_flush_ns >= FLUSH_INTERVAL_NS):
+            self.flush()
+
+    def _roll_up(self, timestamp_ns, interval_ns, interface_id, rx_bps, tx_bps, idle=False):
+        rx_bits = rx_bps * interval_ns // SECOND_NS
+        tx_bits = tx_bps * interval_ns // SECOND_NS
+        for tier in ROLLUP_TIERS:
+            start_ns = timestamp_ns - timestamp_ns % tier.bucket_ns
+            key = (tier.name, interface_id)
+            bucket = self._open_buckets.get(key)
+            if bucket is not None and bucket[0] != start_ns:
+                self._close_bucket(tier, interface_id, bucket)
+                bucket = None
+            if bucket is None:
+                if not idle:
+                    self._open_buckets[key] = [start_ns, 1, interval_ns, rx_bps, rx_bps, rx_bits,
+                                               tx_bps, tx_bps, tx_bits]
+                    self._buckets_changed = True
+                continue
+            self._buckets_changed = True
+            bucket[1] += 1
+            bucket[2] += interval_ns
+            bucket[3] = min(bucket[3], rx_bps)
+            bucket[4] = max(bucket[4], rx_bps)
+            bucket[5] += rx_bits
+            bucket[6] = min(bucket[6], tx_bps)
+            bucket[7] = max(bucket[7], tx_bps)
+            bucket[8] += tx_bits
+
+    def _close_bucket(self, tier, interface_id, bucket):
+        del self._open_buckets[(tier.name, interface_id)]
+        self._buckets_changed = True
+        path = self._segment(_period(bucket[0], tier.segment_format), interface_id, tier)
+        self._buffer(path, BUCKET.pack(*bucket))
+
+    def append_rates(self, timestamp_ns, interval_ns, table):
+        """Buffer a record for every InterfaceRate in a rate table"""
+        for rate in table:
+            self.append(timestamp_ns, interval_ns, rate.interface, rate.rx_bps, rate.tx_bps)
+
+    def flush(self):
+        """Write buffered records and closed rollup buckets to their segment files, and save the open ones.
+
+        Called from the appending side (``append`` and the owner's timer);
+        queries read the buffers instead of flushing.
+        """
+        if self.read_only:
+            return
+        previous_day = _day(self._last_flush_ns)
+        pending, self._pending = self._pending, {}
+        self._pending_bytes = 0
+        self._last_flush_ns = time.time_ns()
+        # Saved first: a crash while appending may lose closed buckets but never writes one twice
+        if self._buckets_changed:
+            self._checkpoint()
+        for path, records in pending.items():
+            try:
+                with open(path, 'ab') as f:
+                    f.write(records)
+            except OSError as e:
+                logging.error(f"Error writing history segment {path}: {e}")
+        if _day(self._last_flush_ns) != previous_day:
+            self.apply_retention()
+
+    def close(self):
+        """Write everything, including the rollup buckets still open"""
+        for name, interface_id in list(self._open_buckets):
+            self._close_bucket(ROLLUP_TIER_NAMES[name], interface_id,
+                               self._open_buckets[(name, interface_id)])
+        self.flush()
+
+    def _list_segments(self, tier=None, interface=None, buffered=False):
+        """(period, interface id, path) of raw or tier segments, oldest first.
+
+        With ``buffered``, segments that so far only exist in the write buffer are included.
+        """
+        wanted = None if interface is None else self._interface_id(interface)
+        if interface is not None and wanted is None:
+            return []
+        prefix = 1 if tier is None else 2
+        result = []
+        names = set(os.listdir(self.directory))
+        if buffered:
+            names.update(os.path.basename(path) for path in list(self._pending))
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            parts = stem.split("-")
+            if ext != ".bin" or len(parts) != prefix + 1 or not parts[-1].isdigit():
+                continue
+            if tier is not None and parts[0] != tier.name:
+                continue
+            interface_id = int(parts[-1])
+            if wanted is None or interface_id == wanted:
+                result.append((parts[-2], interface_id, os.path.join(self.directory, name)))
+        return sorted(result)
+
+    def segments(self, interface=None):
+        """(day, path) of every raw segment, oldest first, optionally for one interface"""
+        return [(day, path) for day, _, path in self._list_segments(None, interface)]
+
+    def apply_retention(self, now_ns=None):
+        """Delete raw segments older than the retention period, and tier segments past theirs"""
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        retention = [(None, "%Y%m%d", self.retention_days)]
+        retention += [(tier, tier.segment_format,
+                       self.retention_days if tier.retention_days is None else tier.retention_days)
+                      for tier in ROLLUP_TIERS]
+        for tier, segment_format, days in retention:
+            if not days:
+                continue
+            cutoff = _period(now_ns - days * DAY_NS, segment_format)
+            for period, _, path in self._list_segments(tier):
+                if period < cutoff:
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logging.warning(f"Could not remove history segment {path}: {e}")
+
+    def _read_segment(self, path, start_ns, end_ns, record=RECORD):
+        """int64 array of the records of one segment within [start_ns, end_ns), buffered ones included"""
+        values = self._read_segment_file(path, start_ns, end_ns, record)
+        pending = self._pending.get(path)
+        if pending:
+            # Buffered records come after those on disk
+            buffered = array('q', bytes(pending))
+            if sys.byteorder != "little":
+                buffered.byteswap()
+            values += self._slice(buffered, buffered, record.size // 8, start_ns, end_ns)
+        return values
+
+    def _read_segment_file(self, path, start_ns, end_ns, record):
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return array('q')  # Only buffered so far
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            size -= size % record.size  # Ignore a record torn by a crash
+            if size == 0:
+                return array('q')
+            fields = record.size // 8
+            if sys.byteorder != "little":
+                values = array('q', f.read(size))
+                values.byteswap()
+                return self._slice(values, values, fields, start_ns, end_ns)
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped).cast('q')
+                try:
+                    return self._slice(view, array('q'), fields, start_ns, end_ns)
+                finally:
+                    view.release()
+
+    @staticmethod
+    def _slice(values, result, fields, start_ns, end_ns):
+        # Records are appended in time order, so the range is found by bisection
+        column = _TimestampColumn(values, fields)
+        first = bisect.bisect_left(column, start_ns) * fields
+        last = bisect.bisect_left(column, end_ns) * fields
+        if result is values:
+            return values[first:last]
+        with values[first:last] as records, records.cast('B') as raw:
+            result.frombytes(raw)
+        return result
+
+    def _read_range(self, start_ns, end_ns, interface=None, tier=None):
+        """{interface id: int64 array} of raw records or tier buckets in [start_ns, end_ns)"""
+        segment_format = tier.segment_format if tier else "%Y%m%d"
+        first_period = _period(start_ns, segment_format)
+        last_period = _period(end_ns, segment_format)
+        record = BUCKET if tier else RECORD
+        result = {}
+        for period, interface_id, path in self._list_segments(tier, interface, buffered=True):
+            if first_period <= period <= last_period:
+                try:
+                    values = self._read_segment(path, start_ns, end_ns, record)
+                except OSError as e:
+                    logging.error(f"Error reading history segment {path}: {e}")
+                    continue
+                if interface_id in result:
+                    result[interface_id] += values
+                else:
+                    result[interface_id] = values
+        return result
+
+    def read(self, start_ns, end_ns, interface=None):
+        """Flat int64 array of raw records in [start_ns, end_ns), FIELDS values per record.
+
+        With no interface, records of all interfaces are concatenated.
+        """
+        values = array('q')
+        for interface_values in self._read_range(start_ns, end_ns, interface).values():
+            values += interface_values
+        return values
+
+    def query(self, start_ns, end_ns, interface):
+        """Raw HistoryRecords of one interface in [start_ns, end_ns)"""
+        values = self.read(start_ns, end_ns, interface)
+        return [HistoryRecord(*values[i:i + FIELDS]) for i in range(0, len(values), FIELDS)]
+
+    def _iter_segment(self, path, start_ns, end_ns):
+        """HistoryRecords of one raw segment in [start_ns, end_ns), copied STREAM_RECORDS at a time"""
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            size -= size % RECORD.size
+            if size == 0:
+                return
+            if sys.byteorder != "little":
+                values = array('q', f.read(size))
+                values.byteswap()
+                values = self._slice(values, values, FIELDS, start_ns, end_ns)
+                for i in range(0, len(values), FIELDS):
+                    yield HistoryRecord(*values[i:i + FIELDS])
+                return
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped).cast('q')
+                try:
+                    column = _TimestampColumn(view, FIELDS)
+                    first = bisect.bisect_left(column, start_ns) * FIELDS
+                    last = bisect.bisect_left(column, end_ns) * FIELDS
+                    for chunk in range(first, last, STREAM_RECORDS * FIELDS):
+                        values = array('q')
+                        with view[chunk:min(chunk + STREAM_RECORDS * FIELDS, last)] as records, \
+                                records.cast('B') as raw:
+                            values.frombytes(raw)
+                        for i in range(0, len(values), FIELDS):
+                            yield HistoryRecord(*values[i:i + FIELDS])
+                finally:
+                    view.release()
+
+    def iter_records(self, start_ns, end_ns, interface=None):
+        """Yield (interface, HistoryRecord) of raw records in [start_ns, end_ns) in time order.
+
+        Segments are streamed a chunk at a time, so memory use does not grow
+        with the range. Records still buffered in memory are not included;
+        call ``flush()`` first from the thread that appends.
+        """
+        first_day, last_day = _day(start_ns), _day(end_ns)
+        names = {index: name for name, index in self._interface_ids.items()}
+        days = {}
+        for day, interface_id, path in self._list_segments(None, interface):
+            if first_day <= day <= last_day:
+                days.setdefault(day, []).append((names.get(interface_id, str(interface_id)), path))
+        for day in sorted(days):
+            streams = [zip(itertools.repeat(name), self._iter_segment(path, start_ns, end_ns))
+                       for name, path in days[day]]
+            yield from heapq.merge(*streams, key=lambda item: item[1].timestamp_ns)
+
+    def rollup(self, start_ns, end_ns, resolution_s, interface=None):
+        """Buckets of the coarsest tier no wider than ``resolution_s`` covering [start_ns, end_ns).
+
+        Buckets still open in memory are included. With no interface, the
+        buckets of all interfaces are added together per start time.
+        """
+        tier = pick_tier(resolution_s)
+        first_ns = start_ns - start_ns % tier.bucket_ns
+        wanted = None if interface is None else self._interface_id(interface)
+        if interface is not None and wanted is None:
+            return []
+
+        per_interface = {}  # (interface id, start) -> Bucket
+        def add(interface_id, bucket):
+            key = (interface_id, bucket.start_ns)
+            previous = per_interface.get(key)
+            per_interface[key] = bucket if previous is None else _join_parts(previous, bucket)
+
+        for interface_id, values in self._read_range(first_ns, end_ns, interface, tier).items():
+            for i in range(0, len(values), BUCKET_FIELDS):
+                add(interface_id, Bucket(values[i], tier.seconds, *values[i + 1:i + BUCKET_FIELDS]))
+        # Copied, as a chart may query from a loader thread while records are appended
+        for (name, interface_id), bucket in list(self._open_buckets.items()):
+            if (name == tier.name and (wanted is None or interface_id == wanted)
+                    and first_ns <= bucket[0] < end_ns):
+                add(interface_id, Bucket(bucket[0], tier.seconds, *bucket[1:]))
+
+        merged = {}
+        for (_, start), bucket in per_interface.items():
+            previous = merged.get(start)
+            merged[start] = bucket if previous is None else _add_interfaces(previous, bucket)
+        return [merged[start] for start in sorted(merged)]
+
+    def summary(self, start_ns, end_ns, interface=None):
+        """HistorySummary of one interface, or all interfaces, in [start_ns, end_ns).
+
+        Computed from the rollup tier with about a thousand buckets across the
+        range, so the range is widened to that tier's bucket boundaries.
+        """
+        buckets = self.rollup(start_ns, end_ns, (end_ns - start_ns) / 1000 / SECOND_NS, interface)
+        return HistorySummary(
+            samples=sum(bucket.samples for bucket in buckets),
+            seconds=sum(bucket.covered_ns for bucket in buckets) / SECOND_NS,
+            rx_bytes=sum(bucket.rx_bits for bucket in buckets) / 8,
+            tx_bytes=sum(bucket.tx_bits for bucket in buckets) / 8,
+            peak_rx_bps=max((bucket.rx_max_bps for bucket in buckets), default=0),
+            peak_tx_bps=max((bucket.tx_max_bps for bucket in buckets), default=0),
+        )
+
+
+def day_range(days, now_ns=None):
+    """(start_ns, end_ns) covering the last ``days`` days up to now"""
+    now_ns = time.time_ns() if now_ns is None else now_ns
+    return now_ns - int(timedelta(days=days).total_seconds() * 1e9), now_ns + 1
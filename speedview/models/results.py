@@ -0,0 +1,195 @@
+"""SQLite database of speed test results.
+
+The database runs in WAL mode, so readers never wait for the writer. Inserts
+are queued and written in batches by one background thread, and the test
+threads never touch SQLite. Reads are range queries on the
+(interface, timestamp) index and use a connection per calling thread. The
+SQL text is constant, so sqlite3 reuses the prepared statements from its
+statement cache.
+"""
+import os
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+
+from speedview.config.config import RESULTS_DB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS speed_tests (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    server TEXT,
+    latency_ms REAL,
+    jitter_ms REAL,
+    download_mbps REAL NOT NULL,
+    upload_mbps REAL NOT NULL,
+    interface TEXT,
+    backend TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS speed_tests_interface_time ON speed_tests (interface, timestamp);
+CREATE INDEX IF NOT EXISTS speed_tests_time ON speed_tests (timestamp);
+"""
+
+COLUMNS = ("timestamp", "server", "latency_ms", "jitter_ms", "download_mbps", "upload_mbps",
+           "interface", "backend")
+INSERT_SQL = f"INSERT INTO speed_tests ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM speed_tests WHERE timestamp >= ? AND timestamp < ?"
+SELECT_INTERFACE_SQL = SELECT_SQL + " AND interface = ?"
+STATISTICS_SQL = ("SELECT COUNT(*), AVG(download_mbps), MAX(download_mbps), AVG(upload_mbps), "
+                  "MAX(upload_mbps), AVG(latency_ms) FROM speed_tests WHERE timestamp >= ? AND timestamp < ?")
+STATISTICS_INTERFACE_SQL = STATISTICS_SQL + " AND interface = ?"
+
+# Most results written in one transaction
+BATCH_SIZE = 256
+# Rows fetched at a time when streaming results
+FETCH_ROWS = 1000
+
+SpeedTestResult = namedtuple("SpeedTestResult", COLUMNS, defaults=(None, None, None, None, None))
+ResultStatistics = namedtuple("ResultStatistics", ["count", "mean_download_mbps", "max_download_mbps",
+                                                   "mean_upload_mbps", "max_upload_mbps",
+                                                   "mean_latency_ms"])
+
+_STOP = object()
+
+
+def speedtest_result(results, interface=None):
+    """SpeedTestResult from a finished ``speedtest.Speedtest().results``"""
+    server = results.server or {}
+    name = ", ".join(part for part in (server.get("sponsor"), server.get("name")) if part)
+    return SpeedTestResult(time.time(), name or None, results.ping or None, None,
+                           results.download / 1_000_000, results.upload / 1_000_000,
+                           interface, "speedtest.net")
+
+
+class ResultsStore:
+    """Stores speed test results and answers indexed range queries"""
+
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Create the schema before anyone reads
+        self._connection().executescript(SCHEMA)
+
+        self._subscribers = []
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="ResultsWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+
+    def _connection(self):
+        """Connection of the calling thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def subscribe(self, callback):
+        """Call ``callback(result)`` with every added SpeedTestResult, on the adding thread"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def add(self, result):
+        """Queue a SpeedTestResult for the writer thread; returns immediately"""
+        self._queue.put(tuple(result))
+        for callback in list(self._subscribers):
+            try:
+                callback(SpeedTestResult(*result))
+            except Exception as e:
+                logging.exception(f"Error in speed test result subscriber: {e}")
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            item = self._queue.get()
+            batch = []
+            stop = item is _STOP
+            if not stop:
+                batch.append(item)
+            # Take whatever else is already waiting, up to one batch
+            while not stop and len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                try:
+                    with connection:
+                        connection.executemany(INSERT_SQL, batch)
+                except sqlite3.Error as e:
+                    logging.error(f"Error saving {len(batch)} speed test results: {e}")
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """Wait until every queued result has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Write the queued results, stop the writer and close all connections"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def query(self, start=0.0, end=float("inf"), interface=None):
+        """SpeedTestResults with start <= timestamp < end, oldest first"""
+        return list(self.iter_results(start, end, interface))
+
+    def iter_results(self, start=0.0, end=float("inf"), interface=None):
+        """Yield SpeedTestResults like ``query``, fetching FETCH_ROWS rows at a time"""
+        if interface is None:
+            cursor = self._connection().execute(SELECT_SQL + " ORDER BY timestamp", (start, end))
+        else:
+            cursor = self._connection().execute(SELECT_INTERFACE_SQL + " ORDER BY timestamp",
+                                                (start, end, interface))
+        try:
+            while True:
+                rows = cursor.fetchmany(FETCH_ROWS)
+                if not rows:
+                    return
+                for row in rows:
+                    yield SpeedTestResult(*row)
+        finally:
+            cursor.close()
+
+    def latest(self, count=20, interface=None):
+        """The ``count`` most recent results, newest first"""
+        sql = SELECT_SQL if interface is None else SELECT_INTERFACE_SQL
+        params = (0.0, float("inf")) if interface is None else (0.0, float("inf"), interface)
+        rows = self._connection().execute(sql + " ORDER BY timestamp DESC LIMIT ?", params + (count,))
+        return [SpeedTestResult(*row) for row in rows]
+
+    def statistics(self, start=0.0, end=float("inf"), interface=None):
+        """ResultStatistics aggregated by SQLite over a time range"""
+        if interface is None:
+            row = self._connection().execute(STATISTICS_SQL, (start, end)).fetchone()
+        else:
+            row = self._connection().execute(STATISTICS_INTERFACE_SQL, (start, end, interface)).fetchone()
+        return ResultStatistics(*row)
@@ -8,10 +8,14 @@ from speedview.config.config import (
     DEFAULT_MAX_SPEED, DEFAULT_UPDATE_INTERVAL, DEFAULT_START_MINIMIZED,
     DEFAULT_MINIMIZE_TO_TRAY, DEFAULT_SHOW_UPLOAD_SPEED, DEFAULT_CLOSE_TO_TRAY,
     DEFAULT_MAX_UPLOAD, DEFAULT_ENABLE_NOTIFICATIONS, DEFAULT_NOTIFICATION_THRESHOLD,
-    DEFAULT_SPEED_UNIT, CONFIG_FILE
+    DEFAULT_SPEED_UNIT, CONFIG_FILE, DEFAULT_SAMPLE_HZ, DEFAULT_RENDER_HZ, MAX_SAMPLE_HZ,
+    MIN_RENDER_HZ, MAX_RENDER_HZ, DEFAULT_HISTORY_RETENTION_DAYS, DEFAULT_METRICS_ENABLED,
+    DEFAULT_METRICS_ADDRESS, DEFAULT_METRICS_PORT, DEFAULT_STREAM_ENABLED, DEFAULT_SPEED_TEST_BACKEND,
+    DEFAULT_SPEED_TEST_URL, DEFAULT_SPEED_TEST_STREAMS, DEFAULT_SPEED_TEST_DURATION, DEFAULT_SPEED_TEST_WARMUP,
+    MAX_SPEED_TEST_STREAMS, SPEED_TEST_BACKENDS, DEFAULT_SPEED_TEST_SCHEDULE, DEFAULT_SPEED_TEST_JITTER,
+    DEFAULT_SPEED_TEST_BUSY_MBPS, DEFAULT_SPEED_TEST_DAILY_BUDGET_MB
 )
-
-logging.basicConfig(level=logging.DEBUG)
+from speedview.controllers.scheduler import parse_schedule
 
 class SettingsError(Exception):
     """Base class for settings related errors"""
@@ -35,6 +39,8 @@ class Settings:
         self.max_speed = DEFAULT_MAX_SPEED
         self.max_upload = DEFAULT_MAX_UPLOAD
         self.update_interval = DEFAULT_UPDATE_INTERVAL
+        self.sample_hz = DEFAULT_SAMPLE_HZ  # High-frequency sampling rate, 0 when off
+        self.render_hz = DEFAULT_RENDER_HZ  # Display rate while high-frequency sampling
         self.selected_interface = self._get_default_interface()  # Changed from None
         self.settings_version = 1  # Add version tracking
 
@@ -51,6 +57,29 @@ class Settings:
         self.enable_notifications = DEFAULT_ENABLE_NOTIFICATIONS
         self.notification_threshold = DEFAULT_NOTIFICATION_THRESHOLD
 
+        # History settings
+        self.history_retention_days = DEFAULT_HISTORY_RETENTION_DAYS  # 0 keeps history forever
+
+        # Prometheus/OpenMetrics endpoint
+        self.metrics_enabled = DEFAULT_METRICS_ENABLED
+        self.metrics_address = DEFAULT_METRICS_ADDRESS
+        self.metrics_port = DEFAULT_METRICS_PORT
+
+        # Local rate stream for other processes
+        self.stream_enabled = DEFAULT_STREAM_ENABLED
+
+        # Speed test engine; see controllers/speed_test.py
+        self.speed_test_backend = DEFAULT_SPEED_TEST_BACKEND
+        self.speed_test_url = DEFAULT_SPEED_TEST_URL
+        self.speed_test_streams = DEFAULT_SPEED_TEST_STREAMS
+        self.speed_test_duration = DEFAULT_SPEED_TEST_DURATION
+        self.speed_test_warmup = DEFAULT_SPEED_TEST_WARMUP
+        # Scheduled speed tests; see controllers/scheduler.py
+        self.speed_test_schedule = DEFAULT_SPEED_TEST_SCHEDULE
+        self.speed_test_jitter = DEFAULT_SPEED_TEST_JITTER
+        self.speed_test_busy_mbps = DEFAULT_SPEED_TEST_BUSY_MBPS
+        self.speed_test_daily_budget_mb = DEFAULT_SPEED_TEST_DAILY_BUDGET_MB
+
         # Window state
         self.window_size = None
         self.window_position = None
@@ -102,6 +131,8 @@ class Settings:
                 'max_speed': self.max_speed,
                 'max_upload': self.max_upload,
                 'update_interval': self.update_interval,
+                'sample_hz': self.sample_hz,
+                'render_hz': self.render_hz,
                 'selected_interface': self.selected_interface,
                 'start_minimized': self.start_minimized,
                 'minimize_to_tray': self.minimize_to_tray,
@@ -111,6 +142,20 @@ class Settings:
                 'is_floating': self.is_floating,
                 'enable_notifications': self.enable_notifications,
                 'notification_threshold': self.notification_threshold,
+                'history_retention_days': self.history_retention_days,
+                'metrics_enabled': self.metrics_enabled,
+                'metrics_address': self.metrics_address,
+                'metrics_port': self.metrics_port,
+                'stream_enabled': self.stream_enabled,
+                'speed_test_backend': self.speed_test_backend,
+                'speed_test_url': self.speed_test_url,
+                'speed_test_streams': self.speed_test_streams,
+                'speed_test_duration': self.speed_test_duration,
+                'speed_test_warmup': self.speed_test_warmup,
+                'speed_test_schedule': self.speed_test_schedule,
+                'speed_test_jitter': self.speed_test_jitter,
+                'speed_test_busy_mbps': self.speed_test_busy_mbps,
+                'speed_test_daily_budget_mb': self.speed_test_daily_budget_mb,
                 'window_size': self.window_size,
                 'window_position': self.window_position,
                 'settings_version': self.settings_version,
@@ -150,6 +195,42 @@ class Settings:
             self.max_upload = DEFAULT_MAX_UPLOAD
         if not isinstance(self.update_interval, (int, float)) or self.update_interval < 0.1:
             self.update_interval = DEFAULT_UPDATE_INTERVAL
+        if not isinstance(self.sample_hz, (int, float)) or self.sample_hz < 0:
+            self.sample_hz = DEFAULT_SAMPLE_HZ
+        self.sample_hz = min(self.sample_hz, MAX_SAMPLE_HZ)
+        if not isinstance(self.render_hz, (int, float)) or self.render_hz <= 0:
+            self.render_hz = DEFAULT_RENDER_HZ
+        self.render_hz = max(MIN_RENDER_HZ, min(self.render_hz, MAX_RENDER_HZ))
+        if self.sample_hz:
+            # Rendering faster than sampling would only repeat samples
+            self.render_hz = min(self.render_hz, max(self.sample_hz, MIN_RENDER_HZ))
+        if not isinstance(self.history_retention_days, int) or self.history_retention_days < 0:
+            self.history_retention_days = DEFAULT_HISTORY_RETENTION_DAYS
+        if not isinstance(self.metrics_port, int) or not 0 < self.metrics_port < 65536:
+            self.metrics_port = DEFAULT_METRICS_PORT
+        if not isinstance(self.metrics_address, str) or not self.metrics_address:
+            self.metrics_address = DEFAULT_METRICS_ADDRESS
+        if self.speed_test_backend not in SPEED_TEST_BACKENDS:
+            self.speed_test_backend = DEFAULT_SPEED_TEST_BACKEND
+        if not isinstance(self.speed_test_url, str):
+            self.speed_test_url = DEFAULT_SPEED_TEST_URL
+        if not isinstance(self.speed_test_streams, int) or self.speed_test_streams < 1:
+            self.speed_test_streams = DEFAULT_SPEED_TEST_STREAMS
+        self.speed_test_streams = min(self.speed_test_streams, MAX_SPEED_TEST_STREAMS)
+        if not isinstance(self.speed_test_duration, (int, float)) or self.speed_test_duration <= 0:
+            self.speed_test_duration = DEFAULT_SPEED_TEST_DURATION
+        if not isinstance(self.speed_test_warmup, (int, float)) or self.speed_test_warmup < 0:
+            self.speed_test_warmup = DEFAULT_SPEED_TEST_WARMUP
+        try:
+            parse_schedule(self.speed_test_schedule)
+        except (TypeError, ValueError):
+            self.speed_test_schedule = DEFAULT_SPEED_TEST_SCHEDULE
+        if not isinstance(self.speed_test_jitter, (int, float)) or self.speed_test_jitter < 0:
+            self.speed_test_jitter = DEFAULT_SPEED_TEST_JITTER
+        if not isinstance(self.speed_test_busy_mbps, (int, float)) or self.speed_test_busy_mbps < 0:
+            self.speed_test_busy_mbps = DEFAULT_SPEED_TEST_BUSY_MBPS
+        if not isinstance(self.speed_test_daily_budget_mb, (int, float)) or self.speed_test_daily_budget_mb < 0:
+            self.speed_test_daily_budget_mb = DEFAULT_SPEED_TEST_DAILY_BUDGET_MB
             
         # Validate network interface
         available_interfaces = list(psutil.net_if_stats().keys())
@@ -1,9 +1,9 @@
 import logging
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QMessageBox, QShortcut
-from PyQt5.QtSvg import QSvgWidget
-from PyQt5.QtCore import Qt, QTimer, QByteArray
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QKeySequence
-from speedview.utils.svg_utils import update_floating_svg, save_svg_to_file
+from speedview.utils.svg_utils import floating_slot_values, FLOATING_SVG_LAYERS
+from speedview.ui.svg_gauge import SvgGaugeWidget
 from speedview.controllers.network_controller import NetworkController
 from speedview.ui.resources.svg_templates import FLOATING_SVG_TEMPLATE
 
@@ -29,12 +29,7 @@ class FloatingWindow(QWidget):
         if hasattr(self.network_controller, 'connection_updated'):
             self.network_controller.connection_updated.connect(self.on_connection_updated)
         
-        # Setup update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_display)
-        self.update_timer.start(500)  
-        
-        # Initial display
+        # Initial display; afterwards it repaints when a new sample arrives
         self.update_display()
         
         # Set window flags without transparency
@@ -49,7 +44,7 @@ class FloatingWindow(QWidget):
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(self.layout)
 
-        self.svg_widget = QSvgWidget()
+        self.svg_widget = SvgGaugeWidget(FLOATING_SVG_TEMPLATE, FLOATING_SVG_LAYERS)
         self.layout.addWidget(self.svg_widget)
 
         # Enable dragging and button interaction
@@ -75,7 +70,7 @@ class FloatingWindow(QWidget):
         upload_speed = upload_speed if upload_speed is not None else 0
         display_speed = upload_speed if self.settings.show_upload_speed else download_speed
 
-        logging.info(f"FloatingWindow display update: download={download_speed}, upload={upload_speed}")
+        logging.debug(f"FloatingWindow display update: download={download_speed}, upload={upload_speed}")
 
         # Update signal strength and connection info
         signal_strength = getattr(self.network_controller, 'signal_strength', 0)
@@ -85,26 +80,18 @@ class FloatingWindow(QWidget):
             logging.exception("Failed to get connection info in FloatingWindow")
             connection_type, band = "Unknown", ""
 
-        # Update SVG content using the template
-        svg_content = update_floating_svg(
-            FLOATING_SVG_TEMPLATE,
+        # Repaint only the dynamic layers over the cached background
+        self.svg_widget.set_values(floating_slot_values(
             speed=display_speed,
             signal_strength=signal_strength,
             connection_type=connection_type,
             band=band
-        )
-        
-        logging.info("Loading SVG into floating window SVG widget...")
-        self.svg_widget.load(QByteArray(svg_content.encode('utf-8')))
-        logging.info("SVG loaded successfully in floating window.")
+        ))
     
     def on_speed_updated(self, download_speed, upload_speed):
         """Slot to handle speed updates from controller in a thread-safe way."""
-        if download_speed == 0 and upload_speed == 0:
-            logging.warning("Speed test failed or no network detected (both speeds zero) in FloatingWindow.")
-            # Disabled notification popup in floating mode
-            return
-        logging.info(f"Speed updated in FloatingWindow: download={download_speed}, upload={upload_speed}")
+        # An idle link is a valid sample too, so zero speeds are displayed as well
+        logging.debug(f"Speed updated in FloatingWindow: download={download_speed}, upload={upload_speed}")
         self.update_display((download_speed, upload_speed))
 
     def on_connection_updated(self, status, strength):
@@ -186,5 +173,9 @@ class FloatingWindow(QWidget):
 
     def closeEvent(self, event):
         """Clean up on window close"""
-        self.update_timer.stop()
+        if hasattr(self.speed_controller, 'speed_updated'):
+            try:
+                self.speed_controller.speed_updated.disconnect(self.on_speed_updated)
+            except (TypeError, AttributeError):
+                pass
         event.accept()
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""State of the values drawn in one speedometer frame."""
+
+
+class FrameState:
+    """Current speed, connection and signal values with per-field dirty tracking.
+
+    Signals update only the fields they own. The window renders from the full
+    state once per event-loop turn, so an update to one field never discards the
+    others.
+    """
+
+    FIELDS = ("speed", "max_speed", "show_upload", "status", "connection_type", "signal_strength")
+
+    def __init__(self, speed=0.0, max_speed=100, show_upload=False, status="Unknown",
+                 connection_type="Unknown", signal_strength=0):
+        self.speed = speed
+        self.max_speed = max_speed
+        self.show_upload = show_upload
+        self.status = status
+        self.connection_type = connection_type
+        self.signal_strength = signal_strength
+        # Everything is dirty until the first frame has been rendered
+        self.dirty = set(self.FIELDS)
+
+    def update(self, **values):
+        """Set fields and mark the ones whose value changed as dirty.
+
+        Returns True if any field changed.
+        """
+        changed = False
+        for name, value in values.items():
+            if name not in self.FIELDS:
+                raise AttributeError(f"Unknown frame field '{name}'")
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                self.dirty.add(name)
+                changed = True
+        return changed
+
+    def take_dirty(self):
+        """Return the dirty fields and reset them"""
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
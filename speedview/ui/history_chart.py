@@ -0,0 +1,344 @@
+"""Zoomable time-series chart of the recorded history, drawn with QPainter.
+
+The time axis is cut into tiles TILE_WIDTH pixels wide at power-of-two zoom
+levels (``1 << level`` nanoseconds per pixel). Each visible tile fetches its
+own range from ``HistoryStore.rollup`` at the coarsest tier that still fits a
+pixel, decimates it to one min/max/mean entry per column and is rendered once
+into a cached pixmap. Panning only blits cached tiles and renders the tiles
+that scroll into view, however much history there is.
+
+Tile data is built on a loader thread, never in ``paintEvent``. Until a tile
+arrives, the part of a coarser cached tile covering it is stretched in its
+place (usually the level shown before a zoom), or the tile is left empty.
+"""
+import math
+import time
+import logging
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QLineF, QPointF, QRect, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QPen, QPolygonF
+
+from speedview.controllers.rate import format_rate
+from speedview.models.history import SECOND_NS, day_range
+from speedview.utils.decimation import decimate_min_max
+
+TILE_WIDTH = 256
+MIN_LEVEL = 30  # About one second per pixel, the finest rollup tier
+MAX_LEVEL = 47  # About 39 hours per pixel; several years fit on screen
+TILE_DATA_CACHE = 512
+TILE_PIXMAP_CACHE = 64
+FALLBACK_LEVELS = 8  # Coarser levels searched for a stand-in tile; 2**8 is TILE_WIDTH
+LIVE_REFRESH_NS = 5 * SECOND_NS  # How long a tile that reaches the present is reused
+Y_AXIS_WIDTH = 72
+X_AXIS_HEIGHT = 20
+TIME_LABEL_SPACING = 110  # Pixels between time axis labels
+
+BACKGROUND = QColor("#1e1e1e")
+GRID = QColor("#3a3a3a")
+LABEL = QColor("#bbbbbb")
+RX_COLOR = QColor("#4caf50")
+TX_COLOR = QColor("#2196f3")
+
+_TileData = namedtuple("_TileData", ["rx", "tx", "peak_bps", "fetched_ns", "complete"])
+
+
+def nice_ceiling(value):
+    """Smallest 1, 2 or 5 times a power of ten not below ``value``"""
+    if value <= 0:
+        return 1
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if step * magnitude >= value:
+            return step * magnitude
+
+
+def _time_format(ns_per_label):
+    if ns_per_label < 60 * SECOND_NS:
+        return "%H:%M:%S"
+    if ns_per_label < 86400 * SECOND_NS:
+        return "%H:%M"
+    if ns_per_label < 60 * 86400 * SECOND_NS:
+        return "%b %d"
+    return "%Y-%m"
+
+
+class HistoryChart(QWidget):
+    """Download and upload rate over time; wheel zooms, dragging pans"""
+
+    view_changed = pyqtSignal(int, int)  # start_ns, end_ns
+    tile_loaded = pyqtSignal(object, int, object)  # (interface, level, index), generation, _TileData or None
+
+    def __init__(self, history, interface=None, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.interface = interface
+        self.level = MIN_LEVEL
+        self.view_start_ns = 0
+        self._data = OrderedDict()  # (interface, level, index) -> _TileData
+        self._pixmaps = OrderedDict()  # (interface, level, index, fetched_ns, y_max, height) -> QPixmap
+        self._loading = set()  # Keys of the tiles queued on the loader
+        self._visible = frozenset()  # Keys on screen; the loader skips tiles scrolled away meanwhile
+        self._generation = 0  # Bumped by invalidate(), so tiles loaded before are dropped
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HistoryTiles")
+        self.tile_loaded.connect(self._on_tile_loaded)
+        self._drag_x = None
+        self.setMinimumSize(400, 180)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.show_range(*day_range(1))
+
+    @property
+    def loading(self):
+        """True while tiles are being built on the loader thread"""
+        return bool(self._loading)
+
+    @property
+    def ns_per_pixel(self):
+        return 1 << self.level
+
+    def plot_rect(self):
+        return QRect(Y_AXIS_WIDTH, 4, max(self.width() - Y_AXIS_WIDTH - 4, 1),
+                     max(self.height() - 4 - X_AXIS_HEIGHT, 1))
+
+    def view_range(self):
+        """(start_ns, end_ns) currently on screen"""
+        return self.view_start_ns, self.view_start_ns + self.plot_rect().width() * self.ns_per_pixel
+
+    def _set_view(self, start_ns):
+        # Keep the view on whole pixels so tiles are blitted without resampling
+        self.view_start_ns = int(start_ns) - int(start_ns) % self.ns_per_pixel
+        self.update()
+        self.view_changed.emit(*self.view_range())
+
+    def show_range(self, start_ns, end_ns):
+        """Zoom to the finest level that fits [start_ns, end_ns), keeping its end in view"""
+        ns_per_pixel = max((end_ns - start_ns) / self.plot_rect().width(), 1)
+        self.level = min(max(math.ceil(math.log2(ns_per_pixel)), MIN_LEVEL), MAX_LEVEL)
+        # Round the start up so the aligned view still reaches end_ns
+        self._set_view(end_ns - (self.plot_rect().width() - 1) * self.ns_per_pixel - 1)
+
+    def set_interface(self, interface):
+        self.interface = interface
+        self.update()
+
+    def invalidate(self):
+        """Drop every cached tile, e.g. after the history was changed"""
+        self._generation += 1
+        self._data.clear()
+        self._pixmaps.clear()
+        self._loading.clear()
+        self.update()
+
+    def zoom(self, steps, anchor_x=None):
+        """Zoom in (positive steps) or out by powers of two around a widget x position"""
+        plot = self.plot_rect()
+        offset = (plot.width() / 2 if anchor_x is None else anchor_x - plot.left())
+        anchor_ns = self.view_start_ns + offset * self.ns_per_pixel
+        level = min(max(self.level - steps, MIN_LEVEL), MAX_LEVEL)
+        if level == self.level:
+            return
+        self.level = level
+        self._set_view(anchor_ns - offset * self.ns_per_pixel)
+
+    def pan(self, pixels):
+        """Move the view; positive pixels shows later times"""
+        self._set_view(self.view_start_ns + int(pixels) * self.ns_per_pixel)
+
+    def _tile_data(self, level, index, now_ns):
+        """Cached data of a tile, or None; queues a load when it is missing or due for a refresh"""
+        key = (self.interface, level, index)
+        data = self._data.get(key)
+        if data is not None:
+            self._data.move_to_end(key)
+            if data.complete or now_ns - data.fetched_ns < LIVE_REFRESH_NS:
+                return data
+        # A live tile keeps showing its old data until the refresh arrives
+        if key not in self._loading:
+            self._loading.add(key)
+            self._loader.submit(self._load_tile, key, self._generation, now_ns)
+        return data
+
+    def _fallback(self, level, index):
+        """(level, index, data, source x, source width) of a coarser cached tile covering a tile, or None"""
+        for steps in range(1, FALLBACK_LEVELS + 1):
+            coarser = level + steps
+            if coarser > MAX_LEVEL:
+                break
+            data = self._data.get((self.interface, coarser, index >> steps))
+            if data is not None:
+                width = TILE_WIDTH >> steps
+                return coarser, index >> steps, data, (index & ((1 << steps) - 1)) * width, width
+        return None
+
+    def _load_tile(self, key, generation, now_ns):
+        # Runs on the loader thread
+        data = None
+        if key in self._visible:
+            try:
+                data = self._build_tile_data(key, now_ns)
+            except Exception as e:
+                logging.exception(f"Error loading history chart tile: {e}")
+        try:
+            self.tile_loaded.emit(key, generation, data)
+        except RuntimeError:
+            pass  # The chart was deleted meanwhile
+
+    def _on_tile_loaded(self, key, generation, data):
+        if generation != self._generation:
+            return
+        self._loading.discard(key)
+        if data is None:
+            return
+        self._data[key] = data
+        self._data.move_to_end(key)
+        if len(self._data) > TILE_DATA_CACHE:
+            self._data.popitem(last=False)
+        self.update()
+
+    def _build_tile_data(self, key, now_ns):
+        interface, level, index = key
+        ns_per_pixel = 1 << level
+        start_ns = index * TILE_WIDTH * ns_per_pixel
+        end_ns = start_ns + TILE_WIDTH * ns_per_pixel
+        buckets = self.history.rollup(start_ns, end_ns, ns_per_pixel / SECOND_NS, interface)
+        starts = [bucket.start_ns for bucket in buckets]
+        rx = decimate_min_max(starts, [bucket.rx_min_bps for bucket in buckets],
+                              [bucket.rx_max_bps for bucket in buckets],
+                              [bucket.rx_mean_bps for bucket in buckets], start_ns, ns_per_pixel, TILE_WIDTH)
+        tx = decimate_min_max(starts, [bucket.tx_min_bps for bucket in buckets],
+                              [bucket.tx_max_bps for bucket in buckets],
+                              [bucket.tx_mean_bps for bucket in buckets], start_ns, ns_per_pixel, TILE_WIDTH)
+        peak_bps = max([value for value in rx.maxs + tx.maxs if value is not None], default=0)
+        # A bucket may end up to one pixel past the tile and still be open
+        return _TileData(rx, tx, peak_bps, now_ns, end_ns + ns_per_pixel <= now_ns)
+
+    def _tile_pixmap(self, level, index, data, y_max, height):
+        key = (self.interface, level, index, data.fetched_ns, y_max, height)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+
+        pixmap = QPixmap(TILE_WIDTH, height)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        scale = (height - 1) / y_max
+        for columns, color in ((data.tx, TX_COLOR), (data.rx, RX_COLOR)):
+            # Min/max envelope, one vertical line per pixel column
+            envelope = QColor(color)
+            envelope.setAlpha(90)
+            painter.setPen(QPen(envelope, 1))
+            painter.drawLines([QLineF(x + 0.5, height - low * scale, x + 0.5, height - high * scale)
+                               for x, (low, high) in enumerate(zip(columns.mins, columns.maxs))
+                               if low is not None])
+
+            # Mean line, broken where there is no data
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setPen(QPen(color, 1.5))
+            line = QPolygonF()
+            for x, mean in enumerate(columns.means):
+                if mean is None:
+                    if line.size() > 1:
+                        painter.drawPolyline(line)
+                    line = QPolygonF()
+                    continue
+                line.append(QPointF(x + 0.5, height - mean * scale))
+            if line.size() > 1:
+                painter.drawPolyline(line)
+            painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.end()
+
+        self._pixmaps[key] = pixmap
+        if len(self._pixmaps) > TILE_PIXMAP_CACHE:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def paintEvent(self, event):
+        plot = self.plot_rect()
+        ns_per_pixel = self.ns_per_pixel
+        tile_ns = TILE_WIDTH * ns_per_pixel
+        start_ns, end_ns = self.view_range()
+        now_ns = time.time_ns()
+        indexes = range(start_ns // tile_ns, (end_ns - 1) // tile_ns + 1)
+        self._visible = frozenset((self.interface, self.level, index) for index in indexes)
+        # (index, (level, index, data, source x, source width)) of what is drawn for each tile
+        tiles = []
+        for index in indexes:
+            data = self._tile_data(self.level, index, now_ns)
+            if data is not None:
+                tile = (self.level, index, data, 0, TILE_WIDTH)
+            else:
+                tile = self._fallback(self.level, index)
+            if tile is not None:
+                tiles.append((index, tile))
+        y_max = nice_ceiling(max((tile[2].peak_bps for _, tile in tiles), default=0) * 1.05)
+
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND)
+
+        # Rate grid and labels
+        for step in range(5):
+            y = plot.bottom() - plot.height() * step / 4
+            painter.setPen(GRID)
+            painter.drawLine(QLineF(plot.left(), y, plot.right(), y))
+            painter.setPen(LABEL)
+            painter.drawText(QRect(0, int(y) - 8, Y_AXIS_WIDTH - 6, 16), Qt.AlignRight | Qt.AlignVCenter,
+                             format_rate(y_max * step / 4))
+
+        # Time labels at a fixed pixel spacing
+        time_format = _time_format(TIME_LABEL_SPACING * ns_per_pixel)
+        for x in range(plot.left(), plot.right() - TIME_LABEL_SPACING // 2, TIME_LABEL_SPACING):
+            timestamp = (start_ns + (x - plot.left()) * ns_per_pixel) / SECOND_NS
+            painter.setPen(GRID)
+            painter.drawLine(x, plot.top(), x, plot.bottom())
+            painter.setPen(LABEL)
+            painter.drawText(QRect(x - TIME_LABEL_SPACING // 2, plot.bottom() + 2, TIME_LABEL_SPACING,
+                                   X_AXIS_HEIGHT - 2), Qt.AlignCenter,
+                             time.strftime(time_format, time.localtime(timestamp)))
+
+        painter.setClipRect(plot)
+        for index, (level, tile_index, data, source_x, source_width) in tiles:
+            x = plot.left() + (index * tile_ns - start_ns) // ns_per_pixel
+            pixmap = self._tile_pixmap(level, tile_index, data, y_max, plot.height())
+            if source_width == TILE_WIDTH:
+                painter.drawPixmap(x, plot.top(), pixmap)
+            else:
+                painter.drawPixmap(QRect(x, plot.top(), TILE_WIDTH, plot.height()), pixmap,
+                                   QRect(source_x, 0, source_width, plot.height()))
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is not None:
+            self.pan(self._drag_x - event.x())
+            self._drag_x = event.x()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.show_range(*day_range(1))
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() // 120
+        if steps:
+            self.zoom(steps, event.x())
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key == Qt.Key_Left:
+            self.pan(-self.plot_rect().width() // 8)
+        elif key == Qt.Key_Right:
+            self.pan(self.plot_rect().width() // 8)
+        elif key in (Qt.Key_Plus, Qt.Key_Equal):
+            self.zoom(1)
+        elif key == Qt.Key_Minus:
+            self.zoom(-1)
+        else:
+            super().keyPressEvent(event)
@@ -0,0 +1,197 @@
+import time
+import logging
+import threading
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QLabel, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QDialogButtonBox, QPushButton, QMenu,
+                             QFileDialog, QMessageBox)
+from PyQt5.QtCore import pyqtSignal
+
+from speedview.controllers.rate import format_rate
+from speedview.models.history import day_range
+from speedview.ui.history_chart import HistoryChart
+from speedview.utils.export import (HISTORY_FIELDS, RESULT_FIELDS, available_formats, export_rows,
+                                    format_for_path, history_rows, result_rows)
+
+# (label, days) of the periods summarised in the table
+HISTORY_PERIODS = [
+    ("Last hour", 1 / 24),
+    ("Last 24 hours", 1),
+    ("Last 7 days", 7),
+    ("Last 30 days", 30),
+]
+
+# Speed test results listed under the traffic summary
+RECENT_RESULTS = 20
+
+# File dialog filter of each export format
+EXPORT_FILTERS = {
+    "csv": "CSV (*.csv)",
+    "jsonl": "JSON Lines (*.jsonl)",
+    "parquet": "Parquet (*.parquet)",
+    "arrow": "Arrow IPC (*.arrow)",
+}
+
+
+def format_bytes(count):
+    """Human readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1000:
+            return f"{count:.1f} {unit}"
+        count /= 1000
+    return f"{count:.1f} TB"
+
+
+class HistoryDialog(QDialog):
+    """Chart and per-period summary of recorded traffic from the HistoryStore"""
+
+    export_finished = pyqtSignal(str)  # Message for the user
+
+    def __init__(self, history, interface=None, parent=None, results=None):
+        super().__init__(parent)
+        self.history = history
+        self.results = results  # Optional ResultsStore of past speed tests
+        self.setWindowTitle("Network History")
+        self.setMinimumWidth(720)
+        self.setup_ui(interface)
+        self.export_finished.connect(self.on_export_finished)
+        self.refresh()
+
+    def setup_ui(self, interface):
+        layout = QVBoxLayout(self)
+
+        interface_layout = QHBoxLayout()
+        interface_layout.addWidget(QLabel("Interface:"))
+        self.interface_combo = QComboBox()
+        self.interface_combo.addItem("All interfaces", None)
+        for name in self.history.interfaces:
+            self.interface_combo.addItem(name, name)
+        index = self.interface_combo.findData(interface)
+        self.interface_combo.setCurrentIndex(max(index, 0))
+        self.interface_combo.currentIndexChanged.connect(self.refresh)
+        interface_layout.addWidget(self.interface_combo, 1)
+        layout.addLayout(interface_layout)
+
+        self.chart = HistoryChart(self.history, self.interface_combo.currentData())
+        self.chart.setToolTip("Scroll to zoom, drag to pan, double-click for the last 24 hours")
+        layout.addWidget(self.chart, 1)
+
+        self.table = QTableWidget(len(HISTORY_PERIODS), 6)
+        self.table.setHorizontalHeaderLabels(["Period", "Avg Download", "Avg Upload",
+                                              "Peak Download", "Downloaded", "Uploaded"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.results_table = None
+        if self.results is not None:
+            layout.addWidget(QLabel("Recent speed tests:"))
+            self.results_table = QTableWidget(0, 5)
+            self.results_table.setHorizontalHeaderLabels(["Time", "Server", "Latency", "Download", "Upload"])
+            self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            self.results_table.verticalHeader().setVisible(False)
+            self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+            layout.addWidget(self.results_table)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        self.export_button = QPushButton("Export...")
+        export_menu = QMenu(self.export_button)
+        export_menu.addAction("Traffic in the chart range...", self.export_history)
+        if self.results is not None:
+            export_menu.addAction("Speed test results...", self.export_results)
+        self.export_button.setMenu(export_menu)
+        buttons.addButton(self.export_button, QDialogButtonBox.ActionRole)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def refresh(self):
+        """Recompute the summary of every period"""
+        interface = self.interface_combo.currentData()
+        self.chart.set_interface(interface)
+        for row, (label, days) in enumerate(HISTORY_PERIODS):
+            try:
+                start_ns, end_ns = day_range(days)
+                summary = self.history.summary(start_ns, end_ns, interface)
+            except Exception as e:
+                logging.exception(f"Error reading history: {e}")
+                continue
+            duration_s = days * 86400
+            cells = [
+                label,
+                format_rate(summary.mean_rx_bps(duration_s)),
+                format_rate(summary.mean_tx_bps(duration_s)),
+                format_rate(summary.peak_rx_bps),
+                format_bytes(summary.rx_bytes),
+                format_bytes(summary.tx_bytes),
+            ]
+            for column, text in enumerate(cells):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+
+        if self.results_table is not None:
+            self.refresh_results(interface)
+
+    def refresh_results(self, interface):
+        """List the latest speed test results; an indexed query, cheap enough for the GUI thread"""
+        try:
+            results = self.results.latest(RECENT_RESULTS, interface)
+        except Exception as e:
+            logging.exception(f"Error reading speed test results: {e}")
+            return
+        self.results_table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            cells = [
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(result.timestamp)),
+                result.server or result.backend,
+                f"{result.latency_ms:.0f} ms" if result.latency_ms is not None else "-",
+                f"{result.download_mbps:.2f} Mbps",
+                f"{result.upload_mbps:.2f} Mbps",
+            ]
+            for column, text in enumerate(cells):
+                self.results_table.setItem(row, column, QTableWidgetItem(text))
+
+    def _export_path(self, title, name):
+        """(path, format) chosen by the user, or (None, None) if cancelled"""
+        formats = {EXPORT_FILTERS[export_format]: export_format for export_format in available_formats()}
+        path, selected = QFileDialog.getSaveFileName(self, title, name, ";;".join(formats))
+        if not path:
+            return None, None
+        return path, format_for_path(path) or formats.get(selected, "csv")
+
+    def export_history(self):
+        """Export the raw records of the chart's time range and interface"""
+        path, export_format = self._export_path("Export Traffic", "traffic.csv")
+        if not path:
+            return
+        start_ns, end_ns = self.chart.view_range()
+        # Buffered records are written here, on the thread that appends them
+        self.history.flush()
+        rows = history_rows(self.history, start_ns, end_ns, self.interface_combo.currentData())
+        self._start_export(rows, HISTORY_FIELDS, path, export_format)
+
+    def export_results(self):
+        """Export every recorded speed test result"""
+        path, export_format = self._export_path("Export Speed Tests", "speed_tests.csv")
+        if not path:
+            return
+        self.results.flush()
+        self._start_export(result_rows(self.results, 0, time.time_ns() + 1), RESULT_FIELDS, path,
+                           export_format)
+
+    def _start_export(self, rows, fields, path, export_format):
+        """Stream rows to the file on a background thread"""
+        self.export_button.setEnabled(False)
+
+        def run():
+            try:
+                count = export_rows(rows, fields, path, export_format)
+                message = f"Exported {count} rows to {path}"
+            except Exception as e:
+                logging.exception(f"Export to {path} failed: {e}")
+                message = f"Export failed: {e}"
+            self.export_finished.emit(message)
+
+        threading.Thread(target=run, name="HistoryExport", daemon=True).start()
+
+    def on_export_finished(self, message):
+        self.export_button.setEnabled(True)
+        QMessageBox.information(self, "Export", message)
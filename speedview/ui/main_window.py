@@ -2,19 +2,24 @@ import sys
 import logging
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QMessageBox, QShortcut, 
                              QApplication, QAction)
-from PyQt5.QtSvg import QSvgWidget
 from PyQt5.QtCore import Qt, QTimer, QPoint
 from PyQt5.QtGui import QKeySequence, QMouseEvent, QIcon
 
-from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE, HISTORY_ICON_SVG
+from speedview.ui.resources.svg_templates import HISTORY_ICON_SVG
 from speedview.ui.settings_dialog import SettingsDialog
 from speedview.ui.system_tray import SystemTray
 from speedview.ui.floating_window import FloatingWindow
-from speedview.utils.svg_utils import (update_svg_speed, update_svg_connection_status,
-                                       update_svg_signal_strength)
+from speedview.ui.history_dialog import HistoryDialog
+from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE
+from speedview.utils.svg_utils import (MAIN_SVG_LAYERS, speed_slot_values, connection_slot_values,
+                                       signal_slot_values)
+from speedview.ui.svg_gauge import SvgGaugeWidget
+from speedview.ui.frame_state import FrameState
 from speedview.controllers.network_controller import NetworkController
 from speedview.controllers.speed_controller import SpeedController
 from speedview.models.settings import Settings
+from speedview.models.history import HistoryStore
+from speedview.models.results import ResultsStore
 from .update_dialog import UpdateDialog
 
 class MainWindow(QWidget):
@@ -24,6 +29,11 @@ class MainWindow(QWidget):
         self.speed_controller = speed_controller
         self.network_controller = network_controller
         self.floating_window = None
+
+        # Frame state shared by all signal handlers; rendered once per event-loop turn
+        self.frame_state = FrameState(max_speed=settings.max_speed,
+                                      show_upload=settings.show_upload_speed)
+        self._render_pending = False
         
         self.setup_ui()
         self.setup_connections()
@@ -35,14 +45,9 @@ class MainWindow(QWidget):
         self.drag_position = QPoint()
         self.last_speeds = (0.0, 0.0)  # (download, upload)
         
-        # Initial updates
+        # Initial updates; afterwards the display repaints when a new sample arrives
         self.update_connection_display()
         self.update_display()
-        
-        # Start update timer
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_display)
-        self.update_timer.start(2000)  # Update every 2 seconds for reduced CPU usage
 
     def setup_ui(self):
         """Initialize the user interface"""
@@ -55,8 +60,8 @@ class MainWindow(QWidget):
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(self.layout)
         
-        # SVG display
-        self.svg_widget = QSvgWidget()
+        # SVG display: static background plus live needle and text layers
+        self.svg_widget = SvgGaugeWidget(MAIN_SVG_TEMPLATE, MAIN_SVG_LAYERS)
         self.layout.addWidget(self.svg_widget)
         # Connect SVG click
         self.svg_widget.mousePressEvent = self.handle_svg_click
@@ -66,8 +71,7 @@ class MainWindow(QWidget):
         # Optionally, center or move the window if desired
         # self.move(self.settings.window_position)
         
-        # Load initial SVG
-        self.current_svg_template = MAIN_SVG_TEMPLATE
+        # Render initial frame
         self.update_display()
         logging.info("Finished setup_ui in MainWindow.")
 
@@ -100,37 +104,21 @@ class MainWindow(QWidget):
             self.tray.show()
 
     def update_display(self):
-        """Update all display elements"""
-        logging.info("Starting update_display in MainWindow...")
+        """Refresh all display elements from the controllers"""
         download_speed, upload_speed = self.speed_controller.get_current_speeds()
         self.last_speeds = (download_speed, upload_speed)
-        
-        # Update speed display
         display_speed = upload_speed if self.settings.show_upload_speed else download_speed
-        svg_content = update_svg_speed(
-            self.current_svg_template,
+
+        self.frame_state.update(
             speed=display_speed,
             max_speed=self.settings.max_speed,
-            show_upload=self.settings.show_upload_speed
-        )
-        
-        # Update connection status
-        status = self.network_controller.connection_status
-        svg_content = update_svg_connection_status(
-            svg_content,
-            status=status,
-            connection_type=self.network_controller.get_connection_info()[0]
+            show_upload=self.settings.show_upload_speed,
+            status=self.network_controller.connection_status,
+            connection_type=self.network_controller.get_connection_info()[0],
+            signal_strength=self.network_controller.signal_strength
         )
-        
-        # Update signal strength
-        strength = self.network_controller.signal_strength
-        svg_content = update_svg_signal_strength(svg_content, strength)
-        
-        # Load updated SVG
-        logging.info("Loading SVG into main window SVG widget...")
-        self.svg_widget.load(svg_content.encode('utf-8'))
-        logging.info("SVG loaded successfully in main window.")
-        
+        self.schedule_render()
+
         # Update tray icon if available
         if hasattr(self, 'tray') and self.tray:
             self.tray.update_icon(display_speed)
@@ -139,35 +127,54 @@ class MainWindow(QWidget):
         """Update only the speed display"""
         self.last_speeds = (download_speed, upload_speed)
         display_speed = upload_speed if self.settings.show_upload_speed else download_speed
-        
-        svg_content = update_svg_speed(
-            self.current_svg_template,
+
+        self.frame_state.update(
             speed=display_speed,
             max_speed=self.settings.max_speed,
             show_upload=self.settings.show_upload_speed
         )
-        self.svg_widget.load(svg_content.encode('utf-8'))
-        
+        self.schedule_render()
+
         if hasattr(self, 'tray') and self.tray:
             self.tray.update_icon(display_speed)
 
-    def update_connection_display(self):
+    def update_connection_display(self, *args):
         """Update connection status display"""
-        status = self.network_controller.connection_status
-        svg_content = update_svg_connection_status(
-            self.current_svg_template,
-            status=status,
+        self.frame_state.update(
+            status=self.network_controller.connection_status,
             connection_type=self.network_controller.get_connection_info()[0]
         )
-        self.svg_widget.load(svg_content.encode('utf-8'))
+        self.schedule_render()
 
     def update_signal_strength(self, strength):
         """Update signal strength indicator"""
-        svg_content = update_svg_signal_strength(
-            self.current_svg_template,
-            strength=strength
-        )
-        self.svg_widget.load(svg_content.encode('utf-8'))
+        self.frame_state.update(signal_strength=strength)
+        self.schedule_render()
+
+    def schedule_render(self):
+        """Coalesce pending state changes into a single render on the next event-loop turn"""
+        if self._render_pending or not self.frame_state.dirty:
+            return
+        self._render_pending = True
+        QTimer.singleShot(0, self.render_frame)
+
+    def render_frame(self):
+        """Push the dirty parts of the frame state to the gauge widget"""
+        self._render_pending = False
+        dirty = self.frame_state.take_dirty()
+        if not dirty:
+            return
+
+        state = self.frame_state
+        # Only reformat the slots whose fields changed
+        values = {}
+        if dirty & {"speed", "max_speed", "show_upload"}:
+            values.update(speed_slot_values(state.speed, state.max_speed, state.show_upload))
+        if dirty & {"status", "connection_type"}:
+            values.update(connection_slot_values(state.status, state.connection_type))
+        if "signal_strength" in dirty:
+            values.update(signal_slot_values(state.signal_strength))
+        self.svg_widget.set_values(values)
 
     def handle_svg_click(self, event: QMouseEvent):
         """Handle clicks on the SVG widget, mapping widget coordinates to SVG coordinates for button detection."""
@@ -209,6 +216,11 @@ class MainWindow(QWidget):
 
     def apply_settings_changes(self):
         """Apply changes from settings dialog"""
+        # Update sampling cadence
+        self.speed_controller.set_update_interval(self.settings.update_interval)
+        self.speed_controller.set_sampling_rates(self.settings.sample_hz, self.settings.render_hz)
+        self.speed_controller.configure_schedule()
+
         # Update tray icon if needed
         if self.settings.minimize_to_tray and not hasattr(self, 'tray'):
             self.init_system_tray()
@@ -221,9 +233,7 @@ class MainWindow(QWidget):
 
     def test_network(self):
         """Start a network speed test"""
-        if not self.speed_controller.test_in_progress:
-            self.speed_controller.run_speed_test()
-        else:
+        if not self.speed_controller.run_speed_test():
             QMessageBox.information(self, "Test Running", 
                                  "A speed test is already in progress.")
 
@@ -261,7 +271,6 @@ class MainWindow(QWidget):
 
     def closeEvent(self, event):
         """Handle window close event"""
-        self.update_timer.stop()
         self.settings.window_size = self.size()
         self.settings.window_position = self.pos()
         self.settings.save()
@@ -278,27 +287,31 @@ class MainWindow(QWidget):
 
     def check_for_updates(self):
         """Check for software updates"""
-        update_dialog = UpdateDialog(self)
+        update_dialog = UpdateDialog(self, settings=self.settings)
         update_dialog.exec_()
         
     def show_history(self):
-        """Show speed test history"""
-        logging.info("Showing speed test history")
-        # This is a placeholder for the history feature
-        # In the future, this will show a dialog with historical speed test data
-        QMessageBox.information(
-            self,
-            "Speed Test History",
-            "Speed test history feature will be implemented in a future update."
-        )
+        """Show recorded network history"""
+        logging.info("Showing network history")
+        history = getattr(self.speed_controller, 'history', None)
+        if history is None:
+            QMessageBox.information(self, "Network History", "History recording is not enabled.")
+            return
+        dialog = HistoryDialog(history, interface=self.settings.selected_interface, parent=self,
+                               results=self.speed_controller.results)
+        dialog.exec_()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     
     # Use real controllers
     settings = Settings()
-    speed_controller = SpeedController(settings)
-    network_controller = NetworkController()
+    results = ResultsStore()
+    speed_controller = SpeedController(settings, history=HistoryStore(
+        retention_days=settings.history_retention_days), results=results)
+    app.aboutToQuit.connect(speed_controller.history.close)
+    app.aboutToQuit.connect(results.close)
+    network_controller = NetworkController(results=results)
     
     window = MainWindow(settings, speed_controller, network_controller)
     window.show()
@@ -128,20 +128,12 @@ MAIN_SVG_TEMPLATE = """
     <circle cx="30" cy="30" r="3" fill="#00F0FF"/>
   </g>
 
-  <!-- Signal strength indicator with animated bars -->
+  <!-- Signal strength indicator -->
   <g id="signalStrength" transform="translate(380 70)">
-    <rect x="0" y="0" width="5" height="15" rx="1" fill="#00F0FF" opacity="0.3" class="signal-bar">
-      <animate attributeName="opacity" values="0.3;1;0.3" dur="2s" begin="0s" repeatCount="indefinite" />
-    </rect>
-    <rect x="8" y="-5" width="5" height="20" rx="1" fill="#00F0FF" opacity="0.5" class="signal-bar">
-      <animate attributeName="opacity" values="0.5;1;0.5" dur="2s" begin="0.5s" repeatCount="indefinite" />
-    </rect>
-    <rect x="16" y="-10" width="5" height="25" rx="1" fill="#00F0FF" opacity="0.7" class="signal-bar">
-      <animate attributeName="opacity" values="0.7;1;0.7" dur="2s" begin="1s" repeatCount="indefinite" />
-    </rect>
-    <rect x="24" y="-15" width="5" height="30" rx="1" fill="#00F0FF" opacity="0.9" class="signal-bar">
-      <animate attributeName="opacity" values="0.9;1;0.9" dur="2s" begin="1.5s" repeatCount="indefinite" />
-    </rect>
+    <rect x="0" y="0" width="5" height="15" rx="1" fill="#00F0FF" opacity="0.3" class="signal-bar" />
+    <rect x="8" y="-5" width="5" height="20" rx="1" fill="#00F0FF" opacity="0.5" class="signal-bar" />
+    <rect x="16" y="-10" width="5" height="25" rx="1" fill="#00F0FF" opacity="0.7" class="signal-bar" />
+    <rect x="24" y="-15" width="5" height="30" rx="1" fill="#00F0FF" opacity="0.9" class="signal-bar" />
   </g>
 
   <!-- Connection status indicator -->
@@ -264,17 +256,11 @@ FLOATING_SVG_TEMPLATE = """
     <text id="speedValue" x="60" y="45" font-family="Arial, sans-serif" font-size="24" font-weight="bold" fill="url(#speedTextGradient)" text-anchor="middle" filter="url(#glow)">54.2</text>
     <text x="60" y="65" font-family="Arial, sans-serif" font-size="14" fill="#00FF8F" text-anchor="middle" opacity="0.8">Mbps</text>
     
-    <!-- Signal strength with animated bars -->
+    <!-- Signal strength bars -->
     <g transform="translate(130, 30)">
-      <rect x="0" y="10" width="5" height="10" rx="2" fill="#00FF8F" opacity="0.4">
-        <animate attributeName="opacity" values="0.4;1;0.4" dur="2s" begin="0s" repeatCount="indefinite" />
-      </rect>
-      <rect x="10" y="5" width="5" height="15" rx="2" fill="#00FF8F" opacity="0.6">
-        <animate attributeName="opacity" values="0.6;1;0.6" dur="2s" begin="0.5s" repeatCount="indefinite" />
-      </rect>
-      <rect x="20" y="0" width="5" height="20" rx="2" fill="#00FF8F" opacity="0.8">
-        <animate attributeName="opacity" values="0.8;1;0.8" dur="2s" begin="1s" repeatCount="indefinite" />
-      </rect>
+      <rect x="0" y="10" width="5" height="10" rx="2" fill="#00FF8F" opacity="0.4" />
+      <rect x="10" y="5" width="5" height="15" rx="2" fill="#00FF8F" opacity="0.6" />
+      <rect x="20" y="0" width="5" height="20" rx="2" fill="#00FF8F" opacity="0.8" />
       <rect x="30" y="-5" width="5" height="25" rx="2" fill="#00FF8F" opacity="0.3" />
     </g>
     
@@ -1,19 +1,24 @@
 from PyQt5.QtWidgets import (QDialog, QFormLayout, QLineEdit, QCheckBox, QComboBox, 
                             QDialogButtonBox, QMessageBox, QGroupBox, QVBoxLayout, 
-                            QSpinBox, QDoubleSpinBox, QLabel, QMenuBar, QMenu, QAction, QPushButton, QHBoxLayout)
+                            QSpinBox, QDoubleSpinBox, QLabel, QMenuBar, QMenu, QAction, QPushButton, QHBoxLayout,
+                            QTableWidget, QTableWidgetItem, QHeaderView)
 from PyQt5.QtCore import Qt
 import psutil
 
+from speedview.config.config import (MAX_SAMPLE_HZ, MIN_RENDER_HZ, MAX_RENDER_HZ, MAX_SPEED_TEST_STREAMS,
+                                     SPEED_TEST_BACKENDS)
+from speedview.controllers.rate import format_rate
+
+# Labels of the SPEED_TEST_BACKENDS (see controllers/speed_test.py)
+SPEED_TEST_BACKEND_LABELS = {"auto": "Automatic", "http": "Built-in (LibreSpeed server)"}
+
 from speedview.config.config import APP_VERSION  # For network interface detection
-from speedview.update.version_checker import VersionChecker  # Adjust the import path as necessary
-from speedview.update.updater import UpdateChecker
 class SettingsDialog(QDialog):
     def __init__(self, parent=None, settings=None):
         super().__init__(parent)
         if settings is None:
             raise ValueError("Settings object must be provided")
         self.settings = settings
-        self.updater = UpdateChecker()
         self.setup_ui()
 
     def setup_ui(self):
@@ -99,24 +104,9 @@ A real-time network speed monitoring tool.
 Licensed under MIT""")
 
     def check_updates(self):
-        """Check for software updates"""
-        try:
-            version_checker = VersionChecker(APP_VERSION)  # Use the current app version
-            has_update = version_checker.check_for_updates()
-            
-            if has_update:
-                reply = QMessageBox.question(self, "Update Available",
-                    "A new version is available. Would you like to update now?",
-                    QMessageBox.Yes | QMessageBox.No)
-                
-                if reply == QMessageBox.Yes:
-                    self.start_update()  # Implement the update logic
-            else:
-                QMessageBox.information(self, "Up to Date",
-                    "You are running the latest version.")
-        except Exception as e:
-            QMessageBox.warning(self, "Update Check Failed",
-                f"Could not check for updates:\n{str(e)}")
+        """Check for software updates; the check runs on a worker inside the dialog"""
+        from speedview.ui.update_dialog import UpdateDialog
+        UpdateDialog(self, settings=self.settings).exec_()
 
     def create_monitoring_group(self):
         """Create monitoring settings group."""
@@ -144,6 +134,20 @@ Licensed under MIT""")
         
         self.refresh_interfaces()  # Load initial interfaces
         layout.addRow("Network Interface:", interface_layout)
+
+        # Live per-interface rates from the speed controller, if the parent has one
+        self.interface_table = QTableWidget(0, 3)
+        self.interface_table.setHorizontalHeaderLabels(["Interface", "Download", "Upload"])
+        self.interface_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.interface_table.verticalHeader().setVisible(False)
+        self.interface_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.interface_table.setMaximumHeight(140)
+        layout.addRow("Interface Rates:", self.interface_table)
+        self.speed_controller = getattr(self.parent(), 'speed_controller', None)
+        if hasattr(self.speed_controller, 'interface_rates_updated'):
+            self.update_interface_table(getattr(self.speed_controller, 'last_interface_rates', []))
+            self.speed_controller.interface_rates_updated.connect(self.update_interface_table)
+            self.finished.connect(self._disconnect_interface_rates)
         
         # Max Speed
         self.max_speed_input = QSpinBox()
@@ -172,6 +176,67 @@ Licensed under MIT""")
         self.update_interval_input.setSingleStep(0.5)
         self.update_interval_input.setToolTip("How often to update the speed display")
         layout.addRow("Update Interval:", self.update_interval_input)
+
+        # High-frequency sampling with a separate render rate
+        self.sample_hz_input = QSpinBox()
+        self.sample_hz_input.setRange(0, MAX_SAMPLE_HZ)
+        self.sample_hz_input.setSuffix(" Hz")
+        self.sample_hz_input.setSpecialValueText("Off")
+        self.sample_hz_input.setToolTip("Sample counters in the background at this rate to catch short bursts")
+        layout.addRow("Sample Rate:", self.sample_hz_input)
+
+        self.render_hz_input = QDoubleSpinBox()
+        self.render_hz_input.setRange(MIN_RENDER_HZ, MAX_RENDER_HZ)
+        self.render_hz_input.setSuffix(" Hz")
+        self.render_hz_input.setSingleStep(0.5)
+        self.render_hz_input.setToolTip("How often the display is redrawn while high-frequency sampling is on")
+        layout.addRow("Render Rate:", self.render_hz_input)
+
+        # Prometheus/OpenMetrics endpoint
+        self.metrics_enabled_checkbox = QCheckBox("Serve metrics for Prometheus")
+        self.metrics_enabled_checkbox.setToolTip("Serve live rates and speed test results at /metrics")
+        layout.addRow(self.metrics_enabled_checkbox)
+
+        self.metrics_port_input = QSpinBox()
+        self.metrics_port_input.setRange(1, 65535)
+        self.metrics_port_input.setToolTip("Port of the metrics endpoint")
+        self.metrics_enabled_checkbox.toggled.connect(self.metrics_port_input.setEnabled)
+        layout.addRow("Metrics Port:", self.metrics_port_input)
+
+        self.stream_enabled_checkbox = QCheckBox("Share live rates with local tools")
+        self.stream_enabled_checkbox.setToolTip("Let other programs, such as 'main.py watch', read the rates "
+                                                "without sampling the counters themselves")
+        layout.addRow(self.stream_enabled_checkbox)
+
+        # Speed test engine
+        self.speed_test_backend_combo = QComboBox()
+        for backend in SPEED_TEST_BACKENDS:
+            self.speed_test_backend_combo.addItem(SPEED_TEST_BACKEND_LABELS.get(backend, backend), backend)
+        self.speed_test_backend_combo.setToolTip("Service that measures speed tests")
+        layout.addRow("Speed Test:", self.speed_test_backend_combo)
+
+        self.speed_test_url_input = QLineEdit()
+        self.speed_test_url_input.setPlaceholderText("https://librespeed.example.com/backend/")
+        self.speed_test_url_input.setToolTip("LibreSpeed-compatible server for the built-in engine")
+        layout.addRow("Speed Test Server:", self.speed_test_url_input)
+
+        self.speed_test_streams_input = QSpinBox()
+        self.speed_test_streams_input.setRange(1, MAX_SPEED_TEST_STREAMS)
+        self.speed_test_streams_input.setToolTip("Parallel connections; more are needed to fill fast links")
+        layout.addRow("Speed Test Streams:", self.speed_test_streams_input)
+
+        self.speed_test_schedule_input = QLineEdit()
+        self.speed_test_schedule_input.setPlaceholderText("Off, @hourly, @every 30m or 0 */6 * * *")
+        self.speed_test_schedule_input.setToolTip("Run speed tests automatically and store the results; "
+                                                  "skipped while the link is busy")
+        layout.addRow("Scheduled Tests:", self.speed_test_schedule_input)
+
+        self.speed_test_budget_input = QSpinBox()
+        self.speed_test_budget_input.setRange(0, 1000000)
+        self.speed_test_budget_input.setSuffix(" MB")
+        self.speed_test_budget_input.setSpecialValueText("Unlimited")
+        self.speed_test_budget_input.setToolTip("Speed test traffic per day above which scheduled tests are skipped")
+        layout.addRow("Daily Test Budget:", self.speed_test_budget_input)
         
         group.setLayout(layout)
         self.layout.addWidget(group)
@@ -211,6 +276,23 @@ Licensed under MIT""")
             print(f"Error refreshing interfaces: {e}")
             self.network_interface_combo.addItem("No interfaces found")
 
+    def update_interface_table(self, table):
+        """Show the latest rate of every interface"""
+        self.interface_table.setRowCount(len(table))
+        for row, rate in enumerate(table):
+            for column, text in enumerate((rate.interface, format_rate(rate.rx_bps), format_rate(rate.tx_bps))):
+                item = self.interface_table.item(row, column)
+                if item is None:
+                    self.interface_table.setItem(row, column, QTableWidgetItem(text))
+                else:
+                    item.setText(text)
+
+    def _disconnect_interface_rates(self):
+        try:
+            self.speed_controller.interface_rates_updated.disconnect(self.update_interface_table)
+        except (TypeError, RuntimeError):
+            pass
+
     def create_behavior_group(self):
         """Create application behavior group."""
         group = QGroupBox("Application Behavior")
@@ -296,6 +378,18 @@ Licensed under MIT""")
         self.max_speed_input.setValue(self.settings.max_speed)
         self.max_upload_input.setValue(self.settings.max_upload)
         self.update_interval_input.setValue(self.settings.update_interval)
+        self.sample_hz_input.setValue(int(self.settings.sample_hz))
+        self.render_hz_input.setValue(self.settings.render_hz)
+        self.metrics_enabled_checkbox.setChecked(self.settings.metrics_enabled)
+        self.metrics_port_input.setValue(self.settings.metrics_port)
+        self.metrics_port_input.setEnabled(self.settings.metrics_enabled)
+        self.stream_enabled_checkbox.setChecked(self.settings.stream_enabled)
+        index = self.speed_test_backend_combo.findData(self.settings.speed_test_backend)
+        self.speed_test_backend_combo.setCurrentIndex(max(index, 0))
+        self.speed_test_url_input.setText(self.settings.speed_test_url)
+        self.speed_test_streams_input.setValue(self.settings.speed_test_streams)
+        self.speed_test_schedule_input.setText(self.settings.speed_test_schedule)
+        self.speed_test_budget_input.setValue(int(self.settings.speed_test_daily_budget_mb))
         self.speed_unit_combo.setCurrentText(self.settings.speed_unit)
         self.auto_select_checkbox.setChecked(self.settings.selected_interface is None)
         # Set network interface selection
@@ -375,6 +469,16 @@ Licensed under MIT""")
         self.settings.max_speed = self.max_speed_input.value()
         self.settings.max_upload = self.max_upload_input.value()
         self.settings.update_interval = self.update_interval_input.value()
+        self.settings.sample_hz = self.sample_hz_input.value()
+        self.settings.render_hz = self.render_hz_input.value()
+        self.settings.metrics_enabled = self.metrics_enabled_checkbox.isChecked()
+        self.settings.metrics_port = self.metrics_port_input.value()
+        self.settings.stream_enabled = self.stream_enabled_checkbox.isChecked()
+        self.settings.speed_test_backend = self.speed_test_backend_combo.currentData()
+        self.settings.speed_test_url = self.speed_test_url_input.text().strip()
+        self.settings.speed_test_streams = self.speed_test_streams_input.value()
+        self.settings.speed_test_schedule = self.speed_test_schedule_input.text().strip()
+        self.settings.speed_test_daily_budget_mb = self.speed_test_budget_input.value()
         self.settings.speed_unit = self.speed_unit_combo.currentText()
         self.settings.start_minimized = self.start_minimized_checkbox.isChecked()
         self.settings.minimize_to_tray = self.minimize_to_tray_checkbox.isChecked()
@@ -390,6 +494,16 @@ Licensed under MIT""")
         self.settings.max_speed = self.max_speed_input.value()
         self.settings.max_upload = self.max_upload_input.value()
         self.settings.update_interval = self.update_interval_input.value()
+        self.settings.sample_hz = self.sample_hz_input.value()
+        self.settings.render_hz = self.render_hz_input.value()
+        self.settings.metrics_enabled = self.metrics_enabled_checkbox.isChecked()
+        self.settings.metrics_port = self.metrics_port_input.value()
+        self.settings.stream_enabled = self.stream_enabled_checkbox.isChecked()
+        self.settings.speed_test_backend = self.speed_test_backend_combo.currentData()
+        self.settings.speed_test_url = self.speed_test_url_input.text().strip()
+        self.settings.speed_test_streams = self.speed_test_streams_input.value()
+        self.settings.speed_test_schedule = self.speed_test_schedule_input.text().strip()
+        self.settings.speed_test_daily_budget_mb = self.speed_test_budget_input.value()
         self.settings.speed_unit = self.speed_unit_combo.currentText()
         self.settings.selected_interface = self.network_interface_combo.currentText() if not self.auto_select_checkbox.isChecked() else None
         self.settings.start_minimized = self.start_minimized_checkbox.isChecked()
@@ -432,16 +546,3 @@ Licensed under MIT""")
         backup_path = f"settings_backup_{int(time.time())}.json"
         with open(backup_path, 'w') as f:
             json.dump(self.settings.__dict__, f, indent=4)
-
-    def start_update(self):
-        """Start the update process"""
-        if self.updater.check_for_updates():
-            # Logic to download and install the update
-            update_file = self.updater.download_update()
-            if update_file:
-                QMessageBox.information(self, "Update Downloaded", "The update has been downloaded. It will be installed now.")
-                self.updater.install_update(update_file)
-            else:
-                QMessageBox.warning(self, "Update Failed", "Failed to download the update.")
-        else:
-            QMessageBox.information(self, "No Updates", "You are already using the latest version.")
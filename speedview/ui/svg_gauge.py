@@ -0,0 +1,170 @@
+import re
+import logging
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtSvg import QSvgRenderer
+from PyQt5.QtCore import Qt, QByteArray, QRectF, QPointF
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QFont, QFontMetricsF
+
+from speedview.utils.svg_template import (split_layers, parse_attributes, parse_translate,
+                                          resolve_paint)
+
+
+class _NeedleLayer:
+    """Group kept in a resident renderer and rotated with the painter transform"""
+
+    def __init__(self, layer, fragment, template, view_box):
+        attrs = parse_attributes(fragment)
+        rotate = re.match(r'rotate\(\s*([-\d.]+)[\s,]+([-\d.]+)[\s,]+([-\d.]+)', attrs.get("transform", ""))
+        self.angle, cx, cy = (float(v) for v in rotate.groups()) if rotate else (0.0, 0.0, 0.0)
+        self.center = (cx, cy)
+        self.slot = layer.bindings["rotate"]
+        self.view_box = view_box
+
+        # Parse the needle once, unrotated, together with the template's defs
+        defs = re.search(r'<defs>.*?</defs>', template, re.DOTALL)
+        unrotated = re.sub(r'\s*transform="rotate\([^"]*\)"', '', fragment, count=1)
+        document = (f'<svg viewBox="0 0 {view_box.width():g} {view_box.height():g}" '
+                    f'xmlns="http://www.w3.org/2000/svg">{defs.group(0) if defs else ""}{unrotated}</svg>')
+        self.renderer = QSvgRenderer(QByteArray(document.encode('utf-8')))
+
+    def paint(self, painter, values):
+        angle = values.get(self.slot)
+        angle = float(angle) if angle is not None else self.angle
+        painter.save()
+        painter.translate(*self.center)
+        painter.rotate(angle)
+        painter.translate(-self.center[0], -self.center[1])
+        self.renderer.render(painter, self.view_box)
+        painter.restore()
+
+
+class _TextLayer:
+    """Text node drawn directly with QPainter"""
+
+    def __init__(self, layer, fragment, template):
+        attrs = parse_attributes(fragment)
+        self.position = QPointF(float(attrs.get("x", 0)), float(attrs.get("y", 0)))
+        self.anchor = attrs.get("text-anchor", "start")
+        self.opacity = float(attrs.get("opacity", 1))
+        self.fill = resolve_paint(template, attrs.get("fill", "#000000"))
+        self.text = re.search(r'>([^<]*)</text>', fragment).group(1)
+        self.text_slot = layer.bindings.get("text")
+        self.fill_slot = layer.bindings.get("fill")
+
+        family = attrs.get("font-family", "Arial").split(",")[0].strip()
+        self.font = QFont(family)
+        self.font.setPixelSize(int(float(attrs.get("font-size", 16))))
+        self.font.setBold(attrs.get("font-weight") == "bold")
+        self.metrics = QFontMetricsF(self.font)
+
+    def paint(self, painter, values):
+        text = values.get(self.text_slot, self.text)
+        fill = values.get(self.fill_slot, self.fill)
+        x = self.position.x()
+        if self.anchor == "middle":
+            x -= self.metrics.horizontalAdvance(text) / 2
+        elif self.anchor == "end":
+            x -= self.metrics.horizontalAdvance(text)
+        painter.setOpacity(self.opacity)
+        painter.setFont(self.font)
+        painter.setPen(QColor(fill))
+        painter.drawText(QPointF(x, self.position.y()), text)
+        painter.setOpacity(1.0)
+
+
+class _RectGroupLayer:
+    """Group of rects (signal bars) whose attributes are bound to slots"""
+
+    def __init__(self, layer, fragment, template):
+        self.offset = parse_translate(parse_attributes(fragment).get("transform"))
+        self.rects = [parse_attributes(tag) for tag in re.findall(r'<rect\b[^>]*>', fragment)]
+        for rect in self.rects:
+            rect["fill"] = resolve_paint(template, rect.get("fill", "#000000"))
+        self.bindings = layer.bindings
+
+    def paint(self, painter, values):
+        painter.save()
+        painter.translate(*self.offset)
+        painter.setPen(Qt.NoPen)
+        for index, rect in enumerate(self.rects):
+            attrs = dict(rect)
+            for attribute, slots in self.bindings.items():
+                if index < len(slots) and slots[index] in values:
+                    attrs[attribute] = values[slots[index]]
+            radius = float(attrs.get("rx", 0))
+            painter.setOpacity(float(attrs.get("opacity", 1)))
+            painter.setBrush(QColor(attrs["fill"]))
+            painter.drawRoundedRect(
+                QRectF(float(attrs.get("x", 0)), float(attrs.get("y", 0)),
+                       float(attrs.get("width", 0)), float(attrs.get("height", 0))),
+                radius, radius
+            )
+        painter.restore()
+
+
+class SvgGaugeWidget(QWidget):
+    """Draws an SVG template as a cached static background plus live dynamic layers.
+
+    The template is parsed once. The background (dial, ticks, gradients and
+    buttons) is rasterised once per widget size; each frame only repaints the
+    needle transform and the text and signal bar values on top of it.
+    Frames are only painted when values change, so SMIL ``<animate>``
+    elements are not played; the gauge templates have none.
+    """
+
+    def __init__(self, template, layers, parent=None):
+        super().__init__(parent)
+        static, fragments = split_layers(template, layers)
+        self._background_renderer = QSvgRenderer(QByteArray(static.encode('utf-8')))
+        self._background = None
+        self._view_box = self._background_renderer.viewBoxF()
+        self._values = {}
+
+        self._layers = []
+        for layer in layers:
+            fragment = fragments[layer.name]
+            if "rotate" in layer.bindings:
+                self._layers.append(_NeedleLayer(layer, fragment, template, self._view_box))
+            elif "text" in layer.bindings:
+                self._layers.append(_TextLayer(layer, fragment, template))
+            else:
+                self._layers.append(_RectGroupLayer(layer, fragment, template))
+
+    def set_values(self, values):
+        """Update slot values and schedule a repaint of the dynamic layers"""
+        self._values.update(values)
+        self.update()
+
+    def sizeHint(self):
+        return self._background_renderer.defaultSize()
+
+    def resizeEvent(self, event):
+        # The background is rasterised again at the new size on the next paint
+        self._background = None
+        super().resizeEvent(event)
+
+    def _rasterise_background(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        self._background_renderer.render(painter, QRectF(0, 0, self.width(), self.height()))
+        painter.end()
+        logging.debug(f"Rasterised gauge background at {self.width()}x{self.height()}")
+        return pixmap
+
+    def paintEvent(self, event):
+        if self._background is None:
+            self._background = self._rasterise_background()
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        # Draw the dynamic layers in SVG viewBox coordinates
+        painter.scale(self.width() / self._view_box.width(), self.height() / self._view_box.height())
+        painter.translate(-self._view_box.x(), -self._view_box.y())
+        for layer in self._layers:
+            layer.paint(painter, self._values)
+        painter.end()
@@ -1,14 +1,28 @@
+import heapq
 from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QFont, QFontMetrics
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication
+from speedview.controllers.rate import format_rate
+
+# Number of interfaces listed in the tooltip
+TOOLTIP_INTERFACES = 3
 
 class SystemTray:
     def __init__(self, main_window):
         self.main_window = main_window
         self.last_speed = 0
+        self.interface_rates = []
+        self.window_stats = None
         self.setup_tray()
 
+        # Per-NIC rates for the tooltip
+        speed_controller = getattr(self.main_window, 'speed_controller', None)
+        if hasattr(speed_controller, 'interface_rates_updated'):
+            speed_controller.interface_rates_updated.connect(self.update_interface_rates)
+        if hasattr(speed_controller, 'window_stats_updated'):
+            speed_controller.window_stats_updated.connect(self.update_window_stats)
+
     def setup_tray(self):
         """Create the system tray icon and menu."""
         self.tray_icon = QSystemTrayIcon(self.main_window)
@@ -81,14 +95,35 @@ class SystemTray:
         icon = self.create_dynamic_icon(speed)
         self.tray_icon.setIcon(icon)
         
-        # Enhanced tooltip with more information
-        tooltip = (
-            f"Network Speed Monitor\n"
-            f"Current Speed: {speed:.2f} Mbps\n"
-            f"Status: {'Active' if speed > 0 else 'Idle'}\n"
-            f"Double-click to show/hide"
-        )
-        self.tray_icon.setToolTip(tooltip)
+        self.update_tooltip()
+
+    def update_interface_rates(self, table):
+        """Store the latest per-interface rates and refresh the tooltip."""
+        self.interface_rates = table
+        self.update_tooltip()
+
+    def update_window_stats(self, rx_stats, tx_stats):
+        """Store the download and upload stats of the last render window."""
+        self.window_stats = (rx_stats, tx_stats)
+
+    def update_tooltip(self):
+        """Tooltip with the current speed and the busiest interfaces."""
+        speed = self.last_speed
+        lines = [
+            "Network Speed Monitor",
+            f"Current Speed: {speed:.2f} Mbps",
+            f"Status: {'Active' if speed > 0 else 'Idle'}",
+        ]
+        if self.window_stats and self.window_stats[0].samples > 1:
+            # High-frequency sampling: show bursts within the window
+            for label, stats in zip(("Down", "Up"), self.window_stats):
+                lines.append(f"{label} peak: {format_rate(stats.peak_bps)}, p95: {format_rate(stats.p95_bps)}")
+        busiest = heapq.nlargest(TOOLTIP_INTERFACES, self.interface_rates,
+                                 key=lambda rate: rate.rx_bps + rate.tx_bps)
+        for rate in busiest:
+            lines.append(f"{rate.interface}: \u2193{format_rate(rate.rx_bps)} \u2191{format_rate(rate.tx_bps)}")
+        lines.append("Double-click to show/hide")
+        self.tray_icon.setToolTip("\n".join(lines))
 
     def tray_icon_activated(self, reason):
         """Handle tray icon activation with more interaction options."""
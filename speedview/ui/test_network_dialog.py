@@ -6,6 +6,13 @@ from PyQt5.QtGui import QKeySequence
 from speedview.utils.svg_utils import update_test_network_svg
 from speedview.ui.resources.svg_templates import TEST_NETWORK_SVG
 
+# Status line while a phase of the speed test runs
+PHASE_STATUS = {
+    "latency": "Measuring latency...",
+    "download": "Testing download...",
+    "upload": "Testing upload...",
+}
+
 class TestNetworkDialog(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -68,6 +75,20 @@ class TestNetworkDialog(QWidget):
         self.status = status
         self.update_display()
 
+    def show_progress(self, batch):
+        """Show a batch of SpeedTestProgress items; the SVG is rebuilt once per batch, not per item"""
+        for item in batch:
+            self.status = PHASE_STATUS.get(item.phase, self.status)
+            if item.value is None:
+                continue
+            if item.phase == "download":
+                self.download_speed = item.value
+            elif item.phase == "upload":
+                self.upload_speed = item.value
+            elif item.phase == "latency":
+                self.status = f"Latency {item.value:.1f} ms"
+        self.update_display()
+
     def show_results(self, download_speed, upload_speed):
         """Display the test results in the SVG dialog."""
         status = "Test Complete!"
@@ -1,4 +1,4 @@
-from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QProgressBar, 
+from PyQt5.QtWidgets import (QApplication, QDialog, QVBoxLayout, QProgressBar, 
                            QLabel, QPushButton, QMessageBox)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from ..update.updater import UpdateChecker
@@ -20,16 +20,33 @@ class UpdateWorker(QThread):
             if update_file:
                 self.finished.emit(update_file)
             else:
-                self.error.emit("Failed to download update")
+                self.error.emit(self.updater.last_error or "Failed to download update")
         except Exception as e:
             self.error.emit(str(e))
 
+class UpdateCheckThread(QThread):
+    """Runs UpdateChecker.check_for_updates off the GUI thread"""
+    checked = pyqtSignal(bool)  # update available
+
+    def __init__(self, updater=None, force=False, parent=None):
+        super().__init__(parent)
+        self.updater = updater or UpdateChecker()
+        self.force = force
+
+    def run(self):
+        self.checked.emit(self.updater.check_for_updates(force=self.force))
+
 class UpdateDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, updater=None, settings=None):
         super().__init__(parent)
-        self.updater = UpdateChecker()
+        # An updater that has already checked (e.g. by UpdateCheckThread) is not asked again
+        self.updater = updater or UpdateChecker(settings)
+        self.check_thread = None
         self.init_ui()
-        self.check_for_updates()
+        if updater is None:
+            self.check_for_updates()
+        else:
+            self.show_update_status(updater.update_available)
 
     def init_ui(self):
         self.setWindowTitle("Software Update")
@@ -53,16 +70,26 @@ class UpdateDialog(QDialog):
         self.setLayout(layout)
 
     def check_for_updates(self):
-        if self.updater.check_for_updates():
+        """Ask the release feed on a worker; the dialog stays responsive meanwhile"""
+        # Parented to the application, so closing the dialog never destroys a running thread
+        app = QApplication.instance()
+        self.check_thread = UpdateCheckThread(self.updater, force=True, parent=app)
+        self.check_thread.checked.connect(self.show_update_status)
+        app.aboutToQuit.connect(self.check_thread.wait)
+        self.check_thread.start()
+
+    def show_update_status(self, update_available):
+        if update_available:
             self.status_label.setText(
                 f"New version {self.updater.latest_version} is available!\n"
                 f"Current version: {self.updater.current_version}\n\n"
                 f"Release Notes:\n{self.updater.release_notes}"
             )
             self.update_button.show()
+        elif self.updater.last_error:
+            self.status_label.setText(f"Could not check for updates:\n{self.updater.last_error}")
         else:
             self.status_label.setText("You have the latest version!")
-            self.close()
 
     def start_update(self):
         self.update_button.setEnabled(False)
@@ -0,0 +1,174 @@
+"""Resumable, hash-verified download of update installers.
+
+Bytes go to a ``.part`` file next to the destination. When the connection
+drops, the next attempt asks for the rest with an HTTP Range request instead
+of starting over; a partial file left by an earlier run is resumed the same
+way. The SHA-256 is computed while the bytes stream in and checked against
+the published digest before the file is renamed into place.
+
+Chunk sizes adapt to the link: a read that returns quickly doubles the next
+one, a slow read halves it, so a fast link is not paced by tiny reads and a
+slow one still reports progress. Progress callbacks are throttled to
+PROGRESS_INTERVAL, because each one becomes a queued signal on the GUI thread.
+
+No Qt here; UpdateWorker calls this from its thread.
+"""
+import os
+import time
+import hashlib
+import logging
+
+import requests
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+TIMEOUT = (3.05, 30)  # Seconds to connect and between bytes
+ATTEMPTS = 5
+RETRY_DELAY = 0.5  # Seconds before the first retry; doubles per retry
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+TARGET_READ_TIME = 0.25  # Seconds one read should take
+PROGRESS_INTERVAL = 0.1  # Seconds between progress callbacks
+HASH_BLOCK = 1024 * 1024
+
+
+class DownloadError(Exception):
+    """The download failed for good, or its digest did not match"""
+
+
+def parse_digest(digest):
+    """Hex SHA-256 from "sha256:<hex>" or a bare hex digest; None for other algorithms"""
+    if not digest:
+        return None
+    algorithm, _, value = digest.strip().rpartition(":")
+    value = value.lower()
+    if algorithm.lower() not in ("", "sha256") or len(value) != 64:
+        return None
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        return None
+    return value
+
+
+def _next_chunk_size(size, elapsed):
+    if elapsed < TARGET_READ_TIME / 2:
+        return min(size * 2, MAX_CHUNK)
+    if elapsed > TARGET_READ_TIME * 2:
+        return max(size // 2, MIN_CHUNK)
+    return size
+
+
+def _hash_file(path, sha256):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            sha256.update(block)
+
+
+class _Progress:
+    """Calls ``callback(percent)`` at most every PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, callback, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self.last = None
+
+    def report(self, done, total, final=False):
+        if not self.callback or not total:
+            return
+        now = time.monotonic()
+        if final or self.last is None or now - self.last >= self.interval:
+            self.last = now
+            self.callback(min(done / total * 100, 100.0))
+
+
+def _fetch(session, url, part_path, progress, timeout):
+    """One attempt: stream the rest of ``url`` onto ``part_path``.
+
+    Returns the total size and the SHA-256 of the whole file when everything
+    arrived; raises on a dropped or refused transfer, leaving what did arrive
+    in ``part_path``.
+    """
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    sha256 = hashlib.sha256()
+    if offset:
+        _hash_file(part_path, sha256)
+    # Identity encoding, so byte offsets are offsets into the file itself
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416 and offset:
+            # Nothing left to send: the part file is already complete (or not this file at all)
+            total = int(response.headers.get("Content-Range", "*/0").rpartition("/")[2] or 0)
+            if total == offset:
+                return total, sha256
+            os.remove(part_path)  # The next attempt starts over
+            raise DownloadError(f"Server refused to resume at byte {offset}")
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            # Range ignored; the body is the whole file, start over
+            logging.info("Server does not support resuming; restarting the download")
+            offset = 0
+            sha256 = hashlib.sha256()
+        length = int(response.headers.get("Content-Length", 0))
+        total = offset + length if length else 0
+
+        mode = "ab" if offset else "wb"
+        done = offset
+        chunk_size = MIN_CHUNK
+        with open(part_path, mode) as f:
+            while True:
+                start = time.monotonic()
+                chunk = response.raw.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                sha256.update(chunk)
+                done += len(chunk)
+                progress.report(done, total)
+                chunk_size = _next_chunk_size(chunk_size, time.monotonic() - start)
+        if total and done < total:
+            raise DownloadError(f"Connection closed after {done} of {total} bytes")
+        return done, sha256
+
+
+def download_file(url, destination, sha256=None, progress_callback=None, timeout=TIMEOUT, attempts=ATTEMPTS):
+    """Download ``url`` to ``destination`` and return its path.
+
+    ``sha256`` is the published hex digest; without one the file is not
+    verified. Interrupted transfers are resumed from ``destination + ".part"``
+    for up to ``attempts`` tries. Raises DownloadError on failure.
+    """
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    part_path = destination + ".part"
+    progress = _Progress(progress_callback)
+    resumed = os.path.exists(part_path) and os.path.getsize(part_path) > 0
+
+    last_error = None
+    with requests.Session() as session:
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+            try:
+                total, digest = _fetch(session, url, part_path, progress, timeout)
+            except (requests.RequestException, Urllib3Error, OSError, DownloadError) as e:
+                last_error = e
+                logging.warning(f"Download attempt {attempt + 1} of {attempts} failed: {e}")
+                resumed = True
+                continue
+
+            if sha256 and digest.hexdigest() != sha256.lower():
+                os.remove(part_path)
+                last_error = DownloadError("Downloaded file does not match the published SHA-256 digest")
+                if resumed:
+                    # The kept bytes may belong to an older file; one clean try is still worth it
+                    logging.warning("Digest mismatch after resuming; downloading again from the start")
+                    resumed = False
+                    continue
+                raise last_error
+            if not sha256:
+                logging.warning(f"No published digest for {url}; the download is not verified")
+            progress.report(total, total, final=True)
+            os.replace(part_path, destination)
+            return destination
+    raise DownloadError(f"Download failed after {attempts} attempts: {last_error}")
@@ -1,76 +1,173 @@
 import os
 import sys
 import json
+import time
+import logging
 import requests
 import tempfile
 import subprocess
+from urllib.parse import urlparse
 from packaging import version
 from PyQt5.QtWidgets import QMessageBox
 
 from speedview.update.version_checker import VersionChecker
-from ..config.config import APP_VERSION, APP_NAME
+from ..config.config import APP_VERSION, APP_NAME, UPDATE_CACHE_FILE, UPDATE_DOWNLOAD_DIR
+from ..config.windows import UPDATE_CHECK_INTERVAL
+from .downloader import DownloadError, download_file, parse_digest
+
+# Seconds to connect and to wait for the response; update checks never block for longer
+UPDATE_TIMEOUT = (3.05, 10)
+
 
 class UpdateChecker:
-    def __init__(self, settings=None):
+    """Checks the release feed with conditional requests.
+
+    The last response is kept in UPDATE_CACHE_FILE with its ETag and
+    Last-Modified headers. Within UPDATE_CHECK_INTERVAL of the last check the
+    cached release is used without touching the network; after that the feed
+    is asked again with If-None-Match/If-Modified-Since, so an unchanged
+    release costs a 304 without a body.
+    """
+
+    def __init__(self, settings=None, cache_file=None, check_interval=UPDATE_CHECK_INTERVAL, download_dir=None):
         self.current_version = APP_VERSION
-        if settings and hasattr(settings, 'update_url'):
+        if settings and getattr(settings, 'update_url', None):
             self.github_api_url = settings.update_url
         else:
             from speedview.config.config import DEFAULT_UPDATE_URL
             self.github_api_url = DEFAULT_UPDATE_URL
+        self.cache_file = cache_file or UPDATE_CACHE_FILE
+        self.check_interval = check_interval
+        self.download_dir = download_dir or UPDATE_DOWNLOAD_DIR
         self.update_available = False
         self.latest_version = None
         self.release_notes = None
         self.download_url = None
+        self.download_sha256 = None
+        self.digest_url = None
+        self.last_error = None
 
-    def check_for_updates(self):
+    def _load_cache(self):
+        """The cached response for this feed, or an empty dict"""
         try:
-            response = requests.get(self.github_api_url, timeout=5)
-            try:
-                response.raise_for_status()  # Raise exception for bad status codes
-            except requests.exceptions.HTTPError as http_err:
-                print(f"Update check HTTP error: {http_err}")
-                return False
-            
-            data = response.json()
-            self.latest_version = data['tag_name'].replace('v', '')
-            self.release_notes = data.get('body', 'No release notes available')
-            
-            if version.parse(self.latest_version) > version.parse(self.current_version):
-                self.update_available = True
-                for asset in data['assets']:
-                    if asset['name'].endswith('.exe'):
-                        self.download_url = asset['browser_download_url']
-                        break
-            return self.update_available
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get('url') != self.github_api_url or 'release' not in cache:
+            return {}
+        return cache
+
+    def _save_cache(self, cache):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_path = self.cache_file + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_path, self.cache_file)
+        except OSError as e:
+            logging.warning(f"Could not save the update check cache: {e}")
+
+    def _apply_release(self, release):
+        """Take version, notes and installer from a release; True when it is newer"""
+        self.latest_version = release['tag_name'].replace('v', '')
+        self.release_notes = release.get('body') or 'No release notes available'
+        self.update_available = version.parse(self.latest_version) > version.parse(self.current_version)
+        self.download_url = None
+        self.download_sha256 = None
+        self.digest_url = None
+        if self.update_available:
+            assets = release.get('assets', [])
+            for asset in assets:
+                if asset['name'].endswith('.exe'):
+                    self.download_url = asset['browser_download_url']
+                    self.download_sha256 = parse_digest(asset.get('digest'))
+                    # Releases without asset digests may publish "<installer>.sha256"
+                    for sidecar in assets:
+                        if sidecar['name'] == asset['name'] + '.sha256':
+                            self.digest_url = sidecar['browser_download_url']
+                    break
+        return self.update_available
+
+    def check_for_updates(self, force=False):
+        """True when a newer release is available.
+
+        Uses the cached release while it is younger than ``check_interval``,
+        unless ``force`` is set (a check the user asked for). Blocks for up to
+        UPDATE_TIMEOUT, so call it from a worker thread (UpdateCheckThread).
+        """
+        self.last_error = None
+        cache = self._load_cache()
+        age = time.time() - cache.get('checked_at', 0)
+        if cache and not force and 0 <= age < self.check_interval:
+            return self._apply_release(cache['release'])
+
+        headers = {'Accept': 'application/vnd.github+json'}
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            headers['If-Modified-Since'] = cache['last_modified']
+        try:
+            response = requests.get(self.github_api_url, headers=headers, timeout=UPDATE_TIMEOUT)
+            if response.status_code == 304 and cache:
+                release = cache['release']
+            else:
+                response.raise_for_status()
+                data = response.json()
+                # Only what _apply_release reads; the full feed entry is large
+                release = {
+                    'tag_name': data['tag_name'],
+                    'body': data.get('body'),
+                    'assets': [{'name': asset['name'], 'browser_download_url': asset['browser_download_url'],
+                                'digest': asset.get('digest')}
+                               for asset in data.get('assets', [])],
+                }
+            update_available = self._apply_release(release)
         except Exception as e:
-            print(f"Update check failed: {e}")
+            logging.warning(f"Update check failed: {e}")
+            self.last_error = str(e)
+            self.update_available = False
             return False
 
+        self._save_cache({
+            'url': self.github_api_url,
+            'etag': response.headers.get('ETag', cache.get('etag')),
+            'last_modified': response.headers.get('Last-Modified', cache.get('last_modified')),
+            'checked_at': time.time(),
+            'release': release,
+        })
+        return update_available
+
+    def published_sha256(self):
+        """Hex SHA-256 of the installer, from the asset digest or a .sha256 asset; None if unpublished"""
+        if self.download_sha256:
+            return self.download_sha256
+        if not self.digest_url:
+            return None
+        response = requests.get(self.digest_url, timeout=UPDATE_TIMEOUT)
+        response.raise_for_status()
+        # sha256sum format: "<hex>  <file name>"
+        fields = response.text.split()
+        return parse_digest(fields[0]) if fields else None
+
     def download_update(self, progress_callback=None):
+        """Download the installer into UPDATE_DOWNLOAD_DIR; its path, or None on failure.
+
+        An interrupted download resumes where it stopped, also on the next
+        call, and the file is verified against the published SHA-256.
+        """
         if not self.download_url:
             return None
 
+        self.last_error = None
+        name = os.path.basename(urlparse(self.download_url).path) or 'update.exe'
+        destination = os.path.join(self.download_dir, f"{self.latest_version}-{name}")
         try:
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.exe')
-            
-            downloaded = 0
-            with temp_file as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        downloaded += len(chunk)
-                        f.write(chunk)
-                        if progress_callback and total_size:
-                            progress = (downloaded / total_size) * 100
-                            progress_callback(progress)
-            
-            return temp_file.name
-        except Exception as e:
-            print(f"Download failed: {e}")
+            return download_file(self.download_url, destination, sha256=self.published_sha256(),
+                                 progress_callback=progress_callback)
+        except (DownloadError, requests.RequestException, OSError) as e:
+            logging.error(f"Download failed: {e}")
+            self.last_error = str(e)
             return None
 
     def install_update(self, update_file):
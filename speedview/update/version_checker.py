@@ -1,5 +1,7 @@
 import requests
 
+TIMEOUT = (3.05, 10)  # Seconds to connect and to wait for the response
+
 class VersionChecker:
     def __init__(self, current_version):
         self.current_version = current_version
@@ -7,7 +9,7 @@ class VersionChecker:
 
     def check_for_updates(self):
         try:
-            response = requests.get(self.update_url)
+            response = requests.get(self.update_url, timeout=TIMEOUT)
             latest_version = response.text.strip()  # Assuming the response is just the version number
             return latest_version > self.current_version
         except Exception as e:
@@ -0,0 +1,40 @@
+"""Level-of-detail reduction of time series to one entry per pixel column.
+
+A chart never needs more points than it has pixel columns. Min/max
+decimation keeps the extremes of every column, so a one-second burst stays
+visible in a year-wide view. Averaging the points instead would flatten it.
+"""
+from collections import namedtuple
+
+Columns = namedtuple("Columns", ["mins", "maxs", "means"])
+
+
+def decimate_min_max(xs, lows, highs, means, x0, step, columns):
+    """Reduce points to ``columns`` pixel columns starting at ``x0``, ``step`` x units wide.
+
+    ``xs`` must be sorted. ``lows`` and ``highs`` are the range of each point
+    (equal for plain samples) and ``means`` its value for the centre line.
+    Returns Columns of three lists, holding None where a column has no points.
+    """
+    mins = [None] * columns
+    maxs = [None] * columns
+    sums = [0.0] * columns
+    counts = [0] * columns
+    for x, low, high, mean in zip(xs, lows, highs, means):
+        column = int((x - x0) // step)
+        if column < 0:
+            continue
+        if column >= columns:
+            break
+        if counts[column]:
+            if low < mins[column]:
+                mins[column] = low
+            if high > maxs[column]:
+                maxs[column] = high
+        else:
+            mins[column] = low
+            maxs[column] = high
+        sums[column] += mean
+        counts[column] += 1
+    means = [total / count if count else None for total, count in zip(sums, counts)]
+    return Columns(mins, maxs, means)
@@ -0,0 +1,129 @@
+"""Streaming export of recorded history and speed test results.
+
+Rows come from generators over the stores, with the time range and interface
+filter applied by the store, so exporting a year of 1 Hz history never holds
+more than one chunk in memory. CSV and JSON Lines are written with the
+standard library. Parquet and Arrow IPC need pyarrow and are written one
+record batch at a time. pyarrow is imported on the first Arrow export, not
+with this module, because loading it takes longer than opening the window.
+"""
+import os
+import sys
+import csv
+import json
+import importlib.util
+
+from speedview.models.history import SECOND_NS
+from speedview.models.results import COLUMNS as RESULT_FIELDS
+
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+HISTORY_FIELDS = ("timestamp_ns", "interface", "interval_ns", "rx_bps", "tx_bps")
+EXPORT_FORMATS = ("csv", "jsonl", "parquet", "arrow")
+BINARY_FORMATS = ("parquet", "arrow")
+# Extensions recognised when no format is given
+FORMAT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet",
+                     ".arrow": "arrow", ".feather": "arrow"}
+ARROW_BATCH_ROWS = 65536
+# Arrow type of every exported column, so all batches share one schema
+FIELD_TYPES = {
+    "timestamp_ns": "int64", "interface": "string", "interval_ns": "int64", "rx_bps": "int64",
+    "tx_bps": "int64", "timestamp": "float64", "server": "string", "latency_ms": "float64",
+    "jitter_ms": "float64", "download_mbps": "float64", "upload_mbps": "float64", "backend": "string",
+}
+
+
+def available_formats():
+    """Export formats usable with the installed packages"""
+    return [name for name in EXPORT_FORMATS if HAVE_PYARROW or name in ("csv", "jsonl")]
+
+
+def format_for_path(path):
+    """Export format implied by a file name's extension, or None"""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def history_rows(history, start_ns, end_ns, interface=None):
+    """Yield HISTORY_FIELDS tuples of raw history records in [start_ns, end_ns)"""
+    for name, record in history.iter_records(start_ns, end_ns, interface):
+        yield record.timestamp_ns, name, record.interval_ns, record.rx_bps, record.tx_bps
+
+
+def result_rows(results, start_ns, end_ns, interface=None):
+    """Yield RESULT_FIELDS tuples of speed test results in [start_ns, end_ns)"""
+    yield from results.iter_results(start_ns / SECOND_NS, end_ns / SECOND_NS, interface)
+
+
+def write_csv(rows, fields, f):
+    """Write rows to a text file as CSV with a header; returns the row count"""
+    writer = csv.writer(f)
+    writer.writerow(fields)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, fields, f):
+    """Write rows to a text file as one JSON object per line; returns the row count"""
+    count = 0
+    for row in rows:
+        f.write(json.dumps(dict(zip(fields, row))))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def _batches(pyarrow, rows, schema, size):
+    columns = [[] for _ in schema.names]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+        if len(columns[0]) >= size:
+            yield pyarrow.record_batch(columns, schema=schema)
+            columns = [[] for _ in schema.names]
+    if columns[0]:
+        yield pyarrow.record_batch(columns, schema=schema)
+
+
+def write_arrow(rows, fields, path, parquet=True, batch_rows=ARROW_BATCH_ROWS):
+    """Write rows to a Parquet or Arrow IPC file in record batches; returns the row count"""
+    if not HAVE_PYARROW:
+        raise RuntimeError("Parquet and Arrow export need the pyarrow package")
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    schema = pyarrow.schema([(name, getattr(pyarrow, FIELD_TYPES.get(name, "string"))())
+                             for name in fields])
+    if parquet:
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+    count = 0
+    with writer:
+        for batch in _batches(pyarrow, rows, schema, batch_rows):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def export_rows(rows, fields, path, export_format=None):
+    """Stream rows to ``path`` in ``export_format`` (default: from the extension); returns the row count.
+
+    A path of ``-`` writes CSV or JSON Lines to standard output; Parquet and Arrow need a file.
+    """
+    export_format = export_format or format_for_path(path)
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format for {path}; use one of {', '.join(EXPORT_FORMATS)}")
+    if path == "-" and export_format in BINARY_FORMATS:
+        raise ValueError(f"{export_format} export cannot be written to standard output; give a file name")
+    if export_format in BINARY_FORMATS:
+        return write_arrow(rows, fields, path, parquet=export_format == "parquet")
+    if path == "-":
+        writer = write_csv if export_format == "csv" else write_jsonl
+        return writer(rows, fields, sys.stdout)
+    with open(path, 'w', newline='' if export_format == "csv" else None, encoding='utf-8') as f:
+        if export_format == "csv":
+            return write_csv(rows, fields, f)
+        return write_jsonl(rows, fields, f)
@@ -0,0 +1,30 @@
+"""Fixed-bucket histogram for latency measurements."""
+import bisect
+
+
+class Histogram:
+    """Counts observations into cumulative ``le`` buckets, like a Prometheus histogram.
+
+    One thread observes. Readers take ``snapshot()``, which may be one
+    observation behind, but never fails.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = tuple(sorted(bounds))
+        self._counts = [0] * (len(self.bounds) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self._counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """(cumulative counts per bound plus +Inf, count, sum)"""
+        cumulative = []
+        total = 0
+        for count in list(self._counts):
+            total += count
+            cumulative.append(total)
+        return cumulative, total, self.sum
@@ -0,0 +1,49 @@
+"""Sockets for talking to the running instance from other local processes.
+
+An address is a Unix socket path, or a (host, port) tuple for loopback TCP
+where Python has no AF_UNIX (Windows). Only the standard library is imported
+here, so a second launch can reach the first one before any heavy import.
+"""
+import os
+import errno
+import socket
+
+
+def create_listener(address):
+    """Listening socket for a Unix socket path or a (host, port) tuple"""
+    if not isinstance(address, str):
+        return socket.create_server(address)
+    if os.path.exists(address):
+        # Left over from a crashed instance, unless someone still answers on it
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(address)
+        except OSError:
+            os.unlink(address)
+        else:
+            raise OSError(errno.EADDRINUSE, f"Another process is listening on {address}")
+        finally:
+            probe.close()
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(address)
+        os.chmod(address, 0o600)
+        listener.listen()
+    except OSError:
+        listener.close()
+        raise
+    return listener
+
+
+def connect(address, timeout=None):
+    """Socket connected to ``address``; raises OSError when nothing listens there"""
+    if not isinstance(address, str):
+        return socket.create_connection(address, timeout)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
@@ -0,0 +1,46 @@
+"""Fixed-size single-producer/single-consumer ring buffer.
+
+One thread pushes and one thread drains, without a lock. The producer fills
+a slot before publishing the new head index, and the consumer only moves its
+own tail index. Both indices are plain ints, and storing one is atomic under
+the GIL. A producer that laps the consumer overwrites the oldest items; those
+items, and the oldest slot of a full buffer, which may be mid-write, are
+counted in ``dropped``.
+"""
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._head = 0  # Items ever pushed; written by the producer only
+        self._tail = 0  # Items ever consumed or dropped; written by the consumer only
+        self.dropped = 0
+
+    def __len__(self):
+        return min(self._head - self._tail, self.capacity)
+
+    def push(self, item):
+        """Add an item, overwriting the oldest one when full (producer side)"""
+        head = self._head
+        self._slots[head % self.capacity] = item
+        self._head = head + 1
+
+    def drain(self):
+        """Remove and return all available items, oldest first (consumer side)"""
+        head = self._head
+        tail = max(self._tail, head - self.capacity)
+        slots, capacity = self._slots, self.capacity
+        items = [slots[index % capacity] for index in range(tail, head)]
+
+        # Items the producer overwrote while they were being copied are stale;
+        # the slot after the published head may already be mid-write
+        overwritten = min(self._head + 1 - capacity - tail, head - tail)
+        if overwritten > 0:
+            items = items[overwritten:]
+            tail += overwritten
+        self.dropped += tail - self._tail
+        self._tail = head
+        return items
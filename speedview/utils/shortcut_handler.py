@@ -1,11 +1,12 @@
 import os
-import winshell
-from win32com.client import Dispatch
 from speedview.config.windows import INSTALL_DIR
 
+# winshell and pywin32 exist only on Windows; they are imported where used
+
 def create_shortcut(target_path, shortcut_path, description="", arguments=""):
     """Create a Windows shortcut"""
     try:
+        from win32com.client import Dispatch
         shell = Dispatch('WScript.Shell')
         shortcut = shell.CreateShortCut(shortcut_path)
         shortcut.Targetpath = target_path
@@ -22,6 +23,7 @@ def create_shortcut(target_path, shortcut_path, description="", arguments=""):
 def create_program_shortcuts():
     """Create all necessary program shortcuts"""
     try:
+        import winshell
         exe_path = os.path.join(INSTALL_DIR, 'NetworkSpeedMeter.exe')
         
         # Desktop shortcut
@@ -44,6 +46,7 @@ def create_program_shortcuts():
 def remove_shortcuts():
     """Remove all program shortcuts"""
     try:
+        import winshell
         # Remove desktop shortcut
         desktop = winshell.desktop()
         desktop_path = os.path.join(desktop, 'Network Speed Meter.lnk')
@@ -0,0 +1,187 @@
+"""One SpeedView per user; later launches hand their command to the running one.
+
+The first launch takes an exclusive lock on INSTANCE_LOCK. It then listens
+for commands on INSTANCE_SOCKET, which is loopback TCP on Windows. A later
+launch cannot take the lock, so it sends its command ("show", "float" or
+"run-test") and exits. The lock belongs to the open file, so the OS releases
+it when the process dies and a crash never leaves a stale lock.
+
+Only the standard library is imported here, so a second launch forwards its
+command before PyQt5 or psutil are loaded.
+"""
+import os
+import time
+import socket
+import logging
+import threading
+
+from speedview.config.config import INSTANCE_LOCK, INSTANCE_SOCKET, DEFAULT_INSTANCE_PORT
+from speedview.utils.local_socket import connect, create_listener
+
+COMMANDS = ("show", "float", "run-test")
+DEFAULT_COMMAND = "show"
+FORWARD_TIMEOUT = 1.0  # Seconds for one connect/send/reply round trip
+STARTUP_WAIT = 3.0  # Seconds to keep retrying while the running instance starts listening
+RETRY_INTERVAL = 0.05
+
+
+def command_from_argv(argv):
+    """The command given as --show, --float or --run-test; "show" when there is none"""
+    for arg in argv:
+        if arg.startswith("--") and arg[2:] in COMMANDS:
+            return arg[2:]
+    return DEFAULT_COMMAND
+
+
+def default_address():
+    """Unix socket path, or (host, port) where AF_UNIX is unavailable"""
+    if hasattr(socket, "AF_UNIX"):
+        return INSTANCE_SOCKET
+    return "127.0.0.1", DEFAULT_INSTANCE_PORT
+
+
+def _lock_file(lock_file):
+    """Lock the whole file without blocking; raises OSError when it is locked elsewhere"""
+    if os.name == "nt":
+        import msvcrt
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _read_line(sock, limit=256):
+    data = b""
+    while not data.endswith(b"\n") and len(data) < limit:
+        chunk = sock.recv(limit)
+        if not chunk:
+            break
+        data += chunk
+    return data.strip()
+
+
+class SingleInstance:
+    """Instance lock plus the command channel between launches"""
+
+    def __init__(self, lock_path=INSTANCE_LOCK, address=None):
+        self.lock_path = lock_path
+        self.address = address or default_address()
+        self._lock = None
+        self._listener = None
+        self._thread = None
+        self._stopping = False
+        self._handler = None
+        self._queued = []  # Commands received before a handler was set
+        self._mutex = threading.Lock()
+
+    @property
+    def primary(self):
+        """True when this process holds the instance lock"""
+        return self._lock is not None
+
+    def acquire(self):
+        """Take the instance lock; False when another instance holds it"""
+        if self._lock is not None:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        lock = open(self.lock_path, "a+")
+        try:
+            _lock_file(lock)
+        except OSError:
+            lock.close()
+            return False
+        self._lock = lock
+        return True
+
+    def forward(self, command, wait=STARTUP_WAIT):
+        """Send ``command`` to the running instance; True once it acknowledged.
+
+        Retries for up to ``wait`` seconds, in case the running instance holds
+        the lock but is not listening yet.
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                with connect(self.address, FORWARD_TIMEOUT) as sock:
+                    sock.sendall(command.encode("utf-8") + b"\n")
+                    return _read_line(sock) == b"ok"
+            except OSError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(RETRY_INTERVAL)
+
+    def listen(self):
+        """Accept commands from later launches on a background thread"""
+        if self._listener is not None:
+            return
+        self._listener = create_listener(self.address)
+        if not isinstance(self.address, str):
+            self.address = self._listener.getsockname()[:2]  # The real port when 0 was asked for
+        self._stopping = False
+        self._thread = threading.Thread(target=self._serve, name="SingleInstance", daemon=True)
+        self._thread.start()
+
+    def set_handler(self, handler):
+        """Call ``handler(command)`` on the listener thread for every forwarded command.
+
+        Commands that arrived before a handler was set are passed on at once.
+        """
+        with self._mutex:
+            self._handler = handler
+            queued, self._queued = self._queued, []
+        for command in queued:
+            self._dispatch(command)
+
+    def _serve(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            if self._stopping:
+                sock.close()
+                return
+            with sock:
+                try:
+                    sock.settimeout(FORWARD_TIMEOUT)
+                    command = _read_line(sock).decode("utf-8", "replace")
+                    sock.sendall(b"ok\n" if command in COMMANDS else b"unknown\n")
+                except OSError as e:
+                    logging.debug(f"Dropped a forwarded command: {e}")
+                    continue
+            if command in COMMANDS:
+                self._dispatch(command)
+
+    def _dispatch(self, command):
+        with self._mutex:
+            handler = self._handler
+            if handler is None:
+                self._queued.append(command)
+                return
+        try:
+            handler(command)
+        except Exception as e:
+            logging.exception(f"Error handling forwarded command '{command}': {e}")
+
+    def release(self):
+        """Stop listening and give up the lock"""
+        if self._listener is not None:
+            self._stopping = True
+            try:
+                # Wake the blocked accept()
+                connect(self.address, FORWARD_TIMEOUT).close()
+            except OSError:
+                pass
+            self._thread.join()
+            self._listener.close()
+            self._listener = None
+            self._thread = None
+            if isinstance(self.address, str):
+                try:
+                    os.unlink(self.address)
+                except OSError:
+                    pass
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
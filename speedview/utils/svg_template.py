@@ -0,0 +1,127 @@
+"""Compiled SVG templates.
+
+A template is scanned once for its dynamic slots (text nodes and attribute
+values that change from frame to frame). Rendering a frame then only joins the
+precomputed static chunks with the new slot values instead of running regular
+expressions over the whole document.
+
+The same template can also be split into layers: a static background that is
+rasterised once and the dynamic elements that are drawn live on top of it.
+"""
+import re
+
+
+class SvgSlot:
+    """A dynamic region of an SVG template.
+
+    ``pattern`` is a regular expression with exactly one group. The text
+    captured by that group is what gets replaced on render; everything else in
+    the match is part of the static template.
+    """
+
+    def __init__(self, name, pattern, required=True):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.required = required
+
+
+class CompiledSvgTemplate:
+    """SVG template split into static chunks and named slots."""
+
+    def __init__(self, template, slots):
+        self.source = template
+        self.offsets = {}
+        self.defaults = {}
+
+        spans = []
+        for slot in slots:
+            match = slot.pattern.search(template)
+            if match is None:
+                if slot.required:
+                    raise ValueError(f"Slot '{slot.name}' not found in SVG template")
+                continue
+            start, end = match.span(1)
+            self.offsets[slot.name] = (start, end)
+            self.defaults[slot.name] = match.group(1)
+            spans.append((start, end, slot.name))
+        spans.sort()
+
+        # Even positions hold static chunks, odd positions hold slot values
+        self._layout = []
+        self._positions = {}
+        cursor = 0
+        for start, end, name in spans:
+            if start < cursor:
+                raise ValueError(f"Slot '{name}' overlaps another slot")
+            self._layout.append(template[cursor:start])
+            self._positions[name] = len(self._layout)
+            self._layout.append(self.defaults[name])
+            cursor = end
+        self._layout.append(template[cursor:])
+
+    def has_slot(self, name):
+        return name in self._positions
+
+    def render(self, **values):
+        """Render the template, using the template's own text for any slot not given"""
+        parts = self._layout.copy()
+        positions = self._positions
+        for name, value in values.items():
+            position = positions.get(name)
+            if position is not None:
+                parts[position] = value
+        return ''.join(parts)
+
+
+class SvgLayer:
+    """A dynamic element that is cut out of the static background.
+
+    ``pattern`` matches the whole element. ``bindings`` map what the element
+    shows to slot names: ``text`` binds the text node, ``rotate`` the rotation
+    angle, and any other keyword an attribute. Inside a group of rects an
+    attribute binds to a list with one slot name per rect.
+    """
+
+    def __init__(self, name, pattern, **bindings):
+        self.name = name
+        self.pattern = re.compile(pattern, re.DOTALL)
+        self.bindings = bindings
+
+
+def split_layers(template, layers):
+    """Remove every layer's element from the template.
+
+    Returns the static template and the removed fragments keyed by layer name.
+    """
+    fragments = {}
+    static = template
+    for layer in layers:
+        match = layer.pattern.search(static)
+        if match is None:
+            raise ValueError(f"Layer '{layer.name}' not found in SVG template")
+        fragments[layer.name] = match.group(0)
+        static = static[:match.start()] + static[match.end():]
+    return static, fragments
+
+
+def parse_attributes(tag):
+    """Attributes of the first tag in an SVG fragment"""
+    opening = re.match(r'\s*<[^>]*>', tag)
+    return dict(re.findall(r'([\w:-]+)="([^"]*)"', opening.group(0) if opening else ''))
+
+
+def parse_translate(transform):
+    """Offset of a translate() transform, or (0, 0)"""
+    match = re.search(r'translate\(\s*([-\d.]+)[\s,]+([-\d.]+)\s*\)', transform or '')
+    if match is None:
+        return 0.0, 0.0
+    return float(match.group(1)), float(match.group(2))
+
+
+def resolve_paint(template, paint):
+    """Plain colour for a fill value, using the first stop of a referenced gradient"""
+    match = re.match(r'url\(#([\w-]+)\)', paint or '')
+    if match is None:
+        return paint
+    gradient = re.search(rf'id="{match.group(1)}".*?stop-color="([^"]*)"', template, re.DOTALL)
+    return gradient.group(1) if gradient else "#FFFFFF"
@@ -1,10 +1,195 @@
 import re
 import os
+import sys
 import logging
 import tempfile
 from speedview.config.config import TEMP_SVG_FILE
+from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE, FLOATING_SVG_TEMPLATE
+from speedview.utils.svg_template import CompiledSvgTemplate, SvgSlot, SvgLayer
+
+# Dynamic regions of the main speedometer template
+MAIN_SVG_SLOTS = [
+    SvgSlot("speed_value", r'<text id="speedValue"[^>]*>([^<]*)</text>'),
+    SvgSlot("needle_angle", r'<g id="needle" transform="rotate\(([^ )]*) 250 250\)"'),
+    SvgSlot("speed_type", r'<text id="speedType"[^>]*>([^<]*)</text>', required=False),
+    SvgSlot("connection_color", r'<text id="connectionStatus"[^>]*?fill="([^"]*)"'),
+    SvgSlot("connection_status", r'<text id="connectionStatus"[^>]*>([^<]*)</text>'),
+    SvgSlot("network_type", r'<text id="networkType"[^>]*>([^<]*)</text>', required=False),
+] + [
+    SvgSlot(f"signal_bar_{i}", rf'<rect x="{i * 8}" [^>]*?opacity="([0-9.]+)"')
+    for i in range(4)
+]
+
+# Dynamic regions of the floating window template
+FLOATING_SVG_SLOTS = [
+    SvgSlot("speed_value", r'<text id="speedValue"[^>]*>([^<]*)</text>'),
+    SvgSlot("connection_type", r'<text x="200" y="35"[^>]*>([^<]*)</text>'),
+    SvgSlot("band", r'<text x="200" y="55"[^>]*>([^<]*)</text>'),
+] + [
+    SvgSlot(f"signal_fill_{i}", rf'<rect x="{x}" y="{y}" [^>]*?fill="([^"]*)"')
+    for i, (x, y) in enumerate([(0, 10), (10, 5), (20, 0), (30, -5)])
+]
+
+# Templates are compiled once at import; renders only join precomputed chunks
+MAIN_SVG = CompiledSvgTemplate(MAIN_SVG_TEMPLATE, MAIN_SVG_SLOTS)
+FLOATING_SVG = CompiledSvgTemplate(FLOATING_SVG_TEMPLATE, FLOATING_SVG_SLOTS)
+_COMPILED_TEMPLATES = {
+    MAIN_SVG_TEMPLATE: MAIN_SVG,
+    FLOATING_SVG_TEMPLATE: FLOATING_SVG,
+}
+
+# Elements drawn live over the cached background by SvgGaugeWidget
+MAIN_SVG_LAYERS = [
+    SvgLayer("needle", r'<g id="needle".*?</g>', rotate="needle_angle"),
+    SvgLayer("speed_value", r'<text id="speedValue".*?</text>', text="speed_value"),
+    SvgLayer("connection_status", r'<text id="connectionStatus".*?</text>',
+             text="connection_status", fill="connection_color"),
+    SvgLayer("network_type", r'<text id="networkType".*?</text>', text="network_type"),
+    SvgLayer("signal", r'<g id="signalStrength".*?</g>',
+             opacity=[f"signal_bar_{i}" for i in range(4)]),
+]
+
+FLOATING_SVG_LAYERS = [
+    SvgLayer("speed_value", r'<text id="speedValue".*?</text>', text="speed_value"),
+    SvgLayer("connection_type", r'<text x="200" y="35".*?</text>', text="connection_type"),
+    SvgLayer("band", r'<text x="200" y="55".*?</text>', text="band"),
+    SvgLayer("signal", r'<g transform="translate\(130, 30\)">.*?</g>',
+             fill=[f"signal_fill_{i}" for i in range(4)]),
+]
+
+SIGNAL_BAR_OPACITIES = [0.3, 0.5, 0.7, 0.9]
+
+
+def speed_slot_values(speed, max_speed, show_upload=False, angle=None):
+    """Formatted slot values for the speed readout and needle"""
+    if angle is None:
+        # Calculate angle based on speed and max speed
+        angle = -135 + (speed / max_speed) * 270
+        angle = max(min(angle, 135), -135)
+    return {
+        "speed_value": f"{speed:.2f}",
+        "needle_angle": f"{angle:.2f}",
+        "speed_type": "Upload" if show_upload else "Download",
+    }
+
+
+def connection_slot_values(status, connection_type="Unknown"):
+    """Formatted slot values for the connection status text"""
+    return {
+        "connection_color": "#00F0FF" if status == "Connected" else "#FF5050",
+        "connection_status": status,
+        "network_type": connection_type,
+    }
+
+
+def signal_slot_values(strength):
+    """Formatted slot values for the four signal bars (strength 0-4)"""
+    strength = max(0, min(4, int(strength)))
+    return {
+        f"signal_bar_{i}": "1.0" if i < strength else str(base_opacity)
+        for i, base_opacity in enumerate(SIGNAL_BAR_OPACITIES)
+    }
+
+
+def render_main_svg(speed, max_speed, show_upload=False, status="Unknown",
+                    connection_type="Unknown", signal_strength=0):
+    """Render a complete main window frame in a single pass"""
+    values = speed_slot_values(speed, max_speed, show_upload)
+    values.update(connection_slot_values(status, connection_type))
+    values.update(signal_slot_values(signal_strength))
+    return MAIN_SVG.render(**values)
+
+
+def floating_slot_values(speed, signal_strength, connection_type, band):
+    """Formatted slot values for the floating window"""
+    # Map signal strength (0-100) onto the four bars
+    filled_bars = 0
+    if signal_strength > 0:
+        filled_bars = 1
+    if signal_strength >= 25:
+        filled_bars = 2
+    if signal_strength >= 50:
+        filled_bars = 3
+    if signal_strength >= 75:
+        filled_bars = 4
+
+    values = {
+        "speed_value": f"{speed:.1f}",
+        "connection_type": f"{connection_type}",
+        "band": f"{band}",
+    }
+    for i in range(4):
+        # Darker color for inactive bars
+        values[f"signal_fill_{i}"] = "#00FF8F" if i < filled_bars else "#222222"
+    return values
+
+
+def render_floating_svg(speed, signal_strength, connection_type, band):
+    """Render a complete floating window frame in a single pass"""
+    return FLOATING_SVG.render(**floating_slot_values(speed, signal_strength, connection_type, band))
+
 
 def update_svg_speed(svg_template, speed, max_speed, show_upload=False, angle=None):
+    """Update the speed value and angle in SVG template"""
+    compiled = _COMPILED_TEMPLATES.get(svg_template)
+    if compiled is not None:
+        return compiled.render(**speed_slot_values(speed, max_speed, show_upload, angle))
+    return _regex_update_svg_speed(svg_template, speed, max_speed, show_upload, angle)
+
+
+def update_svg_connection_status(svg_template, status, connection_type="Unknown"):
+    """Update connection status and network type in SVG template"""
+    compiled = _COMPILED_TEMPLATES.get(svg_template)
+    if compiled is not None:
+        return compiled.render(**connection_slot_values(status, connection_type))
+    return _regex_update_svg_connection_status(svg_template, status, connection_type)
+
+
+def update_svg_signal_strength(svg_content, strength):
+    """
+    Update the signal strength bars in the SVG template.
+    strength: int (0-4)
+    """
+    compiled = _COMPILED_TEMPLATES.get(svg_content)
+    if compiled is not None:
+        return compiled.render(**signal_slot_values(strength))
+    return _regex_update_svg_signal_strength(svg_content, strength)
+
+
+def update_floating_svg(svg_template, speed, signal_strength, connection_type, band):
+    """Update the floating window SVG with current values"""
+    if _COMPILED_TEMPLATES.get(svg_template) is FLOATING_SVG:
+        return render_floating_svg(speed, signal_strength, connection_type, band)
+    return _regex_update_floating_svg(svg_template, speed, signal_strength, connection_type, band)
+
+
+def update_test_network_svg(svg_template, status, download, upload):
+    """Update the test network SVG with status, download, and upload values."""
+    import re
+    # Replace status
+    updated_svg = re.sub(
+        r'<text id="testStatus".*?>.*?</text>',
+        f'<text id="testStatus" x="150" y="60" text-anchor="middle" font-family="Arial, sans-serif" font-size="18" fill="#00F0FF">{status}</text>',
+        svg_template
+    )
+    # Replace download
+    updated_svg = re.sub(
+        r'<text id="downloadSpeed".*?>.*?</text>',
+        f'<text id="downloadSpeed" x="150" y="140" text-anchor="middle" font-family="Arial, sans-serif" font-size="24" fill="#00F0FF">{download:.2f} Mbps</text>',
+        updated_svg
+    )
+    # Replace upload
+    updated_svg = re.sub(
+        r'<text id="uploadSpeed".*?>.*?</text>',
+        f'<text id="uploadSpeed" x="150" y="200" text-anchor="middle" font-family="Arial, sans-serif" font-size="24" fill="#00F0FF">{upload:.2f} Mbps</text>',
+        updated_svg
+    )
+    return updated_svg
+
+
+# Regex implementations, kept for templates that were not compiled at import
+
+def _regex_update_svg_speed(svg_template, speed, max_speed, show_upload=False, angle=None):
     """Update the speed value and angle in SVG template"""
     if angle is None:
         # Calculate angle based on speed and max speed
@@ -39,7 +224,7 @@ def update_svg_speed(svg_template, speed, max_speed, show_upload=False, angle=No
     
     return updated_svg
 
-def update_svg_connection_status(svg_template, status, connection_type="Unknown"):
+def _regex_update_svg_connection_status(svg_template, status, connection_type="Unknown"):
     """Update connection status and network type in SVG template"""
     color = "#00F0FF" if status == "Connected" else "#FF5050"
     updated_svg = re.sub(
@@ -57,30 +242,7 @@ def update_svg_connection_status(svg_template, status, connection_type="Unknown"
         )
     return updated_svg
 
-def update_test_network_svg(svg_template, status, download, upload):
-    """Update the test network SVG with status, download, and upload values."""
-    import re
-    # Replace status
-    updated_svg = re.sub(
-        r'<text id="testStatus".*?>.*?</text>',
-        f'<text id="testStatus" x="150" y="60" text-anchor="middle" font-family="Arial, sans-serif" font-size="18" fill="#00F0FF">{status}</text>',
-        svg_template
-    )
-    # Replace download
-    updated_svg = re.sub(
-        r'<text id="downloadSpeed".*?>.*?</text>',
-        f'<text id="downloadSpeed" x="150" y="140" text-anchor="middle" font-family="Arial, sans-serif" font-size="24" fill="#00F0FF">{download:.2f} Mbps</text>',
-        updated_svg
-    )
-    # Replace upload
-    updated_svg = re.sub(
-        r'<text id="uploadSpeed".*?>.*?</text>',
-        f'<text id="uploadSpeed" x="150" y="200" text-anchor="middle" font-family="Arial, sans-serif" font-size="24" fill="#00F0FF">{upload:.2f} Mbps</text>',
-        updated_svg
-    )
-    return updated_svg
-
-def update_svg_signal_strength(svg_content, strength):
+def _regex_update_svg_signal_strength(svg_content, strength):
     """
     Update the signal strength bars in the SVG template.
     strength: int (0-4)
@@ -105,7 +267,7 @@ def update_svg_signal_strength(svg_content, strength):
         )
     return new_svg
 
-def update_floating_svg(svg_template, speed, signal_strength, connection_type, band):
+def _regex_update_floating_svg(svg_template, speed, signal_strength, connection_type, band):
     """Update the floating window SVG with current values"""
     # Format the speed value
     updated_svg = re.sub(
@@ -141,7 +303,7 @@ def update_floating_svg(svg_template, speed, signal_strength, connection_type, b
     if signal_strength >= 75:
         filled_bars = 4
     
-    # Create signal bars with animations
+    # Create signal bars
     opacities = ["0.4", "0.6", "0.8", "0.3"]
     fills = ["#00FF8F", "#00FF8F", "#00FF8F", "#00FF8F"]
     
@@ -151,15 +313,9 @@ def update_floating_svg(svg_template, speed, signal_strength, connection_type, b
             fills[i] = "#222222"  # Darker color for inactive bars
     
     signal_replacement = f"""<g transform="translate(130, 30)">
-      <rect x="0" y="10" width="5" height="10" rx="2" fill="{fills[0]}" opacity="{opacities[0]}">
-        <animate attributeName="opacity" values="{opacities[0]};1;{opacities[0]}" dur="2s" begin="0s" repeatCount="indefinite" />
-      </rect>
-      <rect x="10" y="5" width="5" height="15" rx="2" fill="{fills[1]}" opacity="{opacities[1]}">
-        <animate attributeName="opacity" values="{opacities[1]};1;{opacities[1]}" dur="2s" begin="0.5s" repeatCount="indefinite" />
-      </rect>
-      <rect x="20" y="0" width="5" height="20" rx="2" fill="{fills[2]}" opacity="{opacities[2]}">
-        <animate attributeName="opacity" values="{opacities[2]};1;{opacities[2]}" dur="2s" begin="1s" repeatCount="indefinite" />
-      </rect>
+      <rect x="0" y="10" width="5" height="10" rx="2" fill="{fills[0]}" opacity="{opacities[0]}" />
+      <rect x="10" y="5" width="5" height="15" rx="2" fill="{fills[1]}" opacity="{opacities[1]}" />
+      <rect x="20" y="0" width="5" height="20" rx="2" fill="{fills[2]}" opacity="{opacities[2]}" />
       <rect x="30" y="-5" width="5" height="25" rx="2" fill="{fills[3]}" opacity="{opacities[3]}" />
     </g>"""
     
@@ -167,24 +323,44 @@ def update_floating_svg(svg_template, speed, signal_strength, connection_type, b
     
     return updated_svg
 
-def save_svg_to_file(svg_content):
-    """Save SVG content to temporary file and return the path"""
-    try:
-        # Create temporary file in a secure way
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.svg', mode='w') as temp_file:
-            temp_file.write(svg_content)
-            return temp_file.name
-    except Exception as e:
-        logging.error(f"Error saving SVG to file: {e}")
-        # Fallback to fixed filename if tempfile fails
-        with open(TEMP_SVG_FILE, 'w') as f:
-            f.write(svg_content)
-        return TEMP_SVG_FILE
-
-def cleanup_temp_files():
-    """Clean up any temporary SVG files"""
+def sweep_orphaned_svg_files(temp_dir=None, app_dir=None):
+    """Remove SVG files that older versions wrote on every update.
+
+    Only ``tmp*.svg`` files in the temp dir containing a SpeedView frame are
+    removed, plus the fixed-name fallback file that older versions wrote to
+    their working directory, the application directory. That file is looked
+    for in ``app_dir`` (by default the directory of the program being run),
+    and only when ``app_dir`` is given or ``temp_dir`` is not. Returns the
+    number of files removed.
+    """
+    candidates = []
+    if app_dir is not None or temp_dir is None:
+        app_dir = app_dir or os.path.dirname(os.path.abspath(sys.argv[0]))
+        candidates.append(os.path.join(app_dir, TEMP_SVG_FILE))
+    temp_dir = temp_dir or tempfile.gettempdir()
+    removed = 0
     try:
-        if os.path.exists(TEMP_SVG_FILE):
-            os.remove(TEMP_SVG_FILE)
-    except Exception as e:
-        print(f"Error cleaning up temp files: {e}")
\ No newline at end of file
+        with os.scandir(temp_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('tmp') and entry.name.endswith('.svg') and entry.is_file():
+                    candidates.append(entry.path)
+    except OSError as e:
+        logging.warning(f"Could not scan temp dir {temp_dir}: {e}")
+
+    for path in candidates:
+        try:
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                head = f.read(16384)
+            # Both the main and floating templates carry the speedValue text node
+            if 'id="speedValue"' not in head:
+                continue
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            logging.debug(f"Could not remove orphaned SVG file {path}: {e}")
+
+    if removed:
+        logging.info(f"Removed {removed} orphaned SVG temp files")
+    return removed
@@ -0,0 +1,87 @@
+"""Live rates from a running SpeedView, without sampling the counters.
+
+    python main.py watch [--interface NAME ...] [--resolution SECONDS] [--unit UNIT]
+
+Subscribes to the rate stream of the desktop application or the headless
+daemon and prints every frame. On a terminal the table is redrawn in place.
+Like the daemon, nothing here imports PyQt5.
+"""
+import sys
+import time
+import argparse
+
+from speedview.controllers.rate import UNITS, convert_rate, format_rate
+from speedview.controllers.stream import StreamClient, default_address
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+
+def format_value(bps, unit=None):
+    if unit is None:
+        return format_rate(bps)
+    return f"{convert_rate(bps, unit):.2f} {unit}"
+
+
+def render_table(frame, unit=None):
+    """Lines of a table of the frame's rates, busiest interface first"""
+    rates = sorted(frame.rates, key=lambda rate: rate.rx_bps + rate.tx_bps, reverse=True)
+    width = max([len(rate.interface) for rate in rates] + [len("Interface")])
+    lines = [f"{'Interface':<{width}}  {'Download':>16}  {'Upload':>16}"]
+    for rate in rates:
+        lines.append(f"{rate.interface:<{width}}  {format_value(rate.rx_bps, unit):>16}  "
+                     f"{format_value(rate.tx_bps, unit):>16}")
+    footer = time.strftime("%H:%M:%S", time.localtime(frame.timestamp_ns / 1e9))
+    footer += f", mean over {frame.interval_ns / 1e9:.2f} s"
+    if frame.dropped:
+        footer += f", {frame.dropped} frames dropped"
+    lines.append(footer)
+    return lines
+
+
+def render_line(frame, unit=None):
+    """One log line per frame, for pipes and files"""
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(frame.timestamp_ns / 1e9))
+    fields = [f"{rate.interface} rx={format_value(rate.rx_bps, unit)} tx={format_value(rate.tx_bps, unit)}"
+              for rate in frame.rates]
+    return f"{stamp} " + "; ".join(fields)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py watch",
+                                     description="Show live rates from a running SpeedView")
+    parser.add_argument("--interface", action="append", dest="interfaces",
+                        help="only this interface (repeatable; default: all)")
+    parser.add_argument("--resolution", type=float, default=1.0,
+                        help="seconds averaged into each update (0: every sample tick)")
+    parser.add_argument("--unit", choices=sorted(UNITS), help="fixed display unit (default: automatic)")
+    parser.add_argument("--address", help=f"Unix socket path of the stream (default: {default_address()})")
+    return parser
+
+
+def main(argv=None, out=None):
+    args = build_parser().parse_args(argv)
+    out = out or sys.stdout
+    interactive = out.isatty()
+    client = StreamClient(args.address, args.interfaces, max(args.resolution, 0))
+    try:
+        client.connect()
+    except OSError as e:
+        print(f"No SpeedView is streaming on {client.address} ({e}). "
+              f"Start the application or 'main.py --headless' first.", file=sys.stderr)
+        return 1
+    try:
+        for frame in client.frames():
+            if interactive:
+                out.write(CLEAR_SCREEN + "\n".join(render_table(frame, args.unit)) + "\n")
+            else:
+                out.write(render_line(frame, args.unit) + "\n")
+            out.flush()
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+from speedview.controllers.counter_sources import (ProcNetDevCounterSource, PsutilCounterSource,
+                                                   NetlinkCounterSource, create_counter_source)
+
+PROC_HEADER = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+
+def proc_line(name, recv, sent):
+    return f"{name:>6}: {recv} 10 0 0 0 0 0 0 {sent} 20 0 0 0 0 0 0\n"
+
+
+class TestProcNetDevCounterSource(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, lines):
+        with open(self.path, "w") as f:
+            f.write(PROC_HEADER + "".join(lines))
+
+    def test_parses_byte_columns(self):
+        self.write([proc_line("lo", 500, 500), proc_line("eth0", 2 ** 40, 12345)])
+        source = ProcNetDevCounterSource(self.path)
+        try:
+            self.assertEqual(source.read(), (("lo", "eth0"), (500, 2 ** 40), (500, 12345)))
+        finally:
+            source.close()
+
+    def test_rereads_open_file(self):
+        self.write([proc_line("eth0", 1, 2)])
+        source = ProcNetDevCounterSource(self.path)
+        try:
+            first = source.read()
+            self.write([proc_line("eth0", 3, 4)])
+            second = source.read()
+            self.assertEqual(second[1:], ((3,), (4,)))
+            # Unchanged interface set reuses the same tuple
+            self.assertIs(first[0], second[0])
+        finally:
+            source.close()
+
+    def test_buffer_grows_for_many_interfaces(self):
+        self.write([proc_line(f"veth{i}", i, i) for i in range(500)])
+        source = ProcNetDevCounterSource(self.path, buffer_size=256)
+        try:
+            interfaces, recv, _ = source.read()
+            self.assertEqual(len(interfaces), 500)
+            self.assertEqual(recv[-1], 499)
+        finally:
+            source.close()
+
+
+@unittest.skipUnless(sys.platform.startswith("linux") and os.path.exists("/proc/net/dev"), "Linux only")
+class TestLinuxSourcesMatchPsutil(unittest.TestCase):
+    def assertMatchesPsutil(self, source):
+        try:
+            interfaces, recv, _ = source.read()
+            expected, expected_recv, _ = PsutilCounterSource().read()
+        finally:
+            source.close()
+        self.assertEqual(sorted(interfaces), sorted(expected))
+        # Counters only grow between the two reads
+        for name, value in zip(expected, expected_recv):
+            self.assertLessEqual(recv[interfaces.index(name)], value)
+
+    def test_procfs(self):
+        self.assertMatchesPsutil(ProcNetDevCounterSource())
+
+    def test_netlink(self):
+        try:
+            source = NetlinkCounterSource()
+            source.read()
+        except OSError as e:
+            self.skipTest(f"rtnetlink unavailable: {e}")
+        self.assertMatchesPsutil(source)
+
+
+class TestCreateCounterSource(unittest.TestCase):
+    def test_unknown_backend_falls_back_to_psutil(self):
+        self.assertIsInstance(create_counter_source("nonexistent"), PsutilCounterSource)
+
+    def test_auto(self):
+        source = create_counter_source()
+        try:
+            expected = "procfs" if sys.platform.startswith("linux") else "psutil"
+            self.assertEqual(source.name, expected)
+        finally:
+            source.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
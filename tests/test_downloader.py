@@ -0,0 +1,156 @@
+import os
+import socket
+import shutil
+import hashlib
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from speedview.update import downloader
+from speedview.update.downloader import DownloadError, download_file, parse_digest
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class InstallerServer(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with Range support; drops the first ``drops`` transfers after ``drop_after`` bytes"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.ranges.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range") and server.ranges_supported:
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        body = PAYLOAD[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if server.drops:
+            server.drops -= 1
+            self.wfile.write(body[:server.drop_after])
+            self.wfile.flush()
+            # Mid-transfer: the client has fewer bytes than Content-Length promised
+            self.connection.shutdown(socket.SHUT_RDWR)
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestParseDigest(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(parse_digest("sha256:" + SHA256.upper()), SHA256)
+        self.assertEqual(parse_digest(SHA256), SHA256)
+        self.assertIsNone(parse_digest("md5:" + SHA256))
+        self.assertIsNone(parse_digest("sha256:abc"))
+        self.assertIsNone(parse_digest("z" * 64))
+        self.assertIsNone(parse_digest(None))
+
+
+@mock.patch.object(downloader, "RETRY_DELAY", 0)
+class TestDownloadFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.destination = os.path.join(self.directory, "updates", "1.1.0-setup.exe")
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), InstallerServer)
+        self.server.daemon_threads = True
+        self.server.ranges = []
+        self.server.ranges_supported = True
+        self.server.drops = 0
+        self.server.drop_after = 1024 * 1024
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/setup.exe"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def assertDownloaded(self, path):
+        self.assertEqual(path, self.destination)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), PAYLOAD)
+        self.assertFalse(os.path.exists(self.destination + ".part"))
+
+    def test_download(self):
+        self.assertDownloaded(download_file(self.url, self.destination, sha256=SHA256))
+        self.assertEqual(self.server.ranges, [None])
+
+    def test_resume_after_dropped_connection(self):
+        self.server.drops = 2
+        self.server.drop_after = 1000 * 1000
+        self.assertDownloaded(download_file(self.url, self.destination, sha256=SHA256))
+        self.assertEqual(self.server.ranges, [None, "bytes=1000000-", "bytes=2000000-"])
+
+    def test_resume_partial_file_from_earlier_run(self):
+        os.makedirs(os.path.dirname(self.destination))
+        with open(self.destination + ".part", "wb") as f:
+            f.write(PAYLOAD[:12345])
+        self.assertDownloaded(download_file(self.url, self.destination, sha256=SHA256))
+        self.assertEqual(self.server.ranges, ["bytes=12345-"])
+
+    def test_complete_partial_file(self):
+        os.makedirs(os.path.dirname(self.destination))
+        with open(self.destination + ".part", "wb") as f:
+            f.write(PAYLOAD)
+        self.assertDownloaded(download_file(self.url, self.destination, sha256=SHA256))
+
+    def test_server_without_ranges(self):
+        self.server.ranges_supported = False
+        self.server.drops = 1
+        self.assertDownloaded(download_file(self.url, self.destination, sha256=SHA256))
+        self.assertEqual(len(self.server.ranges), 2)
+
+    def test_stale_partial_file_is_replaced(self):
+        os.makedirs(os.path.dirname(self.destination))
+        with open(self.destination + ".part", "wb") as f:
+            f.write(b"an older installer")
+        self.assertDownloaded(download_file(self.url, self.destination, sha256=SHA256))
+        self.assertEqual(self.server.ranges, ["bytes=18-", None])
+
+    def test_digest_mismatch(self):
+        with self.assertRaises(DownloadError):
+            download_file(self.url, self.destination, sha256="0" * 64)
+        self.assertFalse(os.path.exists(self.destination))
+        self.assertFalse(os.path.exists(self.destination + ".part"))
+
+    def test_gives_up(self):
+        self.server.drops = 10
+        with self.assertRaises(DownloadError):
+            download_file(self.url, self.destination, sha256=SHA256, attempts=3)
+        self.assertEqual(len(self.server.ranges), 3)
+        # What arrived is kept for the next try
+        self.assertEqual(os.path.getsize(self.destination + ".part"), 3 * self.server.drop_after)
+
+    def test_progress_is_throttled(self):
+        reports = []
+        with mock.patch.object(downloader, "PROGRESS_INTERVAL", 3600):
+            download_file(self.url, self.destination, progress_callback=reports.append)
+        # The first chunk and the final 100%, nothing in between
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(reports[-1], 100.0)
+
+    def test_chunk_size_adapts(self):
+        self.assertEqual(downloader._next_chunk_size(downloader.MIN_CHUNK, 0.001), 2 * downloader.MIN_CHUNK)
+        self.assertEqual(downloader._next_chunk_size(downloader.MAX_CHUNK, 0.001), downloader.MAX_CHUNK)
+        self.assertEqual(downloader._next_chunk_size(4 * downloader.MIN_CHUNK, 10), 2 * downloader.MIN_CHUNK)
+        self.assertEqual(downloader._next_chunk_size(downloader.MIN_CHUNK, 10), downloader.MIN_CHUNK)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+import subprocess
+from speedview.controllers.engine import CounterSampler, Sample, SpeedEngine
+from speedview.daemon import HeadlessDaemon
+from speedview.models.settings import Settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Resident memory budget of the headless daemon
+HEADLESS_RSS_BUDGET_MB = 30
+
+
+class CountingSource:
+    """Counter source whose counters grow by 1000 bytes per read"""
+    name = "counting"
+    def __init__(self):
+        self.reads = 0
+        self.closed = False
+    def read(self):
+        self.reads += 1
+        return ("eth0", "wlan0"), (self.reads * 1000, 0), (0, self.reads * 500)
+    def close(self):
+        self.closed = True
+
+
+class RecordingHistory:
+    def __init__(self):
+        self.tables = []
+    def append_rates(self, timestamp_ns, interval_ns, table):
+        self.tables.append((interval_ns, table))
+
+
+class TestSpeedEngine(unittest.TestCase):
+    def setUp(self):
+        self.history = RecordingHistory()
+        self.engine = SpeedEngine("eth0", self.history)
+        self.updates = []
+        self.engine.subscribe(self.updates.append)
+
+    def test_first_sample_only_sets_baseline(self):
+        self.assertIsNone(self.engine.process([Sample(0, ("eth0",), (0,), (0,))]))
+        self.assertEqual(self.updates, [])
+
+    def test_window_update(self):
+        self.engine.process([Sample(0, ("eth0",), (0,), (0,))])
+        update = self.engine.process([Sample(10 ** 9, ("eth0",), (125_000,), (12_500,))])
+        self.assertEqual(self.updates, [update])
+        self.assertAlmostEqual(update.download_mbps, 1.0)
+        self.assertAlmostEqual(update.upload_mbps, 0.1)
+        self.assertEqual(update.interface_rates[0].interface, "eth0")
+        self.assertIs(self.engine.latest, update)
+        self.assertEqual(self.history.tables[0][0], 10 ** 9)
+
+    def test_interface_change_resets_baseline(self):
+        self.engine.process([Sample(0, ("eth0", "wlan0"), (0, 10 ** 9), (0, 0))])
+        self.engine.interface = "wlan0"
+        update = self.engine.process([Sample(10 ** 9, ("eth0", "wlan0"), (0, 10 ** 9 + 125_000), (0, 0))])
+        # No rate until wlan0 has a baseline of its own
+        self.assertIsNone(update.rate)
+        self.assertIsNotNone(update.interface_rates)
+
+    def test_subscriber_errors_do_not_stop_others(self):
+        def broken(update):
+            raise RuntimeError("broken subscriber")
+        self.engine.unsubscribe(self.updates.append)
+        self.engine.subscribe(broken)
+        self.engine.subscribe(self.updates.append)
+        self.engine.process([Sample(0, ("eth0",), (0,), (0,))])
+        self.engine.process([Sample(10 ** 9, ("eth0",), (1000,), (0,))])
+        self.assertEqual(len(self.updates), 1)
+
+
+class TestCounterSampler(unittest.TestCase):
+    def test_background_thread(self):
+        source = CountingSource()
+        counters = CounterSampler(source)
+        counters.start_thread(100)
+        self.assertTrue(counters.running)
+        time.sleep(0.2)
+        counters.close()
+        self.assertFalse(counters.running)
+        self.assertTrue(source.closed)
+        samples = counters.drain()
+        self.assertGreaterEqual(len(samples), 5)
+        self.assertEqual(len(samples), source.reads)
+
+
+class TestHeadlessDaemon(unittest.TestCase):
+    def make_daemon(self, sample_hz=0):
+        settings = Settings()
+        settings.selected_interface = "eth0"
+        settings.update_interval = 0.01
+        settings.sample_hz = sample_hz
+        settings.render_hz = 20
+        self.source = CountingSource()
+        self.history = RecordingHistory()
+        return HeadlessDaemon(settings, self.history, source=self.source)
+
+    def test_run_for_duration(self):
+        daemon = self.make_daemon()
+        updates = []
+        daemon.engine.subscribe(updates.append)
+        asyncio.run(daemon.run(0.2))
+        self.assertGreaterEqual(daemon.ticks, 5)
+        self.assertEqual(len(updates), daemon.ticks - 1)
+        self.assertEqual(len(self.history.tables), daemon.ticks - 1)
+        self.assertTrue(self.source.closed)
+
+    def test_high_frequency_windows(self):
+        daemon = self.make_daemon(sample_hz=100)
+        asyncio.run(daemon.run(0.3))
+        self.assertGreater(self.source.reads, daemon.ticks)
+        self.assertFalse(daemon.counters.running)
+
+    def test_stop(self):
+        daemon = self.make_daemon()
+
+        async def run():
+            asyncio.get_running_loop().call_later(0.05, daemon.stop)
+            await daemon.run()
+
+        start = time.monotonic()
+        asyncio.run(run())
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "RSS is read from /proc")
+    def test_headless_process_has_no_qt_and_fits_budget(self):
+        # VmHWM is the peak RSS since exec; ru_maxrss would include the forked test runner
+        script = (
+            "import sys\n"
+            "from speedview.daemon import main\n"
+            "main(['--duration', '0.5', '--no-history'])\n"
+            "assert 'PyQt5' not in sys.modules, 'PyQt5 was imported'\n"
+            "print(open('/proc/self/status').read().split('VmHWM:')[1].split()[0])\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, APPDATA=directory)
+            result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                                    capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        rss_mb = int(result.stdout.split()[-1]) / 1024
+        self.assertLess(rss_mb, HEADLESS_RSS_BUDGET_MB)
+
+
+if __name__ == '__main__':
+    unittest.main()
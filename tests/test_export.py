@@ -0,0 +1,202 @@
+import io
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+import tracemalloc
+from array import array
+from unittest import mock
+
+import export
+from speedview.models import history as history_module
+from speedview.models.history import HistoryStore, SECOND_NS, DAY_NS
+from speedview.models.results import ResultsStore, SpeedTestResult
+from speedview.utils.export import (HISTORY_FIELDS, RESULT_FIELDS, export_rows, format_for_path,
+                                    history_rows, result_rows, write_csv, write_jsonl, HAVE_PYARROW)
+
+# 2024-01-01T00:00:00Z
+BASE_NS = 1_704_067_200 * SECOND_NS
+
+
+class TestHistoryExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = HistoryStore(os.path.join(self.directory, "history"), retention_days=0)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def fill(self):
+        for i in range(3):
+            for day in (0, 1):
+                timestamp_ns = BASE_NS + day * DAY_NS + i * SECOND_NS
+                self.store.append(timestamp_ns, SECOND_NS, "eth0", 1000 + i, 10)
+                self.store.append(timestamp_ns + 1, SECOND_NS, "wlan0", 2000 + i, 20)
+        self.store.flush()
+
+    def test_records_are_merged_in_time_order(self):
+        self.fill()
+        rows = list(history_rows(self.store, BASE_NS, BASE_NS + 2 * DAY_NS))
+        self.assertEqual(len(rows), 12)
+        self.assertEqual([row[0] for row in rows], sorted(row[0] for row in rows))
+        self.assertEqual(rows[0], (BASE_NS, "eth0", SECOND_NS, 1000, 10))
+        self.assertEqual(rows[1], (BASE_NS + 1, "wlan0", SECOND_NS, 2000, 20))
+
+    def test_filters_are_applied_by_the_store(self):
+        self.fill()
+        rows = list(history_rows(self.store, BASE_NS + SECOND_NS, BASE_NS + DAY_NS, "wlan0"))
+        self.assertEqual([row[3] for row in rows], [2001, 2002])
+        self.assertEqual(list(history_rows(self.store, BASE_NS, BASE_NS + DAY_NS, "lo")), [])
+
+    def test_segments_are_read_in_chunks(self):
+        self.fill()
+        with mock.patch.object(history_module, "STREAM_RECORDS", 2):
+            rows = list(history_rows(self.store, BASE_NS, BASE_NS + DAY_NS, "eth0"))
+        self.assertEqual([row[3] for row in rows], [1000, 1001, 1002])
+
+    def test_export_memory_does_not_grow_with_range(self):
+        # Two days of records every 4 s, written straight into the segments
+        for day in range(2):
+            values = array('q')
+            for i in range(0, 86400, 4):
+                values.extend((BASE_NS + day * DAY_NS + i * SECOND_NS, 4 * SECOND_NS, 8000, 800))
+            interface_id = self.store._interface_id("eth0", create=True)
+            path = self.store._segment(history_module._day(BASE_NS + day * DAY_NS), interface_id)
+            with open(path, 'wb') as f:
+                values.tofile(f)
+        del values
+
+        tracemalloc.start()
+        try:
+            with open(os.devnull, 'w', newline='') as f, \
+                    mock.patch.object(history_module, "STREAM_RECORDS", 256):
+                count = write_csv(history_rows(self.store, BASE_NS, BASE_NS + 2 * DAY_NS), HISTORY_FIELDS, f)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 2 * 21600)
+        # The raw records alone are 1.4 MB
+        self.assertLess(peak, 256 * 1024)
+
+
+class TestWriters(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.rows = [(BASE_NS, "eth0", SECOND_NS, 1000, 10), (BASE_NS + SECOND_NS, "eth0", SECOND_NS, 2000, 20)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_format_for_path(self):
+        self.assertEqual(format_for_path("a.CSV"), "csv")
+        self.assertEqual(format_for_path("a.ndjson"), "jsonl")
+        self.assertEqual(format_for_path("a.parquet"), "parquet")
+        self.assertIsNone(format_for_path("a.txt"))
+
+    def test_csv(self):
+        f = io.StringIO()
+        self.assertEqual(write_csv(iter(self.rows), HISTORY_FIELDS, f), 2)
+        lines = list(csv.reader(io.StringIO(f.getvalue())))
+        self.assertEqual(lines[0], list(HISTORY_FIELDS))
+        self.assertEqual(lines[2], [str(value) for value in self.rows[1]])
+
+    def test_jsonl(self):
+        f = io.StringIO()
+        write_jsonl(iter(self.rows), HISTORY_FIELDS, f)
+        records = [json.loads(line) for line in f.getvalue().splitlines()]
+        self.assertEqual(records[0]["rx_bps"], 1000)
+        self.assertEqual(records[1]["timestamp_ns"], BASE_NS + SECOND_NS)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_rows(iter(self.rows), HISTORY_FIELDS, os.path.join(self.directory, "out.txt"))
+
+    def test_binary_formats_need_a_file(self):
+        for export_format in ("parquet", "arrow"):
+            with self.assertRaises(ValueError):
+                export_rows(iter(self.rows), HISTORY_FIELDS, "-", export_format)
+        self.assertFalse(os.path.exists("-"))
+
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_parquet_in_batches(self):
+        import pyarrow.parquet
+        path = os.path.join(self.directory, "out.parquet")
+        rows = [(BASE_NS + i, "eth0", SECOND_NS, i, 0) for i in range(10)]
+        with mock.patch("speedview.utils.export.ARROW_BATCH_ROWS", 3):
+            self.assertEqual(export_rows(iter(rows), HISTORY_FIELDS, path), 10)
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.column("rx_bps").to_pylist(), list(range(10)))
+        self.assertEqual(str(table.schema.field("timestamp_ns").type), "int64")
+
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_arrow_results_with_missing_values(self):
+        import pyarrow.ipc
+        path = os.path.join(self.directory, "out.arrow")
+        rows = [SpeedTestResult(1.0, None, None, None, 10.0, 1.0, None, "fast.com"),
+                SpeedTestResult(2.0, "Server", 5.0, 1.0, 20.0, 2.0, "eth0", "speedtest.net")]
+        export_rows(iter(rows), RESULT_FIELDS, path)
+        table = pyarrow.ipc.open_file(path).read_all()
+        self.assertEqual(table.column("server").to_pylist(), [None, "Server"])
+
+
+class TestExportCommand(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.history_dir = os.path.join(self.directory, "history")
+        self.results_db = os.path.join(self.directory, "results.db")
+        store = HistoryStore(self.history_dir, retention_days=0)
+        for i in range(5):
+            store.append(BASE_NS + i * SECOND_NS, SECOND_NS, "eth0", 1000 * i + 1, 0)
+        store.close()
+        results = ResultsStore(self.results_db)
+        results.add(SpeedTestResult(BASE_NS / SECOND_NS, "Server", 5.0, None, 100.0, 10.0, "eth0",
+                                    "speedtest.net"))
+        results.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_export(self, *args):
+        return export.main([*args, "--history-dir", self.history_dir, "--results-db", self.results_db])
+
+    def test_history_time_range(self):
+        output = os.path.join(self.directory, "traffic.jsonl")
+        self.assertEqual(self.run_export("history", output, "--start", "2024-01-01T00:00:01+00:00",
+                                         "--end", "2024-01-01T00:00:03+00:00"), 0)
+        with open(output) as f:
+            rx = [json.loads(line)["rx_bps"] for line in f]
+        self.assertEqual(rx, [1001, 2001])
+
+    def test_export_leaves_history_alone(self):
+        # The 2024 rollup segments are past the 1s and 1m tier retention
+        before = sorted(os.listdir(self.history_dir))
+        self.assertTrue(any(name.startswith("1s-") for name in before))
+        self.assertEqual(self.run_export("history", os.path.join(self.directory, "traffic.csv")), 0)
+        self.assertEqual(sorted(os.listdir(self.history_dir)), before)
+
+    def test_results(self):
+        output = os.path.join(self.directory, "tests.csv")
+        self.assertEqual(self.run_export("results", output, "--interface", "eth0"), 0)
+        with open(output, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(float(rows[0]["download_mbps"]), 100.0)
+
+    def test_format_required_for_unknown_extension(self):
+        self.assertEqual(self.run_export("history", os.path.join(self.directory, "out.txt")), 2)
+
+    def test_binary_format_to_stdout_is_refused(self):
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory)
+        for export_format in ("parquet", "arrow"):
+            with mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                self.assertEqual(self.run_export("history", "-", "--format", export_format), 2)
+            self.assertIn("standard output", stderr.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "-")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from PyQt5.QtWidgets import QApplication
 from speedview.ui.floating_window import FloatingWindow
@@ -77,5 +79,18 @@ class TestFloatingWindow(unittest.TestCase):
         self.assertTrue(window.isVisible())
         window.close()
 
+    def test_updates_create_no_temp_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            previous_tempdir = tempfile.tempdir
+            tempfile.tempdir = temp_dir
+            try:
+                window = FloatingWindow(DummySpeedController(), Settings(), DummyNetworkController())
+                for i in range(10000):
+                    window.update_display((float(i % 100), 1.0))
+                window.close()
+            finally:
+                tempfile.tempdir = previous_tempdir
+            self.assertEqual(os.listdir(temp_dir), [])
+
 if __name__ == '__main__':
     unittest.main()
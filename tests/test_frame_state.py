@@ -0,0 +1,36 @@
+import unittest
+from speedview.ui.frame_state import FrameState
+
+
+class TestFrameState(unittest.TestCase):
+    def test_initial_frame_is_fully_dirty(self):
+        state = FrameState()
+        self.assertEqual(state.take_dirty(), set(FrameState.FIELDS))
+        self.assertEqual(state.dirty, set())
+
+    def test_update_marks_only_changed_fields(self):
+        state = FrameState(status="Connected")
+        state.take_dirty()
+        self.assertTrue(state.update(speed=12.5, status="Connected"))
+        self.assertEqual(state.take_dirty(), {"speed"})
+
+    def test_speed_update_keeps_connection_state(self):
+        state = FrameState()
+        state.update(status="Disconnected", connection_type="Ethernet")
+        state.update(speed=3.0)
+        self.assertEqual(state.status, "Disconnected")
+        self.assertEqual(state.connection_type, "Ethernet")
+
+    def test_unchanged_update(self):
+        state = FrameState()
+        state.take_dirty()
+        self.assertFalse(state.update(speed=0.0))
+        self.assertEqual(state.dirty, set())
+
+    def test_unknown_field(self):
+        with self.assertRaises(AttributeError):
+            FrameState().update(colour="red")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from speedview.controllers.interface_monitor import InterfaceRate
+from speedview.models.history import HistoryStore, RECORD, DAY_NS, day_range, pick_tier
+
+SECOND_NS = 1_000_000_000
+# 2024-01-01T00:00:00Z
+BASE_NS = 1_704_067_200 * SECOND_NS
+# Midnight UTC two days ago, so reopening a store does not expire the rollups
+RECENT_NS = (time.time_ns() // DAY_NS - 2) * DAY_NS
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = HistoryStore(self.directory, retention_days=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_append_and_query(self):
+        for i in range(10):
+            self.store.append(BASE_NS + i * SECOND_NS, SECOND_NS, "eth0", 1000 * (i + 1), 500)
+        records = self.store.query(BASE_NS + 2 * SECOND_NS, BASE_NS + 5 * SECOND_NS, "eth0")
+        self.assertEqual([record.rx_bps for record in records], [3000, 4000, 5000])
+        self.assertEqual(records[0].interval_ns, SECOND_NS)
+
+    def test_idle_intervals_are_not_stored(self):
+        self.store.append(BASE_NS, SECOND_NS, "eth0", 0, 0)
+        self.store.flush()
+        self.assertEqual(self.store.segments(), [])
+
+    def test_daily_segments_per_interface(self):
+        table = [InterfaceRate("eth0", 8000, 0), InterfaceRate("wlan0", 0, 8000)]
+        self.store.append_rates(BASE_NS, SECOND_NS, table)
+        self.store.append_rates(BASE_NS + DAY_NS, SECOND_NS, table)
+        self.store.flush()
+        self.assertEqual(len(self.store.segments()), 4)
+        self.assertEqual([day for day, _ in self.store.segments("wlan0")], ["20240101", "20240102"])
+
+    def test_summary(self):
+        # 10 s at 8 kbit/s down and 16 kbit/s up on two interfaces
+        for i in range(10):
+            self.store.append(BASE_NS + i * SECOND_NS, SECOND_NS, "eth0", 8000, 16000)
+            self.store.append(BASE_NS + i * SECOND_NS, SECOND_NS, "wlan0", 8000, 0)
+        eth0 = self.store.summary(BASE_NS, BASE_NS + DAY_NS, "eth0")
+        self.assertEqual((eth0.samples, eth0.rx_bytes, eth0.tx_bytes), (10, 10_000, 20_000))
+        self.assertEqual(eth0.mean_rx_bps(20), 4000)
+        both = self.store.summary(BASE_NS, BASE_NS + DAY_NS)
+        self.assertEqual(both.rx_bytes, 20_000)
+        self.assertEqual(self.store.summary(BASE_NS, BASE_NS + DAY_NS, "missing").samples, 0)
+
+    def test_reopen_keeps_interfaces(self):
+        self.store.append(BASE_NS, SECOND_NS, "wlan0", 1, 1)
+        self.store.append(BASE_NS, SECOND_NS, "eth0", 2, 2)
+        self.store.close()
+        reopened = HistoryStore(self.directory, retention_days=0)
+        self.assertEqual(reopened.query(BASE_NS, BASE_NS + SECOND_NS, "eth0")[0].rx_bps, 2)
+
+    def test_torn_record_is_ignored(self):
+        self.store.append(BASE_NS, SECOND_NS, "eth0", 1, 1)
+        self.store.flush()
+        _, path = self.store.segments()[0]
+        with open(path, 'ab') as f:
+            f.write(b"\x01\x02\x03")
+        self.assertEqual(len(self.store.query(BASE_NS, BASE_NS + DAY_NS, "eth0")), 1)
+
+    def test_retention(self):
+        self.store.retention_days = 7
+        self.store.append(BASE_NS, SECOND_NS, "eth0", 1, 1)
+        self.store.append(BASE_NS + 10 * DAY_NS, SECOND_NS, "eth0", 1, 1)
+        self.store.flush()
+        self.store.apply_retention(now_ns=BASE_NS + 10 * DAY_NS)
+        self.assertEqual([day for day, _ in self.store.segments()], ["20240111"])
+
+    def test_records_are_fixed_width(self):
+        for i in range(100):
+            self.store.append(BASE_NS + i * SECOND_NS, SECOND_NS, "eth0", 1, 1)
+        self.store.flush()
+        _, path = self.store.segments()[0]
+        self.assertEqual(os.path.getsize(path), 100 * RECORD.size)
+
+    def test_day_range(self):
+        self.assertEqual(day_range(1, now_ns=DAY_NS), (0, DAY_NS + 1))
+
+
+class TestRollups(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = HistoryStore(self.directory, retention_days=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def fill(self, seconds, interface="eth0", rate=lambda i: 8000, start=0):
+        for i in range(start, start + seconds):
+            self.store.append(RECENT_NS + i * SECOND_NS, SECOND_NS, interface, rate(i), 0)
+
+    def test_pick_tier(self):
+        self.assertEqual(pick_tier(0.1).name, "1s")
+        self.assertEqual(pick_tier(59).name, "1s")
+        self.assertEqual(pick_tier(60).name, "1m")
+        self.assertEqual(pick_tier(7200).name, "1h")
+        self.assertEqual(pick_tier(10 ** 7).name, "1d")
+
+    def test_minute_buckets(self):
+        self.fill(180, rate=lambda i: 8000 * (i % 60 + 1))
+        buckets = self.store.rollup(RECENT_NS, RECENT_NS + 180 * SECOND_NS, 60, "eth0")
+        self.assertEqual(len(buckets), 3)
+        first = buckets[0]
+        self.assertEqual((first.start_ns, first.samples, first.covered_ns), (RECENT_NS, 60, 60 * SECOND_NS))
+        self.assertEqual((first.rx_min_bps, first.rx_max_bps), (8000, 480_000))
+        self.assertEqual(first.rx_mean_bps, 8000 * 30.5)
+        # The last bucket is still open in memory and is included
+        self.assertEqual(buckets[-1].samples, 60)
+
+    def test_coarse_tier_matches_raw_totals(self):
+        self.fill(2 * 3600, rate=lambda i: 1000 + i)
+        raw = sum(record.rx_bps for record in self.store.query(RECENT_NS, RECENT_NS + DAY_NS, "eth0")) / 8
+        hourly = self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 3600, "eth0")
+        self.assertEqual(len(hourly), 2)
+        self.assertEqual(sum(bucket.rx_bits for bucket in hourly) / 8, raw)
+
+    def test_idle_time_counts_in_active_bucket(self):
+        self.store.append(RECENT_NS, SECOND_NS, "eth0", 8000, 0)
+        self.store.append(RECENT_NS + SECOND_NS, SECOND_NS, "eth0", 0, 0)
+        bucket = self.store.rollup(RECENT_NS, RECENT_NS + 60 * SECOND_NS, 60, "eth0")[0]
+        self.assertEqual((bucket.samples, bucket.rx_min_bps, bucket.rx_mean_bps), (2, 0, 4000))
+
+    def test_bucket_split_by_restart_is_joined(self):
+        self.fill(10)
+        self.store.close()
+        reopened = HistoryStore(self.directory, retention_days=0)
+        for i in range(10, 20):
+            reopened.append(RECENT_NS + i * SECOND_NS, SECOND_NS, "eth0", 16000, 0)
+        bucket = reopened.rollup(RECENT_NS, RECENT_NS + 60 * SECOND_NS, 60, "eth0")[0]
+        self.assertEqual((bucket.samples, bucket.rx_min_bps, bucket.rx_max_bps), (20, 8000, 16000))
+
+    def test_open_buckets_survive_a_crash(self):
+        self.fill(90)
+        self.store.flush()
+        # Abandoned without close(), as after a kill or power loss
+        reopened = HistoryStore(self.directory, retention_days=0)
+        for tier_seconds in (3600, 86400):
+            bucket = reopened.rollup(RECENT_NS, RECENT_NS + DAY_NS, tier_seconds, "eth0")[0]
+            self.assertEqual((bucket.start_ns, bucket.samples, bucket.rx_bits), (RECENT_NS, 90, 90 * 8000))
+        # Recovered once; opening again does not count the buckets twice
+        reopened.close()
+        again = HistoryStore(self.directory, retention_days=0)
+        self.assertEqual(again.rollup(RECENT_NS, RECENT_NS + DAY_NS, 86400, "eth0")[0].samples, 90)
+
+    def test_queries_do_not_write(self):
+        self.fill(90)
+        before = sorted(os.listdir(self.directory))
+        # Buffered records and closed buckets are read from memory
+        self.assertEqual(len(self.store.query(RECENT_NS, RECENT_NS + DAY_NS, "eth0")), 90)
+        self.assertEqual(len(self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 60, "eth0")), 2)
+        self.assertEqual(self.store.summary(RECENT_NS, RECENT_NS + DAY_NS, "eth0").samples, 90)
+        self.assertEqual(sorted(os.listdir(self.directory)), before)
+        self.store.flush()
+        # The same answers once half of it is on disk
+        self.fill(30, start=90)
+        self.assertEqual(len(self.store.query(RECENT_NS, RECENT_NS + DAY_NS, "eth0")), 120)
+        self.assertEqual(self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 3600, "eth0")[0].samples, 120)
+
+    def test_unchanged_buckets_are_not_checkpointed_again(self):
+        self.fill(10)
+        self.store.flush()
+        checkpoint = os.path.join(self.directory, "open-buckets.json")
+        saved = os.stat(checkpoint)
+        self.store.flush()
+        self.assertEqual(os.stat(checkpoint).st_ino, saved.st_ino)
+        self.fill(1, start=10)
+        self.store.flush()
+        self.assertNotEqual(os.stat(checkpoint).st_ino, saved.st_ino)
+
+    def test_read_only_store_writes_nothing(self):
+        self.fill(90)
+        self.store.flush()
+        checkpoint = os.path.join(self.directory, "open-buckets.json")
+        with open(checkpoint, "rb") as f:
+            saved = f.read()
+        before = sorted(os.listdir(self.directory))
+        reader = HistoryStore(self.directory, retention_days=1, read_only=True)
+        self.assertEqual(len(reader.query(RECENT_NS, RECENT_NS + DAY_NS, "eth0")), 90)
+        reader.rollup(RECENT_NS, RECENT_NS + DAY_NS, 3600, "eth0")
+        # The running store's open buckets are neither recovered nor overwritten
+        self.assertEqual(sorted(os.listdir(self.directory)), before)
+        with open(checkpoint, "rb") as f:
+            self.assertEqual(f.read(), saved)
+
+    def test_interfaces_added_together(self):
+        self.fill(60, "eth0")
+        self.fill(60, "wlan0")
+        bucket = self.store.rollup(RECENT_NS, RECENT_NS + 60 * SECOND_NS, 60)[0]
+        self.assertEqual((bucket.rx_bits, bucket.rx_max_bps), (2 * 60 * 8000, 16000))
+        self.assertEqual(bucket.covered_ns, 60 * SECOND_NS)
+
+    def test_aggregates_outlive_raw_records(self):
+        self.store.retention_days = 7
+        self.fill(120)
+        self.store.close()
+        self.store.apply_retention(now_ns=RECENT_NS + 60 * DAY_NS)
+        self.assertEqual(self.store.segments(), [])
+        self.assertEqual(self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 60, "eth0")[0].samples, 60)
+        self.assertEqual(self.store.summary(RECENT_NS, RECENT_NS + DAY_NS, "eth0").rx_bytes, 120 * 1000)
+
+    def test_second_buckets_follow_raw_retention(self):
+        self.store.retention_days = 7
+        self.fill(120)
+        self.store.close()
+        self.store.apply_retention(now_ns=RECENT_NS + 6 * DAY_NS)
+        self.assertEqual(len(self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 1, "eth0")), 120)
+        self.store.apply_retention(now_ns=RECENT_NS + 8 * DAY_NS)
+        self.assertEqual(self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 1, "eth0"), [])
+        self.assertEqual(len(self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 60, "eth0")), 2)
+        # Kept forever, like the raw records, when the retention is 0
+        self.store.retention_days = 0
+        self.fill(10)
+        self.store.close()
+        self.store.apply_retention(now_ns=RECENT_NS + 1000 * DAY_NS)
+        self.assertEqual(len(self.store.rollup(RECENT_NS, RECENT_NS + DAY_NS, 1, "eth0")), 10)
+
+    def test_month_summary_reads_few_buckets(self):
+        # A month at 1 Hz is 2.6M raw records; the summary reads minute buckets
+        self.fill(3600)
+        summary = self.store.summary(RECENT_NS, RECENT_NS + 30 * DAY_NS, "eth0")
+        self.assertEqual(summary.samples, 3600)
+        self.assertEqual(len(self.store.rollup(RECENT_NS, RECENT_NS + 30 * DAY_NS, 30 * 86.4, "eth0")), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import time
+import threading
+import unittest
+from PyQt5.QtWidgets import QApplication
+from speedview.models.history import Bucket, SECOND_NS, pick_tier
+from speedview.ui.history_chart import HistoryChart, TILE_WIDTH, MIN_LEVEL, MAX_LEVEL, nice_ceiling
+from speedview.utils.decimation import decimate_min_max
+
+# 2024-01-01T00:00:00Z
+BASE_NS = 1_704_067_200 * SECOND_NS
+
+
+class FakeHistory:
+    """Constant traffic in every bucket, recording the ranges asked for"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self.release = threading.Event()
+        self.release.set()
+
+    def rollup(self, start_ns, end_ns, resolution_s, interface=None):
+        self.release.wait(5)
+        self.calls.append((start_ns, end_ns))
+        self.threads.add(threading.current_thread())
+        tier = pick_tier(resolution_s)
+        first_ns = start_ns - start_ns % tier.bucket_ns
+        return [Bucket(bucket_ns, tier.seconds, 1, tier.bucket_ns, 1000, 3000, 2000 * tier.seconds,
+                       100, 300, 200 * tier.seconds)
+                for bucket_ns in range(first_ns, end_ns, tier.bucket_ns)]
+
+
+def draw(chart, timeout=5.0):
+    """Paint, wait for the tiles it asked for, and paint again with them"""
+    chart.grab()
+    deadline = time.monotonic() + timeout
+    while chart.loading:
+        if time.monotonic() > deadline:
+            raise AssertionError("Tiles did not load")
+        QApplication.processEvents()
+        time.sleep(0.002)
+    return chart.grab()
+
+
+class TestDecimation(unittest.TestCase):
+    def test_keeps_extremes_per_column(self):
+        xs = [0, 1, 2, 3, 10, 11]
+        lows = [5, 1, 7, 6, 2, 3]
+        highs = [5, 9, 7, 6, 2, 3]
+        columns = decimate_min_max(xs, lows, highs, lows, 0, 4, 3)
+        self.assertEqual(columns.mins, [1, None, 2])
+        self.assertEqual(columns.maxs, [9, None, 3])
+        self.assertEqual(columns.means, [4.75, None, 2.5])
+
+    def test_points_outside_are_ignored(self):
+        columns = decimate_min_max([-5, 0, 8], [1, 2, 3], [1, 2, 3], [1, 2, 3], 0, 4, 2)
+        self.assertEqual(columns.maxs, [2, None])
+
+    def test_nice_ceiling(self):
+        self.assertEqual(nice_ceiling(0), 1)
+        self.assertEqual(nice_ceiling(3), 5)
+        self.assertEqual(nice_ceiling(1000), 1000)
+        self.assertEqual(nice_ceiling(1001), 2000)
+
+
+class TestHistoryChart(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.history = FakeHistory()
+        self.chart = HistoryChart(self.history)
+        self.chart.resize(600, 300)
+        # A year ago, so every tile is complete and cacheable
+        self.chart.show_range(BASE_NS, BASE_NS + 86400 * SECOND_NS)
+
+    def tearDown(self):
+        self.chart.close()
+
+    def test_show_range_fits_width(self):
+        start_ns, end_ns = self.chart.view_range()
+        self.assertLessEqual(start_ns, BASE_NS)
+        self.assertGreaterEqual(end_ns, BASE_NS + 86400 * SECOND_NS)
+        self.assertLess(end_ns - start_ns, 2 * 86400 * SECOND_NS)
+        self.assertEqual(start_ns % self.chart.ns_per_pixel, 0)
+
+    def test_fetches_only_visible_tiles(self):
+        draw(self.chart)
+        start_ns, end_ns = self.chart.view_range()
+        self.assertTrue(self.history.calls)
+        for call_start, call_end in self.history.calls:
+            self.assertEqual(call_end - call_start, TILE_WIDTH * self.chart.ns_per_pixel)
+            self.assertLess(call_start, end_ns)
+            self.assertGreater(call_end, start_ns)
+
+    def test_pan_reuses_cached_tiles(self):
+        draw(self.chart)
+        fetched = len(self.history.calls)
+        self.chart.pan(-10)
+        self.chart.pan(10)
+        draw(self.chart)
+        self.assertEqual(len(self.history.calls), fetched)
+
+        # Panning a whole tile width brings in exactly one new tile
+        self.chart.pan(TILE_WIDTH)
+        draw(self.chart)
+        self.assertEqual(len(self.history.calls), fetched + 1)
+
+    def test_zoom_keeps_anchor(self):
+        plot = self.chart.plot_rect()
+        anchor_x = plot.left() + 100
+        before_ns = self.chart.view_start_ns + 100 * self.chart.ns_per_pixel
+        level = self.chart.level
+        self.chart.zoom(1, anchor_x)
+        self.assertEqual(self.chart.level, level - 1)
+        after_ns = self.chart.view_start_ns + 100 * self.chart.ns_per_pixel
+        self.assertLessEqual(abs(after_ns - before_ns), self.chart.ns_per_pixel)
+
+    def test_zoom_is_clamped(self):
+        self.chart.zoom(100)
+        self.assertEqual(self.chart.level, MIN_LEVEL)
+        self.chart.zoom(-100)
+        self.assertEqual(self.chart.level, MAX_LEVEL)
+        draw(self.chart)
+
+    def test_paint_never_queries_the_store(self):
+        self.history.release.clear()
+        start = time.monotonic()
+        self.chart.grab()  # Returns while the loader is stuck in the store
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertTrue(self.chart.loading)
+        self.history.release.set()
+        draw(self.chart)
+        self.assertTrue(self.history.calls)
+        self.assertNotIn(threading.main_thread(), self.history.threads)
+
+    def test_coarser_tiles_stand_in_while_loading(self):
+        draw(self.chart)
+        self.history.release.clear()
+        self.chart.zoom(2)
+        self.chart.grab()
+        tile_ns = TILE_WIDTH * self.chart.ns_per_pixel
+        start_ns, end_ns = self.chart.view_range()
+        for index in range(start_ns // tile_ns, (end_ns - 1) // tile_ns + 1):
+            level, _, data, _, width = self.chart._fallback(self.chart.level, index)
+            self.assertEqual((level, width), (self.chart.level + 2, TILE_WIDTH // 4))
+            self.assertGreater(data.peak_bps, 0)
+        self.history.release.set()
+        draw(self.chart)
+
+    def test_scrolled_away_tiles_are_skipped(self):
+        self.history.release.clear()
+        self.chart.grab()
+        self.chart.pan(100 * TILE_WIDTH)
+        self.chart.grab()
+        self.history.release.set()
+        draw(self.chart)
+        # Only the tiles on screen now, and at most the one the loader had started
+        self.assertLessEqual(len(self.history.calls), len(self.chart._visible) + 1)
+
+    def test_interface_change_refetches(self):
+        draw(self.chart)
+        fetched = len(self.history.calls)
+        self.chart.set_interface("eth0")
+        draw(self.chart)
+        self.assertGreater(len(self.history.calls), fetched)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest import mock
+from speedview.controllers import interface_monitor
+from speedview.controllers.interface_monitor import InterfaceRateMonitor
+from speedview.controllers.rate import counter_delta
+from speedview.controllers.sampler import Sample
+
+SECOND_NS = 1_000_000_000
+
+
+def make_sample(timestamp_ns, counters):
+    """Sample from a {interface: (bytes_recv, bytes_sent)} mapping"""
+    interfaces = tuple(counters)
+    return Sample(timestamp_ns, interfaces,
+                  tuple(counters[name][0] for name in interfaces),
+                  tuple(counters[name][1] for name in interfaces))
+
+
+class TestInterfaceRateMonitor(unittest.TestCase):
+    def setUp(self):
+        self.monitor = InterfaceRateMonitor()
+
+    def test_first_sample_has_no_rates(self):
+        self.assertIsNone(self.monitor.update(make_sample(SECOND_NS, {"eth0": (0, 0)})))
+
+    def test_rates_per_interface(self):
+        self.monitor.update(make_sample(SECOND_NS, {"eth0": (0, 0), "wlan0": (1000, 1000)}))
+        table = self.monitor.update(make_sample(2 * SECOND_NS, {"eth0": (125_000, 0), "wlan0": (1000, 251_000)}))
+        rates = {rate.interface: rate for rate in table}
+        self.assertAlmostEqual(rates["eth0"].rx_bps, 1_000_000)
+        self.assertAlmostEqual(rates["eth0"].tx_bps, 0)
+        self.assertAlmostEqual(rates["wlan0"].tx_bps, 2_000_000)
+
+    def test_new_interface_reports_zero_until_next_sample(self):
+        self.monitor.update(make_sample(SECOND_NS, {"eth0": (0, 0)}))
+        table = self.monitor.update(make_sample(2 * SECOND_NS, {"eth0": (0, 0), "tun0": (10 ** 9, 10 ** 9)}))
+        self.assertEqual([(rate.interface, rate.rx_bps) for rate in table], [("eth0", 0.0), ("tun0", 0.0)])
+        table = self.monitor.update(make_sample(3 * SECOND_NS, {"eth0": (0, 0), "tun0": (10 ** 9 + 1000, 10 ** 9)}))
+        self.assertAlmostEqual(table[1].rx_bps, 8000)
+
+    def test_reset_interface_reports_zero(self):
+        self.monitor.update(make_sample(SECOND_NS, {"eth0": (5_000_000, 5_000_000)}))
+        table = self.monitor.update(make_sample(2 * SECOND_NS, {"eth0": (100, 100)}))
+        self.assertEqual(table[0].rx_bps, 0.0)
+
+    def test_reset_from_3e9_is_not_a_wrap(self):
+        monitor = InterfaceRateMonitor(link_speeds=lambda: {"eth0": 10 ** 9})
+        counters = {"eth0": (3_000_000_000, 0), "tun0": (3_000_000_000, 0)}
+        monitor.update(make_sample(SECOND_NS, counters))
+        table = monitor.update(make_sample(2 * SECOND_NS, {"eth0": (0, 0), "tun0": (0, 0)}))
+        self.assertEqual([rate.rx_bps for rate in table], [0.0, 0.0])
+        self.assertEqual((monitor.link_bps("eth0"), monitor.link_bps("tun0")), (10 ** 9, 0))
+
+    def test_wrap_within_link_speed(self):
+        monitor = InterfaceRateMonitor(link_speeds=lambda: {"eth0": 10 ** 9})
+        monitor.update(make_sample(SECOND_NS, {"eth0": (2 ** 32 - 1000, 0)}))
+        table = monitor.update(make_sample(2 * SECOND_NS, {"eth0": (1000, 0)}))
+        self.assertAlmostEqual(table[0].rx_bps, 16000)
+
+    def test_clock_not_advancing(self):
+        self.monitor.update(make_sample(SECOND_NS, {"eth0": (0, 0)}))
+        self.assertIsNone(self.monitor.update(make_sample(SECOND_NS, {"eth0": (10, 10)})))
+
+    def test_churning_interfaces_are_compacted(self):
+        # Container veths come and go; state must not grow with every one ever seen
+        for tick in range(1, 200):
+            counters = {"eth0": (tick * 1000, 0)}
+            counters.update({f"veth{tick + i}": (0, 0) for i in range(50)})
+            table = self.monitor.update(make_sample(tick * SECOND_NS, counters))
+        self.assertEqual(len(table), 51)
+        self.assertAlmostEqual(table[0].rx_bps, 8000)
+        self.assertLessEqual(len(self.monitor._names), 2 * 51 + 16)
+
+    def test_work_per_tick_flat_with_many_interfaces(self):
+        # Per-interface work stays constant: two counter deltas each, and no
+        # slot lookups or link speed queries once the interface set is known.
+        # Timings are in benchmarks/bench_interface_monitor.py.
+        for count in (50, 500):
+            names = [f"veth{i}" for i in range(count)]
+            lookups = []
+            monitor = InterfaceRateMonitor(link_speeds=lambda: lookups.append(1) or {})
+            monitor.update(make_sample(SECOND_NS, {name: (0, 0) for name in names}))
+            order = monitor._order
+            with mock.patch.object(interface_monitor, "counter_delta", wraps=counter_delta) as delta:
+                for tick in range(2, 102):
+                    monitor.update(make_sample(tick * SECOND_NS, {name: (tick, tick) for name in names}))
+            self.assertEqual(delta.call_count, 100 * 2 * count)
+            self.assertEqual(len(lookups), 1)
+            self.assertIs(monitor._order, order)
+            self.assertEqual(len(monitor._prev_recv), count)
+
+if __name__ == '__main__':
+    unittest.main()
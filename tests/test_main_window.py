@@ -51,18 +51,34 @@ class TestMainWindowButtons(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls._app = QApplication.instance() or QApplication(sys.argv)
+
     def setUp(self):
         self.settings = Settings()
         self.speed_controller = DummySpeedController()
         self.network_controller = DummyNetworkController()
         self.window = MainWindow(self.settings, self.speed_controller, self.network_controller)
         self.window.show()
+
     def test_svg_buttons_exist(self):
         # Just ensure the SVG loads and widget is present
         self.assertIsNotNone(self.window.svg_widget)
+
     def test_update_display_runs(self):
         # Should not raise
         self.window.update_display()
+
+    def test_updates_coalesce_into_one_frame(self):
+        QApplication.processEvents()
+        loads = []
+        self.window.svg_widget.set_values = loads.append
+        self.window.update_speed_display(20.0, 5.0)
+        self.window.update_signal_strength(2)
+        self.window.update_connection_display()
+        QApplication.processEvents()
+        self.assertEqual(len(loads), 1)
+        # A later speed update keeps the connection state
+        self.assertEqual(self.window.frame_state.status, "Connected")
+
     # More UI interaction tests would require QTest and event simulation
 
 if __name__ == '__main__':
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from speedview.controllers.engine import CounterSampler, Sample, SpeedEngine
+from speedview.controllers.metrics import CONTENT_TYPE, MetricsExporter, escape_label, render_metrics
+from speedview.models.results import ResultsStore, SpeedTestResult
+from speedview.utils.histogram import Histogram
+
+
+class StaticSource:
+    name = "static"
+    def read(self):
+        return ("eth0",), (1000,), (500,)
+    def close(self):
+        pass
+
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram((0.1, 0.01, 1.0))
+        for value in (0.005, 0.01, 0.5, 2.0):
+            histogram.observe(value)
+        cumulative, count, total = histogram.snapshot()
+        self.assertEqual(histogram.bounds, (0.01, 0.1, 1.0))
+        # Buckets are inclusive upper bounds, like Prometheus "le"
+        self.assertEqual(cumulative, [2, 2, 3, 4])
+        self.assertEqual(count, 4)
+        self.assertAlmostEqual(total, 2.515)
+
+
+class TestRenderMetrics(unittest.TestCase):
+    def test_families(self):
+        engine = SpeedEngine("eth0")
+        engine.process([Sample(0, ("eth0", "wlan0"), (0, 0), (0, 0))])
+        update = engine.process([Sample(10 ** 9, ("eth0", "wlan0"), (125_000, 0), (0, 250))])
+        histogram = Histogram((0.001, 0.01))
+        histogram.observe(0.0005)
+        result = SpeedTestResult(1700000000.0, 'Lab "A"', 12.0, 1.5, 100.0, 10.0, "eth0", "speedtest.net")
+        text = render_metrics(engine.latest_sample, update, result, 1, histogram).decode()
+        lines = text.splitlines()
+        self.assertEqual(lines[-1], "# EOF")
+        self.assertIn('speedview_interface_receive_bytes_total{interface="eth0"} 125000', lines)
+        self.assertIn('speedview_interface_transmit_bytes_total{interface="wlan0"} 250', lines)
+        self.assertIn('speedview_interface_receive_bits_per_second{interface="eth0"} 1000000.0', lines)
+        self.assertIn("speedview_speed_tests_total 1", lines)
+        labels = '{server="Lab \\"A\\"",interface="eth0",backend="speedtest.net"}'
+        self.assertIn(f"speedview_speed_test_download_bits_per_second{labels} 100000000.0", lines)
+        self.assertIn(f"speedview_speed_test_latency_seconds{labels} 0.012", lines)
+        self.assertIn('speedview_sampler_read_duration_seconds_bucket{le="+Inf"} 1', lines)
+        self.assertIn("# TYPE speedview_sampler_read_duration_seconds histogram", lines)
+
+    def test_empty(self):
+        text = render_metrics().decode()
+        self.assertIn("speedview_speed_tests_total 0", text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+    def test_escape_label(self):
+        self.assertEqual(escape_label('a\\b"c\nd'), 'a\\\\b\\"c\\nd')
+
+
+class TestMetricsExporter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.results = ResultsStore(os.path.join(self.directory, "results.db"))
+        self.counters = CounterSampler(StaticSource())
+        self.engine = SpeedEngine("eth0")
+        self.exporter = MetricsExporter(self.engine, self.counters, self.results, port=0)
+        self.exporter.start()
+
+    def tearDown(self):
+        self.exporter.stop()
+        self.results.close()
+        shutil.rmtree(self.directory)
+
+    def scrape(self, path="/metrics"):
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.exporter.port}{path}", timeout=5) as response:
+            return response.headers["Content-Type"], response.read()
+
+    def test_scrape(self):
+        self.engine.process([self.counters.read_sample()])
+        content_type, body = self.scrape()
+        self.assertEqual(content_type, CONTENT_TYPE)
+        self.assertIn(b'speedview_interface_receive_bytes_total{interface="eth0"} 1000', body)
+        self.assertIn(b'speedview_sampler_read_duration_seconds_count 1', body)
+        self.assertTrue(body.endswith(b"# EOF\n"))
+
+    def test_unknown_path(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self.scrape("/")
+        self.assertEqual(context.exception.code, 404)
+
+    def test_cached_between_ticks(self):
+        self.engine.process([self.counters.read_sample()])
+        first = self.exporter.render()
+        self.counters.read_sample()  # Observed, but not published until the next tick
+        self.assertIs(self.exporter.render(), first)
+        self.engine.process([self.counters.read_sample()])
+        self.assertIsNot(self.exporter.render(), first)
+
+    def test_speed_test_results(self):
+        self.results.add(SpeedTestResult(1700000000.0, "Server", 10.0, 1.0, 50.0, 5.0, "eth0", "fast.com"))
+        _, body = self.scrape()
+        self.assertIn(b"speedview_speed_tests_total 1", body)
+        self.assertIn(b'speedview_speed_test_upload_bits_per_second{server="Server",interface="eth0",'
+                      b'backend="fast.com"} 5000000.0', body)
+
+    def test_stop_unsubscribes(self):
+        self.exporter.stop()
+        self.assertFalse(self.exporter.running)
+        self.assertEqual(self.engine._subscribers, [])
+        self.exporter.start()
+        self.assertTrue(self.exporter.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import random
+import unittest
+from speedview.controllers.rate import (RateEngine, counter_delta, convert_rate, format_rate, window_stats,
+                                        wrap_limit, COUNTER_32_MODULUS, COUNTER_64_MODULUS)
+
+
+def synthetic_stream(rng, modulus, length):
+    """Yield (timestamp_ns, counter, true_bytes) with jittered intervals and wrapping counters"""
+    timestamp_ns = rng.randrange(1, 10 ** 12)
+    counter = rng.randrange(modulus)
+    yield timestamp_ns, counter, None
+    for _ in range(length):
+        interval_ns = rng.randint(50_000_000, 3_000_000_000)  # 50 ms to 3 s of timer jitter
+        rate_bytes_per_s = rng.choice([0, rng.randint(1, 10 ** 6), rng.randint(10 ** 6, 10 ** 9)])
+        # Wraps of half the counter range or more cannot be told apart from a reset
+        delta = min(rate_bytes_per_s * interval_ns // 10 ** 9, modulus // 2 - 1)
+        timestamp_ns += interval_ns
+        counter = (counter + delta) % modulus
+        yield timestamp_ns, counter, (delta, interval_ns)
+
+
+class TestCounterDelta(unittest.TestCase):
+    def test_increasing(self):
+        self.assertEqual(counter_delta(100, 250, 1000), 150)
+
+    def test_32_bit_wrap(self):
+        self.assertEqual(counter_delta(COUNTER_32_MODULUS - 10, 5, 1000), 15)
+
+    def test_64_bit_wrap(self):
+        self.assertEqual(counter_delta(COUNTER_64_MODULUS - 10, 5, 1000), 15)
+
+    def test_reset_is_not_a_wrap(self):
+        self.assertIsNone(counter_delta(5_000_000, 1_000, 10 ** 12))
+
+    def test_jump_beyond_link_speed(self):
+        self.assertIsNone(counter_delta(0, 10 ** 12, 10 ** 6))
+
+    def test_reset_near_top_of_32_bit_range(self):
+        # 3e9 -> 0 would be a 1.3 GB wrap, well inside 400 Gbit/s for one second
+        max_delta = 400_000_000_000 // 8
+        self.assertIsNone(counter_delta(3_000_000_000, 0, max_delta, wrap_limit(0, 1_000_000_000)))
+        self.assertIsNone(counter_delta(3_000_000_000, 0, max_delta, wrap_limit(10 ** 9, 1_000_000_000)))
+        # A counter seen close to 2**32 still wraps
+        self.assertEqual(counter_delta(COUNTER_32_MODULUS - 1000, 500, max_delta, wrap_limit(0, 1_000_000_000)), 1500)
+
+    def test_wrap_bounded_by_link_speed(self):
+        # 1 Gbit/s carries at most 125 MB (plus slack) in a second
+        previous = COUNTER_32_MODULUS - 200_000_000
+        self.assertIsNone(counter_delta(previous, 0, 10 ** 12, wrap_limit(10 ** 9, 1_000_000_000)))
+        self.assertEqual(counter_delta(previous, 0, 10 ** 12, wrap_limit(10 ** 10, 1_000_000_000)), 200_000_000)
+
+
+class TestRateEngineProperties(unittest.TestCase):
+    """Property checks over seeded synthetic counter streams"""
+
+    def check_streams(self, modulus, seed):
+        rng = random.Random(seed)
+        for _ in range(100):
+            # The streams reach 1 GB/s; a known link speed lets wraps that large through
+            engine = RateEngine(link_bps=8 * 10 ** 9)
+            for timestamp_ns, counter, truth in synthetic_stream(rng, modulus, 50):
+                rate = engine.update(timestamp_ns, counter, counter)
+                if truth is None:
+                    self.assertIsNone(rate)
+                    continue
+                delta, interval_ns = truth
+                expected_bps = delta * 8 / (interval_ns / 1e9)
+                self.assertIsNotNone(rate)
+                self.assertEqual(rate.interval_ns, interval_ns)
+                self.assertAlmostEqual(rate.rx_bps, expected_bps, delta=expected_bps * 1e-9 + 1e-6)
+                self.assertEqual(rate.rx_bps, rate.tx_bps)
+
+    def test_32_bit_counters(self):
+        self.check_streams(COUNTER_32_MODULUS, seed=32)
+
+    def test_64_bit_counters(self):
+        self.check_streams(COUNTER_64_MODULUS, seed=64)
+
+    def test_resets_never_produce_negative_or_huge_rates(self):
+        rng = random.Random(7)
+        engine = RateEngine(max_rate_bps=10 ** 10)
+        timestamp_ns, counter = 0, 0
+        for _ in range(5000):
+            timestamp_ns += rng.randint(1, 2_000_000_000)
+            if rng.random() < 0.05:
+                counter = rng.randrange(10 ** 6)  # interface reset
+            else:
+                counter += rng.randint(0, 10 ** 8)
+            rate = engine.update(timestamp_ns, counter, counter)
+            if rate is not None:
+                self.assertGreaterEqual(rate.rx_bps, 0)
+                self.assertLessEqual(rate.rx_bps, 10 ** 10 + 8e9 / (rate.interval_ns / 1e9))
+
+    def test_counter_reset_from_3e9(self):
+        engine = RateEngine()
+        engine.update(0, 3_000_000_000, 3_000_000_000)
+        self.assertIsNone(engine.update(1_000_000_000, 0, 0))
+        self.assertAlmostEqual(engine.update(2_000_000_000, 1000, 1000).rx_bps, 8000)
+
+    def test_clock_not_advancing(self):
+        engine = RateEngine()
+        engine.update(1000, 0, 0)
+        self.assertIsNone(engine.update(1000, 10, 10))
+
+
+class TestUnits(unittest.TestCase):
+    def test_si_and_iec(self):
+        self.assertEqual(convert_rate(8_000_000, "Mbps"), 8.0)
+        self.assertEqual(convert_rate(2 ** 20, "Mibps"), 1.0)
+        self.assertEqual(convert_rate(8_000_000, "MB/s"), 1.0)
+        with self.assertRaises(ValueError):
+            convert_rate(1, "furlongs")
+
+    def test_format_rate(self):
+        self.assertEqual(format_rate(1_500_000), "1.50 Mbps")
+        self.assertEqual(format_rate(3 * 2 ** 30, iec=True), "3.00 Gibps")
+        self.assertEqual(format_rate(12), "12.00 bps")
+
+
+class TestWindowStats(unittest.TestCase):
+    def test_empty_window(self):
+        self.assertIsNone(window_stats([]))
+
+    def test_peak_mean_p95(self):
+        stats = window_stats(list(range(1, 101)))
+        self.assertEqual(stats.samples, 100)
+        self.assertEqual(stats.peak_bps, 100)
+        self.assertEqual(stats.mean_bps, 50.5)
+        self.assertEqual(stats.p95_bps, 95)
+
+    def test_burst_shows_in_peak_not_mean(self):
+        rates = [1e6] * 99 + [1e10]
+        stats = window_stats(rates)
+        self.assertEqual(stats.peak_bps, 1e10)
+        self.assertEqual(stats.p95_bps, 1e6)
+
+    def test_time_weighted_mean(self):
+        # 1 s at 10 bps and 3 s at 2 bps moved 16 bits in 4 s
+        self.assertEqual(window_stats([10, 2], [1, 3]).mean_bps, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
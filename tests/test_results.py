@@ -0,0 +1,102 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from speedview.models.results import ResultsStore, SpeedTestResult, speedtest_result
+
+
+def make_result(timestamp, download=100.0, interface="eth0", backend="speedtest.net"):
+    return SpeedTestResult(timestamp, "Test server", 12.0, 1.5, download, download / 10,
+                           interface, backend)
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "results.db")
+        self.store = ResultsStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_add_and_query(self):
+        for i in range(5):
+            self.store.add(make_result(1000.0 + i, download=10.0 * i))
+        self.store.flush()
+        results = self.store.query(1001.0, 1004.0)
+        self.assertEqual([result.download_mbps for result in results], [10.0, 20.0, 30.0])
+        self.assertEqual(results[0], make_result(1001.0, download=10.0))
+
+    def test_query_by_interface(self):
+        self.store.add(make_result(1000.0, interface="eth0"))
+        self.store.add(make_result(1001.0, interface="wlan0"))
+        self.store.add(make_result(1002.0, interface="eth0"))
+        self.store.flush()
+        self.assertEqual([result.timestamp for result in self.store.query(interface="eth0")], [1000.0, 1002.0])
+        self.assertEqual(self.store.query(interface="lo"), [])
+
+    def test_latest_newest_first(self):
+        for i in range(30):
+            self.store.add(make_result(1000.0 + i))
+        self.store.flush()
+        latest = self.store.latest(3)
+        self.assertEqual([result.timestamp for result in latest], [1029.0, 1028.0, 1027.0])
+
+    def test_statistics(self):
+        self.store.add(make_result(1000.0, download=50.0))
+        self.store.add(make_result(1001.0, download=150.0))
+        self.store.add(make_result(1002.0, download=1000.0, interface="wlan0"))
+        self.store.flush()
+        stats = self.store.statistics(interface="eth0")
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.mean_download_mbps, 100.0)
+        self.assertEqual(stats.max_download_mbps, 150.0)
+        self.assertEqual(stats.mean_latency_ms, 12.0)
+        self.assertEqual(self.store.statistics(2000.0).count, 0)
+
+    def test_results_survive_reopening(self):
+        self.store.add(make_result(1000.0))
+        self.store.close()
+        self.store = ResultsStore(self.path)
+        self.assertEqual(len(self.store.query()), 1)
+
+    def test_wal_mode_and_index(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM speed_tests WHERE interface = ? AND timestamp >= ?",
+                ("eth0", 0)).fetchall()
+            self.assertIn("speed_tests_interface_time", " ".join(str(row) for row in plan))
+        finally:
+            connection.close()
+
+    def test_concurrent_producers(self):
+        def produce(offset):
+            for i in range(100):
+                self.store.add(make_result(offset + i))
+
+        threads = [threading.Thread(target=produce, args=(1000.0 * n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.store.flush()
+        self.assertEqual(self.store.statistics().count, 400)
+
+    def test_speedtest_result(self):
+        results = SimpleNamespace(server={"sponsor": "ISP", "name": "City"}, ping=8.5,
+                                  download=250_000_000.0, upload=50_000_000.0)
+        result = speedtest_result(results, "eth0")
+        self.assertEqual(result.server, "ISP, City")
+        self.assertEqual(result.latency_ms, 8.5)
+        self.assertEqual((result.download_mbps, result.upload_mbps), (250.0, 50.0))
+        self.assertEqual((result.interface, result.backend), ("eth0", "speedtest.net"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import threading
+import unittest
+from speedview.utils.ring_buffer import RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_drain_in_order(self):
+        ring = RingBuffer(8)
+        for i in range(5):
+            ring.push(i)
+        self.assertEqual(len(ring), 5)
+        self.assertEqual(ring.drain(), [0, 1, 2, 3, 4])
+        self.assertEqual(ring.drain(), [])
+
+    def test_overrun_keeps_newest(self):
+        ring = RingBuffer(4)
+        for i in range(10):
+            ring.push(i)
+        # The oldest slot of a full buffer may be mid-write, so it is dropped too
+        self.assertEqual(ring.drain(), [7, 8, 9])
+        self.assertEqual(ring.dropped, 7)
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+    def test_concurrent_producer(self):
+        # Everything the consumer sees is in order, and nothing is lost or duplicated
+        ring = RingBuffer(64)
+        total = 200_000
+        seen = []
+
+        def produce():
+            for i in range(total):
+                ring.push(i)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        while producer.is_alive():
+            seen.extend(ring.drain())
+        producer.join()
+        seen.extend(ring.drain())
+
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(set(seen)), len(seen))
+        self.assertEqual(len(seen) + ring.dropped, total)
+        self.assertEqual(seen[-1], total - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import random
+import unittest
+from datetime import datetime
+
+from speedview.controllers.scheduler import (
+    BUSY, BUSY_RETRY, OVER_BUDGET, RUN, RUNNING, CronSchedule, IntervalSchedule, SpeedTestScheduler,
+    estimate_test_mb, parse_schedule
+)
+from speedview.models.results import SpeedTestResult
+
+
+def local(*args):
+    return datetime(*args).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResults:
+    """The two ResultsStore queries the scheduler makes"""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+
+    def query(self, start=0.0, end=float("inf"), interface=None):
+        return [result for result in self.results if start <= result.timestamp < end]
+
+    def latest(self, count=20, interface=None):
+        return sorted(self.results, key=lambda result: -result.timestamp)[:count]
+
+
+def result_at(timestamp, download_mbps=80.0, upload_mbps=0.0):
+    return SpeedTestResult(timestamp, "Server", 5.0, None, download_mbps, upload_mbps, "eth0", "http")
+
+
+class TestSchedules(unittest.TestCase):
+    def test_parse(self):
+        self.assertIsNone(parse_schedule(""))
+        self.assertIsNone(parse_schedule(" Off "))
+        self.assertEqual(parse_schedule("@every 30m").seconds, 1800)
+        self.assertEqual(parse_schedule("@every 2h").seconds, 7200)
+        self.assertIsInstance(parse_schedule("@hourly"), CronSchedule)
+        for bad in ("@every 30", "@every 10s", "* * * *", "61 * * * *", "*/0 * * * *", "0 0 30 2 *", "x * * * *"):
+            with self.assertRaises(ValueError, msg=bad):
+                parse_schedule(bad)
+        with self.assertRaises(TypeError):
+            parse_schedule(None)
+
+    def test_cron(self):
+        every_six_hours = CronSchedule("15 */6 * * *")
+        self.assertEqual(every_six_hours.next_after(local(2026, 3, 4, 5, 0)), local(2026, 3, 4, 6, 15))
+        self.assertEqual(every_six_hours.next_after(local(2026, 3, 4, 6, 15)), local(2026, 3, 4, 12, 15))
+        self.assertEqual(every_six_hours.next_after(local(2026, 3, 4, 23, 59, 30)), local(2026, 3, 5, 0, 15))
+        # 2026-03-07 is a Saturday
+        weekdays = CronSchedule("30 8 * * 1-5")
+        self.assertEqual(weekdays.next_after(local(2026, 3, 6, 9, 0)), local(2026, 3, 9, 8, 30))
+        self.assertEqual(CronSchedule("0 0 * * 7").next_after(local(2026, 3, 6)), local(2026, 3, 8))
+        # Both day fields restricted: either one matches
+        either = CronSchedule("0 12 1 * 6")
+        self.assertEqual(either.next_after(local(2026, 3, 1, 13)), local(2026, 3, 7, 12))
+        self.assertEqual(either.next_after(local(2026, 3, 28, 13)), local(2026, 4, 1, 12))
+
+    def test_estimate(self):
+        self.assertEqual(estimate_test_mb(result_at(0, 80.0, 16.0), 10), 120.0)
+
+
+class TestSpeedTestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(local(2026, 3, 4, 9, 10))
+        self.started = []
+        self.start_result = True
+
+    def start_test(self):
+        self.started.append(self.clock.now)
+        return self.start_result
+
+    def scheduler(self, schedule="@hourly", **kwargs):
+        return SpeedTestScheduler(parse_schedule(schedule), self.start_test, clock=self.clock,
+                                  rng=random.Random(1), **kwargs)
+
+    def test_runs_on_schedule(self):
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.next_run, local(2026, 3, 4, 10, 0))
+        self.assertIsNone(scheduler.tick())
+        self.clock.now = local(2026, 3, 4, 10, 0)
+        self.assertEqual(scheduler.tick(), RUN)
+        self.assertIsNone(scheduler.tick())
+        self.clock.now = local(2026, 3, 4, 11, 0, 5)
+        self.assertEqual(scheduler.tick(), RUN)
+        self.assertEqual(self.started, [local(2026, 3, 4, 10, 0), local(2026, 3, 4, 11, 0, 5)])
+        self.assertEqual(scheduler.next_run, local(2026, 3, 4, 12, 0))
+
+    def test_missed_runs_are_not_repeated(self):
+        scheduler = self.scheduler()
+        self.clock.now = local(2026, 3, 4, 15, 30)  # After a suspend
+        self.assertEqual(scheduler.tick(), RUN)
+        self.assertIsNone(scheduler.tick())
+        self.assertEqual(scheduler.next_run, local(2026, 3, 4, 16, 0))
+
+    def test_interval(self):
+        scheduler = self.scheduler("@every 20m")
+        self.clock.now += 1200
+        self.assertEqual(scheduler.tick(), RUN)
+        self.assertEqual(scheduler.next_run, self.clock.now + 1200)
+
+    def test_jitter(self):
+        scheduler = self.scheduler(jitter=600)
+        slot = local(2026, 3, 4, 10, 0)
+        self.assertEqual(scheduler.slot, slot)
+        self.assertGreater(scheduler.next_run, slot)
+        self.assertLess(scheduler.next_run, slot + 600)
+        self.clock.now = slot
+        self.assertIsNone(scheduler.tick())
+        self.clock.now = scheduler.next_run
+        self.assertEqual(scheduler.tick(), RUN)
+        # Another draw for the next slot
+        self.assertNotEqual(scheduler.next_run - local(2026, 3, 4, 11, 0), self.clock.now - slot)
+
+    def test_busy_link_waits(self):
+        scheduler = self.scheduler(busy_mbps=5.0)
+        self.clock.now = local(2026, 3, 4, 9, 59, 40)
+        for rate in (50.0, 60.0, 0.5):
+            scheduler.observe(rate, 1.0)
+            self.clock.now += 5
+        self.clock.now = local(2026, 3, 4, 10, 0)
+        self.assertEqual(scheduler.tick(), BUSY)
+        self.assertEqual(self.started, [])
+        self.assertEqual(scheduler.next_run, self.clock.now + BUSY_RETRY)
+        # Quiet again; the old samples have left the window
+        self.clock.now += BUSY_RETRY - 10
+        scheduler.observe(0.2, 0.1)
+        self.clock.now += 10
+        self.assertEqual(scheduler.tick(), RUN)
+        self.assertEqual(scheduler.next_run, local(2026, 3, 4, 11, 0))
+
+    def test_busy_until_next_slot_skips(self):
+        scheduler = self.scheduler(busy_mbps=5.0)
+        self.clock.now = local(2026, 3, 4, 10, 0)
+        for _ in range(12):
+            scheduler.observe(100.0, 0.0)
+            self.assertEqual(scheduler.tick(), BUSY)
+            self.clock.now = scheduler.next_run
+            if scheduler.slot != local(2026, 3, 4, 10, 0):
+                break
+        self.assertEqual(scheduler.slot, local(2026, 3, 4, 11, 0))
+        self.assertEqual(self.started, [])
+
+    def test_other_test_running(self):
+        scheduler = self.scheduler()
+        self.start_result = False
+        self.clock.now = local(2026, 3, 4, 10, 0)
+        self.assertEqual(scheduler.tick(), RUNNING)
+        self.assertEqual(scheduler.next_run, self.clock.now + BUSY_RETRY)
+        self.start_result = True
+        self.clock.now += BUSY_RETRY
+        self.assertEqual(scheduler.tick(), RUN)
+        self.assertEqual(len(self.started), 2)
+
+    def test_daily_budget(self):
+        # 80 Mbps for 10 s is 100 MB per test
+        results = FakeResults([result_at(local(2026, 3, 3, 23, 0)), result_at(local(2026, 3, 4, 8, 0))])
+        scheduler = self.scheduler(results=results, daily_budget_mb=250, test_seconds=10)
+        self.clock.now = local(2026, 3, 4, 10, 0)
+        self.assertEqual(scheduler.tick(), RUN)
+        results.results.append(result_at(self.clock.now + 20))
+        self.clock.now = local(2026, 3, 4, 11, 0)
+        self.assertEqual(scheduler.tick(), OVER_BUDGET)
+        self.assertEqual(scheduler.next_run, local(2026, 3, 4, 12, 0))
+        # A new day, a new budget
+        self.clock.now = local(2026, 3, 5, 0, 0)
+        self.assertEqual(scheduler.tick(), RUN)
+        self.assertEqual(len(self.started), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from speedview.controllers import server_cache
+from speedview.controllers.server_cache import ServerCache, probe_latency
+from speedview.controllers.speed_test import SpeedtestCliEngine
+
+
+class LatencyHandler(BaseHTTPRequestHandler):
+    """speedtest.net's latency.txt, answered after the server's delay"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        body = b"test=test\n" if self.path.startswith("/speedtest/latency.txt") else b"nope"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(delay):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LatencyHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def entry(server, name):
+    return {"url": f"http://127.0.0.1:{server.server_address[1]}/speedtest/upload.php",
+            "host": f"127.0.0.1:{server.server_address[1]}", "name": name, "sponsor": "Test", "id": name}
+
+
+class TestServerCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.slow = start_server(0.2)
+        cls.fast = start_server(0.0)
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in (cls.slow, cls.fast):
+            server.shutdown()
+            server.server_close()
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "speedtest_servers.json")
+        self.dead = {"url": "http://127.0.0.1:1/speedtest/upload.php", "host": "127.0.0.1:1", "name": "Dead"}
+        self.servers = [self.dead, entry(self.slow, "Slow"), entry(self.fast, "Fast")]
+        self.fetched = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def fetch(self, st):
+        self.fetched.append(st)
+        return self.servers
+
+    def cache(self, **kwargs):
+        return ServerCache(self.path, ttl=60, fetch=self.fetch, **kwargs)
+
+    def test_probe(self):
+        self.assertLess(probe_latency(entry(self.fast, "Fast")), 150)
+        self.assertIsNone(probe_latency(self.dead))
+        wrong_path = {"url": f"http://127.0.0.1:{self.fast.server_address[1]}/elsewhere/upload.php"}
+        self.assertIsNone(probe_latency(wrong_path))
+
+    def test_missing_cache_is_fetched(self):
+        cache = self.cache()
+        st = object()
+        self.assertEqual(cache.best_server(st)["name"], "Fast")
+        self.assertEqual(self.fetched, [st])
+        servers, fetched_at = cache.load()
+        self.assertEqual(servers, self.servers)
+        self.assertAlmostEqual(fetched_at, time.time(), delta=5)
+
+    def test_fresh_cache_is_not_fetched(self):
+        cache = self.cache()
+        cache.save(self.servers)
+        start = time.monotonic()
+        self.assertEqual(cache.best_server()["name"], "Fast")
+        # Probed in parallel: the slow server's three round trips, not everyone's in turn
+        self.assertLess(time.monotonic() - start, 1.2)
+        self.assertEqual(self.fetched, [])
+
+    def test_stale_cache_is_refreshed_in_background(self):
+        cache = self.cache()
+        cache.save(self.servers[:2], time.time() - 120)
+        with mock.patch.object(cache, "refresh_in_background") as refresh:
+            self.assertEqual(cache.best_server()["name"], "Slow")
+        refresh.assert_called_once_with()
+        self.assertEqual(self.fetched, [])
+
+        thread = cache.refresh_in_background()
+        thread.join(5)
+        self.assertEqual(cache.load()[0], self.servers)
+        self.assertEqual(self.fetched, [None])
+        self.assertEqual(cache.best_server()["name"], "Fast")
+
+    def test_one_refresh_at_a_time(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def fetch(st):
+            started.set()
+            release.wait(5)
+            return self.servers
+
+        cache = ServerCache(self.path, fetch=fetch)
+        thread = cache.refresh_in_background()
+        started.wait(5)
+        self.assertIsNone(cache.refresh_in_background())
+        release.set()
+        thread.join(5)
+        self.assertIsNotNone(cache.refresh_in_background())
+
+    def test_only_candidates_are_probed(self):
+        probed = []
+
+        def probe(server):
+            probed.append(server["name"])
+            return 10.0
+
+        cache = self.cache(candidates=2, probe=probe)
+        cache.save(self.servers)
+        self.assertEqual(cache.best_server()["name"], "Dead")
+        self.assertEqual(sorted(probed), ["Dead", "Slow"])
+
+    def test_no_answer(self):
+        cache = self.cache()
+        cache.save([self.dead])
+        with mock.patch.object(cache, "refresh_in_background") as refresh:
+            self.assertIsNone(cache.best_server())
+        refresh.assert_called_once_with()
+
+    def test_unreadable_cache(self):
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(ServerCache(self.path).load(), ([], 0.0))
+        with open(self.path, "w") as f:
+            json.dump({"fetched_at": time.time(), "servers": [{"host": "no url"}]}, f)
+        self.assertEqual(ServerCache(self.path).load(), ([], 0.0))
+
+    def test_fetch_keeps_server_fields(self):
+        st = mock.Mock()
+        st.get_closest_servers.return_value = [dict(self.servers[2], latency=3600, extra="x")]
+        self.assertEqual(server_cache.fetch_closest_servers(st, 7), [self.servers[2]])
+        st.get_closest_servers.assert_called_once_with(7)
+
+    def test_engine_uses_cached_server(self):
+        cache = self.cache()
+        cache.save(self.servers)
+        with mock.patch("speedtest.Speedtest") as speedtest_class:
+            st = speedtest_class.return_value
+            st.download.return_value = 100e6
+            st.upload.return_value = 10e6
+            st.results.server = self.servers[2]
+            st.results.ping = 1.0
+            st.results.download = 100e6
+            st.results.upload = 10e6
+            result = SpeedtestCliEngine(cache).run("eth0")
+        st.get_best_server.assert_called_once_with([self.servers[2]])
+        self.assertEqual((result.server, result.download_mbps), ("Test, Fast", 100.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
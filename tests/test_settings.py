@@ -0,0 +1,36 @@
+import unittest
+from speedview.config.config import DEFAULT_RENDER_HZ, MAX_SAMPLE_HZ, MAX_RENDER_HZ
+from speedview.models.settings import Settings
+
+
+class TestSamplingSettings(unittest.TestCase):
+    def setUp(self):
+        self.settings = Settings()
+
+    def test_defaults(self):
+        self.assertEqual(self.settings.sample_hz, 0)
+        self.assertEqual(self.settings.render_hz, DEFAULT_RENDER_HZ)
+
+    def test_invalid_values_fall_back(self):
+        self.settings.sample_hz = -5
+        self.settings.render_hz = "fast"
+        self.settings.validate_settings()
+        self.assertEqual(self.settings.sample_hz, 0)
+        self.assertEqual(self.settings.render_hz, DEFAULT_RENDER_HZ)
+
+    def test_rates_are_clamped(self):
+        self.settings.sample_hz = 1000
+        self.settings.render_hz = 1000
+        self.settings.validate_settings()
+        self.assertEqual(self.settings.sample_hz, MAX_SAMPLE_HZ)
+        self.assertEqual(self.settings.render_hz, MAX_RENDER_HZ)
+
+    def test_render_not_faster_than_sampling(self):
+        self.settings.sample_hz = 5
+        self.settings.render_hz = 20
+        self.settings.validate_settings()
+        self.assertEqual(self.settings.render_hz, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import socket
+import shutil
+import tempfile
+import unittest
+import subprocess
+from speedview.utils.single_instance import SingleInstance, command_from_argv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCommandFromArgv(unittest.TestCase):
+    def test_commands(self):
+        self.assertEqual(command_from_argv([]), "show")
+        self.assertEqual(command_from_argv(["--float"]), "float")
+        self.assertEqual(command_from_argv(["--verbose", "--run-test"]), "run-test")
+        self.assertEqual(command_from_argv(["--unknown"]), "show")
+
+
+class TestSingleInstance(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.lock_path = os.path.join(self.directory, "app", "instance.lock")
+        self.instances = []
+
+    def tearDown(self):
+        for instance in self.instances:
+            instance.release()
+        shutil.rmtree(self.directory)
+
+    def make_instance(self):
+        if hasattr(socket, "AF_UNIX"):
+            address = os.path.join(self.directory, "instance.sock")
+        else:
+            address = self.instances[0].address if self.instances else ("127.0.0.1", 0)
+        instance = SingleInstance(self.lock_path, address)
+        self.instances.append(instance)
+        return instance
+
+    def test_lock(self):
+        first = self.make_instance()
+        self.assertTrue(first.acquire())
+        self.assertTrue(first.primary)
+        second = self.make_instance()
+        self.assertFalse(second.acquire())
+        first.release()
+        self.assertTrue(second.acquire())
+
+    def test_forward(self):
+        first = self.make_instance()
+        first.acquire()
+        first.listen()
+        received = []
+        second = self.make_instance()
+        # Received before the GUI is ready: queued, then handed over with the handler
+        self.assertTrue(second.forward("float"))
+        first.set_handler(received.append)
+        self.assertTrue(second.forward("run-test"))
+        # The reply is sent before the command is handled
+        deadline = time.monotonic() + 5
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(received, ["float", "run-test"])
+        self.assertFalse(second.forward("format-disk", wait=0))
+
+    def test_forward_without_instance(self):
+        start = time.monotonic()
+        self.assertFalse(self.make_instance().forward("show", wait=0))
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX") and hasattr(os, "getuid"), "Unix sockets")
+    def test_second_launch_forwards_before_heavy_imports(self):
+        first = SingleInstance(os.path.join(self.directory, "NetworkSpeedMeter", "instance.lock"),
+                               os.path.join(self.directory, f"speedview-{os.getuid()}-instance.sock"))
+        self.instances.append(first)
+        first.acquire()
+        first.listen()
+        received = []
+        first.set_handler(received.append)
+        script = (
+            "import sys, runpy\n"
+            "sys.argv = ['main.py', '--float']\n"
+            "try:\n"
+            "    runpy.run_path('main.py', run_name='__main__')\n"
+            "except SystemExit as e:\n"
+            "    print(e.code, 'PyQt5' in sys.modules, 'psutil' in sys.modules)\n"
+        )
+        env = dict(os.environ, APPDATA=self.directory, XDG_RUNTIME_DIR=self.directory)
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.stdout.split(), ["0", "False", "False"], result.stderr)
+        deadline = time.monotonic() + 5
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(received, ["float"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import time
+import unittest
+from PyQt5.QtWidgets import QApplication
+from speedview.controllers.sampler import Sample, SamplerService
+from speedview.controllers.speed_controller import SpeedController
+from speedview.models.settings import Settings
+
+
+class DummySignal:
+    def __init__(self):
+        self._slots = []
+    def connect(self, slot):
+        self._slots.append(slot)
+    def emit(self, *args):
+        for slot in self._slots:
+            slot(*args)
+
+
+class DummySampler:
+    """Stands in for SamplerService without a timer or psutil"""
+    def __init__(self):
+        self.sample_ready = DummySignal()
+        self.window_ready = DummySignal()
+        self.polls = 0
+        self.interval = None
+        self.rates = None
+    def poll(self):
+        self.polls += 1
+    def set_interval(self, interval):
+        self.interval = interval
+    def set_rates(self, sample_hz, render_hz):
+        self.rates = (sample_hz, render_hz)
+
+
+class CountingSource:
+    """Counter source whose counters grow by 1000 bytes per read"""
+    name = "counting"
+    def __init__(self):
+        self.reads = 0
+    def read(self):
+        self.reads += 1
+        return ("eth0",), (self.reads * 1000,), (0,)
+    def close(self):
+        pass
+
+
+class TestSample(unittest.TestCase):
+    def test_counters(self):
+        sample = Sample(0, ("eth0", "wlan0"), (100, 50), (10, 5))
+        self.assertEqual(sample.counters("wlan0"), (50, 5))
+        self.assertEqual(sample.counters(None), (150, 15))
+        self.assertEqual(sample.counters("missing"), (150, 15))
+
+
+class TestSpeedControllerSampling(unittest.TestCase):
+    def setUp(self):
+        self.settings = Settings()
+        self.settings.selected_interface = "eth0"
+        self.sampler = DummySampler()
+        self.controller = SpeedController(self.settings, sampler=self.sampler)
+        self.speeds = []
+        self.controller.speed_updated.connect(lambda d, u: self.speeds.append((d, u)))
+
+    def test_speeds_from_shared_samples(self):
+        self.sampler.sample_ready.emit(Sample(0, ("eth0",), (1000,), (500,)))
+        # Rates use the elapsed time (0.5 s), not the configured interval
+        self.sampler.sample_ready.emit(Sample(500_000_000, ("eth0",), (126_000,), (63_000,)))
+        self.assertEqual(self.speeds, [(2.0, 1.0)])
+
+    def test_counter_reset_is_skipped(self):
+        self.sampler.sample_ready.emit(Sample(0, ("eth0",), (10 ** 9,), (10 ** 9,)))
+        self.sampler.sample_ready.emit(Sample(10 ** 9, ("eth0",), (100,), (100,)))
+        self.assertEqual(self.speeds, [])
+
+    def test_does_not_poll_on_its_own(self):
+        self.assertEqual(self.sampler.polls, 0)
+        self.controller.update_speed()
+        self.assertEqual(self.sampler.polls, 1)
+
+    def test_set_update_interval(self):
+        self.controller.set_update_interval(2.0)
+        self.assertEqual(self.sampler.interval, 2.0)
+
+    def test_window_renders_once_with_stats(self):
+        stats = []
+        self.controller.window_stats_updated.connect(lambda rx, tx: stats.append((rx, tx)))
+        # 10 ms samples: steady 1 Mbps with a 100 Mbps burst in one of them
+        samples = [Sample(0, ("eth0",), (0,), (0,))]
+        recv = 0
+        for i in range(1, 21):
+            recv += 125_000 if i == 10 else 1250
+            samples.append(Sample(i * 10_000_000, ("eth0",), (recv,), (0,)))
+        self.sampler.window_ready.emit(samples)
+
+        self.assertEqual(len(self.speeds), 1)
+        rx, tx = stats[0]
+        self.assertEqual(rx.samples, 20)
+        self.assertAlmostEqual(rx.peak_bps, 100e6)
+        self.assertAlmostEqual(rx.p95_bps, 1e6)
+        # The displayed speed is the average over the window
+        self.assertAlmostEqual(self.speeds[0][0], (19 * 1250 + 125_000) * 8 / 0.2 / 1e6)
+
+    def test_rates_recorded_in_history(self):
+        class RecordingHistory:
+            def __init__(self):
+                self.tables = []
+            def append_rates(self, timestamp_ns, interval_ns, table):
+                self.tables.append((interval_ns, table))
+
+        history = RecordingHistory()
+        controller = SpeedController(self.settings, sampler=DummySampler(), history=history)
+        controller.on_sample(Sample(0, ("eth0",), (0,), (0,)))
+        controller.on_sample(Sample(10 ** 9, ("eth0",), (1000,), (0,)))
+        interval_ns, table = history.tables[0]
+        self.assertEqual(interval_ns, 10 ** 9)
+        self.assertEqual(table[0].rx_bps, 8000)
+
+    def test_set_sampling_rates(self):
+        self.controller.set_sampling_rates(50, 5)
+        self.assertEqual(self.sampler.rates, (50, 5))
+        self.assertEqual(self.settings.sample_hz, 50)
+
+
+    def test_scheduled_speed_tests(self):
+        app = QApplication.instance() or QApplication([])
+        self.settings.speed_test_schedule = ""
+        self.controller.configure_schedule()
+        self.assertIsNone(self.controller.scheduler)
+        self.assertFalse(self.controller.schedule_timer.isActive())
+
+        self.settings.speed_test_schedule = "@every 30m"
+        self.controller.configure_schedule()
+        self.assertEqual(self.controller.scheduler.schedule.seconds, 1800)
+        self.assertTrue(self.controller.schedule_timer.isActive())
+        # Live rates reach the scheduler, which judges whether the link is busy
+        self.sampler.sample_ready.emit(Sample(0, ("eth0",), (0,), (0,)))
+        self.sampler.sample_ready.emit(Sample(10 ** 9, ("eth0",), (12_500_000,), (0,)))
+        self.assertTrue(self.controller.scheduler.link_busy(time.time()))
+
+        self.settings.speed_test_schedule = "every now and then"
+        self.controller.configure_schedule()
+        self.assertIsNone(self.controller.scheduler)
+        self.assertFalse(self.controller.schedule_timer.isActive())
+
+
+class TestHighFrequencySampler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_background_samples_drained_as_window(self):
+        source = CountingSource()
+        sampler = SamplerService(source=source, sample_hz=100, render_hz=2)
+        windows = []
+        sampler.window_ready.connect(windows.append)
+        sampler.start()
+        time.sleep(0.3)
+        sampler.stop()
+        sampler.poll()
+
+        samples = windows[0]
+        self.assertGreaterEqual(len(samples), 10)
+        self.assertEqual(len(samples), source.reads)
+        timestamps = [sample.timestamp_ns for sample in samples]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertIs(sampler.latest, samples[-1])
+
+    def test_switching_rates_while_running(self):
+        source = CountingSource()
+        sampler = SamplerService(source=source)
+        samples = []
+        sampler.sample_ready.connect(samples.append)
+        sampler.start()
+        self.assertEqual(len(samples), 1)
+        sampler.set_rates(100, 2)
+        self.assertTrue(sampler.high_frequency)
+        self.assertTrue(sampler.timer.isActive())
+        sampler.set_rates(0, 2)
+        self.assertFalse(sampler.counters.running)
+        sampler.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
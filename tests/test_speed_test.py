@@ -0,0 +1,330 @@
+import io
+import sys
+import json
+import time
+import unittest
+import http.client
+from unittest import mock
+from types import SimpleNamespace
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+from speedview import bench
+from speedview.controllers import speed_test
+from speedview.controllers.network_controller import NetworkController
+from speedview.controllers.speed_test import (
+    PHASE_DOWNLOAD, PHASE_LATENCY, PHASE_UPLOAD, FallbackEngine, FastCliEngine, HttpSpeedTestEngine,
+    SpeedTestEngine, SpeedTestError, SpeedTestProgress, SpeedtestCliEngine, create_speed_test_engine
+)
+from speedview.controllers.speed_test_runner import SpeedTestRunner, speed_test_running
+from speedview.controllers.speed_test_server import BLOCK_SIZE, SpeedTestServer
+from speedview.models.results import SpeedTestResult
+from speedview.ui import test_network_dialog
+
+
+def engine_settings(url, backend="http"):
+    return SimpleNamespace(speed_test_backend=backend, speed_test_url=url, speed_test_streams=2,
+                           speed_test_duration=0.3, speed_test_warmup=0.1, selected_interface="lo")
+
+
+class FixedEngine(SpeedTestEngine):
+    name = "fixed"
+
+    def __init__(self, result=None):
+        self.result = result
+
+    def run(self, interface=None, progress=None):
+        if self.result is None:
+            raise SpeedTestError("no result")
+        return self.result._replace(interface=interface)
+
+
+class TestSpeedTestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SpeedTestServer()
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def request(self, method, path, body=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=5)
+        try:
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def test_endpoints(self):
+        status, body = self.request("GET", "/backend/garbage.php?ckSize=2&r=0.5")
+        self.assertEqual((status, len(body)), (200, 2 * BLOCK_SIZE))
+        self.assertEqual(self.request("GET", "/empty.php?r=1"), (200, b""))
+        self.assertEqual(self.request("POST", "/empty.php", body=b"x" * 100000), (200, b""))
+        self.assertEqual(self.request("GET", "/other")[0], 404)
+
+    def test_chunked_download(self):
+        with SpeedTestServer(chunked=True) as server:
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+            try:
+                connection.request("GET", "/garbage.php?ckSize=2")
+                response = connection.getresponse()
+                self.assertIsNone(response.length)
+                self.assertEqual(response.getheader("Transfer-Encoding"), "chunked")
+                self.assertEqual(len(response.read()), 2 * BLOCK_SIZE)
+            finally:
+                connection.close()
+
+
+class TestHttpSpeedTestEngine(unittest.TestCase):
+    def test_loopback(self):
+        with SpeedTestServer() as server:
+            result = HttpSpeedTestEngine(server.url, streams=2, duration=0.3, warmup=0.1).run("lo")
+        self.assertEqual((result.server, result.interface, result.backend), ("127.0.0.1", "lo", "http"))
+        self.assertGreater(result.download_mbps, 0)
+        self.assertGreater(result.upload_mbps, 0)
+        self.assertGreater(result.latency_ms, 0)
+        self.assertGreaterEqual(result.jitter_ms, 0)
+
+    def test_chunked_download(self):
+        # No Content-Length, like garbage.php behind PHP or Apache
+        with SpeedTestServer(chunked=True) as server:
+            engine = HttpSpeedTestEngine(server.url, streams=2, duration=0.3, warmup=0.1)
+            self.assertGreater(engine.measure_throughput(engine._download_stream), 0)
+
+    def test_warmup_is_discarded(self):
+        engine = HttpSpeedTestEngine("http://127.0.0.1:1/", streams=2, duration=0.5, warmup=0.3)
+
+        def stream(index, counters, stop, connections):
+            counters[index] += 10 ** 9  # Slow start burst, inside the warm-up
+            while not stop.is_set():
+                time.sleep(0.01)
+                counters[index] += 10000
+
+        bps = engine.measure_throughput(stream)
+        expected = 2 * 10000 * 100 * 8  # Two streams of 10 kB every 10 ms
+        self.assertGreater(bps, expected / 2)
+        self.assertLess(bps, expected * 2)
+
+    def test_failing_streams(self):
+        engine = HttpSpeedTestEngine("http://127.0.0.1:1/", streams=3, duration=5, warmup=0)
+
+        def stream(index, counters, stop, connections):
+            raise OSError("refused")
+
+        start = time.monotonic()
+        with self.assertRaises(SpeedTestError):
+            engine.measure_throughput(stream)
+        # Gives up as soon as every stream failed
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_unexpected_stream_errors_are_recorded(self):
+        engine = HttpSpeedTestEngine("http://127.0.0.1:1/", streams=2, duration=5, warmup=0)
+
+        def stream(index, counters, stop, connections):
+            raise AttributeError("'NoneType' object has no attribute 'read1'")
+
+        start = time.monotonic()
+        with self.assertRaises(SpeedTestError):
+            engine.measure_throughput(stream)
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_unreachable(self):
+        with self.assertRaises(SpeedTestError):
+            HttpSpeedTestEngine("http://127.0.0.1:1/", duration=0.1, warmup=0).run()
+
+    def test_bad_url(self):
+        with self.assertRaises(ValueError):
+            HttpSpeedTestEngine("ftp://example.com/")
+
+
+class TestEngines(unittest.TestCase):
+    def test_fallback(self):
+        result = SpeedTestResult(1.0, "Server", 5.0, None, 100.0, 10.0, None, "fixed")
+        engine = FallbackEngine([FixedEngine(), FixedEngine(result)])
+        self.assertEqual(engine.run("eth0"), result._replace(interface="eth0"))
+        with self.assertRaises(SpeedTestError):
+            FallbackEngine([FixedEngine(), FixedEngine()]).run()
+
+    def test_create(self):
+        self.assertIsInstance(create_speed_test_engine("fast.com"), FastCliEngine)
+        self.assertIsInstance(create_speed_test_engine("http", "http://127.0.0.1:8080/"), HttpSpeedTestEngine)
+        auto = create_speed_test_engine("auto")
+        self.assertEqual([type(engine) for engine in auto.engines], [SpeedtestCliEngine, FastCliEngine])
+        # A configured server is tried first
+        auto = create_speed_test_engine("auto", "http://127.0.0.1:8080/")
+        self.assertEqual([type(engine) for engine in auto.engines],
+                         [HttpSpeedTestEngine, SpeedtestCliEngine, FastCliEngine])
+        # Unusable choices fall back to auto
+        self.assertIsInstance(create_speed_test_engine("http", ""), FallbackEngine)
+        self.assertIsInstance(create_speed_test_engine("carrier pigeon"), FallbackEngine)
+
+    def test_fast_cli(self):
+        output = json.dumps({"downloadSpeed": 250, "uploadSpeed": 20, "latency": 9})
+        completed = SimpleNamespace(returncode=0, stdout=output, stderr="")
+        with mock.patch.object(speed_test.subprocess, "run", return_value=completed):
+            result = FastCliEngine().run("wlan0")
+        self.assertEqual((result.download_mbps, result.upload_mbps, result.latency_ms), (250.0, 20.0, 9.0))
+        self.assertEqual((result.interface, result.backend), ("wlan0", "fast.com"))
+        with mock.patch.object(speed_test.subprocess, "run", side_effect=FileNotFoundError("fast")):
+            with self.assertRaises(SpeedTestError):
+                FastCliEngine().run()
+
+
+class TestSpeedTestProgress(unittest.TestCase):
+    def test_phases(self):
+        progress = []
+        with SpeedTestServer() as server:
+            HttpSpeedTestEngine(server.url, streams=2, duration=0.5, warmup=0.1).run(progress=progress.append)
+        phases = [item.phase for item in progress]
+        # Each phase starts with a marker, then reports values
+        self.assertEqual([item.phase for item in progress if item.value is None],
+                         [PHASE_LATENCY, PHASE_DOWNLOAD, PHASE_UPLOAD])
+        self.assertEqual(sorted(set(phases), key=phases.index), [PHASE_LATENCY, PHASE_DOWNLOAD, PHASE_UPLOAD])
+        self.assertEqual(phases.count(PHASE_LATENCY), speed_test.PING_COUNT + 1)
+        download = [item for item in progress if item.phase == PHASE_DOWNLOAD and item.value is not None]
+        # About one sample per SAMPLE_INTERVAL over warm-up and duration
+        self.assertGreaterEqual(len(download), 4)
+        self.assertLessEqual(len(download), 8)
+        self.assertTrue(all(item.value >= 0 for item in download))
+        self.assertEqual([item.elapsed for item in download], sorted(item.elapsed for item in download))
+
+
+class TestSpeedTestRunner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def run_test(self, runner, timeout_ms=10000):
+        loop = QEventLoop()
+        runner.completed.connect(loop.quit)
+        runner.failed.connect(loop.quit)
+        QTimer.singleShot(timeout_ms, loop.quit)
+        self.assertTrue(runner.start())
+        loop.exec_()
+
+    def test_progress_is_batched(self):
+        events = []
+        stored = []
+        with SpeedTestServer() as server:
+            runner = SpeedTestRunner(engine_settings(server.url), SimpleNamespace(add=stored.append))
+            runner.progress.connect(lambda batch: events.append(("progress", batch)))
+            runner.completed.connect(lambda result: events.append(("completed", result)))
+            self.run_test(runner)
+        self.assertFalse(runner.running)
+        self.assertEqual(events[-1], ("completed", stored[0]))
+        batches = [batch for kind, batch in events[:-1]]
+        self.assertTrue(all(kind == "progress" for kind, _ in events[:-1]))
+        # The ten latency samples arrive together instead of as ten signals
+        self.assertLess(len(batches), sum(len(batch) for batch in batches))
+        self.assertEqual(batches[0][0], SpeedTestProgress(PHASE_LATENCY, 0.0, None))
+
+    def test_one_test_at_a_time(self):
+        with SpeedTestServer() as server:
+            runner = SpeedTestRunner(engine_settings(server.url))
+            loop = QEventLoop()
+            runner.completed.connect(loop.quit)
+            self.assertTrue(runner.start())
+            self.assertFalse(runner.start())
+            QTimer.singleShot(10000, loop.quit)
+            loop.exec_()
+        self.assertFalse(runner.running)
+
+    def test_runners_do_not_overlap(self):
+        with SpeedTestServer() as server:
+            first = SpeedTestRunner(engine_settings(server.url))
+            second = SpeedTestRunner(engine_settings(server.url))
+            loop = QEventLoop()
+            first.completed.connect(loop.quit)
+            self.assertTrue(first.start())
+            self.assertTrue(speed_test_running())
+            self.assertFalse(second.start())
+            self.assertFalse(second.running)
+            QTimer.singleShot(10000, loop.quit)
+            loop.exec_()
+        self.assertFalse(speed_test_running())
+        self.assertFalse(first.running)
+
+    def test_network_controller(self):
+        completed, failed, progress = [], [], []
+        with SpeedTestServer() as server:
+            controller = NetworkController(settings=engine_settings(server.url))
+            controller.speed_test_complete.connect(lambda down, up: completed.append((down, up)))
+            controller.speed_test_failed.connect(failed.append)
+            controller.speed_test_progress.connect(progress.extend)
+            self.run_test(controller.speed_test_runner)
+        self.assertEqual(failed, [])
+        self.assertEqual(len(completed), 1)
+        self.assertGreater(completed[0][0], 0)
+        self.assertEqual(progress[0].phase, PHASE_LATENCY)
+
+    def test_network_controller_refused_while_busy(self):
+        events = []
+        with SpeedTestServer() as server:
+            # A scheduled test on SpeedController's runner holds the slot
+            scheduled = SpeedTestRunner(engine_settings(server.url))
+            controller = NetworkController(settings=engine_settings(server.url))
+            for signal in (controller.speed_test_complete, controller.speed_test_failed,
+                           controller.speed_test_progress):
+                signal.connect(lambda *args: events.append(args))
+            loop = QEventLoop()
+            scheduled.completed.connect(loop.quit)
+            self.assertTrue(scheduled.start())
+            self.assertFalse(controller.run_speed_test())
+            QTimer.singleShot(10000, loop.quit)
+            loop.exec_()
+            self.assertEqual(events, [])
+            self.assertFalse(controller.speed_test_runner.running)
+            # Free again once the scheduled test is over
+            self.run_test(controller.speed_test_runner)
+        self.assertTrue(events)
+
+    def test_failure(self):
+        failed = []
+        controller = NetworkController(settings=engine_settings("http://127.0.0.1:1/"))
+        controller.speed_test_failed.connect(failed.append)
+        self.run_test(controller.speed_test_runner)
+        self.assertEqual(len(failed), 1)
+
+    def test_store_failure_still_completes(self):
+        completed = []
+
+        def add(result):
+            raise OSError("disk full")
+
+        with SpeedTestServer() as server:
+            runner = SpeedTestRunner(engine_settings(server.url), SimpleNamespace(add=add))
+            runner.completed.connect(completed.append)
+            with self.assertLogs(level="ERROR"):
+                self.run_test(runner)
+            self.assertEqual(len(completed), 1)
+            self.assertFalse(speed_test_running())
+            # The next test is not refused
+            self.run_test(runner)
+        self.assertEqual(len(completed), 2)
+
+    def test_dialog_progress(self):
+        dialog = test_network_dialog.TestNetworkDialog()
+        with mock.patch.object(dialog, "update_display", wraps=dialog.update_display) as update:
+            dialog.show_progress([SpeedTestProgress(PHASE_LATENCY, 0.0, None),
+                                  SpeedTestProgress(PHASE_LATENCY, 0.01, 4.2),
+                                  SpeedTestProgress(PHASE_DOWNLOAD, 0.0, None),
+                                  SpeedTestProgress(PHASE_DOWNLOAD, 0.1, 80.0),
+                                  SpeedTestProgress(PHASE_DOWNLOAD, 0.2, 95.5)])
+        update.assert_called_once_with()
+        self.assertEqual((dialog.status, dialog.download_speed), ("Testing download...", 95.5))
+
+
+class TestBench(unittest.TestCase):
+    def test_loopback(self):
+        out = io.StringIO()
+        self.assertEqual(bench.main(["--streams", "1", "2", "--duration", "0.2", "--warmup", "0.1"], out), 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("http x1, latency "))
+        self.assertTrue(lines[1].startswith("http x2, "))
+
+
+if __name__ == '__main__':
+    unittest.main()
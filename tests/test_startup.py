@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous budgets (about 5x a typical run) so slow CI machines do not flake;
+# an eager import of speedtest/requests/pyarrow or a network call before the
+# first frame still blows through them.
+APP_IMPORT_BUDGET_MS = 500
+FIRST_FRAME_BUDGET_MS = 1500
+# Must not be loaded before the first frame
+LAZY_MODULES = ("speedtest", "requests", "pyarrow", "http.server", "winreg", "winshell",
+                "speedview.ui.settings_dialog", "speedview.ui.history_dialog", "speedview.ui.update_dialog",
+                "speedview.update.updater", "speedview.controllers.metrics")
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+from PyQt5.QtCore import QEvent, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from speedview.app import NetworkSpeedMeter
+window = NetworkSpeedMeter()
+painted = []
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and not painted:
+            painted.append(time.perf_counter())
+            QTimer.singleShot(0, app.quit)
+        return False
+
+first_paint = FirstPaint()
+window.installEventFilter(first_paint)
+window.show()
+QTimer.singleShot(10000, app.quit)
+app.exec_()
+print(json.dumps({"first_frame_ms": (painted[0] - start) * 1000 if painted else None,
+                  "lazy_loaded": [name for name in %r if name in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def import_times(stderr):
+    """Cumulative microseconds per module from ``python -X importtime`` output"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    def test_first_frame(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chmod(directory, 0o700)
+            env = dict(os.environ, APPDATA=directory, XDG_RUNTIME_DIR=directory, QT_QPA_PLATFORM="offscreen",
+                       PYTHONPATH=ROOT)
+            result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=directory, env=env,
+                                    capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        report = json.loads(result.stdout.splitlines()[-1])
+        self.assertEqual(report["lazy_loaded"], [])
+        self.assertIsNotNone(report["first_frame_ms"], "the window was never painted")
+        self.assertLess(report["first_frame_ms"], FIRST_FRAME_BUDGET_MS)
+        self.assertLess(import_times(result.stderr)["speedview.app"] / 1000, APP_IMPORT_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
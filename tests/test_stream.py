@@ -0,0 +1,220 @@
+import io
+import os
+import time
+import socket
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from speedview.controllers.engine import Sample, SpeedEngine
+from speedview.controllers.interface_monitor import InterfaceRate
+from speedview.controllers.stream import (MSG_SUBSCRIBE, FrameReader, RatesFrame, StreamClient, StreamServer,
+                                          _Client, connect, decode_rates, encode_frame, encode_rates,
+                                          encode_subscribe)
+from speedview import watch
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out")
+        time.sleep(0.005)
+
+
+def tick(engine, second, interfaces=("eth0", "wlan0"), rx_step=125_000):
+    """Feed the sample taken at ``second``; every receive counter stands at second * rx_step bytes"""
+    count = len(interfaces)
+    engine.process([Sample(second * 10 ** 9, interfaces, (round(second * rx_step),) * count, (second * 1000,) * count)])
+
+
+class TestFrames(unittest.TestCase):
+    def test_rates_round_trip(self):
+        rates = [InterfaceRate("eth0", 1e6, 2e5), InterfaceRate("Wi-Fi ü", 0.0, 1.5)]
+        frame = encode_rates(123, 10 ** 9, 2, rates)
+        payloads = FrameReader().feed(frame)
+        self.assertEqual(decode_rates(payloads[0]), RatesFrame(123, 10 ** 9, 2, rates))
+
+    def test_partial_frames(self):
+        data = encode_subscribe(["eth0"], 500) + encode_subscribe()
+        reader = FrameReader()
+        payloads = []
+        for i in range(len(data)):
+            payloads += reader.feed(data[i:i + 1])
+        self.assertEqual(len(payloads), 2)
+
+    def test_oversized_frame(self):
+        with self.assertRaises(ValueError):
+            FrameReader().feed(b"\xff\xff\xff\xff")
+
+
+class StreamTestCase(unittest.TestCase):
+    queue_frames = 64
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.engine = SpeedEngine()
+        self.server = StreamServer(self.engine, self.address(), queue_frames=self.queue_frames)
+        self.server.start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def address(self):
+        return os.path.join(self.directory, "stream.sock")
+
+    def subscribe(self, interfaces=None, resolution_s=0):
+        count = self.server.client_count
+        client = StreamClient(self.server.bound_address, interfaces, resolution_s, timeout=5)
+        client.connect()
+        self.clients.append(client)
+        wait_for(lambda: self.server.client_count > count and all(c.subscribed for c in self.server._clients))
+        return client
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets")
+class TestStreamServer(StreamTestCase):
+    def test_fan_out(self):
+        clients = [self.subscribe() for _ in range(20)]
+        tick(self.engine, 0)  # Baseline only
+        tick(self.engine, 1)
+        for client in clients:
+            frame = next(client.frames())
+            self.assertEqual(frame.interval_ns, 10 ** 9)
+            self.assertEqual(frame.rates, [InterfaceRate("eth0", 1e6, 8000.0), InterfaceRate("wlan0", 1e6, 8000.0)])
+
+    def test_interfaces_and_resolution(self):
+        client = self.subscribe(["wlan0"], resolution_s=2)
+        tick(self.engine, 0)
+        tick(self.engine, 1)
+        tick(self.engine, 2, rx_step=250_000)  # 1 Mbps, then 375 KB in the second second
+        frame = next(client.frames())
+        self.assertEqual(frame.interval_ns, 2 * 10 ** 9)
+        self.assertEqual([rate.interface for rate in frame.rates], ["wlan0"])
+        self.assertAlmostEqual(frame.rates[0].rx_bps, (1e6 + 3e6) / 2)
+
+    def test_malformed_subscribe(self):
+        good = self.subscribe()
+        requests = (b"[1, 2]", b'{"interfaces": 5}', b'{"interfaces": "eth0"}', b'"eth0"',
+                    b'{"resolution_ms": 1e999}', b'{"resolution_ms": NaN}', b'{"resolution_ms": -5}',
+                    b'{"resolution_ms": 1e300}')
+        for request in requests:
+            bad = connect(self.server.bound_address, 5)
+            bad.sendall(encode_frame(bytes([MSG_SUBSCRIBE]) + request))
+            # The server drops only that client
+            self.assertEqual(bad.recv(1), b"")
+            bad.close()
+        self.assertTrue(self.server._thread.is_alive())
+        tick(self.engine, 0)
+        tick(self.engine, 1)
+        self.assertEqual(next(good.frames()).interval_ns, 10 ** 9)
+
+    def test_unexpected_client_error(self):
+        good = self.subscribe()
+        bad = connect(self.server.bound_address, 5)
+        with mock.patch.object(_Client, "subscribe", side_effect=RuntimeError("boom")), \
+                self.assertLogs(level="ERROR"):
+            bad.sendall(encode_frame(bytes([MSG_SUBSCRIBE]) + b"{}"))
+            self.assertEqual(bad.recv(1), b"")
+        bad.close()
+        self.assertTrue(self.server._thread.is_alive())
+        tick(self.engine, 0)
+        tick(self.engine, 1)
+        self.assertEqual(next(good.frames()).interval_ns, 10 ** 9)
+
+    def test_client_disconnect(self):
+        client = self.subscribe()
+        client.close()
+        wait_for(lambda: self.server.client_count == 0)
+
+    def test_stale_socket_is_replaced(self):
+        self.server.stop()
+        with open(self.address(), "w"):
+            pass
+        self.server.start()
+        self.subscribe()
+
+    def test_second_server_refused(self):
+        with self.assertRaises(OSError):
+            StreamServer(self.engine, self.address()).start()
+
+    def test_watch(self):
+        self.subscribe()
+        out = io.StringIO()
+        thread = threading.Thread(target=watch.main, args=(["--address", self.address(), "--resolution", "0"], out))
+        thread.start()
+        wait_for(lambda: self.server.client_count == 2 and all(c.subscribed for c in self.server._clients))
+        tick(self.engine, 0)
+        tick(self.engine, 1)
+        wait_for(lambda: out.getvalue())
+        self.server.stop()
+        thread.join(5)
+        self.assertIn("eth0 rx=1.00 Mbps tx=8.00 Kbps", out.getvalue())
+
+    def test_watch_without_server(self):
+        self.server.stop()
+        self.assertEqual(watch.main(["--address", self.address()], io.StringIO()), 1)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets")
+class TestBackpressure(StreamTestCase):
+    queue_frames = 4
+
+    def test_slow_client_drops_frames(self):
+        interfaces = tuple(f"veth{i}" for i in range(200))
+        slow = connect(self.address())
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        slow.sendall(encode_subscribe())
+        wait_for(lambda: self.server.client_count == 1 and self.server._clients[0].subscribed)
+        slow_state = self.server._clients[0]
+        fast = self.subscribe()
+        received = []
+
+        def read():
+            try:
+                for frame in fast.frames():
+                    received.append(frame)
+            except OSError:
+                pass  # Closed by tearDown
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        for second in range(300):
+            tick(self.engine, second, interfaces)
+            time.sleep(0.0005)
+        # Twice the rate in the last second; the fast client gets it while the slow one sheds frames
+        tick(self.engine, 300, interfaces, rx_step=125_000 * 301 / 300)
+        wait_for(lambda: received and received[-1].rates[0].rx_bps == 2e6)
+        self.assertGreater(slow_state.dropped, received[-1].dropped)
+        self.assertLessEqual(len(slow_state.frames), self.queue_frames)
+        slow.close()
+
+
+class TestTcpStream(StreamTestCase):
+    def address(self):
+        return "127.0.0.1", 0
+
+    def test_loopback(self):
+        client = self.subscribe()
+        tick(self.engine, 0)
+        tick(self.engine, 1)
+        self.assertEqual(len(next(client.frames()).rates), 2)
+
+
+class TestWatchRendering(unittest.TestCase):
+    def test_render(self):
+        frame = RatesFrame(0, 10 ** 9, 3, [InterfaceRate("lo", 1e3, 1e3), InterfaceRate("eth0", 5e6, 1e6)])
+        table = watch.render_table(frame, "Mbps")
+        self.assertTrue(table[1].startswith("eth0"))
+        self.assertIn("5.00 Mbps", table[1])
+        self.assertIn("3 frames dropped", table[-1])
+        self.assertIn("lo rx=1.00 Kbps", watch.render_line(frame))
+
+
+if __name__ == '__main__':
+    unittest.main()
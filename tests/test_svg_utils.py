@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from speedview.config.config import TEMP_SVG_FILE
+from speedview.ui.resources.svg_templates import MAIN_SVG_TEMPLATE, FLOATING_SVG_TEMPLATE
+from speedview.utils import svg_utils
+from speedview.utils.svg_template import (CompiledSvgTemplate, SvgSlot, split_layers,
+                                          parse_attributes, parse_translate, resolve_paint)
+
+
+class TestCompiledSvgTemplate(unittest.TestCase):
+    def test_render_defaults_reproduces_template(self):
+        self.assertEqual(svg_utils.MAIN_SVG.render(), MAIN_SVG_TEMPLATE)
+        self.assertEqual(svg_utils.FLOATING_SVG.render(), FLOATING_SVG_TEMPLATE)
+
+    def test_offsets_point_at_slot_text(self):
+        start, end = svg_utils.MAIN_SVG.offsets["speed_value"]
+        self.assertEqual(MAIN_SVG_TEMPLATE[start:end], "0.00")
+
+    def test_missing_required_slot(self):
+        with self.assertRaises(ValueError):
+            CompiledSvgTemplate("<svg></svg>", [SvgSlot("value", r'<text>([^<]*)</text>')])
+
+    def test_optional_slot_is_skipped(self):
+        compiled = CompiledSvgTemplate(
+            "<svg><text>1</text></svg>",
+            [SvgSlot("value", r'<text>([^<]*)</text>'),
+             SvgSlot("other", r'<tspan>([^<]*)</tspan>', required=False)]
+        )
+        self.assertFalse(compiled.has_slot("other"))
+        self.assertEqual(compiled.render(value="2", other="x"), "<svg><text>2</text></svg>")
+
+
+class TestSvgRenderMatchesRegexPath(unittest.TestCase):
+    def test_main_frame(self):
+        for speed, status, strength in [(0, "Connected", 0), (42.5, "Disconnected", 3), (250, "Connected", 9)]:
+            expected = svg_utils._regex_update_svg_speed(MAIN_SVG_TEMPLATE, speed, 100)
+            expected = svg_utils._regex_update_svg_connection_status(expected, status, "WiFi")
+            expected = svg_utils._regex_update_svg_signal_strength(expected, strength)
+            rendered = svg_utils.render_main_svg(speed, 100, status=status,
+                                                 connection_type="WiFi", signal_strength=strength)
+            self.assertEqual(rendered, expected)
+
+    def test_update_functions_use_compiled_template(self):
+        expected = svg_utils._regex_update_svg_speed(MAIN_SVG_TEMPLATE, 12.3, 100, angle=10)
+        self.assertEqual(svg_utils.update_svg_speed(MAIN_SVG_TEMPLATE, 12.3, 100, angle=10), expected)
+
+    def test_floating_frame(self):
+        expected = svg_utils._regex_update_floating_svg(FLOATING_SVG_TEMPLATE, 7.25, 80, "Ethernet", "N/A")
+        self.assertEqual(svg_utils.update_floating_svg(FLOATING_SVG_TEMPLATE, 7.25, 80, "Ethernet", "N/A"),
+                         expected)
+
+    def test_floating_inactive_signal_bars(self):
+        rendered = svg_utils.render_floating_svg(1.0, 30, "WiFi", "5GHz")
+        self.assertEqual(rendered.count('fill="#222222"'), 2)
+
+
+class TestSvgLayers(unittest.TestCase):
+    def test_dynamic_elements_removed_from_background(self):
+        static, fragments = split_layers(MAIN_SVG_TEMPLATE, svg_utils.MAIN_SVG_LAYERS)
+        self.assertNotIn('id="needle"', static)
+        self.assertNotIn('id="speedValue"', static)
+        self.assertNotIn('class="signal-bar"', static)
+        self.assertIn('id="testButton"', static)
+        self.assertTrue(fragments["needle"].endswith("</g>"))
+
+    def test_floating_layers(self):
+        static, fragments = split_layers(FLOATING_SVG_TEMPLATE, svg_utils.FLOATING_SVG_LAYERS)
+        self.assertEqual(fragments["signal"].count("<rect"), 4)
+        self.assertIn('id="closeButton"', static)
+
+    def test_gauge_templates_are_not_animated(self):
+        # SvgGaugeWidget only repaints on new values, so an <animate> would never play. The signal
+        # bar pulses were dropped on purpose; QtSvg 5 ignores <animate> and never showed them either.
+        for template in (MAIN_SVG_TEMPLATE, FLOATING_SVG_TEMPLATE):
+            self.assertNotIn("<animate", template)
+        self.assertNotIn("<animate", svg_utils.render_floating_svg(1.0, 30, "WiFi", "5GHz"))
+
+    def test_parse_helpers(self):
+        attrs = parse_attributes('<text id="speedValue" x="250" font-size="48">0.00</text>')
+        self.assertEqual(attrs, {"id": "speedValue", "x": "250", "font-size": "48"})
+        self.assertEqual(parse_translate("translate(130, 30)"), (130.0, 30.0))
+        self.assertEqual(parse_translate(None), (0.0, 0.0))
+        self.assertEqual(resolve_paint(FLOATING_SVG_TEMPLATE, "url(#speedTextGradient)"), "#00FFAA")
+        self.assertEqual(resolve_paint(FLOATING_SVG_TEMPLATE, "#00FF8F"), "#00FF8F")
+
+
+class TestSweepOrphanedSvgFiles(unittest.TestCase):
+    def test_removes_only_speedview_frames(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, content in [("tmpabc123.svg", MAIN_SVG_TEMPLATE),
+                                  ("tmpdef456.svg", FLOATING_SVG_TEMPLATE),
+                                  ("tmpother.svg", "<svg></svg>"),
+                                  ("speedometer.svg", MAIN_SVG_TEMPLATE)]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write(content)
+            self.assertEqual(svg_utils.sweep_orphaned_svg_files(temp_dir), 2)
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["speedometer.svg", "tmpother.svg"])
+
+    def test_legacy_file_only_in_app_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryDirectory() as app_dir:
+            for directory in (temp_dir, app_dir):
+                with open(os.path.join(directory, TEMP_SVG_FILE), "w") as f:
+                    f.write(MAIN_SVG_TEMPLATE)
+            # Without an app dir only the temp dir is swept
+            self.assertEqual(svg_utils.sweep_orphaned_svg_files(temp_dir), 0)
+            self.assertEqual(svg_utils.sweep_orphaned_svg_files(temp_dir, app_dir), 1)
+            self.assertEqual(os.listdir(app_dir), [])
+            self.assertEqual(os.listdir(temp_dir), [TEMP_SVG_FILE])
+
+
+if __name__ == '__main__':
+    unittest.main()
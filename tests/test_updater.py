@@ -0,0 +1,169 @@
+import sys
+import json
+import time
+import shutil
+import os.path
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication, QWidget
+from speedview.update.updater import UpdateChecker
+from speedview.ui.update_dialog import UpdateCheckThread
+
+RELEASE = {
+    "tag_name": "v9.9.9",
+    "body": "Faster everything",
+    "assets": [{"name": "setup.exe", "browser_download_url": "http://127.0.0.1/setup.exe", "size": 1}],
+}
+ETAG = '"release-999"'
+
+
+class ReleaseFeed(BaseHTTPRequestHandler):
+    """Stand-in for the release feed; answers conditional requests with 304"""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        time.sleep(self.server.delay)
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        body = json.dumps(RELEASE).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", "Sat, 17 Oct 2026 12:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestUpdateChecker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.directory, "NetworkSpeedMeter", "update_cache.json")
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ReleaseFeed)
+        self.server.requests = []
+        self.server.delay = 0
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.settings = SimpleNamespace(update_url=f"http://127.0.0.1:{self.server.server_port}/latest")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def make_checker(self, **kwargs):
+        return UpdateChecker(self.settings, cache_file=self.cache_file, **kwargs)
+
+    def test_release(self):
+        checker = self.make_checker()
+        self.assertTrue(checker.check_for_updates())
+        self.assertEqual(checker.latest_version, "9.9.9")
+        self.assertEqual(checker.release_notes, "Faster everything")
+        self.assertEqual(checker.download_url, "http://127.0.0.1/setup.exe")
+        self.assertTrue(os.path.exists(self.cache_file))
+
+    def test_published_digest(self):
+        checker = self.make_checker()
+        release = dict(RELEASE, assets=[
+            {"name": "setup.exe", "browser_download_url": "http://127.0.0.1/setup.exe", "digest": "sha256:" + "ab" * 32},
+        ])
+        self.assertTrue(checker._apply_release(release))
+        self.assertEqual(checker.published_sha256(), "ab" * 32)
+        # Without an asset digest, a "<installer>.sha256" asset is used
+        release["assets"] = [{"name": "setup.exe", "browser_download_url": "http://127.0.0.1/setup.exe"},
+                             {"name": "setup.exe.sha256", "browser_download_url": "http://127.0.0.1/setup.exe.sha256"}]
+        checker._apply_release(release)
+        self.assertIsNone(checker.download_sha256)
+        self.assertEqual(checker.digest_url, "http://127.0.0.1/setup.exe.sha256")
+
+    def test_rate_limited(self):
+        self.make_checker().check_for_updates()
+        # The cache is persisted, so a new checker (a later start) does not ask again
+        checker = self.make_checker()
+        self.assertTrue(checker.check_for_updates())
+        self.assertEqual(checker.latest_version, "9.9.9")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_conditional_request(self):
+        self.make_checker().check_for_updates()
+        checker = self.make_checker()
+        self.assertTrue(checker.check_for_updates(force=True))
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1]["If-None-Match"], ETAG)
+        self.assertEqual(self.server.requests[1]["If-Modified-Since"], "Sat, 17 Oct 2026 12:00:00 GMT")
+        # The 304 reuses the cached release
+        self.assertEqual(checker.latest_version, "9.9.9")
+        self.assertEqual(checker.download_url, "http://127.0.0.1/setup.exe")
+
+    def test_interval_elapsed(self):
+        self.make_checker().check_for_updates()
+        self.make_checker(check_interval=0).check_for_updates()
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIn("If-None-Match", self.server.requests[1])
+
+    def test_other_url_ignores_cache(self):
+        self.make_checker().check_for_updates()
+        self.settings.update_url += "?channel=beta"
+        self.make_checker().check_for_updates()
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertNotIn("If-None-Match", self.server.requests[1])
+
+    def test_unreachable(self):
+        self.settings.update_url = "http://127.0.0.1:1/latest"
+        checker = self.make_checker()
+        self.assertFalse(checker.check_for_updates())
+        self.assertIsNotNone(checker.last_error)
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_check_does_not_block_gui_thread(self):
+        self.server.delay = 1.0
+        thread = UpdateCheckThread(self.make_checker())
+        results = []
+        loop = QEventLoop()
+        thread.checked.connect(results.append)
+        thread.finished.connect(loop.quit)
+        start = time.monotonic()
+        thread.start()
+        self.assertLess(time.monotonic() - start, 0.2)
+        QTimer.singleShot(10000, loop.quit)
+        loop.exec_()
+        thread.wait()
+        self.assertEqual(results, [True])
+
+    def test_startup_check_does_not_wait(self):
+        import main
+        self.server.delay = 1.0
+        window = QWidget()
+        window.settings = self.settings
+        # Up to date, so no dialog opens and blocks the test
+        with mock.patch("speedview.update.updater.UPDATE_CACHE_FILE", self.cache_file), \
+                mock.patch("speedview.update.updater.APP_VERSION", "10.0.0"):
+            start = time.monotonic()
+            main.check_updates_on_startup(window)
+            self.assertLess(time.monotonic() - start, 0.2)
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.cache_file) and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.assertEqual(len(self.server.requests), 1)
+        for thread in window.findChildren(UpdateCheckThread):
+            thread.wait()
+
+
+if __name__ == '__main__':
+    unittest.main()